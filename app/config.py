@@ -1,10 +1,35 @@
 # app/config.py
 from dotenv import load_dotenv
 import os
-from typing import List
+from typing import Dict, List
 
 load_dotenv()
 
+
+def _parse_module_levels(raw: str) -> Dict[str, str]:
+    """Parsea "app.sockets=WARNING,app.routes.discard=DEBUG" a {modulo: nivel}"""
+    levels = {}
+    for item in raw.split(","):
+        if "=" not in item:
+            continue
+        name, level = item.split("=", 1)
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def _parse_nodes(raw: str) -> Dict[str, str]:
+    """Parsea "w1=http://127.0.0.1:8001,w2=http://127.0.0.1:8002" a {node_id: url}"""
+    nodes = {}
+    for item in raw.split(","):
+        if "=" not in item:
+            continue
+        node_id, url = item.split("=", 1)
+        if node_id.strip() and url.strip():
+            nodes[node_id.strip()] = url.strip().rstrip("/")
+    return nodes
+
+
 class Settings:
     APP_NAME: str = os.getenv("APP_NAME", "FastAPI App")
     ENVIRONMENT: str = os.getenv("ENVIRONMENT", "development")
@@ -12,4 +37,85 @@ class Settings:
     HOST: str = os.getenv("HOST", "0.0.0.0")
     PORT: int = int(os.getenv("PORT", 8000))
 
+    # Logging
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO").upper()
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "text")  # "text" | "json"
+    LOG_MODULE_LEVELS: Dict[str, str] = _parse_module_levels(os.getenv("LOG_MODULE_LEVELS", ""))
+
+    # Deadlines de turnos y acciones pendientes (0 = sin límite)
+    TURN_TIMEOUT_SECONDS: int = int(os.getenv("TURN_TIMEOUT_SECONDS", 300))
+    PENDING_ACTION_TIMEOUT_SECONDS: int = int(os.getenv("PENDING_ACTION_TIMEOUT_SECONDS", 600))
+    TURN_TIMER_TICK_SECONDS: float = float(os.getenv("TURN_TIMER_TICK_SECONDS", 1))
+
+    # Contexto de partida cacheado por las rutas de acciones (sala, jugadores, turno); 0 = sin cache
+    GAME_CONTEXT_TTL_SECONDS: float = float(os.getenv("GAME_CONTEXT_TTL_SECONDS", 30))
+
+    # Executor de servicios síncronos (DB): threads y llamadas que pueden esperar en su cola
+    SERVICE_EXECUTOR_WORKERS: int = int(os.getenv("SERVICE_EXECUTOR_WORKERS", 8))
+    SERVICE_EXECUTOR_QUEUE: int = int(os.getenv("SERVICE_EXECUTOR_QUEUE", 64))
+
+    # Idempotency-Key de las acciones: vencimiento y tope de claves en memoria; con PERSIST también en la DB
+    IDEMPOTENCY_TTL_SECONDS: float = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", 300))
+    IDEMPOTENCY_MAX_KEYS: int = int(os.getenv("IDEMPOTENCY_MAX_KEYS", 10000))
+    IDEMPOTENCY_PERSIST: bool = os.getenv("IDEMPOTENCY_PERSIST", "false").lower() in ("1", "true", "yes")
+
+    # Archivo de partidas terminadas: directorio de los .json.gz y filas por lote al borrar/restaurar
+    ARCHIVE_DIR: str = os.getenv("ARCHIVE_DIR", "archive")
+    ARCHIVE_BATCH_SIZE: int = int(os.getenv("ARCHIVE_BATCH_SIZE", 500))
+
+    # Barrido de salas WAITING abandonadas (0 = sin barrido): sin sockets después de IDLE, con sockets después
+    # de MAX (se les avisa game_cancelled); también borra jugadores huérfanos
+    SWEEP_INTERVAL_SECONDS: float = float(os.getenv("SWEEP_INTERVAL_SECONDS", 300))
+    SWEEP_WAITING_ROOM_IDLE_SECONDS: float = float(os.getenv("SWEEP_WAITING_ROOM_IDLE_SECONDS", 1800))
+    SWEEP_WAITING_ROOM_MAX_SECONDS: float = float(os.getenv("SWEEP_WAITING_ROOM_MAX_SECONDS", 86400))
+    SWEEP_BATCH_SIZE: int = int(os.getenv("SWEEP_BATCH_SIZE", 100))
+
+    # Log de acciones (actions_per_turn): días de retención (0 = sin retención) y particiones mensuales
+    # creadas por adelantado en MySQL
+    ACTION_RETENTION_DAYS: int = int(os.getenv("ACTION_RETENTION_DAYS", 0))
+    ACTION_PARTITION_MONTHS_AHEAD: int = int(os.getenv("ACTION_PARTITION_MONTHS_AHEAD", 3))
+
+    # Historial de partida (GET /api/game/{room_id}/history): acciones por página por defecto y máximo
+    HISTORY_PAGE_SIZE: int = int(os.getenv("HISTORY_PAGE_SIZE", 50))
+    HISTORY_MAX_PAGE_SIZE: int = int(os.getenv("HISTORY_MAX_PAGE_SIZE", 200))
+
+    # Warmup al arrancar: conexiones del pool que se abren antes de reportarse sano
+    WARMUP_DB_CONNECTIONS: int = int(os.getenv("WARMUP_DB_CONNECTIONS", 5))
+
+    # Readiness (/ready): por encima de cualquiera de estos umbrales el worker deja de estar listo (0 = sin límite)
+    READY_DB_LATENCY_MS: float = float(os.getenv("READY_DB_LATENCY_MS", 250))
+    READY_POOL_SATURATION: float = float(os.getenv("READY_POOL_SATURATION", 0.9))
+    READY_LOOP_LAG_MS: float = float(os.getenv("READY_LOOP_LAG_MS", 100))
+    READY_MAX_CONNECTIONS: int = int(os.getenv("READY_MAX_CONNECTIONS", 0))
+    READY_MAX_QUEUE_DEPTH: int = int(os.getenv("READY_MAX_QUEUE_DEPTH", 1000))
+
+    # Monitor del event loop: intervalo del sampler de lag y umbral de bloqueo; en debug reporta el stack del bloqueo
+    LOOP_MONITOR_INTERVAL_SECONDS: float = float(os.getenv("LOOP_MONITOR_INTERVAL_SECONDS", 0.25))
+    LOOP_BLOCK_THRESHOLD_MS: float = float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", 100))
+    LOOP_BLOCK_DEBUG: bool = os.getenv("LOOP_BLOCK_DEBUG", "false").lower() in ("1", "true", "yes")
+
+    # Long-poll de /game_state/{room_id}/poll: espera máxima por request
+    STATUS_LONG_POLL_SECONDS: float = float(os.getenv("STATUS_LONG_POLL_SECONDS", 25))
+
+    # Bus de mensajes entre workers ("" = un solo proceso, "memory://", "redis://host:6379/0")
+    MESSAGE_BUS_URL: str = os.getenv("MESSAGE_BUS_URL", "")
+    # Heartbeat del registro de sesiones: un nodo sin latir por SESSION_NODE_TTL_SECONDS pierde sus sesiones
+    SESSION_HEARTBEAT_SECONDS: float = float(os.getenv("SESSION_HEARTBEAT_SECONDS", 5))
+    SESSION_NODE_TTL_SECONDS: float = float(os.getenv("SESSION_NODE_TTL_SECONDS", 15))
+
+    # Reanudación de sockets: eventos recientes guardados por room y cantidad de rooms con buffer
+    WS_EVENT_BUFFER_SIZE: int = int(os.getenv("WS_EVENT_BUFFER_SIZE", 256))
+    WS_EVENT_BUFFER_ROOMS: int = int(os.getenv("WS_EVENT_BUFFER_ROOMS", 1024))
+
+    # Salida por conexión: paquetes pendientes en el transporte antes de encolar, tope de la cola
+    # propia (se descarta lo más viejo) y segundos congestionado para marcar consumidor lento
+    WS_TRANSPORT_BACKLOG: int = int(os.getenv("WS_TRANSPORT_BACKLOG", 16))
+    WS_OUTBOUND_QUEUE_MAX: int = int(os.getenv("WS_OUTBOUND_QUEUE_MAX", 64))
+    WS_SLOW_CONSUMER_SECONDS: float = float(os.getenv("WS_SLOW_CONSUMER_SECONDS", 10))
+
+    # Afinidad de partidas: worker dueño de cada room por hashing consistente (vacío = un solo nodo)
+    SHARD_NODE_ID: str = os.getenv("SHARD_NODE_ID", "")
+    SHARD_NODES: Dict[str, str] = _parse_nodes(os.getenv("SHARD_NODES", ""))
+    SHARD_VNODES: int = int(os.getenv("SHARD_VNODES", 64))
+
 settings = Settings()
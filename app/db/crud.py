@@ -1,3 +1,5 @@
+from datetime import datetime, timedelta
+from typing import Optional
 from sqlalchemy.orm import Session
 from . import models
 
@@ -76,6 +78,8 @@ def update_player_turn(db: Session, game_id: int, next_player_id: int):
     if game:
         game.player_turn_id = next_player_id
         db.commit()
+        from app.services.game_context import invalidate_game_context  # Import aquí para evitar circular imports
+        invalidate_game_context(game_id=game_id)
         db.refresh(game)
     return game
 
@@ -482,23 +486,40 @@ def get_players_not_in_disgrace(db: Session, game_id: int, exclude_player_id: in
 # DETECTIVE ACTION
 # ------------------------------
 
-def get_action_by_id(db: Session, action_id: int):
+# actions_per_turn puede estar particionada por action_time (ver app/db/partitioning.py): las
+# búsquedas acotan action_time para leer solo las particiones que pueden tener la fila. El margen
+# cubre acciones con action_time del servidor (CURRENT_TIMESTAMP) en otra zona horaria.
+ACTION_TIME_SLACK = timedelta(days=1)
+
+
+def get_game_started_at(db: Session, game_id: int) -> Optional[datetime]:
+    """
+    Cota inferior del action_time de las acciones de una partida: la creación de su sala
+    (la partida se crea al arrancar la sala, después). None si la partida no tiene sala.
+    """
+    return db.query(models.Room.created_at).filter(models.Room.id_game == game_id).scalar()
+
+
+def get_action_by_id(db: Session, action_id: int, since: datetime):
     """
     Obtiene una acción por su ID.
     
     Args:
         db: Sesión de base de datos
         action_id: ID de la acción en ActionsPerTurn
+        since: action_time mínimo de la acción (p. ej. ``get_game_started_at`` de su partida o el
+            vencimiento de una acción pendiente): solo se leen las particiones desde esa fecha
     
     Returns:
-        ActionsPerTurn o None si no existe
+        ActionsPerTurn o None si no existe (o es anterior a ``since``)
     """
     return db.query(models.ActionsPerTurn).filter(
-        models.ActionsPerTurn.id == action_id
+        models.ActionsPerTurn.id == action_id,
+        models.ActionsPerTurn.action_time >= since - ACTION_TIME_SLACK
     ).first()
 
 
-def update_action_result(db: Session, action_id: int, result: models.ActionResult):
+def update_action_result(db: Session, action_id: int, result: models.ActionResult, since: datetime):
     """
     Actualiza el resultado de una acción.
     
@@ -506,8 +527,9 @@ def update_action_result(db: Session, action_id: int, result: models.ActionResul
         db: Sesión de base de datos
         action_id: ID de la acción
         result: Nuevo ActionResult (SUCCESS, FAILED, CANCELLED, etc)
+        since: action_time mínimo de la acción (ver ``get_action_by_id``)
     """
-    action = get_action_by_id(db, action_id)
+    action = get_action_by_id(db, action_id, since)
     if action:
         action.result = result
         db.flush()
@@ -7,11 +7,18 @@ from sqlalchemy import (
     DateTime,
     ForeignKey,
     Enum,
+    Index,
     UniqueConstraint,
+    Text,
+    event,
+    inspect,
     text
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import Session, relationship
+from sqlalchemy.orm.attributes import flag_modified
 from .database import Base
+from datetime import datetime
+from itertools import chain
 import enum
 
 
@@ -146,12 +153,16 @@ class Game(Base):
     
     id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     player_turn_id = Column(Integer, ForeignKey("player.id"))
+    # Compare-and-swap: cada UPDATE de la partida exige la versión leída (StaleDataError si cambió)
+    version = Column(Integer, nullable=False, default=1, server_default=text("1"))
 
     rooms = relationship("Room", back_populates="game")
     cards = relationship("CardsXGame", back_populates="game")
     current_player = relationship("Player", foreign_keys=[player_turn_id])
     turns = relationship("Turn", back_populates="game")
 
+    __mapper_args__ = {"version_id_col": version}
+
 
 class Card(Base):
     __tablename__ = "card"
@@ -176,6 +187,7 @@ class Room(Base):
     password = Column(String(500))
     status = Column(Enum(RoomStatus), nullable=False)
     id_game = Column(Integer, ForeignKey("game.id"))
+    created_at = Column(DateTime, nullable=False, default=datetime.now, server_default=text('CURRENT_TIMESTAMP'))
 
     game = relationship("Game", back_populates="rooms")
     players = relationship("Player", back_populates="room")
@@ -233,6 +245,14 @@ class Turn(Base):
 
 class ActionsPerTurn(Base):
     __tablename__ = "actions_per_turn"
+    __table_args__ = (
+        # Historial (GET /api/game/{room_id}/history): índices cubrientes para elegir los ids de
+        # cada página (filtro + orden por id sin leer la tabla); las columnas finales son filtros
+        # que se evalúan en el índice
+        Index("ix_actions_game_parent_id", "id_game", "parent_action_id", "id", "action_type"),
+        Index("ix_actions_game_turn_id", "id_game", "turn_id", "parent_action_id", "id", "player_id", "action_type"),
+        Index("ix_actions_game_player_id", "id_game", "player_id", "parent_action_id", "id", "action_type"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     id_game = Column(Integer, ForeignKey("game.id"), nullable=False)
@@ -275,4 +295,55 @@ class ActionsPerTurn(Base):
     card_given = relationship("CardsXGame", foreign_keys=[card_given_id])
     card_received = relationship("CardsXGame", foreign_keys=[card_received_id])
     parent_action = relationship("ActionsPerTurn", remote_side=[id], foreign_keys=[parent_action_id])
-    triggered_by = relationship("ActionsPerTurn", remote_side=[id], foreign_keys=[triggered_by_action_id])
\ No newline at end of file
+    triggered_by = relationship("ActionsPerTurn", remote_side=[id], foreign_keys=[triggered_by_action_id])
+
+
+class IdempotencyRecord(Base):
+    """Respuesta guardada de una acción con Idempotency-Key (con IDEMPOTENCY_PERSIST)"""
+    __tablename__ = "idempotency_key"
+
+    key = Column(String(64), primary_key=True)          # sha256 de ruta + usuario + clave del cliente
+    fingerprint = Column(String(64), nullable=False)    # sha256 del body del request original
+    status_code = Column(Integer, nullable=False)
+    body = Column(Text, nullable=False)
+    media_type = Column(String(100))
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+# ========================
+# VERSIONADO DE PARTIDAS
+# ========================
+
+# Filas que son estado de una partida: cambiarlas cambia la partida
+_GAME_STATE_ROWS = (CardsXGame, Turn, ActionsPerTurn)
+
+
+@event.listens_for(Session, "before_flush")
+def _bump_game_versions(session, flush_context, instances):
+    """
+    Toda acción que modifica cartas, turnos o acciones de una partida sube
+    ``Game.version`` en el mismo flush. El UPDATE lleva ``WHERE version = <leída>``:
+    si otro request cambió la partida desde que se cargó, el flush falla con
+    StaleDataError (409 ``version_conflict``, reintentable) en vez de pisarlo.
+
+    La versión comparada es la cargada en la sesión: las rutas la leen con
+    ``confirm_turn``, que también verifica el turno sobre esa fila. Límite: un commit
+    expira ``Game``, así que el flush de un commit posterior relee la versión actual y
+    no detecta cambios ajenos entre ambos commits. Las rutas que escriben después de
+    un commit deben volver a pasar por ``confirm_turn`` (o hacer un único commit).
+    """
+    game_ids = {
+        obj.id_game
+        for obj in chain(session.new, session.dirty, session.deleted)
+        if isinstance(obj, _GAME_STATE_ROWS) and obj.id_game is not None
+        and (obj in session.new or obj in session.deleted or session.is_modified(obj))
+    }
+    for game_id in game_ids:
+        game = session.get(Game, game_id)
+        if game is None or game in session.new or game in session.deleted:
+            continue
+        expired = {"player_turn_id", "version"} & inspect(game).unloaded
+        if expired:
+            # Expirada por un commit previo de la sesión: se relee la versión actual (ver límite)
+            session.refresh(game, sorted(expired))
+        flag_modified(game, "player_turn_id")
@@ -0,0 +1,215 @@
+# app/db/partitioning.py
+"""
+Particionado por tiempo de ``actions_per_turn`` y retención del log de acciones.
+
+``actions_per_turn`` suma una fila por carta movida más las acciones padre: es la
+tabla que más crece. En MySQL se particiona por mes con
+``RANGE COLUMNS(action_time)``:
+
+- particiones ``pYYYYMM`` (``VALUES LESS THAN`` el primer día del mes siguiente) y
+  una ``p_future`` (``MAXVALUE``) que queda vacía: las de los próximos
+  ``ACTION_PARTITION_MONTHS_AHEAD`` meses se crean por adelantado partiendo
+  ``p_future``, que al estar vacía no copia filas;
+- la retención (``ACTION_RETENTION_DAYS``, 0 = sin retención) borra las
+  particiones cuyo mes terminó antes del corte con ``DROP PARTITION``: no recorre
+  filas ni genera undo como un ``DELETE``.
+
+MySQL no admite foreign keys en tablas particionadas y exige la columna de
+particionado en la clave primaria: la migración borra las FKs de la tabla (los
+índices quedan; las relaciones del ORM no dependen de ellas) y cambia la PK a
+``(id, action_time)``. El ``id`` sigue siendo único (autoincremental).
+
+``crud.get_action_by_id`` (``since`` obligatorio, p. ej. ``get_game_started_at``)
+acota ``action_time`` para que MySQL solo lea las particiones que pueden tener la fila.
+
+En otros motores (SQLite de desarrollo y tests) no hay particiones: la retención
+borra por lotes las filas más viejas que el corte.
+
+Uso: ``python scripts/partition_actions.py`` (ver ``--help``).
+"""
+import logging
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import delete, inspect, text, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from .models import ActionsPerTurn
+
+logger = logging.getLogger(__name__)
+
+TABLE = ActionsPerTurn.__tablename__
+FUTURE_PARTITION = "p_future"
+
+
+def month_start(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+
+def next_month(day: date) -> date:
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"p{month:%Y%m}"
+
+
+def _partition_clause(month: date) -> str:
+    return f"PARTITION {partition_name(month)} VALUES LESS THAN ('{next_month(month):%Y-%m-%d}')"
+
+
+def _future_clause() -> str:
+    return f"PARTITION {FUTURE_PARTITION} VALUES LESS THAN (MAXVALUE)"
+
+
+def _months(first: date, last: date) -> List[date]:
+    months, month = [], month_start(first)
+    while month <= last:
+        months.append(month)
+        month = next_month(month)
+    return months
+
+
+# -------------
+# | MySQL     |
+# -------------
+
+def is_partitioned(conn: Connection) -> bool:
+    if conn.dialect.name != "mysql":
+        return False
+    return bool(conn.execute(text(
+        "SELECT COUNT(*) FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND PARTITION_NAME IS NOT NULL"
+    ), {"table": TABLE}).scalar())
+
+
+def existing_partitions(conn: Connection) -> List[str]:
+    return [row[0] for row in conn.execute(text(
+        "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND PARTITION_NAME IS NOT NULL "
+        "ORDER BY PARTITION_ORDINAL_POSITION"
+    ), {"table": TABLE})]
+
+
+def migration_statements(foreign_keys: List[str], first_month: date, today: date, months_ahead: int) -> List[str]:
+    """DDL para particionar la tabla: sin FKs, PK (id, action_time), una partición por mes"""
+    months = _months(first_month, today)
+    for _ in range(months_ahead):
+        months.append(next_month(months[-1]))
+    partitions = ",\n  ".join([_partition_clause(month) for month in months] + [_future_clause()])
+    statements = [f"ALTER TABLE {TABLE} DROP FOREIGN KEY {name}" for name in foreign_keys]
+    statements.append(f"ALTER TABLE {TABLE} DROP PRIMARY KEY, ADD PRIMARY KEY (id, action_time)")
+    statements.append(f"ALTER TABLE {TABLE} PARTITION BY RANGE COLUMNS(action_time) (\n  {partitions}\n)")
+    return statements
+
+
+def migrate(engine: Engine, today: Optional[date] = None, months_ahead: int = 3, dry_run: bool = False) -> List[str]:
+    """Particiona ``actions_per_turn`` (solo MySQL); devuelve el DDL ejecutado (o a ejecutar)"""
+    today = today or date.today()
+    with engine.connect() as conn:
+        if conn.dialect.name != "mysql":
+            raise RuntimeError(f"El particionado de {TABLE} requiere MySQL (motor: {conn.dialect.name})")
+        if is_partitioned(conn):
+            return []
+        foreign_keys = [fk["name"] for fk in inspect(conn).get_foreign_keys(TABLE) if fk.get("name")]
+        oldest = conn.execute(text(f"SELECT MIN(action_time) FROM {TABLE}")).scalar()
+        statements = migration_statements(foreign_keys, oldest.date() if oldest else today, today, months_ahead)
+        if not dry_run:
+            for statement in statements:
+                conn.execute(text(statement))
+            conn.commit()
+            logger.info("%s particionada por mes (%s sentencias)", TABLE, len(statements))
+    return statements
+
+
+def add_future_partitions(conn: Connection, today: date, months_ahead: int) -> List[str]:
+    """Crea las particiones que falten hasta ``months_ahead`` meses después de hoy"""
+    existing = set(existing_partitions(conn))
+    target = month_start(today)
+    for _ in range(months_ahead):
+        target = next_month(target)
+    missing = [month for month in _months(today, target) if partition_name(month) not in existing]
+    if not missing:
+        return []
+    clauses = ", ".join([_partition_clause(month) for month in missing] + [_future_clause()])
+    conn.execute(text(f"ALTER TABLE {TABLE} REORGANIZE PARTITION {FUTURE_PARTITION} INTO ({clauses})"))
+    return [partition_name(month) for month in missing]
+
+
+def expired_partitions(names: List[str], cutoff: datetime) -> List[str]:
+    """Particiones mensuales cuyo rango completo es anterior al corte"""
+    expired = []
+    for name in names:
+        if name == FUTURE_PARTITION or len(name) != 7:
+            continue
+        month = date(int(name[1:5]), int(name[5:7]), 1)
+        if datetime.combine(next_month(month), datetime.min.time()) <= cutoff:
+            expired.append(name)
+    return expired
+
+
+def drop_expired_partitions(conn: Connection, cutoff: datetime) -> List[str]:
+    expired = expired_partitions(existing_partitions(conn), cutoff)
+    if expired:
+        conn.execute(text(f"ALTER TABLE {TABLE} DROP PARTITION {', '.join(expired)}"))
+    return expired
+
+
+# -------------------
+# | Sin particiones |
+# -------------------
+
+def purge_expired_actions(db: Session, cutoff: datetime, batch_size: int = 1000) -> int:
+    """Borra por lotes las acciones anteriores al corte (motores sin particiones)"""
+    deleted = 0
+    while True:
+        ids = [action_id for (action_id,) in (
+            db.query(ActionsPerTurn.id)
+            .filter(ActionsPerTurn.action_time < cutoff)
+            .order_by(ActionsPerTurn.id)
+            .limit(batch_size)
+            .all()
+        )]
+        if not ids:
+            return deleted
+        # Las acciones que sobreviven no pueden seguir apuntando a las borradas
+        db.execute(update(ActionsPerTurn).where(ActionsPerTurn.parent_action_id.in_(ids))
+                   .values(parent_action_id=None))
+        db.execute(update(ActionsPerTurn).where(ActionsPerTurn.triggered_by_action_id.in_(ids))
+                   .values(triggered_by_action_id=None))
+        db.execute(delete(ActionsPerTurn).where(ActionsPerTurn.id.in_(ids)))
+        db.commit()
+        deleted += len(ids)
+
+
+# -------------
+# | Retención |
+# -------------
+
+def maintain(engine: Engine, retention_days: int, months_ahead: int = 3, batch_size: int = 1000,
+             now: Optional[datetime] = None) -> dict:
+    """
+    Pasada de mantenimiento: crea las particiones de los próximos meses y aplica la
+    retención (``DROP PARTITION`` en MySQL particionado, ``DELETE`` por lotes si no).
+    """
+    now = now or datetime.now()
+    cutoff = now - timedelta(days=retention_days) if retention_days > 0 else None
+    report = {"partitioned": False, "created": [], "dropped": [], "deleted_rows": 0}
+    with engine.connect() as conn:
+        if is_partitioned(conn):
+            report["partitioned"] = True
+            report["created"] = add_future_partitions(conn, now.date(), months_ahead)
+            if cutoff is not None:
+                report["dropped"] = drop_expired_partitions(conn, cutoff)
+            conn.commit()
+    if not report["partitioned"] and cutoff is not None:
+        db = Session(bind=engine)
+        try:
+            report["deleted_rows"] = purge_expired_actions(db, cutoff, batch_size)
+        finally:
+            db.close()
+    if report["created"] or report["dropped"] or report["deleted_rows"]:
+        logger.info("Log de acciones: particiones nuevas %s, borradas %s, filas borradas %s",
+                    report["created"], report["dropped"], report["deleted_rows"])
+    return report
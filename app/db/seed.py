@@ -0,0 +1,44 @@
+from pathlib import Path
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from . import models
+
+# Única fuente del catálogo de cartas: el INSERT de scripts/carga-datos.sql
+CARGA_DATOS_PATH = Path(__file__).resolve().parents[2] / "scripts" / "carga-datos.sql"
+
+
+def _extract_card_insert(sql: str) -> str:
+    """
+    Extrae la sentencia "INSERT INTO card ... ;" del script de carga,
+    sin los comentarios de línea, para poder ejecutarla en cualquier motor (MySQL o SQLite).
+    """
+    start = sql.index("INSERT INTO card ")
+    end = sql.index(";", start)
+    lines = [
+        line for line in sql[start:end].splitlines()
+        if not line.strip().startswith("--")
+    ]
+    return "\n".join(lines)
+
+
+def seed_card_catalog(db: Session, sql_path: Path = CARGA_DATOS_PATH) -> int:
+    """
+    Carga el catálogo de cartas si la tabla card está vacía.
+    Los ids quedan en el mismo orden que en carga-datos.sql (los servicios dependen de ellos,
+    ej: Harley Quin = 4).
+
+    Args:
+        db: Sesión de base de datos
+        sql_path: Script SQL del que se toma el INSERT de cartas
+
+    Returns:
+        int: Cantidad de cartas en el catálogo
+    """
+    existing = db.query(models.Card).count()
+    if existing:
+        return existing
+
+    statement = _extract_card_insert(Path(sql_path).read_text(encoding="utf-8"))
+    db.execute(text(statement))
+    db.commit()
+    return db.query(models.Card).count()
@@ -0,0 +1,107 @@
+# app/logging_config.py
+import atexit
+import json
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+# Atributos estándar de LogRecord, el resto viene de extra={...}
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+
+
+class _ConsoleHandler(logging.StreamHandler):
+    """StreamHandler que resuelve sys.stderr al escribir (no al crearse)"""
+
+    def __init__(self, level=logging.NOTSET):
+        logging.Handler.__init__(self, level)
+
+    @property
+    def stream(self):
+        return sys.stderr
+
+
+class JsonFormatter(logging.Formatter):
+    """Formatea cada registro como una línea JSON, incluyendo los campos de extra"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+def _build_formatter(log_format: str) -> logging.Formatter:
+    if log_format == "json":
+        return JsonFormatter()
+    return logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+
+def setup_logging(level: str = "INFO", module_levels: Optional[Dict[str, str]] = None, log_format: str = "text") -> QueueListener:
+    """
+    Configura el logging de la aplicación.
+
+    El root logger solo tiene un QueueHandler (encolar es O(1) y no hace I/O),
+    y un QueueListener en un thread aparte escribe a la consola. Así el event loop
+    nunca bloquea escribiendo logs. Los niveles se aplican en el logger, por lo que
+    un logger.debug(...) descartado no formatea nada.
+
+    Args:
+        level: Nivel del root logger (DEBUG, INFO, WARNING, ...)
+        module_levels: Niveles por módulo, ej: {"app.sockets": "WARNING"}
+        log_format: "text" o "json"
+
+    Returns:
+        El QueueListener activo (idempotente: si ya existe se reconfiguran los niveles)
+    """
+    global _listener
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    for name, module_level in (module_levels or {}).items():
+        logging.getLogger(name).setLevel(module_level)
+
+    if _listener is not None:
+        return _listener
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+
+    console = _ConsoleHandler()
+    console.setFormatter(_build_formatter(log_format))
+
+    root.addHandler(QueueHandler(log_queue))
+
+    _listener = QueueListener(log_queue, console, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return _listener
+
+
+def pending_records() -> int:
+    """Registros encolados que el listener todavía no escribió"""
+    return _listener.queue.qsize() if _listener is not None else 0
+
+
+def shutdown_logging():
+    """Detiene el listener, vaciando los registros pendientes en la cola"""
+    global _listener
+    if _listener is None:
+        return
+
+    _listener.stop()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, QueueHandler):
+            root.removeHandler(handler)
+    _listener = None
@@ -0,0 +1,190 @@
+# app/loop_monitor.py
+"""
+Monitor del event loop: lag y detector de llamadas que lo bloquean.
+
+Las rutas usan la sesión síncrona de la DB dentro de handlers ``async def``:
+una consulta lenta congela todos los sockets del proceso. El monitor tiene dos
+partes:
+
+- un sampler en el loop que duerme ``interval`` segundos y mide cuánto más
+  tardó en despertar (el lag); guarda las últimas ``window`` muestras y cuenta
+  las que superan ``threshold``. Lo usan ``/ready`` y ``/debug/loop``;
+- en modo debug, un thread watchdog que mira el último latido del sampler: si
+  el loop lleva más de ``threshold`` sin latir captura el stack del thread del
+  loop y lo atribuye a la ruta (app/routes) o al handler de socket
+  (app/sockets/socket_events.py) más interno del stack. Cada bloqueo se
+  reporta una vez, con la duración final cuando el loop vuelve.
+
+El watchdog lee el stack de otro thread (``sys._current_frames``): no toca el
+loop y cuesta casi nada mientras el loop late, pero se deja para debug.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Deque, List, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Módulos cuyos frames identifican al handler que bloqueó
+_HANDLER_PATHS = ("app/routes/", "app/sockets/socket_events.py")
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+
+def attribute(frames: List[traceback.FrameSummary]) -> Optional[str]:
+    """Ruta o handler de socket más interno del stack ("app/routes/discard.py:discard_cards")"""
+    for frame in reversed(frames):
+        filename = frame.filename.replace("\\", "/")
+        for path in _HANDLER_PATHS:
+            index = filename.find(path)
+            if index >= 0:
+                return f"{filename[index:]}:{frame.name}"
+    return None
+
+
+class LoopMonitor:
+
+    def __init__(self, interval: float = 0.25, threshold: float = 0.1, window: int = 240, debug: bool = False,
+                 max_reports: int = 50):
+        self.interval = interval
+        self.threshold = threshold
+        self.debug = debug
+        self.samples: Deque[float] = deque(maxlen=window)  # lag de cada muestra (segundos)
+        self.stalls = 0
+        self.reports: Deque[dict] = deque(maxlen=max_reports)
+        self._beat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    # -------------
+    # | Sampler   |
+    # -------------
+
+    async def _sample(self):
+        while True:
+            before = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self.record(now - before - self.interval)
+            self._beat = now
+
+    def record(self, lag: float):
+        lag = max(lag, 0.0)
+        self.samples.append(lag)
+        if lag > self.threshold:
+            self.stalls += 1
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._task = asyncio.get_running_loop().create_task(self._sample())
+        if self.debug:
+            self._stop.clear()
+            self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._watchdog.start()
+
+    async def stop(self):
+        self._stop.set()
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    # -------------
+    # | Watchdog  |
+    # -------------
+
+    def _watch(self):
+        blocked: Optional[dict] = None
+        blocked_beat = 0.0
+        while not self._stop.wait(self.threshold / 2):
+            beat = self._beat
+            if blocked is not None and blocked_beat != beat:
+                # El loop volvió: se cierra el reporte con la duración total
+                blocked["blocked_ms"] = _ms(beat - blocked_beat - self.interval)
+                blocked = None
+            elif blocked is None and time.monotonic() - beat - self.interval > self.threshold:
+                blocked, blocked_beat = self._capture(beat), beat
+
+    def _capture(self, beat: float) -> Optional[dict]:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return None
+        frames = traceback.extract_stack(frame)
+        report = {
+            "handler": attribute(frames),
+            "detected_ms": _ms(time.monotonic() - beat - self.interval),
+            "blocked_ms": None,
+            "at": time.time(),
+            "stack": traceback.format_list(frames),
+        }
+        self.reports.append(report)
+        logger.warning(
+            "Event loop bloqueado %.0fms en %s:\n%s",
+            report["detected_ms"], report["handler"] or "(sin handler)", "".join(report["stack"][-8:])
+        )
+        return report
+
+    # -------------
+    # | Métricas  |
+    # -------------
+
+    def lag_ms(self, last: int = 8) -> float:
+        """Peor lag de las últimas ``last`` muestras (~2s con el intervalo por defecto)"""
+        recent = list(self.samples)[-last:]
+        return _ms(max(recent, default=0.0))
+
+    def stats(self) -> dict:
+        samples = sorted(self.samples)
+        p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))] if samples else 0.0
+        return {
+            "running": self._task is not None,
+            "debug": self.debug,
+            "interval_ms": _ms(self.interval),
+            "threshold_ms": _ms(self.threshold),
+            "lag_ms": self.lag_ms(),
+            "max_lag_ms": _ms(samples[-1] if samples else 0.0),
+            "p99_lag_ms": _ms(p99),
+            "samples": len(samples),
+            "stalls": self.stalls,
+            "blocking_reports": len(self.reports),
+        }
+
+    def blocking_reports(self) -> List[dict]:
+        return [dict(report) for report in self.reports]
+
+
+# Instancia global (None si no se inició: tests, simulador, scripts)
+_monitor: Optional[LoopMonitor] = None
+
+
+def get_loop_monitor() -> Optional[LoopMonitor]:
+    return _monitor
+
+
+def init_loop_monitor() -> LoopMonitor:
+    global _monitor
+    _monitor = LoopMonitor(
+        interval=settings.LOOP_MONITOR_INTERVAL_SECONDS,
+        threshold=settings.LOOP_BLOCK_THRESHOLD_MS / 1000,
+        debug=settings.LOOP_BLOCK_DEBUG,
+    )
+    return _monitor
@@ -1,84 +1,257 @@
 # app/main.py
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+"""
+Aplicación FastAPI + Socket.IO.
+
+``create_app()`` arma todo: logging, Socket.IO (con el bus de mensajes si hay),
+sharding, middlewares, rutas y los eventos de arranque/cierre. Importar este
+módulo no construye nada ni importa FastAPI, SQLAlchemy o las rutas: ``app``,
+``sio`` y ``socket_app`` se crean la primera vez que se piden, así que tanto
+``uvicorn app.main:socket_app`` como ``uvicorn --factory app.main:create_socket_app``
+funcionan, y las herramientas que solo importan el módulo no pagan el arranque.
+
+Al arrancar corre el warmup (pool de la DB y catálogo de cartas, ver
+app/warmup.py); hasta que termina ``/health`` responde 503. ``/ready`` además
+mide DB, pool, event loop, sockets y colas (app/readiness.py). El costo de
+importación se mide con ``scripts/import_profile.py``.
+"""
+import importlib
+
 from app.config import settings
-import socketio
-import logging
-
-# Configurar logging para debugging (comentado en producción)
-# logging.basicConfig(
-#     level=logging.INFO,
-#     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-# )
-
-# Inicializar FastAPI
-app = FastAPI(
-    title=settings.APP_NAME,
-    description="Backend API with FastAPI and WebSocket support",
-    version="1.0.0",
-    docs_url="/docs",
-    redoc_url="/redoc"
-)
 
-# Configurar CORS para desarrollo
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins="*",
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+# Módulos de app.routes, en el orden en que se registran
+ROUTERS = (
+    "get_list",
+    "game",
+    "start",
+    "join",
+    "discard",
+    "finish_turn",
+    "take_deck",
+    "play_detective_set",
+    "detective_action",
+    "draft",
+    "look_ashes",
+    "leave_game",
+    "another_victim",
+    "cards",
+    "game_status",
+    "game_history",
 )
 
-# Configurar Socket.IO para WebSocket
-sio = socketio.AsyncServer(
-    async_mode="asgi",
-    cors_allowed_origins="*",
-    logger=False,           # Logs de Socket.IO (cambiar a True para debugging)
-    engineio_logger=False   # Logs de Engine.IO (cambiar a True para debugging)
-)
 
-# Inicializar manager global
-from app.sockets.socket_manager import init_ws_manager
-from app.db.database import SessionLocal
-init_ws_manager(sio, lambda: SessionLocal())
-
-# Importar y registrar eventos de Socket
-from app.sockets.socket_events import register_events
-register_events(sio)
-
-# Incluir rutas de la API
-from app.routes import get_list
-app.include_router(get_list.router)
-from app.routes import game
-app.include_router(game.router)
-from app.routes import start
-app.include_router(start.router)
-from app.routes import join
-app.include_router(join.router)
-from app.routes import discard
-app.include_router(discard.router)
-from app.routes import finish_turn
-app.include_router(finish_turn.router)
-from app.routes import take_deck
-app.include_router(take_deck.router)
-from app.routes import play_detective_set
-app.include_router(play_detective_set.router)
-from app.routes import detective_action
-app.include_router(detective_action.router)
-from app.routes import draft
-app.include_router(draft.router)
-from app.routes import look_ashes
-app.include_router(look_ashes.router)
-from app.routes import leave_game
-app.include_router(leave_game.router)
-from app.routes import another_victim
-app.include_router(another_victim.router)
-
-# Aplicación ASGI con Socket.IO
-socket_app = socketio.ASGIApp(sio, app)
-
-# Ruta de prueba para health check
-@app.get("/health")
-async def health_check():
-    return {"status": "healthy", "environment": settings.ENVIRONMENT}
+def create_app():
+    import socketio
+    from fastapi import FastAPI
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import JSONResponse
+
+    from app.logging_config import setup_logging
+
+    # Configurar logging: niveles por módulo desde Settings, escritura fuera del event loop
+    setup_logging(
+        level=settings.LOG_LEVEL,
+        module_levels=settings.LOG_MODULE_LEVELS,
+        log_format=settings.LOG_FORMAT
+    )
+
+    # Inicializar FastAPI
+    app = FastAPI(
+        title=settings.APP_NAME,
+        description="Backend API with FastAPI and WebSocket support",
+        version="1.0.0",
+        docs_url="/docs",
+        redoc_url="/redoc"
+    )
+
+    # Configurar CORS para desarrollo
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins="*",
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Bus de mensajes: con MESSAGE_BUS_URL los emits y el registro de sesiones se comparten entre workers
+    from app.sockets.message_bus import BusClientManager, create_message_bus
+    from app.sockets.outbound import OutboundManager
+    from app.sockets.session_registry import SessionRegistry
+    message_bus = create_message_bus(settings.MESSAGE_BUS_URL)
+
+    # Configurar Socket.IO para WebSocket
+    sio = socketio.AsyncServer(
+        async_mode="asgi",
+        cors_allowed_origins="*",
+        client_manager=BusClientManager(message_bus) if message_bus else OutboundManager(),
+        logger=False,           # Logs de Socket.IO (cambiar a True para debugging)
+        engineio_logger=False   # Logs de Engine.IO (cambiar a True para debugging)
+    )
+
+    from app.db.database import SessionLocal, engine
+
+    # Idempotency-Key: los reintentos de acciones reciben la respuesta original (en el worker dueño de la room)
+    from app.services.idempotency import idempotent_actions, init_idempotency_store
+    init_idempotency_store(SessionLocal)
+    app.middleware("http")(idempotent_actions)
+
+    # Afinidad de partidas: cada room tiene un worker dueño; el resto le reenvía HTTP y eventos de room
+    from app.sharding import forward_to_owner, init_shard_router, get_shard_router
+    init_shard_router(settings.SHARD_NODE_ID, settings.SHARD_NODES, message_bus, settings.SHARD_VNODES, SessionLocal)
+    app.middleware("http")(forward_to_owner)
+
+    # Inicializar manager global
+    from app.sockets.socket_manager import collect_ws_events, init_ws_manager, get_ws_manager
+    init_ws_manager(sio, lambda: SessionLocal(), SessionRegistry(
+        message_bus,
+        heartbeat_interval=settings.SESSION_HEARTBEAT_SECONDS,
+        node_ttl=settings.SESSION_NODE_TTL_SECONDS,
+    ))
+    # Outbox por request: los eventos de una acción salen juntos, en orden, al terminar el request
+    app.middleware("http")(collect_ws_events)
+
+    # Importar y registrar eventos de Socket
+    from app.sockets.socket_events import register_events
+    register_events(sio)
+
+    # Conflicto de versión de la partida (Game.version): el cliente puede reintentar la acción
+    from sqlalchemy.orm.exc import StaleDataError
+
+    @app.exception_handler(StaleDataError)
+    async def version_conflict(request, exc):
+        return JSONResponse(status_code=409, content={"detail": "version_conflict"}, headers={"Retry-After": "0"})
+
+    # Incluir rutas de la API
+    for name in ROUTERS:
+        app.include_router(importlib.import_module(f"app.routes.{name}").router)
+
+    # Aplicación ASGI con Socket.IO
+    app.state.sio = sio
+    app.state.socket_app = socketio.ASGIApp(sio, app)
+
+    # Invalidaciones del contexto de partida cacheado: con bus se replican a los demás workers
+    from app.services.game_context import start_context_invalidations, stop_context_invalidations
+
+    @app.on_event("startup")
+    async def start_message_bus():
+        await get_ws_manager().start()
+        await get_shard_router().start()
+        await start_context_invalidations(message_bus)
+
+    @app.on_event("shutdown")
+    async def stop_message_bus():
+        await stop_context_invalidations()
+        await get_ws_manager().stop()
+        await get_shard_router().stop()
+        if message_bus is not None:
+            await message_bus.close()
+
+    # Deadlines de turnos: la rueda corre en el event loop y se recarga desde la DB al arrancar
+    from app.services.turn_timer import init_turn_timer, recargar_deadlines
+
+    @app.on_event("startup")
+    async def start_turn_timer():
+        timer = init_turn_timer()
+        db = SessionLocal()
+        try:
+            recargar_deadlines(db)
+        finally:
+            db.close()
+        timer.start()
+
+    @app.on_event("shutdown")
+    async def stop_turn_timer():
+        from app.services.turn_timer import get_turn_timer
+        timer = get_turn_timer()
+        if timer is not None:
+            await timer.stop()
+
+    # Executor acotado de los servicios síncronos (DB): se crea al primer uso
+    @app.on_event("shutdown")
+    async def stop_service_executor():
+        from app.services.executor import shutdown_service_executor
+        shutdown_service_executor()
+
+    # Barrido periódico de salas WAITING abandonadas y jugadores huérfanos
+    from app.services.room_sweeper import init_room_sweeper, get_room_sweeper
+
+    @app.on_event("startup")
+    async def start_room_sweeper():
+        init_room_sweeper(SessionLocal).start()
+
+    @app.on_event("shutdown")
+    async def stop_room_sweeper():
+        sweeper = get_room_sweeper()
+        if sweeper is not None:
+            await sweeper.stop()
+
+    # Monitor del event loop: lag para /ready y, con LOOP_BLOCK_DEBUG, stacks de los handlers que lo bloquean
+    from app.loop_monitor import init_loop_monitor, get_loop_monitor
+
+    @app.on_event("startup")
+    async def start_loop_monitor():
+        init_loop_monitor().start()
+
+    @app.on_event("shutdown")
+    async def stop_loop_monitor():
+        monitor = get_loop_monitor()
+        if monitor is not None:
+            await monitor.stop()
+
+    # Los stacks exponen rutas internas del código: la ruta solo existe en modo debug
+    if settings.LOOP_BLOCK_DEBUG:
+        @app.get("/debug/loop")
+        async def loop_report():
+            monitor = get_loop_monitor()
+            if monitor is None:
+                return {"running": False}
+            return {**monitor.stats(), "reports": monitor.blocking_reports()}
+
+    # Warmup: pool de la DB y catálogo de cartas antes de reportarse sano
+    from app.warmup import Warmup
+    app.state.warmup = Warmup(engine, SessionLocal, settings.WARMUP_DB_CONNECTIONS)
+
+    @app.on_event("startup")
+    async def start_warmup():
+        app.state.warmup.start()
+
+    # Ruta de prueba para health check
+    @app.get("/health")
+    async def health_check():
+        if not app.state.warmup.ready:
+            return JSONResponse(status_code=503, content={"status": "starting", "environment": settings.ENVIRONMENT})
+        return {"status": "healthy", "environment": settings.ENVIRONMENT}
+
+    # Readiness para el balanceador: DB, pool, event loop, sockets y colas contra los umbrales READY_*
+    from app.readiness import check_readiness
+
+    @app.get("/ready")
+    async def readiness_check():
+        ready, report = await check_readiness(engine, sio, get_ws_manager(), app.state.warmup, get_loop_monitor())
+        return JSONResponse(status_code=200 if ready else 503,
+                            content={"status": "ready" if ready else "not_ready", **report})
+
+    return app
+
+
+def create_socket_app():
+    """Factory para ``uvicorn --factory``"""
+    return create_app().state.socket_app
+
+
+_app = None
+
+
+def get_app():
+    global _app
+    if _app is None:
+        _app = create_app()
+    return _app
+
 
+def __getattr__(name):
+    # app, sio y socket_app se construyen al pedirlos (uvicorn app.main:socket_app, tests)
+    if name == "app":
+        return get_app()
+    if name in ("sio", "socket_app"):
+        return getattr(get_app().state, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
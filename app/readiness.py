@@ -0,0 +1,128 @@
+# app/readiness.py
+"""
+Readiness del worker (``GET /ready``) para el balanceador.
+
+``/health`` solo dice que el proceso arrancó; ``/ready`` mide si puede atender
+más tráfico:
+
+- ``warmup``: terminó el warmup de arranque (app/warmup.py);
+- ``db``: latencia de un ``SELECT 1`` (en un thread, como las rutas: incluye la
+  espera por el threadpool y por una conexión del pool);
+- ``pool``: conexiones en uso sobre la capacidad del pool (size + overflow);
+- ``event_loop``: peor lag reciente del sampler (app/loop_monitor.py); sin
+  monitor, cuánto tarda el loop en volver a correr una tarea que cede;
+- ``sockets``: conexiones Engine.IO abiertas en el worker;
+- ``queues``: eventos pendientes en las colas de salida por conexión, en la
+  réplica de sesiones hacia el bus y en la cola del logging, y llamadas a
+  servicios esperando un thread del executor (app/services/executor.py).
+
+Cada medida tiene su umbral en Settings (``READY_*``, 0 = sin límite); si alguna
+lo supera el worker responde 503 con los checks que fallaron.
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, List, Tuple
+
+from sqlalchemy import text
+
+from app.config import settings
+from app.logging_config import pending_records
+from app.services.executor import get_service_executor
+
+logger = logging.getLogger(__name__)
+
+DB_PING_TIMEOUT_SECONDS = 5.0
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+
+def _ping(engine):
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+
+async def measure_db(engine) -> dict:
+    started = time.monotonic()
+    try:
+        await asyncio.wait_for(asyncio.to_thread(_ping, engine), DB_PING_TIMEOUT_SECONDS)
+    except Exception as e:
+        return {"ok": False, "error": str(e) or type(e).__name__, "latency_ms": _ms(time.monotonic() - started)}
+    latency_ms = _ms(time.monotonic() - started)
+    limit = settings.READY_DB_LATENCY_MS
+    return {"ok": not limit or latency_ms <= limit, "latency_ms": latency_ms, "limit_ms": limit}
+
+
+def measure_pool(engine) -> dict:
+    pool = engine.pool
+    if not callable(getattr(pool, "size", None)):
+        # StaticPool / SingletonThreadPool (SQLite): sin límite de conexiones
+        return {"ok": True, "checked_out": None, "capacity": None, "saturation": 0.0}
+    checked_out = pool.checkedout()
+    max_overflow = getattr(pool, "_max_overflow", 0)
+    capacity = pool.size() + max_overflow if max_overflow >= 0 else None
+    saturation = round(checked_out / capacity, 3) if capacity else 0.0
+    limit = settings.READY_POOL_SATURATION
+    return {
+        "ok": not limit or saturation < limit,
+        "checked_out": checked_out,
+        "capacity": capacity,
+        "saturation": saturation,
+        "limit": limit,
+    }
+
+
+async def measure_loop_lag(monitor=None) -> dict:
+    if monitor is not None and monitor.samples:
+        lag_ms = monitor.lag_ms()
+    else:
+        started = time.monotonic()
+        await asyncio.sleep(0)
+        lag_ms = _ms(time.monotonic() - started)
+    limit = settings.READY_LOOP_LAG_MS
+    return {"ok": not limit or lag_ms <= limit, "lag_ms": lag_ms, "limit_ms": limit}
+
+
+def measure_sockets(sio) -> dict:
+    connections = len(sio.eio.sockets)
+    limit = settings.READY_MAX_CONNECTIONS
+    return {"ok": not limit or connections <= limit, "connections": connections, "limit": limit}
+
+
+def measure_queues(ws_manager) -> dict:
+    outbound = ws_manager.outbound_stats() if ws_manager is not None else {}
+    sessions = getattr(ws_manager, "user_sessions", None) if ws_manager is not None else None
+    depths = {
+        "outbound": outbound.get("pending", 0),
+        "session_replication": sessions.pending() if hasattr(sessions, "pending") else 0,
+        "logging": pending_records(),
+        "service_executor": get_service_executor().depth(),
+    }
+    total = sum(depths.values())
+    limit = settings.READY_MAX_QUEUE_DEPTH
+    return {
+        "ok": not limit or total <= limit,
+        "depths": depths,
+        "max_outbound_queue": outbound.get("max_queue_depth", 0),
+        "slow_consumers": len(outbound.get("slow_consumers", [])),
+        "total": total,
+        "limit": limit,
+    }
+
+
+async def check_readiness(engine, sio, ws_manager=None, warmup=None, loop_monitor=None) -> Tuple[bool, dict]:
+    """(listo, checks) con la medida y el umbral de cada dependencia"""
+    checks: Dict[str, dict] = {
+        "warmup": {"ok": warmup is None or warmup.ready},
+        "event_loop": await measure_loop_lag(loop_monitor),
+        "db": await measure_db(engine),
+        "pool": measure_pool(engine),
+        "sockets": measure_sockets(sio),
+        "queues": measure_queues(ws_manager),
+    }
+    failing: List[str] = [name for name, check in checks.items() if not check["ok"]]
+    if failing:
+        logger.warning("Worker no listo: %s", ", ".join(failing))
+    return not failing, {"checks": checks, "failing": failing}
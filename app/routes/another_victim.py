@@ -1,6 +1,7 @@
 # app/routes/another_victim.py
 from fastapi import APIRouter, Depends, HTTPException, Header, status
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 from app.db.database import SessionLocal
 from pydantic import BaseModel
 from app.db.models import (
@@ -9,6 +10,8 @@ from app.db.models import (
 )
 from app.sockets.socket_service import get_websocket_service
 from app.services.game_status_service import build_complete_game_state
+from app.services.executor import run_sync, game_key
+from app.services.game_context import confirm_turn, get_game_context
 from datetime import datetime
 import logging
 
@@ -66,72 +69,66 @@ async def another_victim(
     logger.info(f"Actor: {actor_user_id}")
     
     try:
-        # Busco la sala
-        room = db.query(Room).filter(Room.id == room_id).first()
-        if not room:
+        # Sala, juego, jugadores y turno en curso (contexto de partida cacheado)
+        context = get_game_context(db, room_id)
+        if not context:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Room not found"
             )
 
-        # Busco el juego
-        game = db.query(Game).filter(Game.id == room.id_game).first()
-        if not game:
+        if not context.has_game:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Game not found"
             )
 
-        actor = db.query(Player).filter(
-            Player.id == actor_user_id,
-            Player.id_room == room_id
-        ).first()
-        if not actor:
+        if not context.has_player(actor_user_id):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Actor player not found"
             )
         
         # chequeo si es el turno del jugador
-        if game.player_turn_id != actor.id:
+        if not context.is_turn_of(actor_user_id):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not your turn"
             )
         
-        current_turn = db.query(Turn).filter(
-            Turn.id_game == game.id,
-            Turn.player_id == actor.id,
-            Turn.status == TurnStatus.IN_PROGRESS
-        ).first()
-        
-        if not current_turn:
+        if context.current_turn_id is None:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="No active turn found"
             )
         
-        victim = db.query(Player).filter(
-            Player.id == request.originalOwnerId,
-            Player.id_room == room_id
-        ).first()
-        if not victim:
+        if not context.has_player(request.originalOwnerId):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Target player not found"
             )
 
         # Chequeo que no pueda robarse a su mismo
-        if actor.id == victim.id:
+        if actor_user_id == request.originalOwnerId:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Cannot steal from yourself"
             )
+
+        game_id = context.game_id
+        turn_id = context.current_turn_id
+        players = {
+            p.id: p for p in db.query(Player).filter(
+                Player.id.in_([actor_user_id, request.originalOwnerId])
+            ).all()
+        }
+        actor = players[actor_user_id]
+        victim = players[request.originalOwnerId]
         
         # Busco el set 
         victim_set_cards = db.query(CardsXGame).filter(
             CardsXGame.player_id == victim.id,
-            CardsXGame.id_game == game.id,
+            CardsXGame.id_game == game_id,
             CardsXGame.is_in == CardState.DETECTIVE_SET,
             CardsXGame.position == request.setPosition
         ).all()
@@ -150,17 +147,20 @@ async def another_victim(
                 detail="Invalid detective set: must have at least 2 cards"
             )
 
+        # turno confirmado sobre la fila de Game que se va a versionar (el contexto puede estar viejo)
+        confirm_turn(db, context, actor_user_id)
+
         # descarto la another victim
         another_victim_card = db.query(CardsXGame).join(Card).filter(
             CardsXGame.player_id == actor.id,
-            CardsXGame.id_game == game.id,
+            CardsXGame.id_game == game_id,
             CardsXGame.is_in == CardState.HAND,
             Card.name == "Another Victim"
         ).first()
 
         if another_victim_card:
             max_discard_position = db.query(CardsXGame.position).filter(
-                CardsXGame.id_game == game.id,
+                CardsXGame.id_game == game_id,
                 CardsXGame.is_in == CardState.DISCARD
             ).order_by(CardsXGame.position.desc()).first()
             
@@ -174,8 +174,8 @@ async def another_victim(
         
         # evento another victim
         action_event = ActionsPerTurn(
-            id_game=game.id,
-            turn_id=current_turn.id,
+            id_game=game_id,
+            turn_id=turn_id,
             player_id=actor.id,
             action_name=ActionName.ANOTHER_VICTIM,
             action_type=ActionType.EVENT_CARD,
@@ -190,8 +190,8 @@ async def another_victim(
                 
         # accion robar set
         action_steal = ActionsPerTurn(
-            id_game=game.id,
-            turn_id=current_turn.id,
+            id_game=game_id,
+            turn_id=turn_id,
             player_id=actor.id,
             action_type=ActionType.STEAL_SET,
             result=ActionResult.SUCCESS,
@@ -210,8 +210,8 @@ async def another_victim(
             card.player_id = actor.id
             
             action_move = ActionsPerTurn(
-                id_game=game.id,
-                turn_id=current_turn.id,
+                id_game=game_id,
+                turn_id=turn_id,
                 player_id=actor.id,
                 action_type=ActionType.MOVE_CARD,
                 result=ActionResult.SUCCESS,
@@ -282,7 +282,7 @@ async def another_victim(
         )
         logger.info(f"se emitio fin de accion")
         
-        game_state = build_complete_game_state(db, game.id)
+        game_state = await run_sync(game_key(game_id), build_complete_game_state, db, game_id)
         
         await ws_service.notificar_estado_publico(
             room_id=room_id,
@@ -298,6 +298,10 @@ async def another_victim(
         
     except HTTPException:
         raise 
+    except StaleDataError:
+        # Conflicto de versión: lo responde el handler global (409 version_conflict, reintentable)
+        db.rollback()
+        raise
     except Exception as e:
         logger.error(f"Error in another_victim: {e}", exc_info=True)
         db.rollback()
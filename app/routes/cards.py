@@ -0,0 +1,54 @@
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy.orm import Session
+from pydantic import BaseModel
+from typing import List, Optional
+from ..db.database import SessionLocal
+from ..db.models import Card
+import logging
+
+router = APIRouter(prefix="/api/cards", tags=["Cards"])
+logger = logging.getLogger(__name__)
+
+# Database dependency
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+# Response models
+class CatalogCard(BaseModel):
+    id: int
+    name: str
+    description: str
+    type: str
+    img_src: str
+
+class CatalogResponse(BaseModel):
+    items: List[CatalogCard]
+
+# El catálogo no cambia en runtime: se lee una vez por proceso (o en el warmup, ver app/warmup.py)
+_catalog: Optional[CatalogResponse] = None
+
+def load_catalog(db: Session) -> CatalogResponse:
+    """Catálogo cacheado del proceso; se relee mientras esté vacío (DB sin cartas cargadas)"""
+    global _catalog
+    if _catalog is None or not _catalog.items:
+        cards = db.query(Card).order_by(Card.id).all()
+        _catalog = CatalogResponse(items=[
+            CatalogCard(id=c.id, name=c.name, description=c.description, type=c.type.value, img_src=c.img_src)
+            for c in cards
+        ])
+        logger.debug("Catálogo de cartas cargado: %s cartas", len(cards))
+    return _catalog
+
+# GET /api/cards/catalog
+@router.get("/catalog", response_model=CatalogResponse)
+def get_card_catalog(response: Response, db: Session = Depends(get_db)):
+    """
+    Catálogo de cartas (Card.id -> metadata). Los clientes que negocian el formato
+    WebSocket "compact" o "msgpack" lo cachean y resuelven con él el cardId de cada carta.
+    """
+    response.headers["Cache-Control"] = "public, max-age=86400"
+    return load_catalog(db)
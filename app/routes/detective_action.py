@@ -1,14 +1,16 @@
 # app/routes/detective_action.py
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 from app.db.database import SessionLocal
-from app.db.models import Room
 from app.schemas.detective_action_schema import (
     DetectiveActionRequest,
     DetectiveActionResponse
 )
 from app.services.detective_action_service import DetectiveActionService
+from app.services.game_context import get_game_context
 from app.services.game_status_service import build_complete_game_state
+from app.services.executor import run_sync, game_key, ordered
 from app.sockets.socket_service import get_websocket_service
 
 import logging
@@ -52,111 +54,117 @@ async def execute_detective_action(
         f"Executor {request.executorId}, Action {request.actionId}"
     )
     
-    room = db.query(Room).filter(Room.id == room_id).first()
-    if not room:
+    context = get_game_context(db, room_id)
+    if not context:
         raise HTTPException(status_code=404, detail="Room not found")
     
-    if not room.id_game:
+    if not context.game_id:
         raise HTTPException(status_code=409, detail="Game not started")
     
-    game_id = room.id_game
+    game_id = context.game_id
     
-    try:
-        service = DetectiveActionService(db)
-        response = service.execute_detective_action(game_id, request)
+    # La partida queda tomada durante toda la acción: servicio, estado y notificaciones
+    async with ordered(game_key(game_id)):
+        try:
+            service = DetectiveActionService(db)
+            response = await run_sync(game_key(game_id), service.execute_detective_action, game_id, request)
         
-        logger.info(f"Detective action executed successfully. Effects: {response.effects}")
+            logger.info(f"Detective action executed successfully. Effects: {response.effects}")
         
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error executing detective action: {str(e)}")
-        db.rollback()
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+        except HTTPException:
+            raise
+        except StaleDataError:
+            # Conflicto de versión: lo responde el handler global (409 version_conflict, reintentable)
+            db.rollback()
+            raise
+        except Exception as e:
+            logger.error(f"Error executing detective action: {str(e)}")
+            db.rollback()
+            raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
     
-    try:
-        game_state = build_complete_game_state(db, game_id)
-    except Exception as e:
-        logger.error(f"Error building game state: {str(e)}")
-        game_state = {}
+        try:
+            game_state = await run_sync(game_key(game_id), build_complete_game_state, db, game_id)
+        except Exception as e:
+            logger.error(f"Error building game state: {str(e)}")
+            game_state = {}
     
-    ws_service = get_websocket_service()
+        ws_service = get_websocket_service()
     
-    try:
-        if not response.completed:
-            # PASO 1: Owner seleccionó target, emitir eventos de target seleccionado
-            logger.info(f"Step 1: Target selected - {request.targetPlayerId}")
+        try:
+            if not response.completed:
+                # PASO 1: Owner seleccionó target, emitir eventos de target seleccionado
+                logger.info(f"Step 1: Target selected - {request.targetPlayerId}")
             
-            # Determinar set_type desde nextAction metadata o desde la acción
-            set_type = "unknown"
-            if response.nextAction and response.nextAction.metadata:
-                # Aquí podrías agregar lógica para determinar el set_type
-                # Por ahora usamos un valor genérico
-                set_type = "detective"
+                # Determinar set_type desde nextAction metadata o desde la acción
+                set_type = "unknown"
+                if response.nextAction and response.nextAction.metadata:
+                    # Aquí podrías agregar lógica para determinar el set_type
+                    # Por ahora usamos un valor genérico
+                    set_type = "detective"
             
-            # Notificar a TODOS que se seleccionó un target
-            await ws_service.notificar_detective_target_selected(
-                room_id=room_id,
-                player_id=request.executorId,  # Owner que seleccionó
-                target_player_id=request.targetPlayerId,  # Target seleccionado
-                set_type=set_type
-            )
-            logger.info(f"Emitted detective_target_selected to room {room_id}")
+                # Notificar a TODOS que se seleccionó un target
+                await ws_service.notificar_detective_target_selected(
+                    room_id=room_id,
+                    player_id=request.executorId,  # Owner que seleccionó
+                    target_player_id=request.targetPlayerId,  # Target seleccionado
+                    set_type=set_type
+                )
+                logger.info(f"Emitted detective_target_selected to room {room_id}")
             
-            # Notificar SOLO al target que debe elegir su secreto
-            await ws_service.notificar_detective_action_request(
-                room_id=room_id,
-                target_player_id=request.targetPlayerId,
-                action_id=str(request.actionId),
-                requester_id=request.executorId,
-                set_type=set_type
-            )
-            logger.info(f"Emitted select_own_secret to player {request.targetPlayerId}")
+                # Notificar SOLO al target que debe elegir su secreto
+                await ws_service.notificar_detective_action_request(
+                    room_id=room_id,
+                    target_player_id=request.targetPlayerId,
+                    action_id=str(request.actionId),
+                    requester_id=request.executorId,
+                    set_type=set_type
+                )
+                logger.info(f"Emitted select_own_secret to player {request.targetPlayerId}")
             
-        else:
-            # PASO 2 o acción de 1 paso: Acción completada
-            logger.info(f"Action completed - emitting results")
+            else:
+                # PASO 2 o acción de 1 paso: Acción completada
+                logger.info(f"Action completed - emitting results")
             
-            action_type = "unknown"
-            action = "revealed"
-            secret_id = None
-            target_player_id = request.targetPlayerId if request.targetPlayerId else request.executorId
-            wildcard_used = False
-            
-            if response.effects.revealed:
+                action_type = "unknown"
                 action = "revealed"
-                secret_id = response.effects.revealed[0].secretId
-                target_player_id = response.effects.revealed[0].playerId
-            elif response.effects.hidden:
-                action = "hidden"
-                secret_id = response.effects.hidden[0].secretId
-                target_player_id = response.effects.hidden[0].playerId
-            elif response.effects.transferred:
-                action = "transferred"
-                secret_id = response.effects.transferred[0].secretId
-                target_player_id = response.effects.transferred[0].fromPlayerId
-                wildcard_used = True
+                secret_id = None
+                target_player_id = request.targetPlayerId if request.targetPlayerId else request.executorId
+                wildcard_used = False
+            
+                if response.effects.revealed:
+                    action = "revealed"
+                    secret_id = response.effects.revealed[0].secretId
+                    target_player_id = response.effects.revealed[0].playerId
+                elif response.effects.hidden:
+                    action = "hidden"
+                    secret_id = response.effects.hidden[0].secretId
+                    target_player_id = response.effects.hidden[0].playerId
+                elif response.effects.transferred:
+                    action = "transferred"
+                    secret_id = response.effects.transferred[0].secretId
+                    target_player_id = response.effects.transferred[0].fromPlayerId
+                    wildcard_used = True
             
-            await ws_service.notificar_detective_action_complete(
-                room_id=room_id,
-                action_type=action_type,
-                player_id=request.executorId,
-                target_player_id=target_player_id,
-                secret_id=secret_id,
-                action=action,
-                wildcard_used=wildcard_used
-            )
-            logger.info(f"Emitted detective_action_complete to room {room_id}")
+                await ws_service.notificar_detective_action_complete(
+                    room_id=room_id,
+                    action_type=action_type,
+                    player_id=request.executorId,
+                    target_player_id=target_player_id,
+                    secret_id=secret_id,
+                    action=action,
+                    wildcard_used=wildcard_used
+                )
+                logger.info(f"Emitted detective_action_complete to room {room_id}")
             
-            await ws_service.notificar_estado_partida(
-                room_id=room_id,
-                jugador_que_actuo=request.executorId,
-                game_state=game_state
-            )
-            logger.info(f"Emitted game state to room {room_id}")
+                await ws_service.notificar_estado_partida(
+                    room_id=room_id,
+                    jugador_que_actuo=request.executorId,
+                    game_state=game_state
+                )
+                logger.info(f"Emitted game state to room {room_id}")
         
-    except Exception as e:
-        logger.error(f"Error emitting WebSocket events: {str(e)}")
+        except Exception as e:
+            logger.error(f"Error emitting WebSocket events: {str(e)}")
     
     logger.info(f"Response: {response.model_dump()}")
     
@@ -5,11 +5,16 @@ from app.db.database import SessionLocal
 from app.db.models import Game, Room, CardsXGame, CardState, Player
 from app.schemas.discard_schema import DiscardRequest, DiscardResponse
 from app.services.discard import descartar_cartas
+from app.services.game_context import confirm_turn, get_game_context
 from app.services.game_service import actualizar_turno
 from app.sockets.socket_service import get_websocket_service
 from app.services.game_status_service import build_complete_game_state
+from app.services.executor import run_sync, game_key
 
 from datetime import datetime
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/game", tags=["Games"])
 
@@ -35,16 +40,15 @@ async def discard_cards(
     user_id: int = Header(..., alias="HTTP_USER_ID"),
     db: Session = Depends(get_db)
 ):
-    room = db.query(Room).filter(Room.id == room_id).first()
-    if not room:
+    context = get_game_context(db, room_id)
+    if not context:
         raise HTTPException(status_code=404, detail="not_found")
     
-    game = db.query(Game).filter(Game.id == room.id_game).first()
-    if not game:
+    if not context.has_game:
         raise HTTPException(status_code=404, detail="game_not_found")
     
     # validar turno
-    if game.player_turn_id != user_id:
+    if not context.is_turn_of(user_id):
         raise HTTPException(status_code=403, detail="forbidden")
     
     # validar cartas en la mano
@@ -54,13 +58,13 @@ async def discard_cards(
 
     card_ids = [c.card_id for c in card_ids_with_order]
 
-    print(f"🎯 POST /discard received: {DiscardRequest}")
+    logger.debug("POST /discard received: room=%s user=%s cards=%s", room_id, user_id, card_ids)
 
     player_cards = (
         db.query(CardsXGame)
         .filter(
             CardsXGame.player_id == user_id,
-            CardsXGame.id_game == game.id,
+            CardsXGame.id_game == context.game_id,
             CardsXGame.is_in == CardState.HAND,
             CardsXGame.id.in_(card_ids)
         )
@@ -69,18 +73,16 @@ async def discard_cards(
     
     if len(player_cards) != len(card_ids):
         raise HTTPException(status_code=400, detail="validation_error: invalid or not owned cards")
-    print(f"❌ Orden después del query (DESORDENADO): {[c.id_card for c in player_cards]}")  # LOG 2
 
     # reordenar cartas para mantener orden de descarte
     card_dict = {card.id: card for card in player_cards}
     ordered_player_cards = [card_dict[card_id] for card_id in card_ids]
     ordered_card_ids = [c.id_card for c in ordered_player_cards]
-    print(f"✅ Orden corregido: {ordered_card_ids}")  # LOG 3
+    logger.debug("Orden de descarte: %s", ordered_card_ids)
 
-    ordered_card_ids = [c.id_card for c in ordered_player_cards]
-
-    # descartar
-    discarded = await descartar_cartas(db, game, user_id, ordered_player_cards)
+    # descartar (turno confirmado sobre la fila de Game que se va a versionar)
+    game = confirm_turn(db, context, user_id)
+    discarded = await descartar_cartas(db, game, user_id, ordered_player_cards, turn_id=context.current_turn_id)
 
     discarded_rows = db.query(CardsXGame).filter(
         CardsXGame.id_game == game.id,
@@ -90,7 +92,7 @@ async def discard_cards(
 
     # Capture card IDs BEFORE any other operation that might detach objects
     discarded_card_ids = [c.id_card for c in discarded_rows]
-    print(f"📤 Orden final descartado: {discarded_card_ids}")  # LOG 4
+    logger.debug("Orden final descartado: %s", discarded_card_ids)
     
     all_hand_cards = db.query(CardsXGame).filter(
         CardsXGame.id_game == game.id,
@@ -121,9 +123,7 @@ async def discard_cards(
         }
     )
 
-    print(f"response: {response.discard.top}")
-
-    game_state = build_complete_game_state(db, game.id)
+    game_state = await run_sync(game_key(game.id), build_complete_game_state, db, game.id)
 
     # Emit complete game state via WebSocket
     ws_service = get_websocket_service()
@@ -139,15 +139,17 @@ async def discard_cards(
         cards_to_draw=len(discarded)
     )
 
-    # Verificar todo el mazo de descarte
-    all_discarded = db.query(CardsXGame).filter(
-        CardsXGame.id_game == game.id,
-        CardsXGame.is_in == CardState.DISCARD
-    ).order_by(CardsXGame.position.asc()).all()
-
-    print(f"\n MAZO DE DESCARTE COMPLETO (orden por position):")
-    for card in all_discarded:
-        print(f"  Position {card.position}: Carta {card.id_card} - {card.card.name if card.card else 'N/A'}")
-    print(f"Total: {len(all_discarded)} cartas\n")
+    # Volcado del mazo de descarte completo: solo en DEBUG, evita la query en producción
+    if logger.isEnabledFor(logging.DEBUG):
+        all_discarded = db.query(CardsXGame).filter(
+            CardsXGame.id_game == game.id,
+            CardsXGame.is_in == CardState.DISCARD
+        ).order_by(CardsXGame.position.asc()).all()
+        logger.debug(
+            "Mazo de descarte game=%s (%s cartas): %s",
+            game.id,
+            len(all_discarded),
+            [(card.position, card.id_card) for card in all_discarded]
+        )
 
     return response
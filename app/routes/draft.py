@@ -5,7 +5,9 @@ from app.db.models import Game, Room, CardsXGame, CardState
 from app.schemas.draft import DraftRequest
 from app.services.draft_service import list_draft_cards, pick_card_from_draft
 from app.services.game_service import procesar_ultima_carta
+from app.services.game_context import confirm_turn, get_game_context_by_game
 from app.services.game_status_service import _build_hand_view, _build_deck_view, build_complete_game_state
+from app.services.executor import run_sync, game_key
 from app.sockets.socket_service import get_websocket_service
 import logging
 
@@ -22,13 +24,12 @@ def get_db():
 
 @router.post("/pick", status_code=200)
 async def pick_card(game_id: int, draft_request: DraftRequest, db: Session = Depends(get_db)):
-    # Validar juego
-    game = db.query(Game).filter(Game.id == game_id).first()
-    if not game:
+    # Validar juego y turno (contexto de partida cacheado; también da el room_id)
+    context = get_game_context_by_game(db, game_id)
+    if not context or not context.has_game:
         raise HTTPException(status_code=404, detail="game_not_found")
 
-    # Validar turno
-    if game.player_turn_id != draft_request.user_id:
+    if not context.is_turn_of(draft_request.user_id):
         raise HTTPException(status_code=403, detail="not_your_turn")
 
     # Validar que el jugador pueda robar hasta 6 cartas
@@ -44,23 +45,21 @@ async def pick_card(game_id: int, draft_request: DraftRequest, db: Session = Dep
 
     # Obtener cartas del draft y validar que la carta este ahi
     draft_cards = list_draft_cards(db, game_id)
-    print("draft_request.card_id =", draft_request.card_id)
-    print("draft_cards =", [c.id for c in draft_cards])
+    logger.debug("Draft pick: card_id=%s draft=%s", draft_request.card_id, [c.id for c in draft_cards])
     card = next((card for card in draft_cards if card.id == draft_request.card_id), None)
     if not card:
         raise HTTPException(status_code=404, detail="Card not found in draft")
 
-    # Mover la carta a la mano del jugador
+    # Mover la carta a la mano del jugador (turno confirmado sobre la fila de Game que se va a versionar)
+    confirm_turn(db, context, draft_request.user_id)
     picked_card = pick_card_from_draft(db, draft_request.card_id, draft_request.user_id)
 
     # Actualizar mano, draft y deck
-    game_state = build_complete_game_state(db, game_id)
+    game_state = await run_sync(game_key(game_id), build_complete_game_state, db, game_id)
     new_hand = _build_hand_view(db, game_id, draft_request.user_id)
     new_deck = _build_deck_view(db, game_id)
 
-    # Obtener room_id para las notificaciones
-    room = db.query(Room).filter(Room.id_game == game_id).first()
-    room_id = room.id if room else game_id
+    room_id = context.room_id
 
     # Verificar si el draft esta vacio para terminar la partida
     draft_remaining = db.query(CardsXGame).filter(
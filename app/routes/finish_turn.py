@@ -6,9 +6,15 @@ from ..db.models import Room, Player, RoomStatus, Game, CardsXGame, CardState, T
 from app.sockets.socket_service import get_websocket_service
 from fastapi import APIRouter, Query, Depends, HTTPException, Path
 from app.services.game_status_service import build_complete_game_state
+from app.services.executor import run_sync, game_key
+from app.services.game_service import avanzar_turno
+from app.services.game_context import confirm_turn, get_game_context
 
 from pydantic import BaseModel
 from datetime import datetime
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -29,21 +35,22 @@ async def finish_turn(
     request: FinishTurnRequest,
     db: Session = Depends(get_db)
 ):
-    print(f"🎯 POST /finish-turn received: {FinishTurnRequest}")
+    logger.debug("POST /finish-turn received: room=%s user=%s", room_id, request.user_id)
 
-    # Buscar sala
-    room = db.query(Room).filter(Room.id == room_id).first()
-    if not room:
+    # Validar sala, partida y turno con el contexto cacheado (sin queries si se rechaza)
+    context = get_game_context(db, room_id)
+    if not context:
         raise HTTPException(status_code=404, detail="room_not_found")
     
-    # Buscar partida
-    game = db.query(Game).filter(Game.id == room.id_game).first()
-    if not game:
+    if not context.has_game:
         raise HTTPException(status_code=404, detail="game_not_found")
 
-    # Validar turno
-    if game.player_turn_id != request.user_id:
+    if not context.is_turn_of(request.user_id):
         raise HTTPException(status_code=403, detail="not_your_turn")
+
+    # Filas que avanzar_turno modifica (por clave primaria); el turno se confirma sobre la fila leída
+    game = confirm_turn(db, context, request.user_id)
+    room = db.get(Room, room_id)
     
     # Buscar cartas en la mano del jugador
     # hand_cards = (
@@ -90,46 +97,12 @@ async def finish_turn(
     #db.add(new_card)
     
     # Avanzar turno
-    players = db.query(Player).filter(Player.id_room == room.id).order_by(Player.order.asc()).all()
-
-    current_order = next((p.order for p in players if p.id == request.user_id), None)
-    next_order = (current_order % len(players)) + 1
-    next_player = next((p for p in players if p.order == next_order), None)
-    
-    # Finalizar turno actual
-    current_turn = db.query(Turn).filter(
-        Turn.id_game == game.id,
-        Turn.player_id == request.user_id,
-        Turn.status == TurnStatus.IN_PROGRESS
-    ).first()
-    
-    if current_turn:
-        current_turn.status = TurnStatus.FINISHED
-        db.add(current_turn)
-        print(f"🔄 Turn {current_turn.number} finished for player {request.user_id}")
-        
-        # Crear nuevo turno para el siguiente jugador
-        new_turn = Turn(
-            number=current_turn.number + 1,
-            id_game=game.id,
-            player_id=next_player.id,
-            status=TurnStatus.IN_PROGRESS,
-            start_time=datetime.now()
-        )
-        db.add(new_turn)
-        print(f"🆕 Turn {new_turn.number} created for player {next_player.id}")
-    else:
-        print(f"⚠️ No active turn found for player {request.user_id}")
-    
-    game.player_turn_id = next_player.id
-    
-    db.commit()
-    db.refresh(game)
+    next_player = avanzar_turno(db, room, game, request.user_id)
 
     deck_count = db.query(CardsXGame).filter(CardsXGame.id_game == game.id, CardsXGame.is_in == CardState.DECK).count()
 
     # Build game state
-    game_state = build_complete_game_state(db, game.id)
+    game_state = await run_sync(game_key(game.id), build_complete_game_state, db, game.id)
        
 
     ws_service = get_websocket_service()
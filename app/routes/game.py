@@ -5,6 +5,9 @@ from app.db.database import SessionLocal
 from app.db import models
 from app.schemas.game import GameCreateRequest, GameResponse, RoomResponse, PlayerResponse
 from datetime import datetime
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -17,7 +20,7 @@ def get_db():
 
 @router.post("/game", response_model=GameResponse, status_code=201)
 def create_game(newgame: GameCreateRequest, db: Session = Depends(get_db)):
-    print(f"🎯 POST /game received: {newgame}")
+    logger.info("POST /game received: %s", newgame.room.nombre_partida)
     
     try:
         existing_room = db.query(models.Room).filter(
@@ -86,7 +89,7 @@ def create_game(newgame: GameCreateRequest, db: Session = Depends(get_db)):
     except HTTPException:
         raise  # Re-raise HTTP exceptions
     except Exception as e:
-        print(f"Error creating game: {e}")
+        logger.error("Error creating game: %s", e)
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -0,0 +1,59 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+from ..db.database import SessionLocal
+from app.config import settings
+from app.db.models import ActionType
+from app.schemas.game_history_schema import GameHistoryResponse
+from app.services.executor import run_sync
+from app.services.game_archive import get_game_archiver
+from app.services.game_context import get_game_context
+from app.services.game_history_service import get_archived_game_history, get_game_history
+import logging
+
+router = APIRouter(prefix="/api/game", tags=["Games"])
+logger = logging.getLogger(__name__)
+
+# Database dependency
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# GET /api/game/{room_id}/history
+@router.get("/{room_id}/history", response_model=GameHistoryResponse)
+async def game_history(
+    room_id: int,
+    after: Optional[int] = Query(None, ge=0),
+    limit: int = Query(settings.HISTORY_PAGE_SIZE, ge=1, le=settings.HISTORY_MAX_PAGE_SIZE),
+    turn_id: Optional[int] = Query(None),
+    player_id: Optional[int] = Query(None),
+    action_type: Optional[ActionType] = Query(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Acciones de la partida en orden, paginadas por id (``after`` = ``next_cursor`` de la
+    página anterior), con las acciones hijas anidadas. Solo lectura: no requiere ser
+    jugador de la partida (espectadores, repeticiones) y no pasa por el executor de la partida.
+    """
+    context = get_game_context(db, room_id)
+    if not context or not context.has_game:
+        raise HTTPException(
+            status_code=404,
+            detail={"code": "game_not_found", "message": "La partida no existe", "details": None}
+        )
+    filters = {"after": after, "limit": limit, "turn_id": turn_id, "player_id": player_id,
+               "action_type": action_type}
+
+    archiver = get_game_archiver()
+    archived = archiver.is_archived(context.game_id)
+    if archived:
+        document = await run_sync(None, archiver.load, context.game_id)
+        page = get_archived_game_history(document, **filters)
+    else:
+        page = await run_sync(None, get_game_history, db, context.game_id, **filters)
+    logger.debug("Historial room %s: %s acciones (after=%s)", room_id, len(page["items"]), after)
+    return GameHistoryResponse(room_id=room_id, game_id=context.game_id, archived=archived, **page)
@@ -0,0 +1,119 @@
+import asyncio
+import time
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from sqlalchemy.orm import Session
+from typing import Optional
+from ..db.database import SessionLocal
+from app.config import settings
+from app.db.models import Game
+from app.schemas.game_status_schema import GameStateView
+from app.services.game_context import get_game_context
+from app.services.game_status_service import get_game_status_service
+from app.sockets.socket_manager import get_ws_manager
+import logging
+
+router = APIRouter(tags=["Games"])
+logger = logging.getLogger(__name__)
+
+# Database dependency
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def _etag(game_id: int, version: int, user_id: int) -> str:
+    # Débil: identifica la versión de la partida vista por ese jugador, no los bytes exactos
+    return f'W/"{game_id}-{version}-{user_id}"'
+
+
+def _game_version(db: Session, game_id: int) -> Optional[int]:
+    """Game.version persistida: la misma en todos los workers (una lectura por clave primaria)"""
+    return db.query(Game.version).filter(Game.id == game_id).scalar()
+
+
+def _validate_context(db: Session, room_id: int, user_id: int):
+    """Sala, partida y pertenencia desde el contexto cacheado (sin tocar las tablas de cartas)"""
+    context = get_game_context(db, room_id)
+    if not context or not context.has_game:
+        raise HTTPException(
+            status_code=404,
+            detail={"code": "game_not_found", "message": "La partida no existe", "details": None}
+        )
+    if not context.has_player(user_id):
+        raise HTTPException(
+            status_code=403,
+            detail={"code": "forbidden", "message": "El usuario no pertenece a esta partida", "details": None}
+        )
+    return context
+
+
+def _status_response(db: Session, response: Response, game_id: int, user_id: int, etag: str) -> GameStateView:
+    state = get_game_status_service(db, game_id, user_id)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+    return state
+
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+
+
+# GET /game_state/{room_id}
+@router.get("/game_state/{room_id}", response_model=GameStateView)
+async def get_game_state(
+    room_id: int,
+    response: Response,
+    user_id: int = Header(..., alias="HTTP_USER_ID"),
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Estado de la partida visto por user_id, con ETag (versión de la partida + jugador).
+    Con If-None-Match igual a la versión actual responde 304 sin reconstruir el estado.
+    """
+    context = _validate_context(db, room_id, user_id)
+    etag = _etag(context.game_id, _game_version(db, context.game_id), user_id)
+    if if_none_match == etag:
+        return _not_modified(etag)
+    return _status_response(db, response, context.game_id, user_id, etag)
+
+
+# GET /game_state/{room_id}/poll
+@router.get("/game_state/{room_id}/poll", response_model=GameStateView)
+async def poll_game_state(
+    room_id: int,
+    response: Response,
+    timeout: float = Query(settings.STATUS_LONG_POLL_SECONDS, ge=0),
+    user_id: int = Header(..., alias="HTTP_USER_ID"),
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Long-poll para clientes sin socket: si If-None-Match coincide con la versión actual
+    espera (hasta timeout, acotado a STATUS_LONG_POLL_SECONDS) a que la partida avance y
+    devuelve el estado nuevo; si no avanza, 304.
+    """
+    context = _validate_context(db, room_id, user_id)
+    event_log = get_ws_manager().event_log
+    deadline = time.monotonic() + min(timeout, settings.STATUS_LONG_POLL_SECONDS)
+    while True:
+        # Se registra antes de leer la versión: un cambio entre la lectura y la espera no se pierde
+        changed = event_log.watch(room_id)
+        version = _game_version(db, context.game_id)
+        etag = _etag(context.game_id, version, user_id)
+        remaining = deadline - time.monotonic()
+        if if_none_match != etag or remaining <= 0:
+            break
+        # Libera la conexión de la DB mientras espera; lo despierta un evento de la room (local o por el bus)
+        db.close()
+        try:
+            await asyncio.wait_for(changed.wait(), remaining)
+        except asyncio.TimeoutError:
+            pass
+    if if_none_match == etag:
+        return _not_modified(etag)
+    logger.debug("Long-poll room %s: versión %s para jugador %s", room_id, version, user_id)
+    return _status_response(db, response, context.game_id, user_id, etag)
@@ -6,6 +6,10 @@ from datetime import date
 from ..db.database import SessionLocal
 from ..db.models import Room, Player, RoomStatus
 from ..services.game_service import join_game_logic
+from ..services.executor import run_sync, room_key
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -49,10 +53,10 @@ class JoinGameResponse(BaseModel):
 @router.post("/game/{room_id}/join", response_model=JoinGameResponse)
 async def join_game(room_id: int, request: JoinGameRequest, db: Session = Depends(get_db)):
     
-    print(f"🎯 POST /join received: {JoinGameRequest}")
+    logger.info("POST /join received: room=%s", room_id)
 
     try:
-        result = join_game_logic(db, room_id, request.dict())
+        result = await run_sync(room_key(room_id), join_game_logic, db, room_id, request.dict())
         
         if not result["success"]:
             if result["error"] == "room_not_found":
@@ -95,5 +99,5 @@ async def join_game(room_id: int, request: JoinGameRequest, db: Session = Depend
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error in join_game: {e}")  # Para debug
+        logger.error("Error in join_game: %s", e)
         raise HTTPException(status_code=500, detail="server_error")
\ No newline at end of file
@@ -5,9 +5,15 @@ from typing import Optional
 from datetime import datetime, timedelta
 
 from app.db import models, crud
+from app.config import settings
 from app.sockets.socket_service import get_websocket_service
 from app.services.game_status_service import build_complete_game_state
+from app.services.executor import run_sync, game_key
+from app.services.game_context import confirm_turn, get_game_context
 from app.schemas.look_ashes_schema import LookAshesPlayRequest, LookAshesSelectRequest
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/game", tags=["event_cards"])
 
@@ -38,29 +44,28 @@ async def play_look_into_ashes(
         available_cards: Top 5 cards from discard (private info)
     """
 
-    print(f"Received room: {room_id} player: {http_user_id} card: {request.card_id}")
+    logger.info("POST look-into-ashes/play: room=%s player=%s card=%s", room_id, http_user_id, request.card_id)
     
-    # Get room and game
-    room = crud.get_room_by_id(db, room_id)
-    if not room:
+    # Get room and game (contexto de partida cacheado)
+    context = get_game_context(db, room_id)
+    if not context:
         raise HTTPException(status_code=404, detail="Room not found")
     
-    if not room.id_game:
+    if not context.game_id:
         raise HTTPException(status_code=400, detail="Room has no active game")
     
-    game = crud.get_game_by_id(db, room.id_game)
-    if not game:
+    if not context.has_game:
         raise HTTPException(status_code=404, detail="Game not found")
     
     # Validate it's player's turn
-    if game.player_turn_id != http_user_id:
+    if not context.is_turn_of(http_user_id):
         raise HTTPException(status_code=403, detail="Not your turn")
     
     # Validate event card is in player's hand
     event_card = db.query(models.CardsXGame).filter(
         models.CardsXGame.id == request.card_id,
         models.CardsXGame.player_id == http_user_id,
-        models.CardsXGame.id_game == room.id_game,
+        models.CardsXGame.id_game == context.game_id,
         models.CardsXGame.is_in == models.CardState.HAND
     ).first()
     
@@ -79,7 +84,7 @@ async def play_look_into_ashes(
     
     # Get top 5 cards from discard pile
     discard_cards = db.query(models.CardsXGame).join(models.Card).filter(
-        models.CardsXGame.id_game == room.id_game,
+        models.CardsXGame.id_game == context.game_id,
         models.CardsXGame.is_in == models.CardState.DISCARD
     ).order_by(
         models.CardsXGame.position.desc()  # Most recent first
@@ -91,17 +96,18 @@ async def play_look_into_ashes(
             detail="Discard pile is empty"
         )
     
-    # Get current turn using crud helper
-    current_turn = crud.get_current_turn(db, room.id_game)
-    
-    if not current_turn:
+    # Current turn from the game context
+    if context.current_turn_id is None:
         raise HTTPException(
             status_code=400,
             detail="No active turn found"
         )
     
+    # Turno confirmado sobre la fila de Game que se va a versionar (el contexto puede estar viejo)
+    confirm_turn(db, context, http_user_id)
+
     # Move event card to DISCARD immediately
-    max_discard_pos = crud.get_max_position_by_state(db, room.id_game, models.CardState.DISCARD)
+    max_discard_pos = crud.get_max_position_by_state(db, context.game_id, models.CardState.DISCARD)
     
     event_card.is_in = models.CardState.DISCARD
     event_card.player_id = None
@@ -110,8 +116,8 @@ async def play_look_into_ashes(
     
     # Create action in ActionsPerTurn using crud helper
     action_data = {
-        'id_game': room.id_game,
-        'turn_id': current_turn.id,
+        'id_game': context.game_id,
+        'turn_id': context.current_turn_id,
         'player_id': http_user_id,
         'action_name': models.ActionName.LOOK_INTO_THE_ASHES.value,
         'action_type': models.ActionType.EVENT_CARD,
@@ -173,23 +179,23 @@ async def select_card_from_ashes(
         success: True if card was taken
     """
     
-    # Get room and game
-    room = crud.get_room_by_id(db, room_id)
-    if not room:
+    # Get room and game (contexto de partida cacheado)
+    context = get_game_context(db, room_id)
+    if not context:
         raise HTTPException(status_code=404, detail="Room not found")
     
-    game = crud.get_game_by_id(db, room.id_game)
-    if not game:
+    if not context.has_game:
         raise HTTPException(status_code=404, detail="Game not found")
     
-    # Get parent action using crud helper
-    parent_action = crud.get_action_by_id(db, request.action_id)
+    # Get parent action using crud helper (solo en las particiones desde que arrancó la partida)
+    started_at = crud.get_game_started_at(db, context.game_id)
+    parent_action = crud.get_action_by_id(db, request.action_id, since=started_at) if started_at else None
     
     if not parent_action:
         raise HTTPException(status_code=404, detail="Parent action not found")
     
     # Validate parent action belongs to this player and game
-    if (parent_action.id_game != room.id_game or 
+    if (parent_action.id_game != context.game_id or 
         parent_action.player_id != http_user_id or
         parent_action.action_name != models.ActionName.LOOK_INTO_THE_ASHES.value or
         parent_action.result != models.ActionResult.SUCCESS):
@@ -198,8 +204,9 @@ async def select_card_from_ashes(
             detail="Invalid parent action"
         )
     
-    # Check action is not too old (10 minutes timeout)
-    if parent_action.action_time < datetime.now() - timedelta(minutes=10):
+    # Check action is not too old (PENDING_ACTION_TIMEOUT_SECONDS, 10 minutes by default)
+    timeout = settings.PENDING_ACTION_TIMEOUT_SECONDS
+    if timeout > 0 and parent_action.action_time < datetime.now() - timedelta(seconds=timeout):
         raise HTTPException(
             status_code=400,
             detail="Action expired"
@@ -208,7 +215,7 @@ async def select_card_from_ashes(
     # Obtener carta seleccionada
     selected_card = db.query(models.CardsXGame).filter(
         models.CardsXGame.id == request.selected_card_id,
-        models.CardsXGame.id_game == room.id_game,
+        models.CardsXGame.id_game == context.game_id,
         models.CardsXGame.is_in == models.CardState.DISCARD
     ).first()
 
@@ -224,7 +231,7 @@ async def select_card_from_ashes(
     # Get current hand size using crud helper
     hand_count = db.query(models.CardsXGame).filter(
         models.CardsXGame.player_id == http_user_id,
-        models.CardsXGame.id_game == room.id_game,
+        models.CardsXGame.id_game == context.game_id,
         models.CardsXGame.is_in == models.CardState.HAND
     ).count()
     
@@ -238,22 +245,19 @@ async def select_card_from_ashes(
 
     # Obtener todas las cartas del descarte ordenadas por posición
     remaining_discard = db.query(models.CardsXGame).filter(
-        models.CardsXGame.id_game == room.id_game,
+        models.CardsXGame.id_game == context.game_id,
         models.CardsXGame.is_in == models.CardState.DISCARD
     ).order_by(models.CardsXGame.position.asc()).all()
 
     # Reasignar posiciones secuenciales (0, 1, 2, 3...)
     for idx, card in enumerate(remaining_discard):
-        old_pos = card.position
         card.position = idx
-        if old_pos != idx:
-            print(f"  📦 Reindexando: Carta {card.id_card} de pos {old_pos} → {idx}")
     
-    print(f"🔄 Reindexado completo: {len(remaining_discard)} cartas en descarte")
+    logger.debug("Reindexado completo: %s cartas en descarte", len(remaining_discard))
     
     # Create completion action using crud helper
     completion_action_data = {
-        'id_game': room.id_game,
+        'id_game': context.game_id,
         'turn_id': parent_action.turn_id,
         'player_id': http_user_id,
         'action_type': models.ActionType.DRAW,
@@ -278,7 +282,7 @@ async def select_card_from_ashes(
     )
     
     # Update full game state
-    game_state = build_complete_game_state(db, room.id_game)
+    game_state = await run_sync(game_key(context.game_id), build_complete_game_state, db, context.game_id)
     await ws_service.notificar_estado_partida(
         room_id=room_id,
         game_state=game_state,
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 from app.db.database import SessionLocal
 from app.db.models import Room
 from app.schemas.detective_set_schema import (
@@ -8,6 +9,7 @@ from app.schemas.detective_set_schema import (
 )
 from app.services.detective_set_service import DetectiveSetService
 from app.services.game_status_service import build_complete_game_state
+from app.services.executor import run_sync, game_key, ordered
 from app.sockets.socket_service import get_websocket_service
 
 import logging
@@ -53,51 +55,57 @@ async def play_detective_set(
     
     game_id = room.id_game
     
-    # 2. Ejecutar la lógica de negocio en el servicio
-    try:
-        service = DetectiveSetService(db)
-        action_id, next_action = service.play_detective_set(game_id, request)
+    # La partida queda tomada durante toda la acción: servicio, estado y notificaciones
+    async with ordered(game_key(game_id)):
+        # 2. Ejecutar la lógica de negocio en el servicio
+        try:
+            service = DetectiveSetService(db)
+            action_id, next_action = await run_sync(game_key(game_id), service.play_detective_set, game_id, request)
         
-        logger.info(f"Detective set played successfully. Action ID: {action_id}")
+            logger.info(f"Detective set played successfully. Action ID: {action_id}")
         
-    except HTTPException:
-        # Re-lanzar excepciones HTTP del servicio
-        raise
-    except Exception as e:
-        logger.error(f"Error playing detective set: {str(e)}")
-        db.rollback()
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+        except HTTPException:
+            # Re-lanzar excepciones HTTP del servicio
+            raise
+        except StaleDataError:
+            # Conflicto de versión: lo responde el handler global (409 version_conflict, reintentable)
+            db.rollback()
+            raise
+        except Exception as e:
+            logger.error(f"Error playing detective set: {str(e)}")
+            db.rollback()
+            raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
     
-    # 3. Obtener estado completo del juego para WebSocket
-    try:
-        game_state = build_complete_game_state(db, game_id)
-    except Exception as e:
-        logger.error(f"Error building game state: {str(e)}")
-        game_state = {}
+        # 3. Obtener estado completo del juego para WebSocket
+        try:
+            game_state = await run_sync(game_key(game_id), build_complete_game_state, db, game_id)
+        except Exception as e:
+            logger.error(f"Error building game state: {str(e)}")
+            game_state = {}
     
-    # 4. Emitir eventos WebSocket
-    ws_service = get_websocket_service()
+        # 4. Emitir eventos WebSocket
+        ws_service = get_websocket_service()
     
-    try:
-        # Notificar que la acción de detective comenzó
-        await ws_service.notificar_detective_action_started(
-            room_id=room_id,
-            player_id=request.owner,
-            set_type=request.setType.value
-        )
-        logger.info(f"📡 Emitted detective_action_started to room {room_id}")
+        try:
+            # Notificar que la acción de detective comenzó
+            await ws_service.notificar_detective_action_started(
+                room_id=room_id,
+                player_id=request.owner,
+                set_type=request.setType.value
+            )
+            logger.info(f"📡 Emitted detective_action_started to room {room_id}")
         
-        # Notificar estado completo del juego (público y privado)
-        await ws_service.notificar_estado_partida(
-            room_id=room_id,
-            jugador_que_actuo=request.owner,
-            game_state=game_state
-        )
-        logger.info(f"📡 Emitted game state to room {room_id}")
+            # Notificar estado completo del juego (público y privado)
+            await ws_service.notificar_estado_partida(
+                room_id=room_id,
+                jugador_que_actuo=request.owner,
+                game_state=game_state
+            )
+            logger.info(f"📡 Emitted game state to room {room_id}")
         
-    except Exception as e:
-        logger.error(f"Error emitting WebSocket events: {str(e)}")
-        # No fallar el request si solo falló el WS
+        except Exception as e:
+            logger.error(f"Error emitting WebSocket events: {str(e)}")
+            # No fallar el request si solo falló el WS
     
     # 5. Construir y retornar response
     response = PlayDetectiveSetResponse(
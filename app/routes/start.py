@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 from app.db.crud import create_game
 from app.db.database import SessionLocal
 from app.db.models import Player, Room, Card, CardsXGame, CardState, CardType, RoomStatus, Turn, TurnStatus
@@ -7,6 +8,9 @@ from app.schemas.start import StartRequest
 from app.sockets.socket_service import get_websocket_service
 from datetime import date, datetime
 from app.services.game_status_service import build_complete_game_state
+from app.services.executor import run_sync, game_key
+from app.services.game_context import invalidate_game_context
+from app.services.turn_timer import programar_turno
 import logging
 import random
 import typing
@@ -24,7 +28,7 @@ def get_db():
 
 @router.post("/start", status_code=201)
 async def start_game(room_id: int, userid: StartRequest, db: Session = Depends(get_db)):
-    print(f"🎯 POST /start received: {StartRequest}")
+    logger.info("POST /start received: room=%s user=%s", room_id, userid.user_id)
 
     try:
         # Buscar sala
@@ -98,6 +102,8 @@ async def start_game(room_id: int, userid: StartRequest, db: Session = Depends(g
         db.add(first_turn)
         db.commit()
         db.refresh(first_turn)
+        invalidate_game_context(room_id=room.id)
+        programar_turno(game.id, first_turn.id, first_turn.start_time)
         
         logger.info(f"✅ Created first turn: number=1, game_id={game.id}, player_id={first_player.id}")
 
@@ -253,7 +259,7 @@ async def start_game(room_id: int, userid: StartRequest, db: Session = Depends(g
         }
 
         # Build game_state
-        game_state = build_complete_game_state(db, game.id)
+        game_state = await run_sync(game_key(game.id), build_complete_game_state, db, game.id)
 
         # Notificar por WebSocket
         ws_service = get_websocket_service()
@@ -265,6 +271,10 @@ async def start_game(room_id: int, userid: StartRequest, db: Session = Depends(g
 
     except HTTPException:
         raise
+    except StaleDataError:
+        # Conflicto de versión: lo responde el handler global (409 version_conflict, reintentable)
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Error interno al iniciar la partida: {str(e)}")
@@ -4,10 +4,15 @@ from app.db.database import SessionLocal
 from app.db.models import Game, Room, CardsXGame, CardState, Player
 from app.schemas.take_deck import TakeDeckRequest, TakeDeckResponse
 from app.services.take_deck import robar_cartas_del_mazo
+from app.services.game_context import confirm_turn, get_game_context
 from app.sockets.socket_service import get_websocket_service
 from datetime import datetime
 from app.services.game_service import procesar_ultima_carta
 from app.services.game_status_service import build_complete_game_state
+from app.services.executor import run_sync, game_key
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 router = APIRouter(prefix="/game", tags=["Games"])
@@ -37,24 +42,22 @@ async def take_from_deck(
 ):
     """Endpoint para robar cartas del mazo regular"""
     
-    # Validar sala
-    room = db.query(Room).filter(Room.id == room_id).first()
-    if not room:
+    # Validar sala, juego y turno (contexto de partida cacheado)
+    context = get_game_context(db, room_id)
+    if not context:
         raise HTTPException(status_code=404, detail="room_not_found")
     
-    # Validar juego
-    game = db.query(Game).filter(Game.id == room.id_game).first()
-    if not game:
+    if not context.has_game:
         raise HTTPException(status_code=404, detail="game_not_found")
     
-    # Validar turno
-    if game.player_turn_id != user_id:
+    if not context.is_turn_of(user_id):
         raise HTTPException(status_code=403, detail="not_your_turn")
     
-    print(f"🎴 Jugador {user_id} quiere robar {request.cantidad} carta(s)")
+    logger.debug("Jugador %s quiere robar %s carta(s)", user_id, request.cantidad)
     
-    # Robar cartas
-    drawn = await robar_cartas_del_mazo(db, game, user_id, request.cantidad)
+    # Robar cartas (turno confirmado sobre la fila de Game que se va a versionar)
+    game = confirm_turn(db, context, user_id)
+    drawn = await robar_cartas_del_mazo(db, game, user_id, request.cantidad, turn_id=context.current_turn_id)
     
     if not drawn:
         raise HTTPException(status_code=400, detail="deck_empty")
@@ -72,7 +75,7 @@ async def take_from_deck(
         CardsXGame.is_in == CardState.DECK
     ).count()
     
-    print(f"✅ Robadas {len(drawn)} carta(s). Quedan {deck_remaining} en el mazo")
+    logger.debug("Robadas %s carta(s). Quedan %s en el mazo", len(drawn), deck_remaining)
     
     # Preparar respuesta
     response = TakeDeckResponse(
@@ -82,9 +85,7 @@ async def take_from_deck(
     )
     
     # Notificar vía WebSocket (opcional - si querés que otros vean que robó)
-    players = db.query(Player).filter(Player.id_room == room_id).order_by(Player.order.asc()).all()
-    
-    game_state = game_state = build_complete_game_state(db, game.id)
+    game_state = await run_sync(game_key(game.id), build_complete_game_state, db, game.id)
 
     ws_service = get_websocket_service()
         
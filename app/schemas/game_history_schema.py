@@ -0,0 +1,36 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+from app.db.models import ActionResult, ActionType, Direction, SourcePile
+
+
+class HistoryAction(BaseModel):
+    id: int
+    parent_action_id: Optional[int] = None
+    triggered_by_action_id: Optional[int] = None
+    turn_id: Optional[int] = None
+    player_id: int
+    action_time: datetime
+    action_name: Optional[str] = None
+    action_type: Optional[ActionType] = None
+    result: Optional[ActionResult] = None
+    player_source: Optional[int] = None
+    player_target: Optional[int] = None
+    secret_target: Optional[int] = None
+    selected_card_id: Optional[int] = None
+    card_given_id: Optional[int] = None
+    card_received_id: Optional[int] = None
+    direction: Optional[Direction] = None
+    source_pile: Optional[SourcePile] = None
+    position_card: Optional[int] = None
+    selected_set_id: Optional[int] = None
+    to_be_hidden: Optional[bool] = None
+    children: List["HistoryAction"] = []  # acciones con parent_action_id = id, ordenadas por id
+
+
+class GameHistoryResponse(BaseModel):
+    room_id: int
+    game_id: int
+    archived: bool = False                # la partida se lee del archivo (ARCHIVE_DIR)
+    items: List[HistoryAction]
+    next_cursor: Optional[int] = None     # valor de ?after= para la página siguiente; None si no hay más
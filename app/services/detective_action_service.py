@@ -104,7 +104,7 @@ class DetectiveActionService:
             executor_id=request.executorId
         )
         
-        crud.update_action_result(self.db, action.id, ActionResult.SUCCESS)
+        crud.update_action_result(self.db, action.id, ActionResult.SUCCESS, since=action.action_time)
         self.db.commit()
         
         return DetectiveActionResponse(
@@ -235,7 +235,7 @@ class DetectiveActionService:
         )
         
         # Marcar la acción como completada
-        crud.update_action_result(self.db, action.id, ActionResult.SUCCESS)
+        crud.update_action_result(self.db, action.id, ActionResult.SUCCESS, since=action.action_time)
         self.db.commit()
         
         return DetectiveActionResponse(
@@ -293,7 +293,9 @@ class DetectiveActionService:
     
     def _get_pending_action(self, action_id: int, game_id: int) -> ActionsPerTurn:
         """Obtiene la acción pendiente o lanza error"""
-        action = crud.get_action_by_id(self.db, action_id)
+        # La acción es de la partida: solo se buscan las particiones desde que arrancó
+        started_at = crud.get_game_started_at(self.db, game_id)
+        action = crud.get_action_by_id(self.db, action_id, since=started_at) if started_at else None
         
         if not action:
             raise HTTPException(status_code=404, detail="Action not found")
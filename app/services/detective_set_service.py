@@ -1,4 +1,5 @@
 from sqlalchemy.orm import Session
+from datetime import datetime
 from typing import List, Tuple
 from fastapi import HTTPException
 
@@ -7,6 +8,7 @@ from ..db.models import (
     CardState, ActionType, ActionResult
 )
 from ..db import crud
+from .turn_timer import programar_accion
 from ..schemas.detective_set_schema import (
     SetType, PlayDetectiveSetRequest, NextActionType, 
     NextAction, NextActionMetadata, SecretInfo, SET_MIN_CARDS, SET_ACTION_NAMES
@@ -90,6 +92,9 @@ class DetectiveSetService:
         
         # 11. Commit de la transacción
         self.db.commit()
+
+        # 12. Deadline para completar la acción (si vence, se cancela)
+        programar_accion(action.id, game_id, datetime.now())
         
         return action.id, next_action
     
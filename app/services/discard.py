@@ -3,20 +3,25 @@ from sqlalchemy.orm import Session
 from app.db.models import CardsXGame, CardState, Game, ActionType, SourcePile, ActionResult, ActionName
 from app.db.crud import get_current_turn, create_parent_card_action, create_card_action
 from typing import List
+import logging
 
-async def descartar_cartas(db, game, user_id, ordered_player_cards):
+logger = logging.getLogger(__name__)
+
+async def descartar_cartas(db, game, user_id, ordered_player_cards, turn_id=None):
     discarded = []
     
-    # Get current turn for action logging
-    current_turn = get_current_turn(db, game.id)
-    if not current_turn:
-        raise ValueError(f"No active turn found for game {game.id}")
+    # Get current turn for action logging (turn_id: ya resuelto por la ruta desde el contexto de partida)
+    if turn_id is None:
+        current_turn = get_current_turn(db, game.id)
+        if not current_turn:
+            raise ValueError(f"No active turn found for game {game.id}")
+        turn_id = current_turn.id
     
     # Create parent action for the complete discard operation
     parent_action = create_parent_card_action(
         db=db,
         game_id=game.id,
-        turn_id=current_turn.id,
+        turn_id=turn_id,
         player_id=user_id,
         action_type=ActionType.DISCARD,
         action_name=ActionName.END_TURN_DISCARD,
@@ -28,7 +33,7 @@ async def descartar_cartas(db, game, user_id, ordered_player_cards):
         CardsXGame.is_in == CardState.DISCARD
     ).count()
     
-    print(f"🔢 Próxima posición en descarte: {next_pos}")
+    logger.debug("Próxima posición en descarte: %s", next_pos)
     
     # Capture card IDs and prepare data before any deletion
     card_ids_to_process = [card.id_card for card in ordered_player_cards]
@@ -54,7 +59,7 @@ async def descartar_cartas(db, game, user_id, ordered_player_cards):
         create_card_action(
             db=db,
             game_id=game.id,
-            turn_id=current_turn.id,
+            turn_id=turn_id,
             player_id=user_id,
             action_type=ActionType.DISCARD,
             source_pile=SourcePile.DISCARD_PILE,
@@ -64,7 +69,7 @@ async def descartar_cartas(db, game, user_id, ordered_player_cards):
             parent_action_id=parent_action.id
         )
         
-        print(f"📤 Carta {card.id_card} → posición {card.position}")
+        logger.debug("Carta %s → posición %s", card.id_card, card.position)
     
     # Flush changes to database but don't commit yet
     db.flush()
@@ -75,6 +80,7 @@ async def descartar_cartas(db, game, user_id, ordered_player_cards):
     # After commit, the objects are still valid - no need to refresh
     # The attributes are already updated in memory
     
-    print(f"✅ Total descartado en orden: {card_ids_to_process}")
+    logger.info("Jugador %s descartó %s carta(s) en game %s", user_id, len(discarded), game.id)
+    logger.debug("Total descartado en orden: %s", card_ids_to_process)
     
     return discarded
\ No newline at end of file
@@ -0,0 +1,191 @@
+# app/services/executor.py
+"""
+Executor acotado para los servicios síncronos que usan la DB.
+
+Mientras la capa de datos sea síncrona, ``DetectiveSetService``,
+``DetectiveActionService``, ``join_game_logic`` y ``build_complete_game_state``
+corren en un pool propio de ``workers`` threads en vez de en el event loop: la
+latencia de la DB ya no frena el tráfico WebSocket del proceso.
+
+- Acotado: como mucho ``workers + queue_max`` llamadas admitidas (en un thread o
+  en la cola del pool); el resto espera en el loop sin ocupar threads.
+- Orden por partida: las llamadas con la misma clave (``game_key``/``room_key``)
+  corren de a una y en el orden en que se pidieron, como cuando todo corría en
+  el loop. Si el request que espera se cancela, la partida sigue tomada hasta
+  que el thread termina.
+- El orden es por llamada: entre dos ``run`` del mismo request puede correr otro
+  request de la partida. Una acción que necesita la partida de punta a punta
+  (servicio + estado + notificaciones) la toma con ``async with ordered(key)``;
+  adentro, los ``run`` de esa clave no vuelven a esperar. Las rutas que mutan en
+  el loop sin pasar por el executor no toman la partida: de esas carreras se
+  ocupa ``Game.version`` (409 ``version_conflict``).
+- La sesión de la DB del request viaja al thread; nunca la usan dos threads a la
+  vez porque el request espera el resultado.
+- Métricas (``stats``): llamadas esperando su turno, encoladas, corriendo,
+  completadas, máximo encolado y espera media hasta tener thread.
+"""
+import asyncio
+import contextlib
+import contextvars
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Claves tomadas con ``ordered``, como pares (clave, tarea): las tareas que el bloque lanza
+# heredan el contexto pero no la partida, esperan su turno como cualquier otra
+_held_keys: contextvars.ContextVar[frozenset] = contextvars.ContextVar("held_keys", default=frozenset())
+
+
+def _holds(key: Hashable) -> bool:
+    return (key, asyncio.current_task()) in _held_keys.get()
+
+
+def game_key(game_id: int) -> tuple:
+    return ("game", game_id)
+
+
+def room_key(room_id: int) -> tuple:
+    return ("room", room_id)
+
+
+class ServiceExecutor:
+
+    def __init__(self, workers: int = 8, queue_max: int = 64):
+        self.workers = workers
+        self.queue_max = queue_max
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="services")
+        self._slots = asyncio.Semaphore(workers + queue_max)
+        self._order: Dict[Hashable, asyncio.Lock] = {}
+        self._order_users: Dict[Hashable, int] = {}
+        self._counters = threading.Lock()
+        self.waiting = 0    # esperando el turno de su partida o un lugar en la cola
+        self.queued = 0     # en la cola del pool, sin thread todavía
+        self.running = 0
+        self.completed = 0
+        self.max_queued = 0
+        self._queue_wait = 0.0
+
+    @contextlib.asynccontextmanager
+    async def _turn(self, key: Hashable):
+        """Espera el turno de ``key`` y lo conserva mientras dura el bloque"""
+        lock = self._order.get(key)
+        if lock is None:
+            lock = self._order[key] = asyncio.Lock()
+        self._order_users[key] = self._order_users.get(key, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._order_users[key] -= 1
+            if not self._order_users[key]:
+                del self._order_users[key]
+                del self._order[key]
+
+    @contextlib.asynccontextmanager
+    async def ordered(self, key: Hashable):
+        """Toma ``key`` para todo el bloque: ningún otro request de la partida corre en el medio"""
+        if _holds(key):
+            yield
+            return
+        async with self._turn(key):
+            token = _held_keys.set(_held_keys.get() | {(key, asyncio.current_task())})
+            try:
+                yield
+            finally:
+                _held_keys.reset(token)
+
+    async def run(self, key: Optional[Hashable], fn: Callable, *args, **kwargs):
+        """Corre ``fn(*args, **kwargs)`` en el pool, en orden con las demás llamadas de ``key``"""
+        if key is None or _holds(key):
+            return await self._submit(fn, args, kwargs)
+        async with self._turn(key):
+            return await self._submit(fn, args, kwargs)
+
+    async def _submit(self, fn: Callable, args, kwargs):
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        try:
+            with self._counters:
+                self.queued += 1
+                self.max_queued = max(self.max_queued, self.queued)
+            call = functools.partial(self._call, time.monotonic(), fn, args, kwargs)
+            future = asyncio.get_running_loop().run_in_executor(self._pool, contextvars.copy_context().run, call)
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # El thread sigue usando la sesión: no se libera la partida hasta que termine
+                await asyncio.wait([future])
+                raise
+        finally:
+            self._slots.release()
+
+    def _call(self, submitted: float, fn: Callable, args, kwargs):
+        with self._counters:
+            self.queued -= 1
+            self.running += 1
+            self._queue_wait += time.monotonic() - submitted
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._counters:
+                self.running -= 1
+                self.completed += 1
+
+    def depth(self) -> int:
+        """Llamadas que todavía no consiguieron thread"""
+        return self.waiting + self.queued
+
+    def stats(self) -> dict:
+        with self._counters:
+            started = self.completed + self.running
+            return {
+                "workers": self.workers,
+                "waiting": self.waiting,
+                "queued": self.queued,
+                "running": self.running,
+                "completed": self.completed,
+                "max_queued": self.max_queued,
+                "avg_queue_wait_ms": round(self._queue_wait / started * 1000, 2) if started else 0.0,
+                "ordered_keys": len(self._order),
+            }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Instancia global: se crea al primer uso y se cierra al apagar la app
+_executor: Optional[ServiceExecutor] = None
+
+
+def get_service_executor() -> ServiceExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ServiceExecutor(settings.SERVICE_EXECUTOR_WORKERS, settings.SERVICE_EXECUTOR_QUEUE)
+    return _executor
+
+
+def shutdown_service_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
+
+
+async def run_sync(key: Optional[Hashable], fn: Callable, *args, **kwargs):
+    """Atajo: ``await run_sync(game_key(game_id), build_complete_game_state, db, game_id)``"""
+    return await get_service_executor().run(key, fn, *args, **kwargs)
+
+
+def ordered(key: Hashable):
+    """Atajo: ``async with ordered(game_key(game_id)):`` alrededor de toda la acción"""
+    return get_service_executor().ordered(key)
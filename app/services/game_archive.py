@@ -0,0 +1,237 @@
+# app/services/game_archive.py
+"""
+Archivo de partidas terminadas.
+
+Las partidas FINISH dejaban para siempre sus filas de ``cardsXgame``, ``turn`` y
+``actions_per_turn`` en las tablas calientes, y los índices de esas tablas
+crecían con el historial. El archivador:
+
+- exporta cada partida terminada a ``{ARCHIVE_DIR}/game_{id}.json.gz`` (un JSON
+  comprimido con las filas de las tres tablas, tal como están en la DB);
+- recién con el archivo escrito (``os.replace`` atómico) borra esas filas en
+  lotes de ``ARCHIVE_BATCH_SIZE``, un commit por lote;
+- un archivo existente nunca se reescribe: si el borrado se cortó a mitad de
+  camino, la próxima pasada encuentra el archivo completo y solo retoma el borrado
+  (las filas que quedaron ya no tienen sus vínculos entre acciones);
+- ``restore_game`` borra lo que haya quedado de la partida, vuelve a insertar las
+  filas con sus ids originales y borra el archivo.
+
+``game``, ``room`` y ``player`` quedan en la DB: son una fila por partida o
+jugador y las usan el listado y los vínculos de los jugadores. Las tablas
+calientes quedan proporcionales a las partidas en curso.
+
+Uso: ``python scripts/archive_games.py`` (ver ``--help``).
+"""
+import gzip
+import json
+import logging
+import os
+import tempfile
+from datetime import date, datetime
+from enum import Enum
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import Date, DateTime, bindparam, delete, insert, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.database import SessionLocal
+from app.db.models import ActionsPerTurn, CardsXGame, Room, RoomStatus, Turn
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FORMAT = 1
+
+# Orden de inserción al restaurar; se borran en el orden inverso (las acciones
+# apuntan a turnos y cartas)
+_TABLES = (Turn, CardsXGame, ActionsPerTurn)
+
+# Vínculos entre acciones: se cortan antes de borrar y se reponen después de insertar
+_ACTION_LINKS = ("parent_action_id", "triggered_by_action_id")
+
+
+def _encode(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _decode(column, value):
+    if value is None:
+        return None
+    if isinstance(column.type, DateTime):
+        return datetime.fromisoformat(value)
+    if isinstance(column.type, Date):
+        return date.fromisoformat(value)
+    return value
+
+
+def _rows(db: Session, model, game_id: int) -> List[dict]:
+    columns = model.__table__.columns
+    result = db.execute(
+        model.__table__.select().where(columns.id_game == game_id).order_by(columns.id)
+    )
+    return [{key: _encode(value) for key, value in row._mapping.items()} for row in result]
+
+
+class GameArchiver:
+
+    def __init__(self, db_factory: Callable[[], Session], directory: str, batch_size: int = 500):
+        self.db_factory = db_factory
+        self.directory = directory
+        self.batch_size = batch_size
+
+    def path(self, game_id: int) -> str:
+        return os.path.join(self.directory, f"game_{game_id}.json.gz")
+
+    def is_archived(self, game_id: int) -> bool:
+        return os.path.exists(self.path(game_id))
+
+    # -------------
+    # | Archivar  |
+    # -------------
+
+    def pending_games(self, limit: Optional[int] = None) -> List[int]:
+        """Partidas FINISH que todavía tienen filas en las tablas calientes"""
+        db = self.db_factory()
+        try:
+            query = (
+                db.query(Room.id_game)
+                .filter(Room.status == RoomStatus.FINISH, Room.id_game.isnot(None))
+                .filter(db.query(CardsXGame.id).filter(CardsXGame.id_game == Room.id_game).exists()
+                        | db.query(Turn.id).filter(Turn.id_game == Room.id_game).exists())
+                .order_by(Room.id_game)
+            )
+            if limit:
+                query = query.limit(limit)
+            return [game_id for (game_id,) in query.all()]
+        finally:
+            db.close()
+
+    def export_game(self, game_id: int) -> Dict[str, int]:
+        """Escribe el archivo de la partida; devuelve las filas exportadas por tabla"""
+        if self.is_archived(game_id):
+            raise FileExistsError(f"La partida {game_id} ya está archivada en {self.path(game_id)}")
+        db = self.db_factory()
+        try:
+            tables = {model.__tablename__: _rows(db, model, game_id) for model in _TABLES}
+        finally:
+            db.close()
+        os.makedirs(self.directory, exist_ok=True)
+        document = {
+            "format": ARCHIVE_FORMAT,
+            "game_id": game_id,
+            "archived_at": datetime.now().isoformat(),
+            "tables": tables,
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb") as f:
+                f.write(json.dumps(document, separators=(",", ":")).encode())
+            os.replace(tmp_path, self.path(game_id))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return {name: len(rows) for name, rows in tables.items()}
+
+    def purge_game(self, game_id: int) -> int:
+        """Borra las filas calientes de la partida en lotes; devuelve cuántas borró"""
+        db = self.db_factory()
+        deleted = 0
+        try:
+            # Las acciones se apuntan entre sí: se cortan los vínculos antes de borrar por lotes
+            db.execute(
+                update(ActionsPerTurn)
+                .where(ActionsPerTurn.id_game == game_id)
+                .values({link: None for link in _ACTION_LINKS})
+            )
+            db.commit()
+            for model in reversed(_TABLES):
+                while True:
+                    ids = [row_id for (row_id,) in (
+                        db.query(model.id).filter(model.id_game == game_id).limit(self.batch_size).all()
+                    )]
+                    if not ids:
+                        break
+                    db.execute(delete(model).where(model.id.in_(ids)))
+                    db.commit()
+                    deleted += len(ids)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        return deleted
+
+    def archive_game(self, game_id: int) -> Dict[str, int]:
+        if self.is_archived(game_id):
+            # Borrado interrumpido: el archivo ya tiene la partida completa, solo se retoma el borrado
+            exported = {name: len(rows) for name, rows in self.load(game_id)["tables"].items()}
+            logger.warning("Partida %s ya archivada: se retoma el borrado de sus filas", game_id)
+        else:
+            exported = self.export_game(game_id)
+        deleted = self.purge_game(game_id)
+        logger.info("Partida %s archivada en %s (%s filas)", game_id, self.path(game_id), deleted)
+        return exported
+
+    def archive_finished(self, limit: Optional[int] = None) -> dict:
+        """Archiva las partidas terminadas pendientes; reporte con partidas y filas movidas"""
+        games = self.pending_games(limit)
+        rows: Dict[str, int] = {model.__tablename__: 0 for model in _TABLES}
+        for game_id in games:
+            for name, count in self.archive_game(game_id).items():
+                rows[name] += count
+        return {"games": games, "rows": rows}
+
+    # -------------
+    # | Restaurar |
+    # -------------
+
+    def load(self, game_id: int) -> dict:
+        with gzip.open(self.path(game_id), "rb") as f:
+            return json.loads(f.read())
+
+    def restore_game(self, game_id: int) -> Dict[str, int]:
+        """Vuelve a cargar la partida en las tablas calientes y borra su archivo"""
+        document = self.load(game_id)
+        if document.get("format") != ARCHIVE_FORMAT:
+            raise ValueError(f"Formato de archivo desconocido: {document.get('format')}")
+        actions = document["tables"][ActionsPerTurn.__tablename__]
+        links = [
+            {"_id": row["id"], **{f"_{link}": row[link] for link in _ACTION_LINKS}}
+            for row in actions if any(row[link] is not None for link in _ACTION_LINKS)
+        ]
+        # Filas que hayan quedado de un borrado interrumpido (el archivo las tiene todas)
+        self.purge_game(game_id)
+        db = self.db_factory()
+        try:
+            for model in _TABLES:
+                columns = model.__table__.columns
+                rows = [
+                    {key: None if key in _ACTION_LINKS else _decode(columns[key], value) for key, value in row.items()}
+                    for row in document["tables"][model.__tablename__]
+                ]
+                for start in range(0, len(rows), self.batch_size):
+                    db.execute(insert(model), rows[start:start + self.batch_size])
+            if links:
+                db.execute(
+                    update(ActionsPerTurn.__table__)
+                    .where(ActionsPerTurn.__table__.c.id == bindparam("_id"))
+                    .values({link: bindparam(f"_{link}") for link in _ACTION_LINKS}),
+                    links,
+                )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        os.unlink(self.path(game_id))
+        logger.info("Partida %s restaurada desde el archivo", game_id)
+        return {name: len(rows) for name, rows in document["tables"].items()}
+
+
+def get_game_archiver(db_factory: Callable[[], Session] = SessionLocal) -> GameArchiver:
+    return GameArchiver(db_factory, settings.ARCHIVE_DIR, settings.ARCHIVE_BATCH_SIZE)
@@ -0,0 +1,247 @@
+# app/services/game_context.py
+"""
+Contexto de partida compartido por las rutas de acciones: sala, partida,
+jugadores (por order), jugador con el turno y turno en curso.
+
+Cada acción validaba sala, partida, pertenencia y turno con sus propias
+consultas (``Room`` por id, ``Game`` por ``room.id_game``, ``Player`` por id y
+sala, ``Turn`` IN_PROGRESS). Con el cache se resuelven una vez por sala y se
+reutilizan hasta que cambian:
+
+- cambio de turno (``avanzar_turno``, ``actualizar_turno``, inicio de partida);
+- cambio de jugadores (join, leave, cancelación).
+
+Esos puntos llaman a ``invalidate_game_context`` después del commit. Con
+``MESSAGE_BUS_URL`` la invalidación se publica en el bus y los demás workers
+descartan su copia (``ContextInvalidations``). Como red de seguridad cada contexto
+vence a los ``GAME_CONTEXT_TTL_SECONDS`` (0 desactiva el cache). Solo guarda ids: los objetos ORM no sobreviven a la sesión que los cargó.
+
+El contexto puede estar viejo (otro worker, o dentro del TTL): las rutas que
+modifican la partida llaman a ``confirm_turn``, que carga ``Game`` en la sesión
+del request y vuelve a verificar el turno sobre esa fila. La versión que compara
+``Game.version`` al hacer commit es la de esa lectura.
+"""
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.config import settings
+from app.db.models import Game, Player, Room, Turn, TurnStatus
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class GameContext:
+    room_id: int
+    game_id: Optional[int]          # room.id_game (None si la partida no empezó)
+    has_game: bool                  # existe la fila de Game
+    player_ids: Tuple[int, ...]     # jugadores de la sala ordenados por order
+    turn_player_id: Optional[int]
+    current_turn_id: Optional[int]  # Turn IN_PROGRESS
+
+    def has_player(self, player_id: int) -> bool:
+        return player_id in self.player_ids
+
+    def is_turn_of(self, player_id: int) -> bool:
+        return self.has_game and self.turn_player_id == player_id
+
+
+class GameContextCache:
+
+    def __init__(self, ttl: float, max_rooms: int = 4096):
+        self.ttl = ttl
+        self.max_rooms = max_rooms
+        self._rooms: "OrderedDict[int, Tuple[float, GameContext]]" = OrderedDict()
+        self._room_by_game: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(self, db: Session, room_id: int) -> Optional[GameContext]:
+        """Contexto de la sala; None si la sala no existe"""
+        cached = self._get(room_id)
+        if cached is not None:
+            return cached
+        context = self._load(db, db.query(Room).filter(Room.id == room_id).first())
+        self._put(context)
+        return context
+
+    def resolve_by_game(self, db: Session, game_id: int) -> Optional[GameContext]:
+        """Contexto de la sala que juega ``game_id``; None si no hay sala para esa partida"""
+        room_id = self._room_by_game.get(game_id)
+        cached = self._get(room_id) if room_id is not None else None
+        if cached is not None:
+            return cached
+        context = self._load(db, db.query(Room).filter(Room.id_game == game_id).first())
+        self._put(context)
+        return context
+
+    def _get(self, room_id: int) -> Optional[GameContext]:
+        with self._lock:
+            entry = self._rooms.get(room_id)
+            if entry is None or time.monotonic() >= entry[0]:
+                self.misses += 1
+                return None
+            self._rooms.move_to_end(room_id)
+            self.hits += 1
+            return entry[1]
+
+    def _put(self, context: Optional[GameContext]):
+        if context is None or self.ttl <= 0:
+            return
+        with self._lock:
+            self._rooms[context.room_id] = (time.monotonic() + self.ttl, context)
+            self._rooms.move_to_end(context.room_id)
+            if context.game_id is not None:
+                self._room_by_game[context.game_id] = context.room_id
+            while len(self._rooms) > self.max_rooms:
+                _, (_, evicted) = self._rooms.popitem(last=False)
+                self._room_by_game.pop(evicted.game_id, None)
+
+    @staticmethod
+    def _load(db: Session, room: Optional[Room]) -> Optional[GameContext]:
+        if room is None:
+            return None
+        game = db.query(Game).filter(Game.id == room.id_game).first() if room.id_game else None
+        players = db.query(Player).filter(Player.id_room == room.id).order_by(Player.order.asc()).all()
+        current_turn = None
+        if game is not None:
+            current_turn = db.query(Turn).filter(
+                Turn.id_game == game.id,
+                Turn.status == TurnStatus.IN_PROGRESS
+            ).first()
+        return GameContext(
+            room_id=room.id,
+            game_id=room.id_game,
+            has_game=game is not None,
+            player_ids=tuple(p.id for p in players),
+            turn_player_id=game.player_turn_id if game is not None else None,
+            current_turn_id=current_turn.id if current_turn is not None else None,
+        )
+
+    def invalidate(self, room_id: Optional[int] = None, game_id: Optional[int] = None):
+        with self._lock:
+            if room_id is None and game_id is not None:
+                room_id = self._room_by_game.get(game_id)
+            if room_id is None:
+                return
+            entry = self._rooms.pop(room_id, None)
+            if entry is not None:
+                self._room_by_game.pop(entry[1].game_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._rooms.clear()
+            self._room_by_game.clear()
+
+
+_cache = GameContextCache(settings.GAME_CONTEXT_TTL_SECONDS)
+
+
+class ContextInvalidations:
+    """
+    Replica las invalidaciones entre workers por el bus. ``publish`` se puede llamar
+    desde cualquier thread (los servicios corren en el executor): el envío se agenda
+    en el event loop.
+    """
+
+    channel = "game_context_invalidations"
+
+    def __init__(self, cache: GameContextCache, bus, node_id: Optional[str] = None):
+        self.cache = cache
+        self.bus = bus
+        self.node_id = node_id or uuid.uuid4().hex
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        subscription = await self.bus.subscribe(self.channel)
+        self._task = self._loop.create_task(self._listen(subscription))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self._loop = None
+
+    async def _listen(self, subscription):
+        async for message in subscription:
+            if message.get("origin") != self.node_id:
+                self.cache.invalidate(room_id=message.get("room_id"), game_id=message.get("game_id"))
+
+    def publish(self, room_id: Optional[int], game_id: Optional[int]):
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        message = {"origin": self.node_id, "room_id": room_id, "game_id": game_id}
+        loop.call_soon_threadsafe(lambda: loop.create_task(self._send(message)))
+
+    async def _send(self, message: dict):
+        try:
+            await self.bus.publish(self.channel, message)
+        except Exception as e:
+            logger.warning("No se pudo publicar la invalidación de contexto %s: %s", message, e)
+
+
+# Sin bus (un solo proceso, tests) las invalidaciones son locales
+_invalidations: Optional[ContextInvalidations] = None
+
+
+def get_game_context_cache() -> GameContextCache:
+    return _cache
+
+
+def get_game_context(db: Session, room_id: int) -> Optional[GameContext]:
+    return _cache.resolve(db, room_id)
+
+
+def get_game_context_by_game(db: Session, game_id: int) -> Optional[GameContext]:
+    return _cache.resolve_by_game(db, game_id)
+
+
+def invalidate_game_context(room_id: Optional[int] = None, game_id: Optional[int] = None):
+    """Descarta el contexto cacheado de la sala (o de la sala de ``game_id``) en todos los workers"""
+    _cache.invalidate(room_id=room_id, game_id=game_id)
+    if _invalidations is not None:
+        _invalidations.publish(room_id, game_id)
+
+
+async def start_context_invalidations(bus) -> Optional[ContextInvalidations]:
+    """Con bus, publica y escucha las invalidaciones del resto de los workers"""
+    global _invalidations
+    if bus is None or _invalidations is not None:
+        return _invalidations
+    _invalidations = ContextInvalidations(_cache, bus)
+    await _invalidations.start()
+    return _invalidations
+
+
+async def stop_context_invalidations():
+    global _invalidations
+    if _invalidations is not None:
+        await _invalidations.stop()
+        _invalidations = None
+
+
+def confirm_turn(db: Session, context: GameContext, player_id: int) -> Game:
+    """
+    Carga la partida en la sesión y confirma que el turno sigue siendo de ``player_id``.
+    Si el contexto cacheado quedó viejo lo descarta y levanta StaleDataError (409
+    ``version_conflict``): el reintento se valida con el contexto nuevo.
+    """
+    game = db.get(Game, context.game_id)
+    if game is None or game.player_turn_id != player_id:
+        invalidate_game_context(room_id=context.room_id)
+        raise StaleDataError(f"El turno de la partida {context.game_id} cambió desde que se cacheó el contexto")
+    return game
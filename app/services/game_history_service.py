@@ -0,0 +1,107 @@
+# app/services/game_history_service.py
+"""
+Historial paginado de una partida desde el log de acciones.
+
+- Paginación por keyset: ``after`` es el id de la última acción de la página
+  anterior (``id > after ORDER BY id``), sin ``OFFSET``; cada página cuesta lo
+  mismo sin importar qué tan lejos esté del principio.
+- Se paginan las acciones raíz (sin ``parent_action_id``); los filtros de turno,
+  jugador y ``ActionType`` aplican a ellas. Cada raíz trae sus hijas anidadas en
+  ``children``: una consulta ``parent_action_id IN (...)`` por nivel para toda la
+  página, no una por acción.
+- Las consultas de la página y de cada nivel proyectan solo ``id`` (y
+  ``parent_action_id``): las responden los índices ``ix_actions_game_*`` sin leer
+  la tabla. Las filas completas se leen al final, por clave primaria, una sola
+  consulta para la página con todas sus hijas.
+- Las partidas archivadas (``GameArchiver``) se leen de su archivo con la misma
+  forma de respuesta.
+"""
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.db.models import ActionsPerTurn, ActionType
+
+# Corta el anidado si los vínculos entre acciones formaran un ciclo
+MAX_DEPTH = 8
+
+_table = ActionsPerTurn.__table__
+
+
+def _nest(roots: List[dict], fetch_children: Callable[[List[int]], List[dict]]) -> List[dict]:
+    """Cuelga de cada acción sus hijas, un fetch por nivel de anidado; devuelve todas las hijas"""
+    level, nested = roots, []
+    for _ in range(MAX_DEPTH):
+        by_id: Dict[int, dict] = {}
+        for row in level:
+            row["children"] = []
+            by_id[row["id"]] = row
+        if not by_id:
+            break
+        level = fetch_children(list(by_id))
+        for child in level:
+            by_id[child["parent_action_id"]]["children"].append(child)
+        nested.extend(level)
+    return nested
+
+
+def _page(rows: List[dict], limit: int) -> dict:
+    items = rows[:limit]
+    next_cursor = items[-1]["id"] if len(rows) > limit else None
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def get_game_history(db: Session, game_id: int, after: Optional[int] = None, limit: int = 50,
+                     turn_id: Optional[int] = None, player_id: Optional[int] = None,
+                     action_type: Optional[ActionType] = None) -> dict:
+    """Página de acciones raíz de la partida con sus hijas: ``{"items", "next_cursor"}``"""
+    query = select(_table.c.id).where(_table.c.id_game == game_id, _table.c.parent_action_id.is_(None))
+    if after is not None:
+        query = query.where(_table.c.id > after)
+    if turn_id is not None:
+        query = query.where(_table.c.turn_id == turn_id)
+    if player_id is not None:
+        query = query.where(_table.c.player_id == player_id)
+    if action_type is not None:
+        query = query.where(_table.c.action_type == action_type)
+    rows = [dict(row._mapping) for row in db.execute(query.order_by(_table.c.id).limit(limit + 1))]
+    page = _page(rows, limit)
+
+    def fetch_children(parent_ids: List[int]) -> List[dict]:
+        return [dict(row._mapping) for row in db.execute(
+            select(_table.c.id, _table.c.parent_action_id)
+            .where(_table.c.id_game == game_id, _table.c.parent_action_id.in_(parent_ids))
+            .order_by(_table.c.id)
+        )]
+
+    children = _nest(page["items"], fetch_children)
+    # Filas completas de la página y sus hijas, por clave primaria
+    stubs = {row["id"]: row for row in page["items"] + children}
+    if stubs:
+        for row in db.execute(select(_table).where(_table.c.id.in_(list(stubs)))):
+            stubs[row.id].update(row._mapping)
+    return page
+
+
+def get_archived_game_history(document: dict, after: Optional[int] = None, limit: int = 50,
+                              turn_id: Optional[int] = None, player_id: Optional[int] = None,
+                              action_type: Optional[ActionType] = None) -> dict:
+    """Igual que ``get_game_history`` sobre el documento de ``GameArchiver.load``"""
+    actions = sorted(document["tables"][ActionsPerTurn.__tablename__], key=lambda row: row["id"])
+    children = defaultdict(list)
+    roots = []
+    for row in actions:
+        if row["parent_action_id"] is not None:
+            children[row["parent_action_id"]].append(row)
+        elif ((after is None or row["id"] > after)
+              and (turn_id is None or row["turn_id"] == turn_id)
+              and (player_id is None or row["player_id"] == player_id)
+              and (action_type is None or row["action_type"] == action_type)):
+            roots.append(row)
+    page = _page(roots, limit)
+    _nest(page["items"], lambda parent_ids: sorted(
+        (child for parent_id in parent_ids for child in children[parent_id]), key=lambda row: row["id"]
+    ))
+    return page
@@ -1,5 +1,5 @@
 from app.sockets.socket_service import get_websocket_service
-from app.db.models import Room, RoomStatus, CardState, CardsXGame, Player
+from app.db.models import Room, RoomStatus, CardState, CardsXGame, Player, Turn, TurnStatus
 from app.db.models import Room, RoomStatus
 from app.db.database import SessionLocal
 from typing import Dict, Optional, List
@@ -8,6 +8,8 @@ from app.sockets.socket_manager import get_ws_manager
 from sqlalchemy.orm import Session
 from datetime import datetime
 from ..db import crud
+from .game_context import invalidate_game_context
+from .turn_timer import cancelar_partida, programar_turno
 
 logger = logging.getLogger(__name__)
 
@@ -43,6 +45,7 @@ async def finalizar_partida(game_id: int, winners: List[Dict]):
         room.status = RoomStatus.FINISH
         db.add(room)
         db.commit()
+        cancelar_partida(game_id)
         logger.info(f"Persistida partida {game_id} como terminada.")
     finally:
         db.close()
@@ -62,16 +65,16 @@ async def procesar_ultima_carta(game_id: int, room_id: int, game_state: Dict):
         jugadores_info = game_state.get("jugadores", [])
 
         jugadores_map = {j["player_id"]: j for j in jugadores_info}
-        logger.info(f"🔍 Estados privados disponibles: {list(estados_privados.keys())}")
+        logger.debug("Estados privados disponibles: %s", list(estados_privados.keys()))
         
         for player_id, estado_privado in estados_privados.items():
             secretos = estado_privado.get("secretos", [])
             player_info = jugadores_map.get(player_id, {})
-            logger.info(f"🔍 Player {player_id} ({player_info.get('name', 'Unknown')}): {len(secretos)} secretos")
+            logger.debug("Player %s (%s): %s secretos", player_id, player_info.get('name', 'Unknown'), len(secretos))
             
             for secret in secretos:
                 secret_name = secret.get("name", "")
-                logger.info(f"  - Secret: {secret_name}")
+                logger.debug("  - Secret: %s", secret_name)
                 if secret_name == "You are the Murderer!!":
                     winners.append({
                         "role": "murderer",
@@ -91,9 +94,9 @@ async def procesar_ultima_carta(game_id: int, room_id: int, game_state: Dict):
 
         if not winners:
             logger.error(f"⚠️ No se encontraron ganadores!")
-            logger.error(f"Estados privados: {estados_privados}")
+            logger.debug("Estados privados: %s", estados_privados)
         else:
-            print(f"\n✅ Ganadores identificados: {winners}")
+            logger.info("Ganadores identificados: %s", winners)
         
         # Mark room as finished in database
         await finalizar_partida(game_id, winners)
@@ -122,8 +125,6 @@ def join_game_logic(db: Session, room_id: int, player_data: dict):
         # Get current players in the room
         current_players = crud.list_players_by_room(db, room_id)
 
-        print(current_players)
-
         # Calculate next order for players
         next_order = len(current_players) + 1
         
@@ -149,6 +150,7 @@ def join_game_logic(db: Session, room_id: int, player_data: dict):
         
         # Create the new player
         new_player = crud.create_player(db, new_player_data)
+        invalidate_game_context(room_id=room_id)
         
         # Get updated list of players
         updated_players = crud.list_players_by_room(db, room_id)
@@ -161,7 +163,7 @@ def join_game_logic(db: Session, room_id: int, player_data: dict):
         }
     
     except Exception as e:
-        print(f"Error in join_game_logic: {e}")
+        logger.error("Error in join_game_logic: %s", e)
         return {"success": False, "error": "internal_error"}
 
 
@@ -180,3 +182,53 @@ async def actualizar_turno(db, game):
         next_idx = (idx + 1) % len(ids)
         game.player_turn_id = ids[next_idx]
         db.commit()
+        invalidate_game_context(room_id=room.id)
+
+
+def avanzar_turno(db: Session, room: Room, game, user_id: int) -> Player:
+    """
+    Termina el turno en curso de user_id y crea el turno del siguiente jugador (por order).
+    Es la regla de finish-turn: la usan la ruta y cualquier otro actor que cierre turnos.
+
+    Returns:
+        Player: Jugador que tiene el turno ahora
+    """
+    players = db.query(Player).filter(Player.id_room == room.id).order_by(Player.order.asc()).all()
+
+    current_order = next((p.order for p in players if p.id == user_id), None)
+    next_order = (current_order % len(players)) + 1
+    next_player = next((p for p in players if p.order == next_order), None)
+
+    # Finalizar turno actual
+    current_turn = db.query(Turn).filter(
+        Turn.id_game == game.id,
+        Turn.player_id == user_id,
+        Turn.status == TurnStatus.IN_PROGRESS
+    ).first()
+
+    if current_turn:
+        current_turn.status = TurnStatus.FINISHED
+        db.add(current_turn)
+        logger.info("Turn %s finished for player %s", current_turn.number, user_id)
+
+        # Crear nuevo turno para el siguiente jugador
+        new_turn = Turn(
+            number=current_turn.number + 1,
+            id_game=game.id,
+            player_id=next_player.id,
+            status=TurnStatus.IN_PROGRESS,
+            start_time=datetime.now()
+        )
+        db.add(new_turn)
+        logger.info("Turn %s created for player %s", new_turn.number, next_player.id)
+    else:
+        logger.warning("No active turn found for player %s", user_id)
+
+    game.player_turn_id = next_player.id
+
+    db.commit()
+    invalidate_game_context(room_id=room.id)
+    db.refresh(game)
+    if current_turn:
+        programar_turno(game.id, new_turn.id, new_turn.start_time)
+    return next_player
@@ -8,6 +8,9 @@ from app.schemas.game_status_schema import (
 )
 from typing import Dict, Any, Optional, List
 from collections import defaultdict
+import logging
+
+logger = logging.getLogger(__name__)
 
 def get_game_status_service(db: Session, game_id: int, user_id: int) -> GameStateView:
     """Recupera el estado de la partida y valida la pertenencia del usuario."""
@@ -232,6 +235,7 @@ def build_complete_game_state(db: Session, game_id: int) -> Dict[str, Any]:
         revealed_secrets_list = [
             {
                 "id": c.id,
+                "cardId": c.id_card,  # Card.id (catálogo)
                 "name": c.card.name,
                 "img_src": c.card.img_src,
                 "type": c.card.type.value
@@ -243,6 +247,7 @@ def build_complete_game_state(db: Session, game_id: int) -> Dict[str, Any]:
         for secret in all_secrets:
             secretsFromAllPlayers.append({
                 "id": secret.id,
+                "cardId": secret.id_card,
                 "player_id": player.id,
                 "player_name": player.name,
                 "name": secret.card.name,
@@ -289,6 +294,7 @@ def build_complete_game_state(db: Session, game_id: int) -> Dict[str, Any]:
     draft = [
         {
             "id": c.id,  # CardsXGame.id
+            "cardId": c.id_card,
             "name": c.card.name,
             "img_src": c.card.img_src,
             "type": c.card.type.value
@@ -352,6 +358,7 @@ def build_complete_game_state(db: Session, game_id: int) -> Dict[str, Any]:
                 "cards": [
                     {
                         "id": c.id,
+                        "cardId": c.id_card,
                         "name": c.card.name,
                         "description": c.card.description,
                         "type": c.card.type.value,
@@ -362,7 +369,7 @@ def build_complete_game_state(db: Session, game_id: int) -> Dict[str, Any]:
                 "count": len(cards)
             })
 
-    print(f"SETS to SEND: {sets}")
+    logger.debug("Sets a enviar para game %s: %s", game_id, sets)
 
     # Build private states for each player
     estados_privados = {}
@@ -377,6 +384,7 @@ def build_complete_game_state(db: Session, game_id: int) -> Dict[str, Any]:
         mano = [
             {
                 "id": c.id,  # CardsXGame.id (instance ID)
+                "cardId": c.id_card,
                 "name": c.card.name,
                 "description": c.card.description,
                 "type": c.card.type.value,
@@ -395,6 +403,7 @@ def build_complete_game_state(db: Session, game_id: int) -> Dict[str, Any]:
         secretos = [
             {
                 "id": c.id,  # CardsXGame.id
+                "cardId": c.id_card,
                 "name": c.card.name,
                 "description": c.card.description,
                 "img_src": c.card.img_src,
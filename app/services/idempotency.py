@@ -0,0 +1,265 @@
+# app/services/idempotency.py
+"""
+Idempotency-Key para las acciones de juego que los clientes reintentan.
+
+Con una red inestable el cliente reenvía ``discard``, ``take-deck``,
+``draft/pick`` y ``detective-action``: la acción se aplicaba dos veces o el
+reintento fallaba en la validación después de varias consultas. Si el request
+trae ``Idempotency-Key`` el middleware guarda la respuesta y los reintentos con
+la misma clave reciben esa respuesta (con ``Idempotent-Replayed: true``) sin
+volver a ejecutar la ruta: un lookup en un dict.
+
+- La clave vale por ruta (incluye la room) y usuario (``HTTP_USER_ID``).
+- Se guarda el hash del body: la misma clave con otro body responde 422
+  ``idempotency_key_reused``.
+- Un reintento que llega mientras el original corre espera su respuesta.
+- No se guardan las respuestas reintentables (5xx, 408, 409, 429): el reintento
+  vuelve a ejecutar la acción.
+- Cache en memoria acotado (``IDEMPOTENCY_MAX_KEYS``, LRU) con vencimiento
+  (``IDEMPOTENCY_TTL_SECONDS``). Con ``IDEMPOTENCY_PERSIST`` las respuestas
+  también se guardan en la tabla ``idempotency_key`` (sobreviven a un reinicio);
+  la DB se consulta solo si la clave no está en memoria.
+"""
+import asyncio
+import hashlib
+import logging
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+# Rutas con Idempotency-Key
+_IDEMPOTENT_PATHS = [
+    re.compile(r"^/game/\d+/discard$"),
+    re.compile(r"^/game/\d+/take-deck$"),
+    re.compile(r"^/game/\d+/draft/pick$"),
+    re.compile(r"^/api/game/\d+/detective-action$"),
+]
+
+# Respuestas que el cliente puede reintentar: no se guardan
+_RETRYABLE_STATUS = {408, 409, 429}
+
+# Cada cuántas escrituras se borran de la DB las claves vencidas
+_PURGE_EVERY = 100
+
+
+def is_idempotent_path(path: str) -> bool:
+    return any(pattern.match(path) for pattern in _IDEMPOTENT_PATHS)
+
+
+def is_cacheable(status_code: int) -> bool:
+    return status_code < 500 and status_code not in _RETRYABLE_STATUS
+
+
+def scope_key(path: str, user_id: str, client_key: str) -> str:
+    return hashlib.sha256(f"{path}\n{user_id}\n{client_key}".encode()).hexdigest()
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    fingerprint: str
+    status_code: int
+    body: bytes
+    media_type: Optional[str]
+    expires_at: float   # time.time()
+
+
+class IdempotencyStore:
+
+    def __init__(self, ttl: float = 300, max_keys: int = 10000, db_factory: Optional[Callable] = None):
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self.db_factory = db_factory
+        self._entries: "OrderedDict[str, StoredResponse]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Event] = {}
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.conflicts = 0
+
+    # -------------
+    # | Memoria   |
+    # -------------
+
+    def get(self, key: str) -> Optional[StoredResponse]:
+        stored = self._entries.get(key)
+        if stored is None:
+            return None
+        if time.time() >= stored.expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return stored
+
+    def put(self, key: str, stored: StoredResponse):
+        self._entries[key] = stored
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_keys:
+            self._entries.popitem(last=False)
+
+    def response(self, status_code: int, body: bytes, media_type: Optional[str], fingerprint: str) -> StoredResponse:
+        return StoredResponse(fingerprint, status_code, body, media_type, time.time() + self.ttl)
+
+    # -----------------
+    # | En curso      |
+    # -----------------
+
+    def pending(self, key: str) -> Optional[asyncio.Event]:
+        return self._inflight.get(key)
+
+    def begin(self, key: str):
+        self._inflight[key] = asyncio.Event()
+
+    def end(self, key: str):
+        event = self._inflight.pop(key, None)
+        if event is not None:
+            event.set()
+
+    # -------------
+    # | DB        |
+    # -------------
+
+    def load(self, key: str) -> Optional[StoredResponse]:
+        from app.db.models import IdempotencyRecord
+
+        db = self.db_factory()
+        try:
+            record = db.get(IdempotencyRecord, key)
+            if record is None or record.expires_at <= datetime.now():
+                return None
+            return StoredResponse(record.fingerprint, record.status_code, record.body.encode(),
+                                  record.media_type, record.expires_at.timestamp())
+        finally:
+            db.close()
+
+    def persist(self, key: str, stored: StoredResponse):
+        from app.db.models import IdempotencyRecord
+
+        db = self.db_factory()
+        try:
+            self._writes += 1
+            if self._writes % _PURGE_EVERY == 0:
+                db.query(IdempotencyRecord).filter(IdempotencyRecord.expires_at <= datetime.now()).delete()
+            db.merge(IdempotencyRecord(
+                key=key,
+                fingerprint=stored.fingerprint,
+                status_code=stored.status_code,
+                body=stored.body.decode(),
+                media_type=stored.media_type,
+                expires_at=datetime.fromtimestamp(stored.expires_at),
+            ))
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.exception("No se pudo guardar la respuesta idempotente %s", key)
+        finally:
+            db.close()
+
+    async def lookup(self, key: str) -> Optional[StoredResponse]:
+        stored = self.get(key)
+        if stored is None and self.db_factory is not None:
+            # Import aquí para evitar circular imports
+            from app.services.executor import run_sync
+            stored = await run_sync(None, self.load, key)
+            if stored is not None:
+                self.put(key, stored)
+        if stored is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return stored
+
+    async def store(self, key: str, stored: StoredResponse):
+        self.put(key, stored)
+        if self.db_factory is not None:
+            from app.services.executor import run_sync
+            await run_sync(None, self.persist, key, stored)
+
+    def clear(self):
+        self._entries.clear()
+        self._inflight.clear()
+
+    def stats(self) -> dict:
+        return {
+            "keys": len(self._entries),
+            "in_flight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "conflicts": self.conflicts,
+        }
+
+
+def _replay(stored: StoredResponse) -> Response:
+    return Response(content=stored.body, status_code=stored.status_code, media_type=stored.media_type,
+                    headers={REPLAYED_HEADER: "true"})
+
+
+async def idempotent_actions(request: Request, call_next):
+    """Middleware HTTP: los reintentos con la misma Idempotency-Key reciben la respuesta original"""
+    client_key = request.headers.get(IDEMPOTENCY_HEADER)
+    if request.method != "POST" or not client_key or not is_idempotent_path(request.url.path):
+        return await call_next(request)
+    if len(client_key) > MAX_KEY_LENGTH:
+        return JSONResponse(status_code=400, content={"detail": "validation_error: idempotency key too long"})
+
+    store = get_idempotency_store()
+    key = scope_key(request.url.path, request.headers.get("HTTP_USER_ID", ""), client_key)
+    fingerprint = hashlib.sha256(await request.body()).hexdigest()
+
+    # Reintento mientras el original sigue corriendo: se espera su respuesta
+    pending = store.pending(key)
+    while pending is not None:
+        await pending.wait()
+        pending = store.pending(key)
+
+    # Se toma la clave antes de cualquier await: el lookup puede ir a la DB y un reintento
+    # concurrente tiene que esperar a este request en lugar de ejecutar la acción otra vez
+    store.begin(key)
+    try:
+        stored = await store.lookup(key)
+        if stored is not None:
+            if stored.fingerprint != fingerprint:
+                store.conflicts += 1
+                return JSONResponse(status_code=422, content={"detail": "idempotency_key_reused"})
+            logger.debug("Respuesta idempotente repetida para %s", request.url.path)
+            return _replay(stored)
+
+        response = await call_next(request)
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        if is_cacheable(response.status_code):
+            await store.store(key, store.response(response.status_code, body, response.headers.get("content-type"),
+                                                fingerprint))
+        return Response(content=body, status_code=response.status_code, headers=dict(response.headers))
+    finally:
+        store.end(key)
+
+
+# Instancia global: en memoria por defecto; init_idempotency_store agrega la DB con IDEMPOTENCY_PERSIST
+_store = IdempotencyStore(settings.IDEMPOTENCY_TTL_SECONDS, settings.IDEMPOTENCY_MAX_KEYS)
+
+
+def get_idempotency_store() -> IdempotencyStore:
+    return _store
+
+
+def init_idempotency_store(db_factory: Optional[Callable] = None) -> IdempotencyStore:
+    global _store
+    _store = IdempotencyStore(
+        settings.IDEMPOTENCY_TTL_SECONDS,
+        settings.IDEMPOTENCY_MAX_KEYS,
+        db_factory if settings.IDEMPOTENCY_PERSIST else None,
+    )
+    return _store
@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 from app.db.models import Room, Player, RoomStatus
 from app.sockets.socket_service import get_websocket_service
+from app.services.game_context import invalidate_game_context
 from datetime import datetime
 import logging
 
@@ -55,6 +56,7 @@ async def leave_game_logic(db: Session, room_id: int, user_id: int):
             # Eliminar la sala
             db.delete(room)
             db.commit()
+            invalidate_game_context(room_id=room_id)
             
             logger.info(f"Room {room_id} deleted and all players removed from DB")
             
@@ -78,6 +80,7 @@ async def leave_game_logic(db: Session, room_id: int, user_id: int):
             # Eliminar al jugador de la BD (no solo desvincular)
             db.delete(player)
             db.commit()
+            invalidate_game_context(room_id=room_id)
             
             # Obtener jugadores restantes DESPUÉS de eliminar
             remaining_players = db.query(Player).filter(Player.id_room == room_id).all()
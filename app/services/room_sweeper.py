@@ -0,0 +1,246 @@
+# app/services/room_sweeper.py
+"""
+Barrido de salas WAITING abandonadas y jugadores huérfanos.
+
+Las salas creadas con ``POST /game`` que nunca arrancan quedaban en ``room`` y
+``player`` (y su ``game`` vacío) para siempre, y ``/api/game_list`` las recorre
+en cada request. Cada ``SWEEP_INTERVAL_SECONDS`` el barrido:
+
+- borra las salas WAITING creadas hace más de ``SWEEP_WAITING_ROOM_IDLE_SECONDS``
+  sin ningún socket conectado;
+- borra también, aunque tengan sockets, las que superan
+  ``SWEEP_WAITING_ROOM_MAX_SECONDS``: a esos sockets les llega
+  ``game_cancelled`` (``notificar_game_cancelled``), como cuando el host cancela;
+- borra los jugadores huérfanos: sin sala (o con una sala que ya no existe) y
+  sin cartas, turnos ni acciones que los referencien.
+
+Trabaja en lotes de ``SWEEP_BATCH_SIZE`` (un commit por lote) y en el executor de
+servicios, fuera del event loop. Con sharding cada worker barre solo las salas de
+las que es dueño. Cada pasada devuelve (y loguea) las filas recuperadas.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import delete, exists, or_
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.models import ActionsPerTurn, CardsXGame, Game, Player, Room, RoomStatus, Turn
+from app.services.game_context import invalidate_game_context
+from app.sharding import get_shard_router
+
+logger = logging.getLogger(__name__)
+
+
+def _connected_sockets(room_id: int) -> int:
+    # Import aquí para evitar circular imports
+    from app.sockets.socket_manager import get_ws_manager
+    try:
+        return len(get_ws_manager().user_sessions.in_room(room_id))
+    except RuntimeError:
+        return 0  # sin WebSocketManager (scripts, tests): nadie conectado
+
+
+class RoomSweeper:
+
+    def __init__(self, db_factory: Callable[[], Session], idle_seconds: float, max_age_seconds: float,
+                 batch_size: int = 100, interval: float = 300,
+                 connected: Callable[[int], int] = _connected_sockets):
+        self.db_factory = db_factory
+        self.idle_seconds = idle_seconds
+        self.max_age_seconds = max_age_seconds
+        self.batch_size = batch_size
+        self.interval = interval
+        self.connected = connected
+        self.last_report: Optional[dict] = None
+        self._task: Optional[asyncio.Task] = None
+
+    # -------------
+    # | Salas     |
+    # -------------
+
+    def _stale_rooms(self, after_id: int) -> List[tuple]:
+        """Próximo lote de salas WAITING más viejas que el umbral idle: (id, id_game, created_at)"""
+        cutoff = datetime.now() - timedelta(seconds=self.idle_seconds)
+        db = self.db_factory()
+        try:
+            return [tuple(row) for row in (
+                db.query(Room.id, Room.id_game, Room.created_at)
+                .filter(Room.status == RoomStatus.WAITING, Room.created_at < cutoff, Room.id > after_id)
+                .order_by(Room.id)
+                .limit(self.batch_size)
+                .all()
+            )]
+        finally:
+            db.close()
+
+    def _delete_rooms(self, room_ids: List[int], game_ids: List[int]) -> Dict[str, int]:
+        db = self.db_factory()
+        try:
+            # Se vuelve a exigir WAITING: la sala pudo arrancar desde que se eligió. FOR UPDATE
+            # bloquea las filas hasta el commit, así un start concurrente espera al barrido
+            # (y luego no encuentra la sala) en lugar de arrancar una sala que se está borrando
+            room_ids = [room_id for (room_id,) in db.query(Room.id).filter(
+                Room.id.in_(room_ids), Room.status == RoomStatus.WAITING
+            ).with_for_update().all()]
+            if not room_ids:
+                return {"rooms": 0, "players": 0, "games": 0}
+            players = db.execute(delete(Player).where(Player.id_room.in_(room_ids))).rowcount
+            rooms = db.execute(delete(Room).where(
+                Room.id.in_(room_ids), Room.status == RoomStatus.WAITING
+            )).rowcount
+            if rooms != len(room_ids):
+                # Alguna sala dejó de estar WAITING (motor sin FOR UPDATE): no se borra nada del
+                # lote, ni sus jugadores; la próxima pasada lo vuelve a intentar
+                db.rollback()
+                return {"rooms": 0, "players": 0, "games": 0}
+            # La partida de una sala que no arrancó no tiene cartas, turnos ni acciones
+            games = db.execute(delete(Game).where(
+                Game.id.in_(game_ids),
+                ~exists().where(Room.id_game == Game.id),
+                ~exists().where(CardsXGame.id_game == Game.id),
+                ~exists().where(Turn.id_game == Game.id),
+            )).rowcount if game_ids else 0
+            db.commit()
+            return {"rooms": rooms, "players": players, "games": games, "room_ids": room_ids}
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    # -----------------
+    # | Huérfanos     |
+    # -----------------
+
+    def _delete_orphan_players(self) -> int:
+        """Un lote de jugadores sin sala y sin nada que los referencie"""
+        db = self.db_factory()
+        try:
+            ids = [player_id for (player_id,) in (
+                db.query(Player.id)
+                .filter(
+                    or_(Player.id_room.is_(None), ~exists().where(Room.id == Player.id_room)),
+                    ~exists().where(Game.player_turn_id == Player.id),
+                    ~exists().where(Turn.player_id == Player.id),
+                    ~exists().where(CardsXGame.player_id == Player.id),
+                    ~exists().where(or_(
+                        ActionsPerTurn.player_id == Player.id,
+                        ActionsPerTurn.player_source == Player.id,
+                        ActionsPerTurn.player_target == Player.id,
+                    )),
+                )
+                .limit(self.batch_size)
+                .all()
+            )]
+            if not ids:
+                return 0
+            deleted = db.execute(delete(Player).where(Player.id.in_(ids))).rowcount
+            db.commit()
+            return deleted
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    # -------------
+    # | Pasada    |
+    # -------------
+
+    async def sweep(self) -> dict:
+        """Una pasada completa; reporte con las filas recuperadas"""
+        # Import aquí para evitar circular imports
+        from app.services.executor import run_sync
+        from app.sockets.socket_service import get_websocket_service
+
+        report = {"rooms": 0, "players": 0, "games": 0, "orphan_players": 0, "notified": 0}
+        max_age_cutoff = datetime.now() - timedelta(seconds=self.max_age_seconds)
+        router = get_shard_router()
+        after_id = 0
+        while True:
+            batch = await run_sync(None, self._stale_rooms, after_id)
+            if not batch:
+                break
+            after_id = batch[-1][0]
+            doomed, notify = [], set()
+            for room_id, game_id, created_at in batch:
+                if not router.is_local(room_id):
+                    continue
+                sockets = self.connected(room_id)
+                if sockets and created_at >= max_age_cutoff:
+                    continue  # hay alguien esperando en la sala
+                doomed.append((room_id, game_id))
+                if sockets:
+                    notify.add(room_id)
+            if not doomed:
+                continue
+            deleted = await run_sync(None, self._delete_rooms, [r for r, _ in doomed],
+                                     [g for _, g in doomed if g is not None])
+            for key in ("rooms", "players", "games"):
+                report[key] += deleted[key]
+            for room_id in deleted.get("room_ids", []):
+                invalidate_game_context(room_id=room_id)
+                if room_id in notify:
+                    await get_websocket_service().notificar_game_cancelled(
+                        room_id=room_id,
+                        timestamp=datetime.now().isoformat()
+                    )
+                    report["notified"] += 1
+
+        while True:
+            deleted = await run_sync(None, self._delete_orphan_players)
+            report["orphan_players"] += deleted
+            if deleted < self.batch_size:
+                break
+
+        if any(report.values()):
+            logger.info(
+                "Barrido: %s salas, %s jugadores, %s partidas vacías, %s jugadores huérfanos (%s salas notificadas)",
+                report["rooms"], report["players"], report["games"], report["orphan_players"], report["notified"]
+            )
+        self.last_report = {**report, "at": datetime.now().isoformat()}
+        return report
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.sweep()
+            except Exception:
+                logger.exception("Error en el barrido de salas")
+
+    def start(self):
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Instancia global (None si no se inició: tests, simulador, scripts)
+_sweeper: Optional[RoomSweeper] = None
+
+
+def get_room_sweeper() -> Optional[RoomSweeper]:
+    return _sweeper
+
+
+def init_room_sweeper(db_factory: Callable[[], Session]) -> RoomSweeper:
+    global _sweeper
+    _sweeper = RoomSweeper(
+        db_factory,
+        idle_seconds=settings.SWEEP_WAITING_ROOM_IDLE_SECONDS,
+        max_age_seconds=settings.SWEEP_WAITING_ROOM_MAX_SECONDS,
+        batch_size=settings.SWEEP_BATCH_SIZE,
+        interval=settings.SWEEP_INTERVAL_SECONDS,
+    )
+    return _sweeper
@@ -2,20 +2,25 @@ from sqlalchemy.orm import Session
 from app.db.models import CardsXGame, CardState, Game, ActionType, SourcePile, ActionResult, ActionName
 from app.db.crud import get_current_turn, create_parent_card_action, create_card_action
 from typing import List
+import logging
 
-async def robar_cartas_del_mazo(db, game, user_id, cantidad):
-    print(f"🎴 Robando {cantidad} carta(s) del mazo para jugador {user_id}")
+logger = logging.getLogger(__name__)
+
+async def robar_cartas_del_mazo(db, game, user_id, cantidad, turn_id=None):
+    logger.debug("Robando %s carta(s) del mazo para jugador %s", cantidad, user_id)
     
-    # Get current turn for action logging
-    current_turn = get_current_turn(db, game.id)
-    if not current_turn:
-        raise ValueError(f"No active turn found for game {game.id}")
+    # Get current turn for action logging (turn_id: ya resuelto por la ruta desde el contexto de partida)
+    if turn_id is None:
+        current_turn = get_current_turn(db, game.id)
+        if not current_turn:
+            raise ValueError(f"No active turn found for game {game.id}")
+        turn_id = current_turn.id
 
     # Create parent action for the complete draw operation
     parent_action = create_parent_card_action(
         db=db,
         game_id=game.id,
-        turn_id=current_turn.id,
+        turn_id=turn_id,
         player_id=user_id,
         action_type=ActionType.DRAW,
         action_name=ActionName.DRAW_FROM_DECK,
@@ -36,7 +41,7 @@ async def robar_cartas_del_mazo(db, game, user_id, cantidad):
         create_card_action(
             db=db,
             game_id=game.id,
-            turn_id=current_turn.id,
+            turn_id=turn_id,
             player_id=user_id,
             action_type=ActionType.DRAW,
             source_pile=SourcePile.DRAW_PILE,
@@ -49,8 +54,8 @@ async def robar_cartas_del_mazo(db, game, user_id, cantidad):
         # resetear dueño
         card.player_id = user_id
         card.is_in = CardState.HAND
-        print(f"  ✓ Carta {card.id_card} ({card.card.name if card.card else 'N/A'}) → mano del jugador")
+        logger.debug("Carta %s → mano del jugador %s", card.id_card, user_id)
 
     db.commit()
-    print(f"✅ Total robado: {len(drawn)} carta(s)")
+    logger.info("Jugador %s robó %s carta(s) en game %s", user_id, len(drawn), game.id)
     return drawn
\ No newline at end of file
@@ -0,0 +1,319 @@
+# app/services/turn_timer.py
+"""
+Deadlines de turnos y acciones pendientes.
+
+Un TimerWheel (rueda de timers hasheada sobre asyncio) guarda un deadline por turno activo
+(clave ("turn", game_id)) y por acción de detective PENDING (clave ("action", action_id)).
+Al vencer un turno se lo cierra con la misma regla que finish-turn (avanzar_turno); al vencer
+una acción pendiente se la cancela. Al arrancar, los deadlines se recargan desde
+turn.start_time / actions_per_turn.action_time, así que sobreviven a un reinicio.
+Cada vencimiento toma la partida como una acción más (``ordered(game_key)``) y corre su
+parte de DB en el executor de servicios, fuera del event loop.
+"""
+import asyncio
+import logging
+import math
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.config import settings
+from app.db.database import SessionLocal
+from app.db.models import (
+    ActionResult, ActionType, ActionsPerTurn, Room, RoomStatus, Turn, TurnStatus
+)
+from app.db import crud
+from app.sharding import get_shard_router
+
+logger = logging.getLogger(__name__)
+
+Callback = Callable[[], Awaitable[None]]
+
+
+class TimerWheel:
+    """
+    Rueda de timers: `slots` baldes de `tick` segundos. Programar y cancelar son O(1);
+    cada tick solo revisa su balde. Los deadlines más lejanos que una vuelta completa
+    quedan en su balde hasta que llega la vuelta correspondiente.
+    """
+
+    def __init__(self, tick: float = 1.0, slots: int = 512, clock: Callable[[], float] = time.time):
+        self.tick = tick
+        self.clock = clock
+        self._slots: List[Dict[Hashable, Tuple[float, Callback]]] = [dict() for _ in range(slots)]
+        self._slot_of: Dict[Hashable, int] = {}
+        self._current_tick = int(clock() // tick)
+        self._task: Optional[asyncio.Task] = None
+        self._running: Set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._slot_of
+
+    def schedule(self, key: Hashable, deadline: float, callback: Callback):
+        """Programa (o reprograma) `callback` para `deadline` (timestamp de `clock`)"""
+        self.cancel(key)
+        # Balde del primer tick >= deadline; uno vencido va al próximo tick
+        target_tick = max(math.ceil(deadline / self.tick), self._current_tick + 1)
+        slot = target_tick % len(self._slots)
+        self._slots[slot][key] = (deadline, callback)
+        self._slot_of[key] = slot
+
+    def cancel(self, key: Hashable) -> bool:
+        slot = self._slot_of.pop(key, None)
+        if slot is None:
+            return False
+        self._slots[slot].pop(key, None)
+        return True
+
+    def deadline(self, key: Hashable) -> Optional[float]:
+        slot = self._slot_of.get(key)
+        return None if slot is None else self._slots[slot][key][0]
+
+    def advance(self, now: Optional[float] = None) -> List[Hashable]:
+        """Dispara los timers vencidos hasta `now`. Devuelve las claves disparadas"""
+        now = self.clock() if now is None else now
+        now_tick = int(now // self.tick)
+        # Si se saltó más de una vuelta alcanza con revisar cada balde una vez
+        first_tick = max(self._current_tick + 1, now_tick - len(self._slots) + 1)
+        fired = []
+        for t in range(first_tick, now_tick + 1):
+            bucket = self._slots[t % len(self._slots)]
+            due = [key for key, (deadline, _) in bucket.items() if deadline <= now]
+            for key in due:
+                _, callback = bucket.pop(key)
+                del self._slot_of[key]
+                self._fire(key, callback)
+                fired.append(key)
+        self._current_tick = max(self._current_tick, now_tick)
+        return fired
+
+    def _fire(self, key: Hashable, callback: Callback):
+        task = asyncio.ensure_future(callback())
+        self._running.add(task)
+
+        def _done(t: asyncio.Task):
+            self._running.discard(t)
+            if not t.cancelled() and t.exception():
+                logger.error("Timer %s falló: %s", key, t.exception(), exc_info=t.exception())
+
+        task.add_done_callback(_done)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.tick)
+            self.advance()
+
+    def start(self):
+        if self._task is None:
+            self._current_tick = int(self.clock() // self.tick)
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Instancia global (None si no se inició: tests, simulador, scripts)
+_timer: Optional[TimerWheel] = None
+
+
+def get_turn_timer() -> Optional[TimerWheel]:
+    return _timer
+
+
+def init_turn_timer(tick: float = None) -> TimerWheel:
+    global _timer
+    _timer = TimerWheel(tick=tick or settings.TURN_TIMER_TICK_SECONDS)
+    return _timer
+
+
+def turn_key(game_id: int) -> tuple:
+    return ("turn", game_id)
+
+
+def action_key(action_id: int) -> tuple:
+    return ("action", action_id)
+
+
+# ------------------------
+# | PROGRAMAR / CANCELAR |
+# ------------------------
+
+def programar_turno(game_id: int, turn_id: int, start_time: datetime):
+    """Programa el vencimiento del turno (reemplaza el del turno anterior de la partida)"""
+    if _timer is None or settings.TURN_TIMEOUT_SECONDS <= 0:
+        return
+    deadline = start_time + timedelta(seconds=settings.TURN_TIMEOUT_SECONDS)
+    _timer.schedule(turn_key(game_id), deadline.timestamp(), lambda: expirar_turno(game_id, turn_id))
+
+
+def programar_accion(action_id: int, game_id: int, action_time: datetime):
+    """Programa el vencimiento de una acción de detective PENDING"""
+    if _timer is None or settings.PENDING_ACTION_TIMEOUT_SECONDS <= 0:
+        return
+    deadline = action_time + timedelta(seconds=settings.PENDING_ACTION_TIMEOUT_SECONDS)
+    _timer.schedule(action_key(action_id), deadline.timestamp(),
+                    lambda: expirar_accion(action_id, game_id, action_time))
+
+
+def cancelar_partida(game_id: int):
+    if _timer is not None:
+        _timer.cancel(turn_key(game_id))
+
+
+def recargar_deadlines(db) -> int:
+    """
+    Reprograma los turnos IN_PROGRESS de partidas INGAME y las acciones PENDING.
+    Se llama al arrancar: lo vencido durante la caída se dispara en el primer tick.
+
+    Returns:
+        int: Cantidad de deadlines programados
+    """
+    router = get_shard_router()
+    rows = db.query(Turn, Room.id).join(Room, Room.id_game == Turn.id_game).filter(
+        Turn.status == TurnStatus.IN_PROGRESS,
+        Room.status == RoomStatus.INGAME
+    ).all()
+    # Con sharding cada worker vence solo los turnos de sus rooms
+    turns = [turn for turn, room_id in rows if router.is_local(room_id)]
+    for turn in turns:
+        programar_turno(turn.id_game, turn.id, turn.start_time)
+
+    rows = db.query(ActionsPerTurn, Room.id).join(Room, Room.id_game == ActionsPerTurn.id_game).filter(
+        ActionsPerTurn.result == ActionResult.PENDING,
+        ActionsPerTurn.action_type == ActionType.DETECTIVE_SET
+    ).all()
+    actions = [action for action, room_id in rows if router.is_local(room_id)]
+    for action in actions:
+        programar_accion(action.id, action.id_game, action.action_time)
+
+    logger.info("Deadlines recargados: %s turnos, %s acciones pendientes", len(turns), len(actions))
+    return len(turns) + len(actions)
+
+
+# ----------------
+# | VENCIMIENTOS |
+# ----------------
+
+def _cancelar_acciones_pendientes(db, turn_id: int) -> List[int]:
+    pending = db.query(ActionsPerTurn).filter(
+        ActionsPerTurn.turn_id == turn_id,
+        ActionsPerTurn.result == ActionResult.PENDING
+    ).all()
+    for action in pending:
+        action.result = ActionResult.CANCELLED
+        if _timer is not None:
+            _timer.cancel(action_key(action.id))
+    return [a.id for a in pending]
+
+
+def _vencer_turno(db, game_id: int, turn_id: int) -> Optional[Tuple[int, int, int, List[int]]]:
+    """Parte de DB del vencimiento (en el executor): (room_id, jugador vencido, siguiente, canceladas) o None"""
+    from app.services.game_service import avanzar_turno
+
+    turn = db.query(Turn).filter(Turn.id == turn_id).first()
+    if not turn or turn.status != TurnStatus.IN_PROGRESS:
+        return None
+    room = db.query(Room).filter(Room.id_game == game_id).first()
+    if not room or room.status != RoomStatus.INGAME:
+        return None
+    game = crud.get_game_by_id(db, game_id)
+    if game.player_turn_id != turn.player_id:
+        logger.warning("Turno %s vencido no es del jugador actual de game %s", turn_id, game_id)
+        return None
+
+    expired_player_id = turn.player_id
+    cancelled = _cancelar_acciones_pendientes(db, turn_id)
+    try:
+        next_player = avanzar_turno(db, room, game, expired_player_id)
+    except StaleDataError:
+        # Otro request cambió la partida mientras tanto (p. ej. finish-turn): su turno manda
+        db.rollback()
+        logger.info("Turno %s de game %s cambió antes de vencer: se descarta", turn_id, game_id)
+        return None
+    logger.info(
+        "Turno %s de game %s vencido: jugador %s -> %s (acciones canceladas: %s)",
+        turn.number, game_id, expired_player_id, next_player.id, cancelled
+    )
+    return room.id, expired_player_id, next_player.id, cancelled
+
+
+async def expirar_turno(game_id: int, turn_id: int):
+    """Cierra un turno vencido con la misma regla que finish-turn y notifica a la sala"""
+    from app.services.game_status_service import build_complete_game_state
+    from app.services.executor import run_sync, game_key, ordered
+    from app.sockets.socket_service import get_websocket_service
+
+    db = SessionLocal()
+    try:
+        # Como una acción más de la partida: nada de la partida corre entre la lectura y el commit
+        async with ordered(game_key(game_id)):
+            expired = await run_sync(game_key(game_id), _vencer_turno, db, game_id, turn_id)
+            if expired is None:
+                return
+            room_id, expired_player_id, next_player_id, cancelled = expired
+
+            game_state = await run_sync(game_key(game_id), build_complete_game_state, db, game_id)
+            ws_service = get_websocket_service()
+            # Fuera de un request no hay outbox del middleware: se agrupan acá
+            async with ws_service.ws_manager.outbox():
+                await ws_service.notificar_turn_expired(
+                    room_id=room_id,
+                    player_id=expired_player_id,
+                    next_player_id=next_player_id,
+                    cancelled_actions=cancelled
+                )
+                await ws_service.notificar_estado_partida(
+                    room_id=room_id,
+                    jugador_que_actuo=expired_player_id,
+                    game_state=game_state
+                )
+                await ws_service.notificar_turn_finished(room_id=room_id, player_id=expired_player_id)
+    finally:
+        db.close()
+
+
+def _vencer_accion(db, action_id: int, action_time: datetime) -> Optional[Tuple[int, int]]:
+    """Parte de DB del vencimiento de una acción (en el executor): (room_id, player_id) o None"""
+    # El action_time con que se programó acota la búsqueda a sus particiones
+    action = crud.get_action_by_id(db, action_id, since=action_time)
+    if not action or action.result != ActionResult.PENDING:
+        return None
+    crud.update_action_result(db, action_id, ActionResult.CANCELLED, since=action_time)
+    db.commit()
+
+    room = db.query(Room).filter(Room.id_game == action.id_game).first()
+    logger.info("Acción %s (%s) vencida en game %s", action_id, action.action_name, action.id_game)
+    return (room.id, action.player_id) if room else None
+
+
+async def expirar_accion(action_id: int, game_id: int, action_time: datetime):
+    """Cancela una acción de detective que sigue PENDING al vencer su deadline"""
+    from app.services.executor import run_sync, game_key, ordered
+    from app.sockets.socket_service import get_websocket_service
+
+    db = SessionLocal()
+    try:
+        # Con la partida tomada: la acción de detective que la completa no puede commitear en el medio
+        async with ordered(game_key(game_id)):
+            expired = await run_sync(game_key(game_id), _vencer_accion, db, action_id, action_time)
+            if expired is None:
+                return
+            room_id, player_id = expired
+            await get_websocket_service().notificar_action_expired(
+                room_id=room_id,
+                action_id=action_id,
+                player_id=player_id
+            )
+    finally:
+        db.close()
@@ -0,0 +1,233 @@
+# app/sharding.py
+"""
+Afinidad de partidas a workers.
+
+Cada room (una partida) tiene un worker dueño, elegido por hashing consistente
+sobre ``SHARD_NODES``. El dueño atiende todas las acciones HTTP de esa room
+(los demás workers las reenvían), corre sus deadlines de turno y resuelve los
+eventos de room que se originan en sockets conectados a otro worker, así el
+estado caliente de la partida vive en un solo proceso.
+
+Sin ``SHARD_NODES`` (o con un solo nodo) todo es local: comportamiento original.
+Los eventos de socket se reenvían por el bus de mensajes (``MESSAGE_BUS_URL``).
+Si el dueño no responde, el request se rechaza con 503 y ``Retry-After``: otro
+worker no lo atiende por su cuenta, así dos procesos nunca mutan la misma partida.
+"""
+import asyncio
+import bisect
+import hashlib
+import logging
+import re
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+FORWARD_HEADER = "x-shard-forwarded"
+# Segundos que se sugieren al cliente cuando el dueño de la room no responde
+FORWARD_RETRY_AFTER_SECONDS = 1
+
+# Rutas con room_id en el path; /game/{game_id}/draft usa el id de la partida.
+# El historial solo lee la DB: lo atiende cualquier worker, sin pasar por el dueño
+_ROOM_PATHS = [
+    re.compile(r"^/api/game/(\d+)/(?!history$)"),
+    re.compile(r"^/game/(\d+)/(?!draft/)"),
+    re.compile(r"^/game_join/(\d+)/"),
+    re.compile(r"^/game_state/(\d+)(?:/|$)"),
+]
+_GAME_PATHS = [
+    re.compile(r"^/game/(\d+)/draft/"),
+]
+
+# Headers que no se copian al reenviar (los recalcula httpx / el servidor)
+_HOP_HEADERS = {"host", "content-length", "connection", "keep-alive", "transfer-encoding", "upgrade"}
+
+
+class HashRing:
+    """Anillo de hashing consistente con nodos virtuales"""
+
+    def __init__(self, nodes: Iterable[str], vnodes: int = 64):
+        self._ring: List[Tuple[int, str]] = sorted(
+            (self._hash(f"{node}#{i}"), node) for node in nodes for i in range(vnodes)
+        )
+        self._points = [point for point, _ in self._ring]
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(hashlib.md5(value.encode()).digest()[:8], "big")
+
+    def owner(self, key) -> Optional[str]:
+        if not self._ring:
+            return None
+        idx = bisect.bisect(self._points, self._hash(str(key))) % len(self._ring)
+        return self._ring[idx][1]
+
+
+class ShardRouter:
+
+    def __init__(self, node_id: str = "", nodes: Optional[Dict[str, str]] = None, bus=None, vnodes: int = 64,
+                 db_factory: Optional[Callable] = None):
+        self.node_id = node_id
+        self.nodes = dict(nodes or {})
+        self.bus = bus
+        self.db_factory = db_factory
+        self.ring = HashRing(self.nodes, vnodes)
+        self._handlers: Dict[str, Callable[..., Awaitable]] = {}
+        self._game_rooms: Dict[int, int] = {}  # game_id -> room_id (no cambia una vez creada la partida)
+        self._http = None
+        self._task: Optional[asyncio.Task] = None
+        if len(self.nodes) > 1 and node_id not in self.nodes:
+            logger.warning("SHARD_NODE_ID=%r no está en SHARD_NODES: sharding desactivado", node_id)
+
+    @property
+    def sharded(self) -> bool:
+        return len(self.nodes) > 1 and self.node_id in self.nodes
+
+    @property
+    def channel(self) -> str:
+        return f"shard:{self.node_id}"
+
+    def owner_of(self, room_id: int) -> str:
+        return self.ring.owner(room_id) if self.sharded else self.node_id
+
+    def is_local(self, room_id: int) -> bool:
+        return not self.sharded or self.owner_of(room_id) == self.node_id
+
+    # -----------------
+    # | HTTP          |
+    # -----------------
+
+    def room_id_for_path(self, path: str) -> Optional[int]:
+        for pattern in _GAME_PATHS:
+            match = pattern.match(path)
+            if match:
+                return self.room_id_for_game(int(match.group(1)))
+        for pattern in _ROOM_PATHS:
+            match = pattern.match(path)
+            if match:
+                return int(match.group(1))
+        return None
+
+    async def resolve_room_id(self, path: str) -> Optional[int]:
+        """Como ``room_id_for_path``, pero la consulta game_id -> room_id corre en el executor, no en el loop"""
+        for pattern in _GAME_PATHS:
+            match = pattern.match(path)
+            if match:
+                game_id = int(match.group(1))
+                if game_id in self._game_rooms:
+                    return self._game_rooms[game_id]
+                # Import aquí para evitar circular imports
+                from app.services.executor import run_sync
+                return await run_sync(None, self.room_id_for_game, game_id)
+        return self.room_id_for_path(path)
+
+    def room_id_for_game(self, game_id: int) -> Optional[int]:
+        if game_id in self._game_rooms:
+            return self._game_rooms[game_id]
+        if self.db_factory is None:
+            return None
+        from app.db.models import Room
+
+        db = self.db_factory()
+        try:
+            room = db.query(Room.id).filter(Room.id_game == game_id).first()
+        finally:
+            db.close()
+        if room is None:
+            return None
+        self._game_rooms[game_id] = room.id
+        return room.id
+
+    async def forward_http(self, request: Request, owner: str) -> Response:
+        """Reenvía el request al dueño. 503 con ``Retry-After`` si no responde"""
+        import httpx
+
+        if self._http is None:
+            # La lectura espera además lo que puede bloquear un long-poll de /game_state
+            self._http = httpx.AsyncClient(timeout=httpx.Timeout(10.0, read=10.0 + settings.STATUS_LONG_POLL_SECONDS))
+        headers = {k: v for k, v in request.headers.items() if k.lower() not in _HOP_HEADERS}
+        headers[FORWARD_HEADER] = self.node_id
+        url = self.nodes[owner] + request.url.path
+        try:
+            upstream = await self._http.request(
+                request.method, url, params=request.query_params, headers=headers, content=await request.body()
+            )
+        except httpx.HTTPError as e:
+            logger.warning("No se pudo reenviar %s a %s (%s)", request.url.path, owner, e)
+            return JSONResponse(status_code=503, content={"detail": "shard_owner_unavailable"},
+                                headers={"Retry-After": str(FORWARD_RETRY_AFTER_SECONDS)})
+        response_headers = {k: v for k, v in upstream.headers.items()
+                            if k.lower() not in _HOP_HEADERS and k.lower() != "content-encoding"}
+        return Response(content=upstream.content, status_code=upstream.status_code, headers=response_headers)
+
+    # ---------------------------
+    # | Eventos de room (bus)   |
+    # ---------------------------
+
+    def register_handler(self, kind: str, handler: Callable[..., Awaitable]):
+        """Handler que ejecuta el dueño para los eventos ``kind`` reenviados"""
+        self._handlers[kind] = handler
+
+    async def dispatch(self, room_id: int, kind: str, payload: dict, local: Callable[..., Awaitable]):
+        """Ejecuta ``local(**payload)`` si la room es de este worker; si no, lo reenvía al dueño"""
+        if self.is_local(room_id) or self.bus is None:
+            return await local(**payload)
+        await self.bus.publish(f"shard:{self.owner_of(room_id)}",
+                               {"kind": kind, "room_id": room_id, "payload": payload, "origin": self.node_id})
+
+    async def start(self):
+        if not self.sharded or self.bus is None or self._task is not None:
+            return
+        subscription = await self.bus.subscribe(self.channel)
+        self._task = asyncio.create_task(self._listen(subscription))
+        logger.info("Shard %s atendiendo %s", self.node_id, self.channel)
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def _listen(self, subscription):
+        async for message in subscription:
+            handler = self._handlers.get(message.get("kind"))
+            if handler is None:
+                logger.warning("Evento de shard sin handler: %s", message.get("kind"))
+                continue
+            try:
+                await handler(**message["payload"])
+            except Exception:
+                logger.exception("Error atendiendo evento %s de room %s", message.get("kind"), message.get("room_id"))
+
+
+async def forward_to_owner(request: Request, call_next):
+    """Middleware HTTP: las rutas de una room se atienden en su worker dueño"""
+    router = get_shard_router()
+    if not router.sharded or request.headers.get(FORWARD_HEADER):
+        return await call_next(request)
+    room_id = await router.resolve_room_id(request.url.path)
+    if room_id is None or router.is_local(room_id):
+        return await call_next(request)
+    return await router.forward_http(request, router.owner_of(room_id))
+
+
+# Instancia global: por defecto un solo nodo (todo local)
+_router: ShardRouter = ShardRouter()
+
+
+def get_shard_router() -> ShardRouter:
+    return _router
+
+
+def init_shard_router(node_id: str, nodes: Dict[str, str], bus=None, vnodes: int = 64,
+                      db_factory: Optional[Callable] = None) -> ShardRouter:
+    global _router
+    _router = ShardRouter(node_id, nodes, bus, vnodes, db_factory)
+    return _router
@@ -0,0 +1,4 @@
+"""
+Simulación headless de partidas (self-play) sobre los servicios del juego.
+No importa app.db al cargarse: __main__ fija DATABASE_URL antes de importar el motor.
+"""
@@ -0,0 +1,68 @@
+# app/simulation/__main__.py
+"""
+Self-play headless:
+    python -m app.simulation --games 1000 --workers 8 --players 4
+"""
+import argparse
+import json
+import os
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Simula partidas completas sin HTTP ni sockets")
+    parser.add_argument("--games", type=int, default=100, help="Cantidad de partidas")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Procesos del pool")
+    parser.add_argument("--players", type=int, default=4, choices=range(2, 7), help="Jugadores por partida")
+    parser.add_argument("--seed", type=int, default=0, help="Seed de la primera partida (una seed por partida)")
+    parser.add_argument("--batch-size", type=int, default=10, help="Partidas por tarea del pool")
+    parser.add_argument("--max-turns", type=int, default=400, help="Corta partidas que no terminan")
+    parser.add_argument("--set-probability", type=float, default=0.8)
+    parser.add_argument("--event-probability", type=float, default=0.5)
+    parser.add_argument("--draft-probability", type=float, default=0.3)
+    parser.add_argument("--no-invariants", action="store_true", help="No verificar invariantes después de cada turno")
+    parser.add_argument(
+        "--keep-games",
+        action="store_true",
+        help="No borrar las partidas terminadas (por defecto se borran con la base en memoria)"
+    )
+    parser.add_argument(
+        "--database-url",
+        help="Base a usar (default: SQLite en memoria por worker). Con MySQL sirve como carga para la persistencia"
+    )
+    parser.add_argument("--json", metavar="PATH", help="Guardar el resumen en JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Antes de importar el motor: app.db.database crea el engine al importarse
+    os.environ["DATABASE_URL"] = args.database_url or "sqlite:///:memory:"
+
+    from .runner import format_summary, run_and_summarize
+    from .simulator import SimulationConfig
+
+    config = SimulationConfig(
+        num_players=args.players,
+        max_turns=args.max_turns,
+        set_probability=args.set_probability,
+        event_probability=args.event_probability,
+        draft_probability=args.draft_probability,
+        check_invariants=not args.no_invariants,
+        keep_games=args.keep_games or bool(args.database_url)
+    )
+    summary = run_and_summarize(
+        args.games,
+        config,
+        workers=args.workers,
+        seed=args.seed,
+        batch_size=args.batch_size,
+        database_url=args.database_url
+    )
+    print(format_summary(summary))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+# app/simulation/runner.py
+"""
+Corre muchas partidas del simulador en un pool de procesos y agrega estadísticas.
+Cada worker tiene su propia base (por defecto SQLite en memoria) y su propio event loop.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from itertools import repeat
+from statistics import mean, median
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional
+
+if TYPE_CHECKING:
+    from .simulator import SimulationConfig
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_session_factory = None
+
+
+class _NullSio:
+    """AsyncServer sin clientes: los servicios notifican igual, pero nada sale del proceso"""
+
+    async def emit(self, *args, **kwargs):
+        pass
+
+    async def enter_room(self, *args, **kwargs):
+        pass
+
+    async def leave_room(self, *args, **kwargs):
+        pass
+
+
+def init_worker(database_url: Optional[str] = None, log_level: str = "ERROR"):
+    """
+    Prepara un proceso para simular: base con el catálogo de cartas cargado y un
+    WebSocketManager sin conexiones. Debe correr antes de importar app.db.database.
+    """
+    global _loop, _session_factory
+    if database_url:
+        os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+    logging.getLogger("app").setLevel(log_level)
+
+    from app.db.database import Base, SessionLocal, engine
+    from app.db.seed import seed_card_catalog
+    from app.sockets.socket_manager import init_ws_manager
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        seed_card_catalog(db)
+    finally:
+        db.close()
+
+    init_ws_manager(_NullSio(), SessionLocal)
+    _session_factory = SessionLocal
+    _loop = asyncio.new_event_loop()
+
+
+def run_batch(seeds: List[int], config: "SimulationConfig") -> List[dict]:
+    """Juega una partida por seed, cada una en su propia sesión"""
+    from .simulator import simulate_game
+
+    if _loop is None:
+        init_worker()
+
+    results = []
+    for seed in seeds:
+        db = _session_factory()
+        try:
+            results.append(asdict(_loop.run_until_complete(simulate_game(db, config, seed))))
+        finally:
+            db.close()
+    return results
+
+
+def _chunks(seeds: List[int], size: int) -> Iterable[List[int]]:
+    for i in range(0, len(seeds), size):
+        yield seeds[i:i + size]
+
+
+def run_simulations(
+    games: int,
+    config: "SimulationConfig",
+    workers: int = 1,
+    seed: int = 0,
+    batch_size: int = 10,
+    database_url: Optional[str] = None
+) -> List[dict]:
+    """
+    Simula `games` partidas con seeds seed..seed+games-1.
+    Con workers > 1 usa procesos "spawn" (cada uno con su propia base y engine).
+    """
+    seeds = list(range(seed, seed + games))
+    if workers <= 1:
+        init_worker(database_url)
+        return run_batch(seeds, config)
+
+    results: List[dict] = []
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=ctx,
+        initializer=init_worker,
+        initargs=(database_url,)
+    ) as pool:
+        for batch in pool.map(run_batch, _chunks(seeds, batch_size), repeat(config)):
+            results.extend(batch)
+    return results
+
+
+def summarize(results: List[dict], elapsed_s: float) -> Dict:
+    """Agrega los resultados: throughput, duración de partidas, balance y errores"""
+    finished = [r for r in results if r["status"] == "finished"]
+    turns = [r["turns"] for r in finished]
+    statuses = Counter(r["status"] for r in results)
+    sets_played, events_played, errors = Counter(), Counter(), Counter()
+    for r in results:
+        sets_played.update(r["sets_played"])
+        events_played.update(r["events_played"])
+        if r["error"]:
+            errors[r["error"]] += 1
+
+    revealed = sum(1 for r in finished if r["murderer_revealed"])
+    return {
+        "games": len(results),
+        "elapsed_s": round(elapsed_s, 2),
+        "games_per_min": round(len(results) / elapsed_s * 60, 1) if elapsed_s else 0,
+        "status": dict(statuses),
+        "turns": {
+            "mean": round(mean(turns), 1) if turns else 0,
+            "median": median(turns) if turns else 0,
+            "max": max(turns, default=0),
+        },
+        "game_time_ms_mean": round(mean(r["elapsed_s"] for r in results) * 1000, 1) if results else 0,
+        "actions_logged_mean": round(mean(r["actions_logged"] for r in results), 1) if results else 0,
+        # Hoy el servidor solo termina la partida al vaciarse el draft: gana siempre el asesino
+        "murderer_revealed_rate": round(revealed / len(finished), 3) if finished else 0,
+        "sets_played": dict(sets_played),
+        "events_played": dict(events_played),
+        "rule_violations": sum(len(r["violations"]) for r in results),
+        "errors": dict(errors.most_common(10)),
+        "failing_seeds": [r["seed"] for r in results if r["status"] == "error"][:20],
+    }
+
+
+def format_summary(summary: Dict) -> str:
+    lines = [
+        f"Partidas: {summary['games']} en {summary['elapsed_s']}s ({summary['games_per_min']} partidas/min)",
+        f"Estados: {summary['status']}",
+        f"Turnos por partida: media {summary['turns']['mean']}  mediana {summary['turns']['median']}  "
+        f"máx {summary['turns']['max']}",
+        f"Tiempo medio por partida: {summary['game_time_ms_mean']} ms  acciones registradas: "
+        f"{summary['actions_logged_mean']}",
+        f"Asesino revelado antes del final: {summary['murderer_revealed_rate']:.1%}",
+        f"Sets jugados: {summary['sets_played']}",
+        f"Eventos jugados: {summary['events_played']}",
+        f"Violaciones de reglas: {summary['rule_violations']}",
+    ]
+    if summary["errors"]:
+        lines.append(f"Errores: {summary['errors']}")
+        lines.append(f"Seeds con error (reproducir con --seed N --games 1): {summary['failing_seeds']}")
+    return "\n".join(lines)
+
+
+def run_and_summarize(games: int, config: "SimulationConfig", **kwargs) -> Dict:
+    t0 = time.perf_counter()
+    results = run_simulations(games, config, **kwargs)
+    return summarize(results, time.perf_counter() - t0)
@@ -0,0 +1,392 @@
+# app/simulation/simulator.py
+"""
+Motor de self-play: juega partidas completas llamando a los mismos servicios (y, para las
+cartas de evento, a los mismos handlers) que usa la API, sin HTTP ni sockets.
+"""
+import random
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.db import crud, models
+from app.routes.another_victim import VictimRequest, another_victim
+from app.routes.look_ashes import play_look_into_ashes, select_card_from_ashes
+from app.routes.start import start_game
+from app.schemas.detective_action_schema import DetectiveActionRequest
+from app.schemas.detective_set_schema import PlayDetectiveSetRequest, SetType, SET_MIN_CARDS
+from app.schemas.look_ashes_schema import LookAshesPlayRequest, LookAshesSelectRequest
+from app.schemas.start import StartRequest
+from app.services.detective_action_service import DetectiveActionService
+from app.services.detective_set_service import DetectiveSetService
+from app.services.discard import descartar_cartas
+from app.services.draft_service import pick_card_from_draft
+from app.services.game_service import avanzar_turno, procesar_ultima_carta
+from app.services.game_status_service import build_complete_game_state
+from app.services.take_deck import robar_cartas_del_mazo
+
+HAND_SIZE = 6
+MURDERER_SECRET = "You are the Murderer!!"
+ACCOMPLICE_SECRET = "You are the Accomplice!"
+LOOK_ASHES = "Look into the ashes"
+ANOTHER_VICTIM = "Another Victim"
+
+# Sets que el simulador sabe armar sin comodín: id_card -> SetType
+SET_BY_CARD_ID = {card_id: set_type for set_type, card_id in DetectiveSetService.SET_CARD_IDS.items()}
+BERESFORD_CARD_IDS = (DetectiveSetService.TOMMY_BERESFORD_CARD_ID, DetectiveSetService.TUPPENCE_BERESFORD_CARD_ID)
+
+
+@dataclass
+class SimulationConfig:
+    num_players: int = 4
+    max_turns: int = 400
+    set_probability: float = 0.8
+    event_probability: float = 0.5
+    draft_probability: float = 0.3
+    max_discard: int = 3
+    check_invariants: bool = True
+    # False: borra las filas de la partida al terminar para que la base no crezca entre partidas
+    keep_games: bool = True
+
+
+@dataclass
+class GameResult:
+    seed: int
+    num_players: int
+    status: str = "running"  # finished | max_turns | error
+    turns: int = 0
+    elapsed_s: float = 0.0
+    murderer_id: Optional[int] = None
+    accomplice_id: Optional[int] = None
+    murderer_revealed: bool = False
+    sets_played: Dict[str, int] = field(default_factory=dict)
+    events_played: Dict[str, int] = field(default_factory=dict)
+    cards_discarded: int = 0
+    cards_drawn_deck: int = 0
+    cards_drawn_draft: int = 0
+    actions_logged: int = 0
+    violations: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+class InvariantViolation(Exception):
+    """Estado de la partida inconsistente con las reglas"""
+
+
+class GameSimulator:
+    """
+    Juega una partida con bots aleatorios (reproducible por seed).
+    Cada turno: bajar un set de detective, jugar un evento, descartar, reponer hasta 6
+    desde el mazo o el draft y pasar el turno. La partida termina cuando se vacía el draft
+    (procesar_ultima_carta), igual que en el servidor.
+    """
+
+    def __init__(self, db: Session, config: SimulationConfig, seed: int):
+        self.db = db
+        self.config = config
+        self.rng = random.Random(seed)
+        self.result = GameResult(seed=seed, num_players=config.num_players)
+        self.sets_played = Counter()
+        self.events_played = Counter()
+        self.room_id: Optional[int] = None
+        self.game_id: Optional[int] = None
+        self.total_cards = 0
+
+    async def run(self) -> GameResult:
+        t0 = time.perf_counter()
+        try:
+            await self._setup()
+            while self.result.status == "running":
+                if self.result.turns >= self.config.max_turns:
+                    self.result.status = "max_turns"
+                    break
+                await self._play_turn()
+        except (InvariantViolation, HTTPException, ValueError) as e:
+            self.result.status = "error"
+            self.result.error = f"{type(e).__name__}: {getattr(e, 'detail', e)}"
+            self.db.rollback()
+        finally:
+            self.result.elapsed_s = time.perf_counter() - t0
+            self.result.sets_played = dict(self.sets_played)
+            self.result.events_played = dict(self.events_played)
+            if self.game_id is not None:
+                self._collect_final_stats()
+                if not self.config.keep_games:
+                    self._purge_game()
+        return self.result
+
+    # ------------------
+    # | SETUP Y ESTADO |
+    # ------------------
+
+    async def _setup(self):
+        room = crud.create_room(self.db, {
+            "name": f"sim-{self.result.seed}",
+            "status": models.RoomStatus.WAITING,
+            "players_min": 2,
+            "players_max": 6
+        })
+        players = [
+            crud.create_player(self.db, {
+                "name": f"Bot {room.id}-{i + 1}",
+                "avatar_src": f"/avatars/bot{i + 1}.png",
+                "birthdate": date(1980 + self.rng.randint(0, 30), self.rng.randint(1, 12), self.rng.randint(1, 28)),
+                "id_room": room.id,
+                "is_host": i == 0,
+                "order": i + 1
+            })
+            for i in range(self.config.num_players)
+        ]
+        # start_game baraja con el random global: se fija para que la partida sea reproducible
+        random.seed(self.result.seed)
+        payload = await start_game(room.id, StartRequest(user_id=players[0].id), self.db)
+
+        self.room_id = room.id
+        self.game_id = payload["game"]["id"]
+        self.total_cards = self._cards().count()
+
+        for secret in self._cards().filter(models.CardsXGame.is_in == models.CardState.SECRET_SET).all():
+            if secret.card.name == MURDERER_SECRET:
+                self.result.murderer_id = secret.player_id
+            elif secret.card.name == ACCOMPLICE_SECRET:
+                self.result.accomplice_id = secret.player_id
+
+    def _cards(self):
+        return self.db.query(models.CardsXGame).filter(models.CardsXGame.id_game == self.game_id)
+
+    def _pile(self, state: models.CardState, player_id: Optional[int] = None) -> List[models.CardsXGame]:
+        query = self._cards().filter(models.CardsXGame.is_in == state)
+        if player_id is not None:
+            query = query.filter(models.CardsXGame.player_id == player_id)
+        return query.order_by(models.CardsXGame.position).all()
+
+    def _game(self) -> models.Game:
+        return crud.get_game_by_id(self.db, self.game_id)
+
+    # ---------
+    # | TURNO |
+    # ---------
+
+    async def _play_turn(self):
+        game = self._game()
+        player_id = game.player_turn_id
+
+        if self.rng.random() < self.config.set_probability:
+            self._play_detective_set(player_id)
+
+        if self.rng.random() < self.config.event_probability:
+            await self._play_event(player_id)
+
+        await self._discard(game, player_id)
+        if await self._refill_hand(game, player_id):
+            return
+
+        room = crud.get_room_by_id(self.db, self.room_id)
+        avanzar_turno(self.db, room, game, player_id)
+        self.result.turns += 1
+
+        if self.config.check_invariants:
+            self._check_invariants()
+
+    async def _discard(self, game: models.Game, player_id: int):
+        hand = self._pile(models.CardState.HAND, player_id)
+        if not hand:
+            return
+        amount = self.rng.randint(1, min(self.config.max_discard, len(hand)))
+        discarded = await descartar_cartas(self.db, game, player_id, self.rng.sample(hand, amount))
+        self.result.cards_discarded += len(discarded)
+
+    async def _refill_hand(self, game: models.Game, player_id: int) -> bool:
+        """Repone la mano hasta 6. Devuelve True si con eso se vació el draft y terminó la partida"""
+        while True:
+            missing = HAND_SIZE - len(self._pile(models.CardState.HAND, player_id))
+            if missing <= 0:
+                return False
+
+            draft = self._pile(models.CardState.DRAFT)
+            deck_left = self._cards().filter(models.CardsXGame.is_in == models.CardState.DECK).count()
+
+            if draft and (not deck_left or self.rng.random() < self.config.draft_probability):
+                pick_card_from_draft(self.db, self.rng.choice(draft).id, player_id)
+                self.result.cards_drawn_draft += 1
+                if not self._pile(models.CardState.DRAFT):
+                    await self._finish_game()
+                    return True
+            elif deck_left:
+                drawn = await robar_cartas_del_mazo(self.db, game, player_id, missing)
+                self.result.cards_drawn_deck += len(drawn)
+            else:
+                return False
+
+    async def _finish_game(self):
+        game_state = build_complete_game_state(self.db, self.game_id)
+        await procesar_ultima_carta(game_id=self.game_id, room_id=self.room_id, game_state=game_state)
+
+        self.db.expire_all()
+        room = crud.get_room_by_id(self.db, self.room_id)
+        if room.status != models.RoomStatus.FINISH:
+            raise InvariantViolation("procesar_ultima_carta no marcó la sala como FINISH")
+        self.result.status = "finished"
+
+    # -----------------------
+    # | SETS DE DETECTIVES |
+    # -----------------------
+
+    def _find_set(self, player_id: int):
+        """Busca en la mano un set jugable sin comodín. Devuelve (SetType, [CardsXGame.id]) o None"""
+        by_card = defaultdict(list)
+        for card in self._pile(models.CardState.HAND, player_id):
+            by_card[card.id_card].append(card.id)
+
+        candidates = []
+        for card_id, set_type in SET_BY_CARD_ID.items():
+            needed = SET_MIN_CARDS[set_type]
+            if len(by_card[card_id]) >= needed:
+                candidates.append((set_type, by_card[card_id][:needed]))
+        beresford = [cid for card_id in BERESFORD_CARD_IDS for cid in by_card[card_id]]
+        if len(beresford) >= 2:
+            candidates.append((SetType.BERESFORD, beresford[:2]))
+        return self.rng.choice(candidates) if candidates else None
+
+    def _secrets(self, player_id: int, hidden: bool) -> List[models.CardsXGame]:
+        return [s for s in self._pile(models.CardState.SECRET_SET, player_id) if s.hidden == hidden]
+
+    def _play_detective_set(self, player_id: int):
+        found = self._find_set(player_id)
+        if not found:
+            return
+        set_type, card_ids = found
+
+        # Pyne oculta un secreto revelado; el resto revela uno oculto
+        wants_hidden = set_type != SetType.PYNE
+        targets = [
+            p for p in crud.get_players_not_in_disgrace(self.db, self.game_id, player_id)
+            if self._secrets(p, hidden=wants_hidden)
+        ]
+        if not targets:
+            return
+
+        action_id, _ = DetectiveSetService(self.db).play_detective_set(
+            self.game_id,
+            PlayDetectiveSetRequest(owner=player_id, setType=set_type, cards=card_ids, hasWildcard=False)
+        )
+        target_id = self.rng.choice(targets)
+        secret = self.rng.choice(self._secrets(target_id, hidden=wants_hidden))
+        service = DetectiveActionService(self.db)
+
+        if set_type in DetectiveActionService.TARGET_SELECTS_OWN:
+            service.execute_detective_action(self.game_id, DetectiveActionRequest(
+                actionId=action_id, executorId=player_id, targetPlayerId=target_id
+            ))
+            service.execute_detective_action(self.game_id, DetectiveActionRequest(
+                actionId=action_id, executorId=target_id, secretId=secret.id
+            ))
+        else:
+            service.execute_detective_action(self.game_id, DetectiveActionRequest(
+                actionId=action_id, executorId=player_id, targetPlayerId=target_id, secretId=secret.id
+            ))
+
+        self.sets_played[set_type.value] += 1
+        if set_type != SetType.PYNE and secret.card.name == MURDERER_SECRET:
+            self.result.murderer_revealed = True
+
+    # ---------------------
+    # | CARTAS DE EVENTO |
+    # ---------------------
+
+    async def _play_event(self, player_id: int):
+        hand = self._pile(models.CardState.HAND, player_id)
+        by_name = {card.card.name: card for card in hand}
+
+        if LOOK_ASHES in by_name and self._pile(models.CardState.DISCARD):
+            played = await play_look_into_ashes(
+                self.room_id, LookAshesPlayRequest(card_id=by_name[LOOK_ASHES].id), player_id, self.db
+            )
+            choice = self.rng.choice(played["available_cards"])
+            await select_card_from_ashes(
+                self.room_id,
+                LookAshesSelectRequest(action_id=played["action_id"], selected_card_id=choice["id"]),
+                player_id,
+                self.db
+            )
+            self.events_played["look_ashes"] += 1
+
+        elif ANOTHER_VICTIM in by_name:
+            victim_sets = {
+                (card.player_id, card.position)
+                for card in self._pile(models.CardState.DETECTIVE_SET)
+                if card.player_id != player_id
+            }
+            if not victim_sets:
+                return
+            owner_id, position = self.rng.choice(sorted(victim_sets))
+            await another_victim(
+                self.room_id, VictimRequest(originalOwnerId=owner_id, setPosition=position), player_id, self.db
+            )
+            self.events_played["another_victim"] += 1
+
+    # ---------------
+    # | INVARIANTES |
+    # ---------------
+
+    def _check_invariants(self):
+        """Verifica reglas que deben valer después de cada turno (para fuzzing de reglas)"""
+        cards = self._cards().all()
+        if len(cards) != self.total_cards:
+            raise InvariantViolation(f"cantidad de cartas {len(cards)} != {self.total_cards}")
+
+        owned_states = (models.CardState.HAND, models.CardState.SECRET_SET, models.CardState.DETECTIVE_SET)
+        for card in cards:
+            if (card.is_in in owned_states) != (card.player_id is not None):
+                raise InvariantViolation(f"carta {card.id} en {card.is_in} con player_id={card.player_id}")
+
+        active_turns = self.db.query(models.Turn).filter(
+            models.Turn.id_game == self.game_id,
+            models.Turn.status == models.TurnStatus.IN_PROGRESS
+        ).all()
+        game = self._game()
+        if len(active_turns) != 1 or active_turns[0].player_id != game.player_turn_id:
+            raise InvariantViolation(f"turnos activos inconsistentes: {[t.player_id for t in active_turns]}")
+
+        hand_sizes = Counter(c.player_id for c in cards if c.is_in == models.CardState.HAND)
+        for pid, size in hand_sizes.items():
+            if size > HAND_SIZE:
+                self.result.violations.append(f"turno {self.result.turns}: jugador {pid} con {size} cartas en mano")
+
+    def _collect_final_stats(self):
+        self.result.actions_logged = self.db.query(models.ActionsPerTurn).filter(
+            models.ActionsPerTurn.id_game == self.game_id
+        ).count()
+
+
+    def _purge_game(self):
+        """Borra todas las filas de la partida, rompiendo antes las referencias circulares"""
+        db = self.db
+        db.rollback()
+        actions = db.query(models.ActionsPerTurn).filter(models.ActionsPerTurn.id_game == self.game_id)
+        actions.update(
+            {models.ActionsPerTurn.parent_action_id: None, models.ActionsPerTurn.triggered_by_action_id: None},
+            synchronize_session=False
+        )
+        actions.delete(synchronize_session=False)
+        db.query(models.Turn).filter(models.Turn.id_game == self.game_id).delete(synchronize_session=False)
+        self._cards().delete(synchronize_session=False)
+        db.query(models.Game).filter(models.Game.id == self.game_id).update(
+            {models.Game.player_turn_id: None}, synchronize_session=False
+        )
+        db.query(models.Room).filter(models.Room.id == self.room_id).update(
+            {models.Room.id_game: None}, synchronize_session=False
+        )
+        db.query(models.Player).filter(models.Player.id_room == self.room_id).delete(synchronize_session=False)
+        db.query(models.Room).filter(models.Room.id == self.room_id).delete(synchronize_session=False)
+        db.query(models.Game).filter(models.Game.id == self.game_id).delete(synchronize_session=False)
+        db.commit()
+
+
+async def simulate_game(db: Session, config: SimulationConfig, seed: int) -> GameResult:
+    """Juega una partida completa sobre la sesión dada"""
+    return await GameSimulator(db, config, seed).run()
@@ -0,0 +1,103 @@
+# app/sockets/event_buffer.py
+"""
+Buffer acotado de eventos recientes por room, para reanudar sockets que se
+reconectan sin reenviar el estado completo.
+
+Cada evento emitido a una room (o privado a un jugador de la room) recibe un
+``seq`` creciente que viaja en el payload. Al reconectar, el cliente manda el
+último ``seq`` que vio: si todos los posteriores siguen en el buffer se
+re-emiten solo esos; si no (buffer desbordado, server reiniciado) hay que
+mandar un snapshot.
+
+La numeración de cada buffer arranca en ``ms_actuales * 1000``: un ``seq`` de
+un proceso anterior queda siempre por debajo del primero del buffer nuevo y se
+detecta como hueco en vez de confundirse con eventos nuevos.
+
+Como toda acción que cambia la partida se emite a su room, cada evento despierta
+también a quienes esperan un cambio de la room (``watch``): el long-poll de
+routes/game_status.py, que después compara ``Game.version`` en la DB. Los cambios
+hechos en otro worker llegan por el bus (``notify``, ver socket_manager.py).
+"""
+import asyncio
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, NamedTuple, Optional
+
+
+class BufferedEvent(NamedTuple):
+    seq: int
+    event: str
+    data: Any
+    user_id: Optional[int]  # None = evento de room; si no, privado de ese jugador
+
+
+class RoomEventBuffer:
+
+    def __init__(self, maxlen: int):
+        self.events: Deque[BufferedEvent] = deque(maxlen=maxlen)
+        self.seq = int(time.time() * 1000) * 1000
+
+    def append(self, event: str, data: Any, user_id: Optional[int] = None) -> int:
+        self.seq += 1
+        self.events.append(BufferedEvent(self.seq, event, data, user_id))
+        return self.seq
+
+    def since(self, last_seq: int, user_id: int) -> Optional[List[BufferedEvent]]:
+        """Eventos posteriores a ``last_seq`` visibles para ``user_id``; None si hay hueco"""
+        if last_seq > self.seq:
+            return None
+        if last_seq == self.seq:
+            return []
+        oldest = self.events[0].seq if self.events else self.seq + 1
+        if last_seq < oldest - 1:
+            return None
+        return [e for e in self.events if e.seq > last_seq and e.user_id in (None, user_id)]
+
+
+class EventLog:
+    """Buffers por room; guarda los de las ``max_rooms`` rooms con actividad más reciente"""
+
+    def __init__(self, maxlen: int = 256, max_rooms: int = 1024):
+        self.maxlen = maxlen
+        self.max_rooms = max_rooms
+        self._rooms: "OrderedDict[int, RoomEventBuffer]" = OrderedDict()
+        self._changed: Dict[int, asyncio.Event] = {}
+
+    def record(self, room_id: int, event: str, data: Any, user_id: Optional[int] = None) -> int:
+        seq = self._buffer(room_id).append(event, data, user_id)
+        self.notify(room_id)
+        return seq
+
+    def watch(self, room_id: int) -> asyncio.Event:
+        """Evento que se activa con el próximo cambio de la room (registrarlo antes de leer el estado)"""
+        return self._changed.setdefault(room_id, asyncio.Event())
+
+    def notify(self, room_id: int):
+        """Despierta a los que esperan un cambio de la room (eventos locales o avisos de otro worker)"""
+        changed = self._changed.pop(room_id, None)
+        if changed is not None:
+            changed.set()
+
+    def _buffer(self, room_id: int) -> RoomEventBuffer:
+        buffer = self._rooms.get(room_id)
+        if buffer is None:
+            buffer = self._rooms[room_id] = RoomEventBuffer(self.maxlen)
+            while len(self._rooms) > self.max_rooms:
+                self._rooms.popitem(last=False)
+        else:
+            self._rooms.move_to_end(room_id)
+        return buffer
+
+    def replay(self, room_id: int, last_seq: int, user_id: int) -> Optional[List[BufferedEvent]]:
+        buffer = self._rooms.get(room_id)
+        if buffer is None:
+            return None
+        return buffer.since(last_seq, user_id)
+
+    def current_seq(self, room_id: int) -> Optional[int]:
+        buffer = self._rooms.get(room_id)
+        return buffer.seq if buffer is not None else None
+
+    def drop(self, room_id: int):
+        self._rooms.pop(room_id, None)
+        self.notify(room_id)
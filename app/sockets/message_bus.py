@@ -0,0 +1,161 @@
+# app/sockets/message_bus.py
+"""
+Bus de mensajes entre workers/nodos.
+
+Lo usan dos consumidores:
+- ``BusClientManager``: client manager de Socket.IO; los emits a una room o sid
+  se entregan en el worker local y se publican para que los demás workers los
+  entreguen a sus sockets.
+- ``SessionRegistry`` (session_registry.py): réplica del tracking sid -> sesión.
+
+Backends (``MESSAGE_BUS_URL``):
+- ``""``          sin bus: un solo proceso, comportamiento original.
+- ``memory://``   broker en proceso; varios AsyncServer del mismo proceso
+                  comparten el broker (lo usan los tests para simular workers).
+- ``redis://...`` pub/sub de Redis (requiere el paquete opcional ``redis``).
+"""
+import asyncio
+import logging
+import pickle
+from collections import defaultdict
+from typing import AsyncIterator, Dict, List, Optional
+
+from socketio.async_pubsub_manager import AsyncPubSubManager
+
+from .outbound import OutboundManager
+
+logger = logging.getLogger(__name__)
+
+
+class MessageBus:
+    """Interfaz mínima de pub/sub por canal"""
+
+    async def publish(self, channel: str, message: dict) -> None:
+        raise NotImplementedError
+
+    async def subscribe(self, channel: str) -> AsyncIterator[dict]:
+        """Suscribe al canal y devuelve el iterador de mensajes.
+
+        La suscripción queda activa al retornar, así que nada publicado después
+        se pierde aunque todavía no se haya empezado a iterar.
+        """
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class _QueueSubscription:
+    """Iterador de una suscripción del broker en memoria"""
+
+    def __init__(self, broker: "InMemoryBroker", channel: str):
+        self.broker = broker
+        self.channel = channel
+        self.queue: asyncio.Queue = asyncio.Queue()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> dict:
+        return pickle.loads(await self.queue.get())
+
+    async def aclose(self):
+        self.broker._unsubscribe(self.channel, self.queue)
+
+
+class InMemoryBroker(MessageBus):
+    """Broker en proceso.
+
+    Cada mensaje se serializa con pickle (igual que el manager de Redis de
+    python-socketio), así los suscriptores reciben copias y un payload que no
+    viajaría por un broker real falla también acá.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[str, List[asyncio.Queue]] = defaultdict(list)
+
+    async def publish(self, channel: str, message: dict) -> None:
+        payload = pickle.dumps(message)
+        for queue in list(self._subscribers.get(channel, ())):
+            queue.put_nowait(payload)
+
+    async def subscribe(self, channel: str) -> _QueueSubscription:
+        subscription = _QueueSubscription(self, channel)
+        self._subscribers[channel].append(subscription.queue)
+        return subscription
+
+    def _unsubscribe(self, channel: str, queue: asyncio.Queue):
+        if queue in self._subscribers.get(channel, ()):
+            self._subscribers[channel].remove(queue)
+
+    def subscriber_count(self, channel: str) -> int:
+        return len(self._subscribers.get(channel, ()))
+
+
+class RedisBus(MessageBus):
+    """Pub/sub de Redis (``redis.asyncio``)"""
+
+    def __init__(self, url: str):
+        try:
+            import redis.asyncio as aioredis
+        except ImportError as e:  # pragma: no cover - depende del entorno
+            raise RuntimeError(
+                "MESSAGE_BUS_URL=%s requiere el paquete 'redis' (pip install redis)" % url
+            ) from e
+        self._redis = aioredis.Redis.from_url(url)
+
+    async def publish(self, channel: str, message: dict) -> None:
+        await self._redis.publish(channel, pickle.dumps(message))
+
+    async def subscribe(self, channel: str) -> AsyncIterator[dict]:
+        pubsub = self._redis.pubsub()
+        await pubsub.subscribe(channel)
+
+        async def messages():
+            try:
+                async for item in pubsub.listen():
+                    if item.get("type") == "message":
+                        yield pickle.loads(item["data"])
+            finally:
+                await pubsub.unsubscribe(channel)
+                await pubsub.close()
+
+        return messages()
+
+    async def close(self) -> None:
+        await self._redis.close()
+
+
+def create_message_bus(url: str) -> Optional[MessageBus]:
+    """Crea el backend según MESSAGE_BUS_URL; None = un solo proceso, sin bus"""
+    url = (url or "").strip()
+    if not url:
+        return None
+    if url.startswith("memory://"):
+        return InMemoryBroker()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBus(url)
+    raise ValueError("MESSAGE_BUS_URL no soportada: %s" % url)
+
+
+class BusClientManager(AsyncPubSubManager, OutboundManager):
+    """Client manager de Socket.IO sobre un ``MessageBus``.
+
+    ``AsyncPubSubManager`` entrega cada emit en el worker local y lo publica;
+    el listener de los otros workers lo entrega a los sids que tengan en esa room.
+    La entrega local (propia o desde el bus) pasa por los límites de ``OutboundManager``.
+    """
+
+    name = "messagebus"
+
+    def __init__(self, bus: MessageBus, channel: str = "socketio", write_only: bool = False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.bus = bus
+
+    async def _publish(self, data):
+        await self.bus.publish(self.channel, data)
+
+    async def _listen(self):
+        subscription = await self.bus.subscribe(self.channel)
+        async for message in subscription:
+            yield message
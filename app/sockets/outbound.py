@@ -0,0 +1,156 @@
+# app/sockets/outbound.py
+"""
+Límites de salida por conexión para clientes que no dan abasto.
+
+python-socketio encola cada paquete en la cola del socket de engine.io sin
+límite: un cliente móvil lento acumula todos los estados que se le mandan.
+``OutboundManager`` es el client manager de Socket.IO del worker que tiene el
+socket (también recibe los emits que llegan por el bus) y:
+
+- entrega directo mientras el transporte de la conexión tenga menos de
+  ``backlog`` paquetes pendientes (el caso normal: mismo costo que antes);
+- si no, encola el evento en una cola propia de la conexión, acotada a
+  ``queue_max``, que se drena a medida que el transporte se vacía;
+- en esa cola los snapshots (``game_state_public``/``game_state_private``)
+  reemplazan al pendiente anterior del mismo tipo (se reencolan al final para
+  no adelantarse a los eventos que los precedieron);
+- si la cola desborda se descarta lo más viejo; el cliente ve el salto de
+  ``seq`` y puede reanudar (ver event_buffer.py);
+- una conexión congestionada más de ``slow_after`` segundos, o que desbordó,
+  queda marcada como consumidor lento.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+from socketio.async_manager import AsyncManager
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+CONFLATABLE_EVENTS = frozenset({"game_state_public", "game_state_private"})
+
+
+class _ConnectionQueue:
+
+    def __init__(self, eio_sid: str, namespace: str):
+        self.eio_sid = eio_sid
+        self.namespace = namespace
+        self.events: Deque[Tuple[str, object]] = deque()
+        self.congested_since = time.monotonic()
+        self.task: Optional[asyncio.Task] = None
+
+
+class OutboundManager(AsyncManager):
+
+    def __init__(self, queue_max: Optional[int] = None, backlog: Optional[int] = None,
+                 slow_after: Optional[float] = None, poll_interval: float = 0.05):
+        super().__init__()
+        self.queue_max = queue_max if queue_max is not None else settings.WS_OUTBOUND_QUEUE_MAX
+        self.backlog = backlog if backlog is not None else settings.WS_TRANSPORT_BACKLOG
+        self.slow_after = slow_after if slow_after is not None else settings.WS_SLOW_CONSUMER_SECONDS
+        self.poll_interval = poll_interval
+        self._queues: Dict[str, _ConnectionQueue] = {}
+        self.slow_consumers: Dict[str, float] = {}  # sid -> desde cuándo
+        self.merged = 0
+        self.dropped = 0
+        self.queued = 0
+
+    # -------------
+    # | Entrega   |
+    # -------------
+
+    async def emit(self, event, data, namespace, room=None, skip_sid=None, callback=None, to=None, **kwargs):
+        room = to or room
+        if callback is not None or self.backlog <= 0 or namespace not in self.rooms:
+            return await super().emit(event, data, namespace, room=room, skip_sid=skip_sid, callback=callback, **kwargs)
+
+        skip = skip_sid if isinstance(skip_sid, list) else [skip_sid]
+        congested = [
+            (sid, eio_sid) for sid, eio_sid in self.get_participants(namespace, room)
+            if sid not in skip and self._is_congested(sid, eio_sid)
+        ]
+        if not congested:
+            return await super().emit(event, data, namespace, room=room, skip_sid=skip_sid, **kwargs)
+
+        await super().emit(event, data, namespace, room=room, skip_sid=skip + [sid for sid, _ in congested], **kwargs)
+        for sid, eio_sid in congested:
+            self._enqueue(sid, eio_sid, namespace, event, data)
+
+    def transport_backlog(self, eio_sid: str) -> int:
+        socket = self.server.eio.sockets.get(eio_sid) if self.server is not None else None
+        return socket.queue.qsize() if socket is not None else 0
+
+    def _is_congested(self, sid: str, eio_sid: str) -> bool:
+        return sid in self._queues or self.transport_backlog(eio_sid) >= self.backlog
+
+    def _enqueue(self, sid: str, eio_sid: str, namespace: str, event: str, data):
+        queue = self._queues.get(sid)
+        if queue is None:
+            queue = self._queues[sid] = _ConnectionQueue(eio_sid, namespace)
+            queue.task = asyncio.create_task(self._drain(sid, queue))
+
+        if event in CONFLATABLE_EVENTS:
+            for pending in queue.events:
+                if pending[0] == event:
+                    queue.events.remove(pending)
+                    self.merged += 1
+                    break
+        queue.events.append((event, data))
+        self.queued += 1
+
+        if len(queue.events) > self.queue_max:
+            queue.events.popleft()
+            self.dropped += 1
+            self._flag_slow(sid, "cola de salida desbordada")
+        elif time.monotonic() - queue.congested_since > self.slow_after:
+            self._flag_slow(sid, "congestionado %.0fs" % (time.monotonic() - queue.congested_since))
+
+    async def _drain(self, sid: str, queue: _ConnectionQueue):
+        try:
+            while queue.events:
+                if self.transport_backlog(queue.eio_sid) >= self.backlog:
+                    if queue.eio_sid not in self.server.eio.sockets:
+                        break
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+                event, data = queue.events.popleft()
+                await AsyncManager.emit(self, event, data, queue.namespace, room=sid)
+        finally:
+            if self._queues.get(sid) is queue:
+                del self._queues[sid]
+                self.slow_consumers.pop(sid, None)
+
+    def _flag_slow(self, sid: str, reason: str):
+        if sid not in self.slow_consumers:
+            self.slow_consumers[sid] = time.monotonic()
+            logger.warning("Consumidor lento %s: %s", sid, reason)
+
+    async def disconnect(self, sid, namespace, **kwargs):
+        queue = self._queues.pop(sid, None)
+        if queue is not None and queue.task is not None:
+            queue.task.cancel()
+        self.slow_consumers.pop(sid, None)
+        return await super().disconnect(sid, namespace, **kwargs)
+
+    # -------------
+    # | Métricas  |
+    # -------------
+
+    def queue_depths(self) -> Dict[str, int]:
+        return {sid: len(queue.events) for sid, queue in self._queues.items()}
+
+    def stats(self) -> dict:
+        depths = self.queue_depths()
+        return {
+            "queued": self.queued,
+            "merged": self.merged,
+            "dropped": self.dropped,
+            "congested_connections": len(depths),
+            "pending": sum(depths.values()),
+            "max_queue_depth": max(depths.values(), default=0),
+            "slow_consumers": sorted(self.slow_consumers),
+        }
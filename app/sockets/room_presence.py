@@ -0,0 +1,119 @@
+# app/sockets/room_presence.py
+"""
+Cache de perfiles de los jugadores de cada sala (nombre, avatar, host, orden)
+para armar la presencia que se emite al conectarse un socket.
+
+Antes cada connect consultaba ``Player`` en la DB; tras un deploy todos los
+clientes reconectan a la vez y eso era una consulta por socket. Ahora la sala
+se carga una vez y se mantiene al día:
+
+- un jugador que no está en el cache (se unió después de la carga) fuerza una
+  recarga de la sala;
+- ``player_left`` reemplaza los perfiles con la lista que ya arma el servicio;
+- cada ``game_state_public`` refresca la sala con sus ``jugadores`` (así el
+  orden que se asigna al iniciar la partida llega sin ir a la DB);
+- al cancelar la partida se descarta la sala.
+
+Como las salas cacheadas son también la membresía (jugador -> sala), el connect
+valida con ``fetch`` contra el cache y solo si falla va a la DB, en un thread y
+con una única consulta en vuelo por sala aunque lleguen muchos sockets juntos.
+``profiles`` recarga por el mismo camino: nunca consulta la DB en el event loop.
+
+Guarda las ``max_rooms`` salas usadas más recientemente.
+"""
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RoomPresenceCache:
+
+    def __init__(self, db_factory, max_rooms: int = 1024):
+        self.db_factory = db_factory
+        self.max_rooms = max_rooms
+        self._rooms: "OrderedDict[int, Dict[int, dict]]" = OrderedDict()
+        self._pending: Dict[int, asyncio.Future] = {}
+        self.loads = 0
+
+    async def profiles(self, room_id: int, user_ids: Iterable[int]) -> Dict[int, dict]:
+        """Perfiles de la sala; si falta alguno de ``user_ids`` recarga con ``fetch`` (fuera del loop)"""
+        cached = self._rooms.get(room_id)
+        if cached is None or any(user_id not in cached for user_id in user_ids):
+            cached = await self.fetch(room_id) or {}
+        else:
+            self._rooms.move_to_end(room_id)
+        return cached
+
+    async def fetch(self, room_id: int) -> Optional[Dict[int, dict]]:
+        """Recarga la sala sin bloquear el event loop; None si la sala no existe"""
+        pending = self._pending.get(room_id)
+        if pending is None:
+            pending = self._pending[room_id] = asyncio.ensure_future(self._fetch(room_id))
+            pending.add_done_callback(lambda _: self._pending.pop(room_id, None))
+        return await asyncio.shield(pending)
+
+    async def _fetch(self, room_id: int) -> Optional[Dict[int, dict]]:
+        players = await asyncio.to_thread(self._query, room_id, True)
+        if players is None:
+            self.drop(room_id)
+            return None
+        return self.set_players(room_id, players)
+
+    def _query(self, room_id: int, check_room: bool = False) -> Optional[List[dict]]:
+        from app.db.models import Player, Room  # Import aquí para evitar circular imports
+
+        db = self.db_factory()
+        try:
+            if check_room and db.query(Room.id).filter(Room.id == room_id).first() is None:
+                return None
+            players = db.query(Player).filter(Player.id_room == room_id).all()
+            self.loads += 1
+            logger.debug("Presencia de room %s cargada de la DB: %s jugadores", room_id, len(players))
+            return [
+                {
+                    'id': p.id,
+                    'name': p.name,
+                    'avatar': p.avatar_src,
+                    'is_host': p.is_host,
+                    'order': p.order,
+                }
+                for p in players
+            ]
+        finally:
+            db.close()
+
+    def set_players(self, room_id: int, players: Iterable[dict]) -> Dict[int, dict]:
+        """Reemplaza los perfiles de la sala (dicts con id, name, avatar, is_host, order)"""
+        profiles = {
+            p['id']: {k: p.get(k) for k in ('id', 'name', 'avatar', 'is_host', 'order')}
+            for p in players
+        }
+        self._rooms[room_id] = profiles
+        self._rooms.move_to_end(room_id)
+        while len(self._rooms) > self.max_rooms:
+            self._rooms.popitem(last=False)
+        return profiles
+
+    def set_from_game_state(self, room_id: int, jugadores: Iterable[dict]):
+        """Refresca la sala con los ``jugadores`` de build_complete_game_state"""
+        jugadores = [j for j in jugadores if isinstance(j, dict) and 'player_id' in j]
+        if jugadores:
+            self.set_players(room_id, (
+                {
+                    'id': j['player_id'],
+                    'name': j.get('name'),
+                    'avatar': j.get('avatar_src'),
+                    'is_host': j.get('is_host'),
+                    'order': j.get('order'),
+                }
+                for j in jugadores
+            ))
+
+    def get(self, room_id: int) -> Optional[Dict[int, dict]]:
+        return self._rooms.get(room_id)
+
+    def drop(self, room_id: int):
+        self._rooms.pop(room_id, None)
@@ -0,0 +1,206 @@
+# app/sockets/session_registry.py
+"""
+Registro de sesiones WebSocket: sid -> {user_id, room_id, connected_at}.
+
+Sin bus es un dict del proceso. Con bus cada worker mantiene una réplica
+completa: las escrituras locales se aplican al instante y se publican en orden
+por el bus; las de los demás workers llegan por el listener. Así las lecturas
+(``get_sids_in_game``, chequeo de room vacía, participantes) siguen siendo
+síncronas y en memoria, pero ven las sesiones de todos los workers.
+
+Mensajes del canal (todos llevan ``origin`` = node_id del emisor):
+- ``set`` / ``del``   alta o baja de un sid.
+- ``sync_request``    un worker que arranca pide el estado; cada nodo responde
+                      con los ``set`` de sus sesiones propias.
+- ``node_down``       un worker que se apaga ordenadamente; los demás descartan
+                      sus sesiones.
+- ``heartbeat``       cada ``heartbeat_interval`` segundos. Un worker que muere
+                      sin ``node_down`` deja de latir: pasado ``node_ttl`` sin
+                      ningún mensaje suyo, los demás descartan sus sesiones.
+"""
+import asyncio
+import logging
+import time
+import uuid
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, List, Optional
+
+from .message_bus import MessageBus
+
+logger = logging.getLogger(__name__)
+
+
+class SessionRegistry(MutableMapping):
+
+    def __init__(self, bus: Optional[MessageBus] = None, channel: str = "ws_sessions", node_id: Optional[str] = None,
+                 heartbeat_interval: float = 5.0, node_ttl: float = 15.0):
+        self.bus = bus
+        self.channel = channel
+        self.node_id = node_id or uuid.uuid4().hex
+        self.heartbeat_interval = heartbeat_interval
+        self.node_ttl = node_ttl
+        self._last_seen: Dict[str, float] = {}  # node_id -> último mensaje recibido (monotonic)
+        self._sessions: Dict[str, dict] = {}
+        self._owners: Dict[str, str] = {}  # sid -> node_id del worker que tiene el socket
+        self._by_room: Dict[Any, Dict[str, dict]] = {}  # room_id -> {sid: sesión}
+        self._outbox: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    # Interfaz de dict (lo que usa WebSocketManager)
+
+    def __getitem__(self, sid: str) -> dict:
+        return self._sessions[sid]
+
+    def __setitem__(self, sid: str, data: dict):
+        self._store(sid, data)
+        self._owners[sid] = self.node_id
+        self._publish({"op": "set", "sid": sid, "data": data})
+
+    def __delitem__(self, sid: str):
+        if sid not in self._sessions:
+            raise KeyError(sid)
+        self._discard(sid)
+        self._owners.pop(sid, None)
+        self._publish({"op": "del", "sid": sid})
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._sessions))
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def in_room(self, room_id) -> Dict[str, dict]:
+        """Sesiones de una room (sin recorrer todas las sesiones)"""
+        return dict(self._by_room.get(room_id, {}))
+
+    def _store(self, sid: str, data: dict):
+        previous = self._sessions.get(sid)
+        if previous is not None and previous.get('room_id') != data.get('room_id'):
+            self._discard(sid)
+        self._sessions[sid] = data
+        self._by_room.setdefault(data.get('room_id'), {})[sid] = data
+
+    def _discard(self, sid: str):
+        data = self._sessions.pop(sid, None)
+        if data is None:
+            return
+        room = self._by_room.get(data.get('room_id'))
+        if room is not None:
+            room.pop(sid, None)
+            if not room:
+                del self._by_room[data.get('room_id')]
+
+    def local_sids(self) -> List[str]:
+        """Sids cuyos sockets están conectados a este worker"""
+        return [sid for sid, owner in self._owners.items() if owner == self.node_id]
+
+    def is_local(self, sid: str) -> bool:
+        return self._owners.get(sid) == self.node_id
+
+    def pending(self) -> int:
+        """Escrituras locales todavía sin publicar en el bus"""
+        return self._outbox.qsize() if self._outbox is not None else 0
+
+    # Replicación
+
+    @property
+    def started(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self):
+        """Suscribe al bus y anuncia el nodo. No-op sin bus o si ya arrancó"""
+        if self.bus is None or self.started:
+            return
+        subscription = await self.bus.subscribe(self.channel)
+        self._outbox = asyncio.Queue()
+        self._tasks = [
+            asyncio.create_task(self._listen(subscription)),
+            asyncio.create_task(self._send()),
+            asyncio.create_task(self._heartbeat()),
+        ]
+        # Sesiones creadas antes de arrancar + pedido de estado al resto
+        for sid in self.local_sids():
+            self._publish({"op": "set", "sid": sid, "data": self._sessions[sid]})
+        self._publish({"op": "sync_request"})
+        logger.info("SessionRegistry %s replicando en canal %s", self.node_id, self.channel)
+
+    async def stop(self):
+        if not self.started:
+            return
+        self._publish({"op": "node_down"})
+        await self.flush()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._outbox = None
+
+    async def flush(self):
+        """Espera a que se publiquen las escrituras locales pendientes"""
+        if self._outbox is not None:
+            await self._outbox.join()
+
+    def _publish(self, message: dict):
+        if self._outbox is None:
+            return
+        message["origin"] = self.node_id
+        self._outbox.put_nowait(message)
+
+    async def _send(self):
+        # Un único sender para que el orden de publicación sea el de escritura
+        while True:
+            message = await self._outbox.get()
+            try:
+                await self.bus.publish(self.channel, message)
+            except Exception:
+                logger.exception("No se pudo publicar %s de SessionRegistry", message.get("op"))
+            finally:
+                self._outbox.task_done()
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            self._publish({"op": "heartbeat"})
+            self.expire_nodes()
+
+    def expire_nodes(self, now: Optional[float] = None) -> List[str]:
+        """Descarta las sesiones de los nodos que no latieron en ``node_ttl`` segundos"""
+        now = time.monotonic() if now is None else now
+        expired = [node for node, seen in self._last_seen.items() if now - seen > self.node_ttl]
+        for node in expired:
+            self._drop_node(node)
+            logger.warning("Nodo %s sin heartbeat hace más de %ss: sesiones descartadas", node, self.node_ttl)
+        return expired
+
+    def _drop_node(self, node: str):
+        self._last_seen.pop(node, None)
+        for sid in [sid for sid, owner in self._owners.items() if owner == node]:
+            self._discard(sid)
+            self._owners.pop(sid, None)
+
+    async def _listen(self, subscription):
+        async for message in subscription:
+            if message.get("origin") == self.node_id:
+                continue
+            if message.get("origin") and message.get("op") != "node_down":
+                self._last_seen[message["origin"]] = time.monotonic()
+            try:
+                self._apply_remote(message)
+            except Exception:
+                logger.exception("Mensaje inválido en SessionRegistry: %s", message)
+
+    def _apply_remote(self, message: dict):
+        op = message.get("op")
+        origin = message["origin"]
+        if op == "set":
+            self._store(message["sid"], message["data"])
+            self._owners[message["sid"]] = origin
+        elif op == "del":
+            self._discard(message["sid"])
+            self._owners.pop(message["sid"], None)
+        elif op == "sync_request":
+            for sid in self.local_sids():
+                self._publish({"op": "set", "sid": sid, "data": self._sessions[sid]})
+        elif op == "node_down":
+            self._drop_node(origin)
+            logger.info("Nodo %s caído: sesiones descartadas", origin)
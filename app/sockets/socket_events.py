@@ -1,7 +1,8 @@
 # sockets/socket_events.py
 from .socket_manager import init_ws_manager, get_ws_manager
-from app.db.database import SessionLocal
-from app.db.models import Room
+from .socket_service import get_websocket_service
+from .wire_format import JSON, negotiate
+from app.sharding import get_shard_router
 import socketio
 import logging
 
@@ -12,62 +13,63 @@ def register_events(sio: socketio.AsyncServer):
 
     # inicializar manager
     ws_manager = get_ws_manager()
+    # Reanudaciones de sockets conectados a otro worker cuando este es el dueño de la room
+    get_shard_router().register_handler(
+        "resume", lambda **payload: get_websocket_service().reanudar_sesion(**payload)
+    )
 
     @sio.event
     async def connect(sid, environ):
         """Maneja nuevas conexiones"""
         try:
             # Debug logging
-            logger.info(f"=== NEW CONNECTION ATTEMPT ===")
-            logger.info(f"SID: {sid}")
-            logger.info(f"Query string: {environ.get('QUERY_STRING', 'None')}")
+            logger.debug("=== NEW CONNECTION ATTEMPT ===")
+            logger.debug("SID: %s", sid)
+            logger.debug("Query string: %s", environ.get('QUERY_STRING', 'None'))
             
             # Parse query parameters
             query_string = environ.get('QUERY_STRING', '')
             from urllib.parse import parse_qs
             query_params = parse_qs(query_string)
             
-            logger.info(f"Parsed query params: {query_params}")
+            logger.debug("Parsed query params: %s", query_params)
             
             # Get user_id from query params
             user_id_list = query_params.get('user_id', [])
             if not user_id_list:
-                logger.error(f"❌ Missing user_id in query for sid: {sid}")
+                logger.error("Missing user_id in query for sid: %s", sid)
                 await sio.emit('connect_error', {'message': 'user_id required'}, room=sid)
                 return False
                 
             try:
                 user_id = int(user_id_list[0])
             except (ValueError, IndexError):
-                logger.error(f"❌ Invalid user_id format: {user_id_list}")
+                logger.error("Invalid user_id format: %s", user_id_list)
                 await sio.emit('connect_error', {'message': 'invalid user_id format'}, room=sid)
                 return False
             
             # Get room_id from query params
             room_id_list = query_params.get('room_id', [])
             if not room_id_list:
-                logger.error(f"❌ Missing room_id in query for sid: {sid}")
+                logger.error("Missing room_id in query for sid: %s", sid)
                 await sio.emit('connect_error', {'message': 'room_id required'}, room=sid)
                 return False
                 
             try:
                 room_id = int(room_id_list[0])
             except (ValueError, IndexError):
-                logger.error(f"❌ Invalid room_id format: {room_id_list}")
+                logger.error("Invalid room_id format: %s", room_id_list)
                 await sio.emit('connect_error', {'message': 'invalid room_id format'}, room=sid)
                 return False
             
-            logger.info(f"Extracted - SID: {sid}, Game ID: {room_id}, User ID: {user_id}")
+            logger.debug("Extracted - SID: %s, Game ID: %s, User ID: %s", sid, room_id, user_id)
 
-            # Validate room exists
-            db = SessionLocal()
-            try:
-                room = db.query(Room).filter(Room.id == room_id).first()
-                if not room:
-                    await sio.emit('connect_error', {'message': 'room not found'}, room=sid)
-                    return False
-            finally:
-                db.close()
+            # Validate room exists and user belongs to it (cache de membresía; la DB solo si falla)
+            error = await ws_manager.validate_connection(room_id, user_id)
+            if error:
+                logger.warning("Connection rejected for user %s in room %s: %s", user_id, room_id, error)
+                await sio.emit('connect_error', {'message': error}, room=sid)
+                return False
             
             # Guardar session con toda la información
             await sio.save_session(sid, {
@@ -75,9 +77,18 @@ def register_events(sio: socketio.AsyncServer):
                 'room_id': room_id
             })
             
-            logger.info(f"🚪 Attempting to join room for game {room_id}")
+            logger.debug("Attempting to join room for game %s", room_id)
             # Usar ws_manager para unirse al room automáticamente
-            success = await ws_manager.join_game_room(sid, room_id, user_id)
+            # Formato de payloads negociado por conexión (json por defecto)
+            wire_format, deflate = negotiate(
+                query_params.get('format', [JSON])[0],
+                query_params.get('deflate', ['0'])[0] in ('1', 'true')
+            )
+            # batch=1: el cliente acepta los eventos de un mismo request agrupados en un evento 'batch'
+            batch = query_params.get('batch', ['0'])[0] in ('1', 'true')
+            success = await ws_manager.join_game_room(
+                sid, room_id, user_id, wire_format=wire_format, deflate=deflate, batch=batch
+            )
             
             if success:
                 # Notificar conexión exitosa al cliente
@@ -85,18 +96,29 @@ def register_events(sio: socketio.AsyncServer):
                     'message': 'Conectado exitosamente',
                     'user_id': user_id,
                     'room_id': room_id,
-                    'sid': sid
+                    'sid': sid,
+                    'format': wire_format,
+                    'deflate': deflate,
+                    'batch': batch
                 }, room=sid)
                 
-                logger.info(f"✅ User {user_id} connected successfully to game {room_id} (sid: {sid})")
+                # Resume handshake: el cliente manda el último seq recibido y el dueño de la room
+                # le re-emite solo lo que se perdió (o un snapshot si el hueco es muy grande)
+                last_seq_list = query_params.get('last_seq', [])
+                if last_seq_list and last_seq_list[0].isdigit():
+                    await get_shard_router().dispatch(room_id, "resume", {
+                        'sid': sid, 'room_id': room_id, 'user_id': user_id, 'last_seq': int(last_seq_list[0])
+                    }, local=get_websocket_service().reanudar_sesion)
+
+                logger.info("User %s connected successfully to game %s (sid: %s)", user_id, room_id, sid)
                 return True
             else:
-                logger.error(f"❌ Failed to join user {user_id} to game {room_id}")
+                logger.error("Failed to join user %s to game %s", user_id, room_id)
                 await sio.emit('error', {'message': 'Failed to join game room'}, room=sid)
                 return False
             
         except Exception as e:
-            logger.error(f"❌ Unexpected error in connect: {e}")
+            logger.error("Unexpected error in connect: %s", e)
             await sio.emit('error', {'message': f'Connection error: {str(e)}'}, room=sid)
             return False
 
@@ -109,7 +131,7 @@ def register_events(sio: socketio.AsyncServer):
             user_id = session.get('user_id', 'Unknown') if session else 'Unknown'
             room_id = session.get('room_id', 'Unknown') if session else 'Unknown'
             
-            logger.info(f"Usuario {user_id} desconectado de juego {room_id} (sid: {sid})")
+            logger.info("Usuario %s desconectado de juego %s (sid: %s)", user_id, room_id, sid)
             
             # Salir del room si estaba en uno
             if session and 'room_id' in session:
@@ -122,4 +144,4 @@ def register_events(sio: socketio.AsyncServer):
                 }, room=f"game_{session['room_id']}")
             
         except Exception as e:
-            logger.error(f"Error en disconnect para sid {sid}: {e}")       
+            logger.error("Error en disconnect para sid %s: %s", sid, e)
@@ -1,25 +1,85 @@
+import asyncio
 import socketio 
-from typing import Dict, List, Optional
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Set
 import logging
 from datetime import datetime
-from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.sharding import get_shard_router
+from .event_buffer import EventLog
+from .room_presence import RoomPresenceCache
+from . import wire_format as wire
+from .session_registry import SessionRegistry
 
 logger = logging.getLogger(__name__)
 
+# Canal del bus con los avisos de "la room cambió" (despiertan long-polls en los demás workers)
+ROOM_CHANGES_CHANNEL = "ws_room_changes"
+
+# Outbox del request en curso: (room_id, sid | None para toda la room, evento, data)
+_outbox: ContextVar[Optional[List[tuple]]] = ContextVar("ws_outbox", default=None)
+
 class WebSocketManager:
 
-    def __init__(self, sio: socketio.AsyncServer, db_factory):
+    def __init__(self, sio: socketio.AsyncServer, db_factory, sessions: Optional[SessionRegistry] = None):
         self.sio = sio
-        # tracking interno: sid -> {user_id, game_id, connected_at} se pierde si se cae el server
         self.db_factory = db_factory  # Función que retorna una Session de DB
-        self.user_sessions: Dict[str, dict] = {}
+        # tracking: sid -> {user_id, room_id, connected_at}; con bus se replica entre workers
+        self._sessions = sessions if sessions is not None else SessionRegistry()
+        # últimos eventos por room con seq, para reanudar reconexiones
+        self.event_log = EventLog(settings.WS_EVENT_BUFFER_SIZE, settings.WS_EVENT_BUFFER_ROOMS)
+        # perfiles de los jugadores por sala, para no ir a la DB en cada connect
+        self.presence = RoomPresenceCache(db_factory)
+        self._changes_task: Optional[asyncio.Task] = None
+
+    @property
+    def user_sessions(self) -> SessionRegistry:
+        return self._sessions
+
+    @user_sessions.setter
+    def user_sessions(self, sessions: Dict[str, dict]):
+        self._sessions.clear()
+        self._sessions.update(sessions)
+
+    async def start(self):
+        """Arranca la replicación del registro de sesiones y los avisos de cambios de room (no-op sin bus)"""
+        await self._sessions.start()
+        bus = self._sessions.bus
+        if bus is not None and self._changes_task is None:
+            subscription = await bus.subscribe(ROOM_CHANGES_CHANNEL)
+            self._changes_task = asyncio.create_task(self._listen_room_changes(subscription))
+
+    async def stop(self):
+        if self._changes_task is not None:
+            self._changes_task.cancel()
+            await asyncio.gather(self._changes_task, return_exceptions=True)
+            self._changes_task = None
+        await self._sessions.stop()
+
+    async def _listen_room_changes(self, subscription):
+        async for message in subscription:
+            if message.get("origin") != self._sessions.node_id:
+                self.event_log.notify(message["room_id"])
+
+    async def _publish_room_change(self, room_id: int):
+        """Avisa a los demás workers que la room cambió (el estado ya está commiteado)"""
+        bus = self._sessions.bus
+        if bus is None:
+            return
+        try:
+            await bus.publish(ROOM_CHANGES_CHANNEL, {"origin": self._sessions.node_id, "room_id": room_id})
+        except Exception as e:
+            logger.warning("No se pudo publicar el cambio de room %s: %s", room_id, e)
 
     def get_room_name(self, room_id: int) -> str:
         """Genera nombre estandar del room para una partida"""
         return f"game_{room_id}"
 
-    async def join_game_room(self, sid: str, room_id: int, user_id: int) -> bool:
-        """Une a un jugador al room de su partida"""
+    async def join_game_room(self, sid: str, room_id: int, user_id: int,
+                             wire_format: str = wire.JSON, deflate: bool = False, batch: bool = False) -> bool:
+        """Une a un jugador al room de su partida (formato y batch negociados por la conexión)"""
         try:
             room = self.get_room_name(room_id)
             
@@ -30,9 +90,12 @@ class WebSocketManager:
             self.user_sessions[sid] = {
                 'user_id': user_id,
                 'room_id': room_id,
-                'connected_at': datetime.now().isoformat()
+                'connected_at': datetime.now().isoformat(),
+                'format': wire_format,
+                'deflate': deflate,
+                'batch': batch
             }
-            logger.debug(f"User {user_id} joined room {room} with sid {sid}, sessions: {self.user_sessions}")
+            logger.debug("User %s joined room %s with sid %s (%s sesiones activas)", user_id, room, sid, len(self.user_sessions))
             
             # notificar a otros jugadores en el room (skip current user)
             await self.sio.emit('player_connected', {
@@ -41,26 +104,45 @@ class WebSocketManager:
                 'timestamp': datetime.now().isoformat()
             }, room=room, skip_sid=sid)
 
-            # Obtener participantes con datos completos de la DB
-            participants = await self.get_room_participants(room_id)
-
-            await self.sio.emit('game_state_public', {
-                'room_id': room_id,
-                'status': 'WAITING',
-                'turno_actual': None,
-                'jugadores': participants,
-                'mazos': {},
-                'timestamp': datetime.now().isoformat()
-            }, room=room)
+            # El estado de la sala lo arma el worker dueño de la room (local sin sharding)
+            await get_shard_router().dispatch(
+                room_id, "room_presence", {"room_id": room_id}, local=self.broadcast_room_presence
+            )
             
-            logger.info(f"Usuario {user_id} se unió a room {room}")
+            logger.info("Usuario %s se unió a room %s", user_id, room)
             return True
             
         except Exception as e:
-            logger.error(f"Error joining room: {e}")
+            logger.error("Error joining room: %s", e)
             await self.sio.emit('error', {'message': 'Error uniendose a la partida'}, room=sid)
             return False
 
+    async def validate_connection(self, room_id: int, user_id: int) -> Optional[str]:
+        """Motivo de rechazo del connect (sala inexistente o jugador ajeno) o None si es válido"""
+        members = self.presence.get(room_id)
+        if members is None or user_id not in members:
+            # Sala sin cachear o jugador recién unido: se consulta la DB fuera del event loop
+            members = await self.presence.fetch(room_id)
+        if members is None:
+            return 'room not found'
+        if user_id not in members:
+            return 'user not in room'
+        return None
+
+    async def broadcast_room_presence(self, room_id: int):
+        """Emite a la room el game_state_public de sala de espera con los participantes conectados"""
+        # Obtener participantes con datos completos de la DB
+        participants = await self.get_room_participants(room_id)
+
+        await self.sio.emit('game_state_public', {
+            'room_id': room_id,
+            'status': 'WAITING',
+            'turno_actual': None,
+            'jugadores': participants,
+            'mazos': {},
+            'timestamp': datetime.now().isoformat()
+        }, room=self.get_room_name(room_id))
+
     async def leave_game_room(self, sid: str, room_id: int = None):
         """Salir del room"""
         try: 
@@ -87,94 +169,160 @@ class WebSocketManager:
             # limpiar tracking
             del self.user_sessions[sid]
 
-            logger.info(f"Usuario {user_id} salio de room {room}")
+            logger.info("Usuario %s salio de room %s", user_id, room)
         
         except Exception as e:
-            logger.error(f"Error leaving room: {e}")
+            logger.error("Error leaving room: %s", e)
 
     async def get_room_participants(self, room_id: int) -> List[dict]:
-        """Obtiene la lista de participantes en el room con datos completos de la DB"""
-        from app.db.models import Player, Room  # Import aquí para evitar circular imports
-        
-        participants = []
-
-        db: Session = self.db_factory()
-        
+        """Obtiene la lista de participantes conectados al room con sus perfiles (cacheados por sala)"""
         try:
-            # Obtener todos los jugadores conectados a esta room desde memoria
-            connected_user_ids = [
-                session_data['user_id'] 
-                for sid, session_data in self.user_sessions.items() 
-                if session_data.get('room_id') == room_id
-            ]
+            # Jugadores conectados a esta room desde memoria (la primera sesión de cada uno)
+            connected: Dict[int, Optional[str]] = {}
+            for session_data in self.user_sessions.in_room(room_id).values():
+                connected.setdefault(session_data['user_id'], session_data.get('connected_at'))
 
-            # DEBUG
-            logger.info(f"🔍 Connected user_ids for room {room_id}: {connected_user_ids}")
-            
-            if not connected_user_ids:
+            logger.debug("Connected user_ids for room %s: %s", room_id, list(connected))
+
+            if not connected:
                 return []
-            
-            # Consultar la DB para obtener info completa de los jugadores
-            players = db.query(Player).filter(
-                Player.id.in_(connected_user_ids),
-                Player.id_room == room_id
-            ).all()
-
-            # DEBUG
-            logger.info(f"🔍 Players found in DB: {[p.id for p in players]}")
-            
+
+            profiles = await self.presence.profiles(room_id, connected)
+
             # Construir la lista de participantes con formato correcto
-            for player in players:
-                participants.append({
-                    'id': player.id,
-                    'name': player.name,
-                    'avatar': player.avatar_src,
-                    'is_host': player.is_host,
-                    'order': player.order,
-                    'connected_at': next(
-                        (s['connected_at'] for s in self.user_sessions.values() 
-                         if s.get('user_id') == player.id and s.get('room_id') == room_id),
-                        datetime.now().isoformat()
-                    )
-                })
-            
+            participants = [
+                {**profiles[user_id], 'connected_at': connected_at or datetime.now().isoformat()}
+                for user_id, connected_at in connected.items()
+                if user_id in profiles
+            ]
+
             # Ordenar por order
             participants.sort(key=lambda x: x.get('order') if x.get('order') is not None else 999)
-            
-            logger.debug(f"Participants in room {room_id}: {participants}")
+
+            logger.debug("Participants in room %s: %s", room_id, participants)
             return participants
-            
+
         except Exception as e:
-            logger.error(f"Error getting room participants: {e}")
+            logger.error("Error getting room participants: %s", e)
             return []
-        finally:
-            db.close()
 
     # Metodos para las notificaciones
 
     async def emit_to_room(self, room_id: int, event: str, data: Dict):
         """Emite un evento a todos los jugadores en una partida"""
+        # Se bufferea aunque la room esté vacía: quien reconecte lo recibe al reanudar
+        seq = self.event_log.record(room_id, event, data)
+        data = {**data, 'seq': seq}
+        box = _outbox.get()
+        if box is not None:
+            box.append((room_id, None, event, data))
+            return
+        await self._send_to_room(room_id, event, data)
+        await self._publish_room_change(room_id)
+    
+    async def emit_to_sid(self, sid: str, event: str, data: Dict, record: bool = True):
+        """Emite un evento privado a un jugador (record=False para replays/snapshots)"""
+        session = self.user_sessions.get(sid)
+        if record and session and session.get('room_id') is not None:
+            seq = self.event_log.record(session['room_id'], event, data, user_id=session.get('user_id'))
+            data = {**data, 'seq': seq}
+            box = _outbox.get()
+            if box is not None:
+                box.append((session['room_id'], sid, event, data))
+                return
+        await self._send_to_sid(sid, event, data, session)
+
+    async def _send_to_room(self, room_id: int, event: str, data: Dict, skip: Set[str] = frozenset()):
         room = self.get_room_name(room_id) # Tomo a que partida le mando la notificacion
-        # Chequeo que la room no este vacia
-        if not any(s['room_id'] == room_id for s in self.user_sessions.values()):
-          logger.warning(f"La room esta vacía: {room}")
+        # Chequeo que la room no este vacia y agrupo los sids por formato negociado
+        encodings: Dict[tuple, List[str]] = {}
+        for sid, s in self.user_sessions.in_room(room_id).items():
+            if sid not in skip:
+                encodings.setdefault((s.get('format', wire.JSON), s.get('deflate', False)), []).append(sid)
+        if not encodings:
+          if not skip:
+              logger.warning("La room esta vacía: %s", room)
           return
         
-        await self.sio.emit(event, data, room=room)
-    
-    async def emit_to_sid(self, sid: str, event: str, data: Dict):
-        """Emite un evento privado a un jugador"""
+        plain = (wire.JSON, False)
+        if list(encodings) == [plain] and not skip:
+            await self.sio.emit(event, data, room=room)
+            return
+        # JSON a la room salteando a quienes negociaron otro formato; el resto, codificado por grupo
+        others = [sid for key, sids in encodings.items() if key != plain for sid in sids] + list(skip)
+        if plain in encodings:
+            await self.sio.emit(event, data, room=room, skip_sid=others)
+        for (wire_format, deflate), sids in encodings.items():
+            if (wire_format, deflate) != plain:
+                await self.sio.emit(event, wire.encode(data, wire_format, deflate), to=sids)
+
+    async def _send_to_sid(self, sid: str, event: str, data: Dict, session: Optional[dict]):
+        if session:
+            data = wire.encode(data, session.get('format', wire.JSON), session.get('deflate', False))
         await self.sio.emit(event, data, to=sid)
+
+    # Outbox: eventos de un request agrupados en un frame por destinatario
+
+    @asynccontextmanager
+    async def outbox(self):
+        """
+        Junta los emit_to_room/emit_to_sid del bloque y los manda al salir, en orden.
+        Las conexiones que negociaron batch reciben un único evento 'batch' con todos
+        los eventos que les tocan; el resto los recibe uno por uno como siempre.
+        Anidado es no-op: manda el outbox más externo.
+        """
+        if _outbox.get() is not None:
+            yield
+            return
+        box: List[tuple] = []
+        token = _outbox.set(box)
+        try:
+            yield
+        finally:
+            _outbox.reset(token)
+            if box:
+                await self.flush_outbox(box)
+
+    async def flush_outbox(self, box: List[tuple]):
+        rooms = list(dict.fromkeys(room_id for room_id, _, _, _ in box))
+        for room_id in rooms:
+            entries = [(target, event, data) for r, target, event, data in box if r == room_id]
+            sessions = self.user_sessions.in_room(room_id)
+            batched = {sid for sid, s in sessions.items() if s.get('batch')}
+
+            for sid in batched:
+                events = [{'event': event, 'data': data} for target, event, data in entries if target in (None, sid)]
+                if events:
+                    await self._send_to_sid(sid, 'batch', {'room_id': room_id, 'events': events}, sessions[sid])
+
+            for target, event, data in entries:
+                if target is None:
+                    await self._send_to_room(room_id, event, data, skip=batched)
+                elif target not in batched:
+                    await self._send_to_sid(target, event, data, sessions.get(target))
+            if any(target is None for target, _, _ in entries):
+                await self._publish_room_change(room_id)
+            logger.debug("Outbox room %s: %s eventos, %s conexiones en batch", room_id, len(entries), len(batched))
     
     def get_sids_in_game(self, room_id: int) -> List[str]:
-        sids = [sid for sid, s in self.user_sessions.items() if s.get('room_id') == room_id]
-        logger.debug(f"get_sids_in_game({room_id}): user_sessions={self.user_sessions}, sids={sids}")
+        sids = list(self.user_sessions.in_room(room_id))
+        logger.debug("get_sids_in_game(%s): sids=%s", room_id, sids)
         return sids
     
+    def outbound_stats(self) -> dict:
+        """Métricas de las colas de salida por conexión (mergeados, descartados, consumidores lentos)"""
+        stats = getattr(self.sio.manager, 'stats', None)
+        return stats() if callable(stats) else {}
+
     def get_user_session(self, sid: str) -> Optional[dict]:
         """Devuelve la sesión del usuario si esta conectado"""
         return self.user_sessions.get(sid)
 
+async def collect_ws_events(request, call_next):
+    """Middleware HTTP: los eventos que emite un request salen juntos al terminar (después del commit)"""
+    async with get_ws_manager().outbox():
+        return await call_next(request)
+
 # Instancia global
 _ws_manager: Optional[WebSocketManager] = None
 
@@ -184,7 +332,9 @@ def get_ws_manager() -> WebSocketManager:
         raise RuntimeError("WebSocketManager no inicializado")
     return _ws_manager
 
-def init_ws_manager(sio: socketio.AsyncServer, db_factory) -> WebSocketManager:
+def init_ws_manager(sio: socketio.AsyncServer, db_factory, sessions: Optional[SessionRegistry] = None) -> WebSocketManager:
     global _ws_manager
-    _ws_manager = WebSocketManager(sio, db_factory)
+    _ws_manager = WebSocketManager(sio, db_factory, sessions)
+    # Eventos de room reenviados por otros workers cuando este es el dueño
+    get_shard_router().register_handler("room_presence", _ws_manager.broadcast_room_presence)
     return _ws_manager
@@ -15,6 +15,31 @@ class WebSocketService:
     # | GAME STATE |
     # --------------
     
+    @staticmethod
+    def _mensaje_publico(room_id: int, game_state: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "type": "game_state_public",
+            "room_id": room_id,
+            "game_id": game_state.get("game_id"),
+            "status": game_state.get("status", "WAITING"),
+            "turno_actual": game_state.get("turno_actual"),
+            "jugadores": game_state.get("jugadores", []),
+            "mazos": game_state.get("mazos", {}),
+            "sets": game_state.get("sets", []),
+            "secretsFromAllPlayers": game_state.get("secretsFromAllPlayers", []),
+            "timestamp": datetime.now().isoformat()
+        }
+
+    @staticmethod
+    def _mensaje_privado(user_id: int, private_data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "type": "game_state_private",
+            "user_id": user_id,
+            "mano": private_data.get("mano", []),
+            "secretos": private_data.get("secretos", []),
+            "timestamp": datetime.now().isoformat()
+        }
+
     async def notificar_estado_publico(
         self,
         room_id: int,
@@ -32,23 +57,13 @@ class WebSocketService:
                 - jugadores: List[Dict] (player info)
                 - mazos: Dict (deck, discard, draft counts/data)
         """
-        logger.info(f"🔵 Notifying public state to room {room_id}")
+        logger.debug("Notifying public state to room %s", room_id)
         
-        mensaje_publico = {
-            "type": "game_state_public",
-            "room_id": room_id,
-            "game_id": game_state.get("game_id"),
-            "status": game_state.get("status", "WAITING"),
-            "turno_actual": game_state.get("turno_actual"),
-            "jugadores": game_state.get("jugadores", []),
-            "mazos": game_state.get("mazos", {}),
-            "sets": game_state.get("sets", []),
-            "secretsFromAllPlayers": game_state.get("secretsFromAllPlayers", []),
-            "timestamp": datetime.now().isoformat()
-        }
+        mensaje_publico = self._mensaje_publico(room_id, game_state)
+        self.ws_manager.presence.set_from_game_state(room_id, game_state.get("jugadores") or [])
         
         await self.ws_manager.emit_to_room(room_id, "game_state_public", mensaje_publico)
-        logger.info(f"✅ Emitted game_state_public to room {room_id}")
+        logger.debug("Emitted game_state_public to room %s", room_id)
     
     async def notificar_estados_privados(
         self,
@@ -68,11 +83,11 @@ class WebSocketService:
                     }
                 }
         """
-        logger.info(f"🟢 Notifying private states to room {room_id}")
+        logger.debug("Notifying private states to room %s", room_id)
         sids = self.ws_manager.get_sids_in_game(room_id)
         
         if not sids:
-            logger.warning(f"Room {room_id} has no connected players")
+            logger.warning("Room %s has no connected players", room_id)
             return
           
         for sid in sids:
@@ -81,18 +96,10 @@ class WebSocketService:
                 continue
             
             user_id = session["user_id"]
-            private_data = estados_privados.get(user_id, {})
-            
-            mensaje_privado = {
-                "type": "game_state_private",
-                "user_id": user_id,
-                "mano": private_data.get("mano", []),
-                "secretos": private_data.get("secretos", []),
-                "timestamp": datetime.now().isoformat()
-            }
+            mensaje_privado = self._mensaje_privado(user_id, estados_privados.get(user_id, {}))
             
             await self.ws_manager.emit_to_sid(sid, "game_state_private", mensaje_privado)
-            logger.info(f"✅ Emitted game_state_private to user {user_id}")
+            logger.debug("Emitted game_state_private to user %s", user_id)
     
     async def notificar_fin_partida(
         self,
@@ -109,11 +116,11 @@ class WebSocketService:
                 [{"player_id": 1, "name": "Player 1", ...}]
             reason: String explaining why game ended
         """
-        logger.info(f"🏁 Notifying game ended to room {room_id}")
+        logger.debug("Notifying game ended to room %s", room_id)
         sids = self.ws_manager.get_sids_in_game(room_id)
         
         if not sids:
-            logger.warning(f"Room {room_id} has no connected players")
+            logger.warning("Room %s has no connected players", room_id)
             return
         
         for sid in sids:
@@ -134,8 +141,7 @@ class WebSocketService:
             }
             
             await self.ws_manager.emit_to_sid(sid, "game_ended", resultado)
-            print(f"✅ Se emitio el fin de partida")
-            logger.info(f"✅ Emitted game_ended to user {user_id} (winner: {is_winner})")
+            logger.debug("Emitted game_ended to user %s (winner: %s)", user_id, is_winner)
     
     # --------------------------------------------
     # | Metodo Anterior - backward compatibility |
@@ -154,10 +160,10 @@ class WebSocketService:
         
         This calls the three refactored methods internally
         """
-        logger.info(f"🎮 Notifying game state to room {room_id} (legacy method)")
+        logger.debug("Notifying game state to room %s (legacy method)", room_id)
         
         if not game_state:
-            logger.warning(f"No game_state provided to notificar_estado_partida")
+            logger.warning("No game_state provided to notificar_estado_partida")
             return
         
         # 1. Public state
@@ -178,6 +184,61 @@ class WebSocketService:
                 reason=game_state.get("finish_reason", "Game completed")
             )
 
+    # ----------------------------
+    # | RECONEXIÓN / REANUDACIÓN |
+    # ----------------------------
+
+    async def reanudar_sesion(
+        self,
+        sid: str,
+        room_id: int,
+        user_id: int,
+        last_seq: int
+    ):
+        """
+        Resume handshake: re-emite al sid solo los eventos posteriores a last_seq
+        (de la room y privados del jugador). Si ya no están en el buffer manda un
+        snapshot del estado. Termina siempre con 'resumed'.
+        """
+        eventos = self.ws_manager.event_log.replay(room_id, last_seq, user_id)
+        if eventos is not None:
+            for evento in eventos:
+                await self.ws_manager.emit_to_sid(sid, evento.event, {**evento.data, "seq": evento.seq}, record=False)
+            modo = "replay"
+        else:
+            await self.notificar_snapshot(sid, room_id, user_id)
+            modo = "snapshot"
+
+        await self.ws_manager.emit_to_sid(sid, "resumed", {
+            "type": "resumed",
+            "room_id": room_id,
+            "mode": modo,
+            "replayed": len(eventos) if eventos is not None else 0,
+            "seq": self.ws_manager.event_log.current_seq(room_id),
+            "timestamp": datetime.now().isoformat()
+        }, record=False)
+        logger.debug("Sesión %s reanudada en room %s (%s desde seq %s)", sid, room_id, modo, last_seq)
+
+    async def notificar_snapshot(self, sid: str, room_id: int, user_id: int):
+        """Estado público + privado actual de la partida, solo para ese sid"""
+        from app.db.models import Room
+        from app.services.game_status_service import build_complete_game_state
+        from app.services.executor import run_sync, game_key
+
+        db = self.ws_manager.db_factory()
+        try:
+            room = db.query(Room).filter(Room.id == room_id).first()
+            if not room or not room.id_game:
+                # Sala de espera: el join ya re-emitió los participantes
+                return
+            game_state = await run_sync(game_key(room.id_game), build_complete_game_state, db, room.id_game)
+        finally:
+            db.close()
+
+        await self.ws_manager.emit_to_sid(sid, "game_state_public", self._mensaje_publico(room_id, game_state), record=False)
+        privado = game_state.get("estados_privados", {}).get(user_id, {})
+        await self.ws_manager.emit_to_sid(sid, "game_state_private", self._mensaje_privado(user_id, privado), record=False)
+
     # ---------------------
     # | DETECTIVE ACTIONS |
     # ---------------------
@@ -197,7 +258,7 @@ class WebSocketService:
             "timestamp": datetime.now().isoformat()
         }
         await self.ws_manager.emit_to_room(room_id, "detective_action_started", mensaje)
-        logger.info(f"✅ Emitted detective_action_started to room {room_id}")
+        logger.debug("Emitted detective_action_started to room %s", room_id)
     
     async def notificar_detective_target_selected(
         self,
@@ -216,7 +277,7 @@ class WebSocketService:
             "timestamp": datetime.now().isoformat()
         }
         await self.ws_manager.emit_to_room(room_id, "detective_target_selected", mensaje)
-        logger.info(f"✅ Emitted detective_target_selected to room {room_id}")
+        logger.debug("Emitted detective_target_selected to room %s", room_id)
     
     async def notificar_detective_action_request(
         self,
@@ -240,7 +301,7 @@ class WebSocketService:
                     "timestamp": datetime.now().isoformat()
                 }
                 await self.ws_manager.emit_to_sid(sid, "select_own_secret", mensaje)
-                logger.info(f"✅ Notified player {target_player_id} to choose secret")
+                logger.debug("Notified player %s to choose secret", target_player_id)
                 break
     
     async def notificar_detective_action_complete(
@@ -265,7 +326,7 @@ class WebSocketService:
             "timestamp": datetime.now().isoformat()
         }
         await self.ws_manager.emit_to_room(room_id, "detective_action_complete", mensaje)
-        logger.info(f"✅ Broadcast detective action complete to room {room_id}")
+        logger.debug("Broadcast detective action complete to room %s", room_id)
     
     # ---------------
     # | EVENT CARDS | 
@@ -290,7 +351,7 @@ class WebSocketService:
             "timestamp": datetime.now().isoformat()
         }
         await self.ws_manager.emit_to_room(room_id, "event_action_started", mensaje)
-        logger.info(f"✅ Emitted event_action_started to room {room_id}")
+        logger.debug("Emitted event_action_started to room %s", room_id)
     
     async def notificar_event_step_update(
         self,
@@ -312,7 +373,7 @@ class WebSocketService:
             "timestamp": datetime.now().isoformat()
         }
         await self.ws_manager.emit_to_room(room_id, "event_step_update", mensaje)
-        logger.info(f"✅ Emitted event_step_update to room {room_id}: {step}")
+        logger.debug("Emitted event_step_update to room %s: %s", room_id, step)
     
     async def notificar_event_action_complete(
         self,
@@ -328,7 +389,7 @@ class WebSocketService:
             "timestamp": datetime.now().isoformat()
         }
         await self.ws_manager.emit_to_room(room_id, "event_action_complete", mensaje)
-        logger.info(f"✅ Emitted event_action_complete to room {room_id}")
+        logger.debug("Emitted event_action_complete to room %s", room_id)
 
     # ----------------
     # | DISCARD-DRAW |
@@ -349,8 +410,7 @@ class WebSocketService:
             "timestamp": datetime.now().isoformat()
         }
         await self.ws_manager.emit_to_room(room_id, "player_must_draw", mensaje)
-        logger.info(f"✅ Emitted player_must_draw to room {room_id}")
-        print(f"✅ Emitted player_must_draw to room {room_id}")
+        logger.debug("Emitted player_must_draw to room %s", room_id)
 
 
     async def notificar_card_drawn_simple(
@@ -370,7 +430,7 @@ class WebSocketService:
             "timestamp": datetime.now().isoformat()
         }
         await self.ws_manager.emit_to_room(room_id, "card_drawn_simple", mensaje)
-        logger.info(f"✅ Emitted card_drawn_simple to room {room_id}")
+        logger.debug("Emitted card_drawn_simple to room %s", room_id)
 
     async def notificar_turn_finished(
         self,
@@ -385,7 +445,41 @@ class WebSocketService:
             "timestamp": datetime.now().isoformat()
         }
         await self.ws_manager.emit_to_room(room_id, "turn_finished", mensaje)
-        logger.info(f"✅ Emitted turn_finished to room {room_id}: Player {player_id}")
+        logger.debug("Emitted turn_finished to room %s: Player %s", room_id, player_id)
+
+    async def notificar_turn_expired(
+        self,
+        room_id: int,
+        player_id: int,
+        next_player_id: int,
+        cancelled_actions: Optional[List[int]] = None
+    ):
+        """Notify all players that a turn ran out of time and was finished by the server"""
+        mensaje = {
+            "type": "turn_expired",
+            "player_id": player_id,
+            "next_player_id": next_player_id,
+            "cancelled_actions": cancelled_actions or [],
+            "timestamp": datetime.now().isoformat()
+        }
+        await self.ws_manager.emit_to_room(room_id, "turn_expired", mensaje)
+        logger.debug("Emitted turn_expired to room %s: Player %s", room_id, player_id)
+
+    async def notificar_action_expired(
+        self,
+        room_id: int,
+        action_id: int,
+        player_id: int
+    ):
+        """Notify all players that a pending action ran out of time and was cancelled"""
+        mensaje = {
+            "type": "action_expired",
+            "action_id": action_id,
+            "player_id": player_id,
+            "timestamp": datetime.now().isoformat()
+        }
+        await self.ws_manager.emit_to_room(room_id, "action_expired", mensaje)
+        logger.debug("Emitted action_expired to room %s: action %s", room_id, action_id)
 
     # ----------------------
     # | LOBBY - LEAVE GAME |
@@ -405,8 +499,9 @@ class WebSocketService:
             "room_id": room_id,
             "timestamp": timestamp
         }
+        self.ws_manager.presence.drop(room_id)
         await self.ws_manager.emit_to_room(room_id, "game_cancelled", mensaje)
-        logger.info(f"Emitted game_cancelled to room {room_id}")
+        logger.debug("Emitted game_cancelled to room %s", room_id)
     
     async def notificar_player_left(
         self,
@@ -427,8 +522,9 @@ class WebSocketService:
             "players": players,
             "timestamp": timestamp
         }
+        self.ws_manager.presence.set_players(room_id, players)
         await self.ws_manager.emit_to_room(room_id, "player_left", mensaje)
-        logger.info(f"Emitted player_left to room {room_id}: player {player_id} left")
+        logger.debug("Emitted player_left to room %s: player %s left", room_id, player_id)
 
 _websocket_service = None
 
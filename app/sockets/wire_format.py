@@ -0,0 +1,92 @@
+# app/sockets/wire_format.py
+"""
+Formato de los payloads WebSocket, negociado por conexión en el handshake
+(``?format=json|compact|msgpack&deflate=1``).
+
+- ``json``     payload tal cual (default, compatible con clientes existentes).
+- ``compact``  JSON sin la metadata de catálogo de cada carta: los dicts de carta
+               con ``cardId`` pierden ``name``, ``description``, ``img_src`` y
+               ``type``; el cliente los resuelve con el catálogo que cachea de
+               ``GET /api/cards/catalog``.
+- ``msgpack``  payload compacto codificado con MessagePack (binario). Usa el
+               paquete ``msgpack`` (requirements.txt); si falta en el entorno se
+               negocia ``compact``.
+
+Los valores sin representación nativa (``datetime``, enums, ``Decimal``) se
+serializan con ``str`` en todos los formatos, como en el JSON de Socket.IO.
+
+``deflate`` comprime con zlib el payload ya codificado y lo manda como binario.
+La compresión a nivel WebSocket (permessage-deflate) la negocian el cliente y
+uvicorn en el upgrade; ``deflate`` cubre long-polling y proxies que la quitan.
+"""
+import json
+import zlib
+from typing import Any, Tuple
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - depende del entorno
+    msgpack = None
+
+JSON = "json"
+COMPACT = "compact"
+MSGPACK = "msgpack"
+FORMATS = (JSON, COMPACT, MSGPACK)
+
+CATALOG_REF = "cardId"
+CATALOG_FIELDS = ("name", "description", "img_src", "type")
+
+
+def _fallback(value: Any) -> str:
+    """``default`` de los encoders: mismo texto en JSON y MessagePack"""
+    return str(value)
+
+
+def negotiate(requested: str, deflate: bool = False) -> Tuple[str, bool]:
+    """Formato efectivo para lo que pidió el cliente"""
+    requested = (requested or JSON).lower()
+    if requested not in FORMATS:
+        requested = JSON
+    if requested == MSGPACK and msgpack is None:
+        requested = COMPACT
+    return requested, bool(deflate)
+
+
+def is_plain(wire_format: str, deflate: bool) -> bool:
+    return wire_format == JSON and not deflate
+
+
+def compact_payload(data: Any) -> Any:
+    """Copia del payload sin la metadata de catálogo en los dicts de carta"""
+    if isinstance(data, dict):
+        is_card = CATALOG_REF in data
+        return {
+            k: compact_payload(v) for k, v in data.items()
+            if not (is_card and k in CATALOG_FIELDS)
+        }
+    if isinstance(data, (list, tuple)):
+        return [compact_payload(v) for v in data]
+    return data
+
+
+def encode(data: Any, wire_format: str = JSON, deflate: bool = False) -> Any:
+    """Payload listo para ``sio.emit`` en el formato de la conexión"""
+    if is_plain(wire_format, deflate):
+        return data
+    if wire_format != JSON:
+        data = compact_payload(data)
+    if wire_format == MSGPACK:
+        body = msgpack.packb(data, use_bin_type=True, default=_fallback)
+    elif deflate:
+        body = json.dumps(data, separators=(",", ":"), default=_fallback).encode()
+    else:
+        return data
+    return zlib.compress(body) if deflate else body
+
+
+def encoded_size(data: Any, wire_format: str = JSON, deflate: bool = False) -> int:
+    """Bytes del payload en el cable (JSON como lo serializa Socket.IO)"""
+    encoded = encode(data, wire_format, deflate)
+    if isinstance(encoded, (bytes, bytearray)):
+        return len(encoded)
+    return len(json.dumps(encoded, separators=(",", ":"), default=_fallback).encode())
@@ -7,4 +7,23 @@ def setup_test_environment():
     os.environ["DATABASE_URL"] = "sqlite:///:memory:"
     os.environ.setdefault("SECRET_KEY", "test-secret-key-123")
     
-    yield
\ No newline at end of file
+    yield
+
+@pytest.fixture(autouse=True)
+def clear_game_context_cache():
+    """El contexto de partida cacheado es global: cada test arranca sin contextos de otros"""
+    from app.services.game_context import get_game_context_cache
+    get_game_context_cache().clear()
+    yield
+    get_game_context_cache().clear()
+
+@pytest.fixture
+def game_context():
+    """Fábrica de GameContext: sala 1 (game 10) con el turno del jugador 1; los kwargs pisan campos"""
+    from app.services.game_context import GameContext
+
+    def make(**overrides):
+        fields = dict(room_id=1, game_id=10, has_game=True, player_ids=(1, 2), turn_player_id=1, current_turn_id=100)
+        fields.update(overrides)
+        return GameContext(**fields)
+    return make
@@ -5,10 +5,28 @@ from datetime import datetime
 
 from app.routes.another_victim import another_victim, VictimRequest
 from app.db.models import CardState, TurnStatus, ActionType, ActionResult
+from app.services.game_context import GameContext
 
 
 class TestAnotherVictim:
     """Tests para el endpoint another_victim"""
+
+    @pytest.fixture(autouse=True)
+    def game_context(self, monkeypatch):
+        """Contexto de partida: sala 1, juego 1, turno 1 del actor 10, víctima 20"""
+        state = {"context": GameContext(
+            room_id=1, game_id=1, has_game=True, player_ids=(10, 20),
+            turn_player_id=10, current_turn_id=1,
+        )}
+        monkeypatch.setattr(
+            'app.routes.another_victim.get_game_context',
+            lambda db, room_id: state["context"]
+        )
+        return state
+
+    def set_context(self, game_context, **overrides):
+        game_context["context"] = None if overrides.pop("missing", False) else \
+            GameContext(**{**game_context["context"].__dict__, **overrides})
     
     @pytest.fixture
     def mock_db(self):
@@ -18,6 +36,7 @@ class TestAnotherVictim:
         db.commit = Mock()
         db.flush = Mock()
         db.rollback = Mock()
+        db.get = Mock(return_value=Mock(id=1, player_turn_id=10))
         return db
     
     @pytest.fixture
@@ -153,11 +172,7 @@ class TestAnotherVictim:
         
         # Configurar respuestas en el orden exacto del código
         self.setup_query_chain(mock_db, [
-            mock_room,                  # Room query
-            mock_game,                  # Game query
-            mock_actor,                 # Actor query
-            mock_turn,                  # Turn query
-            mock_victim,                # Victim query
+            [mock_actor, mock_victim],  # Actor y víctima
             mock_victim_set_cards,      # victim_set_cards.all()
             mock_another_victim_card,   # Another Victim card query
             (5,)                        # max_discard_position
@@ -216,9 +231,9 @@ class TestAnotherVictim:
             assert call_args.kwargs['step'] == "set_stolen"
     
     @pytest.mark.asyncio
-    async def test_room_not_found(self, mock_db):
+    async def test_room_not_found(self, mock_db, game_context):
         """Test cuando no se encuentra la sala"""
-        self.setup_query_chain(mock_db, [None])
+        self.set_context(game_context, missing=True)
         
         request = VictimRequest(originalOwnerId=20, setPosition=1)
         
@@ -234,9 +249,9 @@ class TestAnotherVictim:
         assert "Room not found" in exc_info.value.detail
     
     @pytest.mark.asyncio
-    async def test_game_not_found(self, mock_db, mock_room):
+    async def test_game_not_found(self, mock_db, game_context):
         """Test cuando no se encuentra el juego"""
-        self.setup_query_chain(mock_db, [mock_room, None])
+        self.set_context(game_context, has_game=False)
         
         request = VictimRequest(originalOwnerId=20, setPosition=1)
         
@@ -252,9 +267,9 @@ class TestAnotherVictim:
         assert "Game not found" in exc_info.value.detail
     
     @pytest.mark.asyncio
-    async def test_actor_not_found(self, mock_db, mock_room, mock_game):
+    async def test_actor_not_found(self, mock_db, game_context):
         """Test cuando no se encuentra el actor"""
-        self.setup_query_chain(mock_db, [mock_room, mock_game, None])
+        self.set_context(game_context, player_ids=(20,))
         
         request = VictimRequest(originalOwnerId=20, setPosition=1)
         
@@ -270,11 +285,9 @@ class TestAnotherVictim:
         assert "Actor player not found" in exc_info.value.detail
     
     @pytest.mark.asyncio
-    async def test_not_player_turn(self, mock_db, mock_room, mock_game, mock_actor):
+    async def test_not_player_turn(self, mock_db, game_context):
         """Test cuando no es el turno del jugador"""
-        mock_game.player_turn_id = 999  # Different player
-        
-        self.setup_query_chain(mock_db, [mock_room, mock_game, mock_actor])
+        self.set_context(game_context, turn_player_id=999)  # Different player
         
         request = VictimRequest(originalOwnerId=20, setPosition=1)
         
@@ -290,9 +303,9 @@ class TestAnotherVictim:
         assert "Not your turn" in exc_info.value.detail
     
     @pytest.mark.asyncio
-    async def test_no_active_turn(self, mock_db, mock_room, mock_game, mock_actor):
+    async def test_no_active_turn(self, mock_db, game_context):
         """Test cuando no hay turno activo"""
-        self.setup_query_chain(mock_db, [mock_room, mock_game, mock_actor, None])
+        self.set_context(game_context, current_turn_id=None)
         
         request = VictimRequest(originalOwnerId=20, setPosition=1)
         
@@ -308,11 +321,9 @@ class TestAnotherVictim:
         assert "No active turn found" in exc_info.value.detail
     
     @pytest.mark.asyncio
-    async def test_victim_not_found(
-        self, mock_db, mock_room, mock_game, mock_actor, mock_turn
-    ):
+    async def test_victim_not_found(self, mock_db, game_context):
         """Test cuando no se encuentra la víctima"""
-        self.setup_query_chain(mock_db, [mock_room, mock_game, mock_actor, mock_turn, None])
+        self.set_context(game_context, player_ids=(10,))
         
         request = VictimRequest(originalOwnerId=20, setPosition=1)
         
@@ -328,11 +339,8 @@ class TestAnotherVictim:
         assert "Target player not found" in exc_info.value.detail
     
     @pytest.mark.asyncio
-    async def test_cannot_steal_from_yourself(
-        self, mock_db, mock_room, mock_game, mock_actor, mock_turn
-    ):
+    async def test_cannot_steal_from_yourself(self, mock_db):
         """Test cuando intentas robarte a ti mismo"""
-        self.setup_query_chain(mock_db, [mock_room, mock_game, mock_actor, mock_turn, mock_actor])
         
         request = VictimRequest(originalOwnerId=10, setPosition=1)
         
@@ -353,7 +361,7 @@ class TestAnotherVictim:
     ):
         """Test cuando no existe el set especificado"""
         self.setup_query_chain(mock_db, [
-            mock_room, mock_game, mock_actor, mock_turn, mock_victim, []
+            [mock_actor, mock_victim], []
         ])
         
         request = VictimRequest(originalOwnerId=20, setPosition=5)
@@ -378,7 +386,7 @@ class TestAnotherVictim:
         single_card = [Mock()]
         
         self.setup_query_chain(mock_db, [
-            mock_room, mock_game, mock_actor, mock_turn, mock_victim, single_card
+            [mock_actor, mock_victim], single_card
         ])
         
         request = VictimRequest(originalOwnerId=20, setPosition=1)
@@ -401,8 +409,7 @@ class TestAnotherVictim:
     ):
         """Test que se hace rollback en caso de error"""
         self.setup_query_chain(mock_db, [
-            mock_room, mock_game, mock_actor, mock_turn, 
-            mock_victim, mock_victim_set_cards, None, (5,)
+            [mock_actor, mock_victim], mock_victim_set_cards, None, (5,)
         ])
         
         mock_db.commit.side_effect = Exception("Database error")
@@ -427,8 +434,7 @@ class TestAnotherVictim:
     ):
         """Test que las cartas se transfieren correctamente"""
         self.setup_query_chain(mock_db, [
-            mock_room, mock_game, mock_actor, mock_turn, 
-            mock_victim, mock_victim_set_cards, 
+            [mock_actor, mock_victim], mock_victim_set_cards, 
             mock_another_victim_card, (5,)
         ])
         
@@ -465,8 +471,7 @@ class TestAnotherVictim:
     ):
         """Test cuando el jugador no tiene la carta Another Victim en la mano"""
         self.setup_query_chain(mock_db, [
-            mock_room, mock_game, mock_actor, mock_turn, 
-            mock_victim, mock_victim_set_cards, 
+            [mock_actor, mock_victim], mock_victim_set_cards, 
             None,  # No tiene la carta Another Victim
             None   # No hay max_discard_position (primera carta descartada)
         ])
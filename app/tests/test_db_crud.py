@@ -936,15 +936,16 @@ def test_get_action_by_id(db):
     db.commit()
     db.refresh(action)
     
-    # Obtener por ID
-    fetched_action = crud.get_action_by_id(db, action.id)
+    # Obtener por ID (desde que arrancó la partida)
+    started_at = crud.get_game_started_at(db, game.id)
+    fetched_action = crud.get_action_by_id(db, action.id, since=started_at)
     assert fetched_action is not None
     assert fetched_action.id == action.id
     assert fetched_action.action_name == "play_Poirot_set"
     assert fetched_action.result == models.ActionResult.PENDING
     
     # Acción inexistente
-    nonexistent = crud.get_action_by_id(db, 9999)
+    nonexistent = crud.get_action_by_id(db, 9999, since=started_at)
     assert nonexistent is None
 
 
@@ -986,21 +987,22 @@ def test_update_action_result(db):
     assert action.result == models.ActionResult.PENDING
     
     # Actualizar a SUCCESS
-    updated_action = crud.update_action_result(db, action.id, models.ActionResult.SUCCESS)
+    started_at = crud.get_game_started_at(db, game.id)
+    updated_action = crud.update_action_result(db, action.id, models.ActionResult.SUCCESS, since=started_at)
     db.commit()
     db.refresh(updated_action)
     
     assert updated_action.result == models.ActionResult.SUCCESS
     
     # Actualizar a FAILED
-    updated_action_2 = crud.update_action_result(db, action.id, models.ActionResult.FAILED)
+    updated_action_2 = crud.update_action_result(db, action.id, models.ActionResult.FAILED, since=started_at)
     db.commit()
     db.refresh(updated_action_2)
     
     assert updated_action_2.result == models.ActionResult.FAILED
     
     # Acción inexistente
-    nonexistent = crud.update_action_result(db, 9999, models.ActionResult.SUCCESS)
+    nonexistent = crud.update_action_result(db, 9999, models.ActionResult.SUCCESS, since=started_at)
     assert nonexistent is None
 
 
@@ -295,6 +295,42 @@ class TestDetectiveActionRoute:
         assert exc_info.value.status_code == 404
         assert "Action not found" in str(exc_info.value.detail)
     
+    @patch('app.routes.detective_action.get_websocket_service')
+    @patch('app.routes.detective_action.DetectiveActionService')
+    def test_version_conflict_returns_409(
+        self,
+        mock_service_class,
+        mock_ws_service,
+        setup_full_game,
+        db
+    ):
+        """Test que StaleDataError llega al handler global (409 reintentable) en vez de un 500"""
+        from fastapi.testclient import TestClient
+        from sqlalchemy.orm.exc import StaleDataError
+        from app.main import app
+        from app.routes.detective_action import get_db
+
+        data = setup_full_game
+        mock_service_class.return_value.execute_detective_action.side_effect = StaleDataError("game changed")
+        app.dependency_overrides[get_db] = lambda: db
+        try:
+            response = TestClient(app).post(
+                f"/api/game/{data['room'].id}/detective-action",
+                json={
+                    "actionId": data["action"].id,
+                    "executorId": data["player1"].id,
+                    "targetPlayerId": data["player2"].id,
+                    "secretId": data["secret"].id,
+                },
+            )
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 409
+        assert response.json()["detail"] == "version_conflict"
+        assert response.headers["Retry-After"] == "0"
+        mock_ws_service.assert_not_called()
+
     @pytest.mark.asyncio
     @patch('app.routes.detective_action.get_websocket_service')
     @patch('app.routes.detective_action.build_complete_game_state')
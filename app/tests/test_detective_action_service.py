@@ -202,9 +202,14 @@ def test_get_pending_action_wrong_game(db, setup_game_with_players):
     db.commit()
     db.refresh(action)
     
-    # Intentar obtenerla con otro game_id
+    # Intentar obtenerla con otra partida
+    other_game = models.Game()
+    db.add(other_game)
+    db.commit()
+    db.add(models.Room(name="Otra", status="INGAME", id_game=other_game.id, players_min=2, players_max=4))
+    db.commit()
     with pytest.raises(HTTPException) as exc_info:
-        service._get_pending_action(action.id, 9999)
+        service._get_pending_action(action.id, other_game.id)
     
     assert exc_info.value.status_code == 400
     assert "does not belong to this game" in str(exc_info.value.detail)
@@ -3,6 +3,7 @@ import pytest
 from unittest.mock import Mock, patch, AsyncMock, MagicMock
 from fastapi import HTTPException
 
+
 def test_discard_new_format_parsing():
     """Test que verifica el parsing del nuevo formato"""
     from app.schemas.discard_schema import CardWithOrder, DiscardRequest
@@ -110,11 +111,11 @@ async def test_discard_room_not_found():
     from app.schemas.discard_schema import DiscardRequest
     
     mock_db = Mock()
-    mock_db.query.return_value.filter.return_value.first.return_value = None
     
     request = DiscardRequest(card_ids=[{"order": 1, "card_id": 10}])
     
-    with pytest.raises(HTTPException) as exc_info:
+    with patch('app.routes.discard.get_game_context', return_value=None), \
+         pytest.raises(HTTPException) as exc_info:
         await discard_cards(room_id=999, request=request, user_id=1, db=mock_db)
     
     assert exc_info.value.status_code == 404
@@ -122,22 +123,19 @@ async def test_discard_room_not_found():
 
 
 @pytest.mark.asyncio
-async def test_discard_game_not_found():
+async def test_discard_game_not_found(game_context):
     """Test cuando el juego no existe"""
     from app.routes.discard import discard_cards
     from app.schemas.discard_schema import DiscardRequest
     from app.db.models import Room
     
     mock_db = Mock()
-    mock_room = Mock(spec=Room)
-    mock_room.id_game = 10
-    
-    # Primera query retorna room, segunda retorna None (game)
-    mock_db.query.return_value.filter.return_value.first.side_effect = [mock_room, None]
     
     request = DiscardRequest(card_ids=[{"order": 1, "card_id": 10}])
     
-    with pytest.raises(HTTPException) as exc_info:
+    # La sala existe pero no la fila de Game
+    with patch('app.routes.discard.get_game_context', return_value=game_context(has_game=False)), \
+         pytest.raises(HTTPException) as exc_info:
         await discard_cards(room_id=1, request=request, user_id=1, db=mock_db)
     
     assert exc_info.value.status_code == 404
@@ -145,25 +143,19 @@ async def test_discard_game_not_found():
 
 
 @pytest.mark.asyncio
-async def test_discard_not_your_turn():
+async def test_discard_not_your_turn(game_context):
     """Test cuando no es el turno del jugador"""
     from app.routes.discard import discard_cards
     from app.schemas.discard_schema import DiscardRequest
     from app.db.models import Room, Game
     
     mock_db = Mock()
-    mock_room = Mock(spec=Room)
-    mock_room.id_game = 10
-    
-    mock_game = Mock(spec=Game)
-    mock_game.id = 10
-    mock_game.player_turn_id = 2  # Turno del jugador 2
-    
-    mock_db.query.return_value.filter.return_value.first.side_effect = [mock_room, mock_game]
     
     request = DiscardRequest(card_ids=[{"order": 1, "card_id": 10}])
     
-    with pytest.raises(HTTPException) as exc_info:
+    # Turno del jugador 2
+    with patch('app.routes.discard.get_game_context', return_value=game_context(turn_player_id=2)), \
+         pytest.raises(HTTPException) as exc_info:
         await discard_cards(room_id=1, request=request, user_id=1, db=mock_db)  # Usuario 1 intenta
     
     assert exc_info.value.status_code == 403
@@ -171,25 +163,18 @@ async def test_discard_not_your_turn():
 
 
 @pytest.mark.asyncio
-async def test_discard_empty_card_list():
+async def test_discard_empty_card_list(game_context):
     """Test cuando la lista de cartas está vacía"""
     from app.routes.discard import discard_cards
     from app.schemas.discard_schema import DiscardRequest
     from app.db.models import Room, Game
     
     mock_db = Mock()
-    mock_room = Mock(spec=Room)
-    mock_room.id_game = 10
-    
-    mock_game = Mock(spec=Game)
-    mock_game.id = 10
-    mock_game.player_turn_id = 1
-    
-    mock_db.query.return_value.filter.return_value.first.side_effect = [mock_room, mock_game]
     
     request = DiscardRequest(card_ids=[])
     
-    with pytest.raises(HTTPException) as exc_info:
+    with patch('app.routes.discard.get_game_context', return_value=game_context()), \
+         pytest.raises(HTTPException) as exc_info:
         await discard_cards(room_id=1, request=request, user_id=1, db=mock_db)
     
     assert exc_info.value.status_code == 400
@@ -197,39 +182,24 @@ async def test_discard_empty_card_list():
 
 
 @pytest.mark.asyncio
-async def test_discard_invalid_cards():
+async def test_discard_invalid_cards(game_context):
     """Test cuando las cartas no son del jugador o no existen"""
     from app.routes.discard import discard_cards
     from app.schemas.discard_schema import DiscardRequest
     from app.db.models import Room, Game, CardsXGame
     
     mock_db = Mock()
-    mock_room = Mock(spec=Room)
-    mock_room.id_game = 10
     
-    mock_game = Mock(spec=Game)
-    mock_game.id = 10
-    mock_game.player_turn_id = 1
-    
-    # Setup queries: room, game, then player_cards query returns fewer cards
-    def query_side_effect(*args):
-        mock_query = Mock()
-        if len(mock_db.query.call_args_list) == 1:  # Room query
-            mock_query.filter.return_value.first.return_value = mock_room
-        elif len(mock_db.query.call_args_list) == 2:  # Game query
-            mock_query.filter.return_value.first.return_value = mock_game
-        else:  # Player cards query - returns only 1 card but request has 2
-            mock_query.filter.return_value.all.return_value = [Mock(spec=CardsXGame)]
-        return mock_query
-    
-    mock_db.query.side_effect = query_side_effect
+    # Sala y partida salen del contexto; la query de cartas devuelve 1 pero el request pide 2
+    mock_db.query.return_value.filter.return_value.all.return_value = [Mock(spec=CardsXGame)]
     
     request = DiscardRequest(card_ids=[
         {"order": 1, "card_id": 10},
         {"order": 2, "card_id": 11}
     ])
     
-    with pytest.raises(HTTPException) as exc_info:
+    with patch('app.routes.discard.get_game_context', return_value=game_context()), \
+         pytest.raises(HTTPException) as exc_info:
         await discard_cards(room_id=1, request=request, user_id=1, db=mock_db)
     
     assert exc_info.value.status_code == 400
@@ -240,19 +210,17 @@ async def test_discard_invalid_cards():
 @patch('app.routes.discard.build_complete_game_state')
 @patch('app.routes.discard.get_websocket_service')
 @patch('app.routes.discard.descartar_cartas')
-async def test_discard_success(mock_descartar, mock_ws, mock_build_state):
+async def test_discard_success(mock_descartar, mock_ws, mock_build_state, game_context):
     """Test exitoso de descarte de cartas"""
     from app.routes.discard import discard_cards
     from app.schemas.discard_schema import DiscardRequest
     from app.db.models import Room, Game, CardsXGame, CardState
     
     mock_db = Mock()
-    mock_room = Mock(spec=Room)
-    mock_room.id_game = 10
-    
     mock_game = Mock(spec=Game)
     mock_game.id = 10
     mock_game.player_turn_id = 1
+    mock_db.get.return_value = mock_game
     
     # Mock cartas
     mock_card1 = Mock(spec=CardsXGame)
@@ -302,37 +270,30 @@ async def test_discard_success(mock_descartar, mock_ws, mock_build_state):
         query_count[0] += 1
         mock_query = Mock()
         
-        if query_count[0] == 1:  # Room query
-            mock_filter = Mock()
-            mock_filter.first.return_value = mock_room
-            mock_query.filter.return_value = mock_filter
-        elif query_count[0] == 2:  # Game query
-            mock_filter = Mock()
-            mock_filter.first.return_value = mock_game
-            mock_query.filter.return_value = mock_filter
-        elif query_count[0] == 3:  # Player cards query (hand validation)
+        # Sala, partida y turno salen del contexto de partida
+        if query_count[0] == 1:  # Player cards query (hand validation)
             mock_filter = Mock()
             mock_filter.all.return_value = [mock_card1, mock_card2]
             mock_query.filter.return_value = mock_filter
-        elif query_count[0] == 4:  # Discarded cards query (with order_by)
+        elif query_count[0] == 2:  # Discarded cards query (with order_by)
             mock_filter = Mock()
             mock_order = Mock()
             mock_order.all.return_value = [mock_card1, mock_card2]
             mock_filter.order_by.return_value = mock_order
             mock_query.filter.return_value = mock_filter
-        elif query_count[0] == 5:  # All hand cards query
+        elif query_count[0] == 3:  # All hand cards query
             mock_filter = Mock()
             mock_filter.all.return_value = [mock_card3]
             mock_query.filter.return_value = mock_filter
-        elif query_count[0] == 6:  # Deck remaining count
+        elif query_count[0] == 4:  # Deck remaining count
             mock_filter = Mock()
             mock_filter.count.return_value = 15
             mock_query.filter.return_value = mock_filter
-        elif query_count[0] == 7:  # Discard count
+        elif query_count[0] == 5:  # Discard count
             mock_filter = Mock()
             mock_filter.count.return_value = 2
             mock_query.filter.return_value = mock_filter
-        elif query_count[0] == 8:  # All discarded cards query (with order_by)
+        elif query_count[0] == 6:  # All discarded cards query (with order_by)
             mock_filter = Mock()
             mock_order = Mock()
             mock_order.all.return_value = [mock_card1, mock_card2]
@@ -354,7 +315,8 @@ async def test_discard_success(mock_descartar, mock_ws, mock_build_state):
     ])
     
     # Execute
-    response = await discard_cards(room_id=1, request=request, user_id=1, db=mock_db)
+    with patch('app.routes.discard.get_game_context', return_value=game_context()):
+        response = await discard_cards(room_id=1, request=request, user_id=1, db=mock_db)
     
     # Verify response
     assert response is not None
@@ -4,6 +4,7 @@ from fastapi import HTTPException
 from app.routes import draft
 from app.services import draft_service
 
+
 def test_list_draft_cards_returns_list(monkeypatch):
     mock_deck = MagicMock()
     mock_deck.draft = [MagicMock(id=1), MagicMock(id=2)]
@@ -75,24 +76,26 @@ def test_pick_card_from_draft_not_found(monkeypatch):
     assert result is None
 
 @pytest.fixture
-def mock_db_game_room():
+def mock_db_game_room(game_context, monkeypatch):
     db = MagicMock()
     mock_game = MagicMock(player_turn_id=1)
     mock_room = MagicMock(id=77)
-    db.query().filter().first.side_effect = [mock_game, mock_room]
+    db.get.return_value = mock_game
+    monkeypatch.setattr(draft, "get_game_context_by_game", lambda db, game_id: game_context(room_id=77))
     db.query().filter().count.return_value = 3
     return db, mock_game, mock_room
 
 @pytest.mark.asyncio
-@pytest.mark.parametrize("side_effect, hand, status, detail", [
-    ([None, None], None, 404, "game_not_found"),
-    ([MagicMock(player_turn_id=99), None], MagicMock(cards=[1]), 403, "not_your_turn"),
-    ([MagicMock(player_turn_id=1), None], MagicMock(cards=[1,2,3,4,5,6]), 403, "must_discard_before_draft"),
-    ([MagicMock(player_turn_id=1), None], MagicMock(cards=[1,2]), 404, "Card not found in draft"),
+@pytest.mark.parametrize("overrides, hand, status, detail", [
+    (None, None, 404, "game_not_found"),  # sin contexto de partida
+    (dict(turn_player_id=99), MagicMock(cards=[1]), 403, "not_your_turn"),
+    ({}, MagicMock(cards=[1,2,3,4,5,6]), 403, "must_discard_before_draft"),
+    ({}, MagicMock(cards=[1,2]), 404, "Card not found in draft"),
 ])
-async def test_pick_card_errors(monkeypatch, side_effect, hand, status, detail):
+async def test_pick_card_errors(game_context, monkeypatch, overrides, hand, status, detail):
     db = MagicMock()
-    db.query().filter().first.side_effect = side_effect
+    context = None if overrides is None else game_context(room_id=77, **overrides)
+    monkeypatch.setattr(draft, "get_game_context_by_game", lambda db, game_id: context)
     monkeypatch.setattr(draft, "logger", MagicMock())
     monkeypatch.setattr(draft, "_build_hand_view", lambda *a, **kw: hand)
     monkeypatch.setattr(draft, "list_draft_cards", lambda *a, **kw: [MagicMock(id=99)])
@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+from app.sockets.event_buffer import EventLog, RoomEventBuffer
+
+
+def test_since_returns_only_missed_events_visible_to_player():
+    buffer = RoomEventBuffer(maxlen=10)
+    first = buffer.append("turn_finished", {"n": 1})
+    buffer.append("game_state_private", {"mano": []}, user_id=2)
+    buffer.append("game_state_private", {"mano": []}, user_id=1)
+    last = buffer.append("turn_finished", {"n": 2})
+
+    missed = buffer.since(first, user_id=1)
+
+    assert [(e.event, e.user_id) for e in missed] == [("game_state_private", 1), ("turn_finished", None)]
+    assert buffer.since(last, user_id=1) == []
+
+
+def test_since_reports_gap_when_buffer_overflowed():
+    buffer = RoomEventBuffer(maxlen=3)
+    first = buffer.append("e", {})
+    for _ in range(4):
+        buffer.append("e", {})
+
+    assert buffer.since(first, user_id=1) is None
+    # Justo antes del más viejo que queda: sin hueco
+    assert len(buffer.since(buffer.events[0].seq - 1, user_id=1)) == 3
+
+
+def test_seq_from_previous_process_is_a_gap():
+    old = RoomEventBuffer(maxlen=10)
+    stale_seq = old.append("e", {})
+    new = RoomEventBuffer(maxlen=10)
+    new.seq = stale_seq + 5_000  # buffer creado después
+    new.append("e", {})
+
+    assert new.since(stale_seq, user_id=1) is None
+    assert new.since(new.seq + 10, user_id=1) is None
+
+
+def test_event_log_keeps_most_recent_rooms():
+    log = EventLog(maxlen=5, max_rooms=2)
+    log.record(1, "e", {})
+    log.record(2, "e", {})
+    log.record(1, "e", {})
+    log.record(3, "e", {})
+
+    assert log.current_seq(2) is None
+    assert log.current_seq(1) is not None and log.current_seq(3) is not None
+    assert log.replay(2, 0, user_id=1) is None
+
+
+@pytest.mark.asyncio
+async def test_watch_wakes_on_record_and_notify():
+    log = EventLog(maxlen=10)
+
+    recorded = log.watch(1)
+    log.record(1, "game_state_public", {})
+    notified = log.watch(1)
+    log.notify(1)
+
+    assert recorded.is_set() and notified.is_set()
+    assert recorded is not notified  # cada cambio despierta a los que esperaban hasta ese momento
+
+
+@pytest.mark.asyncio
+async def test_watch_ignores_other_rooms():
+    log = EventLog(maxlen=10)
+    changed = log.watch(1)
+    log.record(2, "e", {})  # otra room no despierta
+    log.notify(3)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(changed.wait(), 0.05)
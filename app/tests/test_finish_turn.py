@@ -60,6 +60,7 @@ def test_finish_turn_success(mock_db, mock_get_db):
         return MagicMock()
 
     mock_db.query.side_effect = query_side_effect
+    mock_db.get.side_effect = lambda model, key: game if model is models.Game else room
     mock_db.commit = MagicMock()
     mock_db.refresh = MagicMock()
 
@@ -208,6 +209,7 @@ def test_finish_turn_handles_turn_transitions(mock_db, mock_get_db):
         return MagicMock()
 
     mock_db.query.side_effect = query_side_effect
+    mock_db.get.side_effect = lambda model, key: game if model is models.Game else room
     mock_db.commit = MagicMock()
     mock_db.refresh = MagicMock()
 
@@ -241,3 +243,52 @@ def test_finish_turn_handles_turn_transitions(mock_db, mock_get_db):
         assert hasattr(new_turn, 'start_time')
 
     app.dependency_overrides.clear()
+
+
+# ================================================================
+# VERSION CONFLICT
+# ================================================================
+
+def test_finish_turn_version_conflict_is_retryable(mock_db, mock_get_db):
+    from sqlalchemy.orm.exc import StaleDataError
+    from app.services.game_context import GameContext
+
+    app.dependency_overrides[get_db] = mock_get_db
+    context = GameContext(room_id=1, game_id=10, has_game=True, player_ids=(1, 2),
+                          turn_player_id=1, current_turn_id=5)
+
+    mock_db.get.return_value = models.Game(id=10, player_turn_id=1)
+
+    with patch("app.routes.finish_turn.get_game_context", return_value=context), \
+         patch("app.routes.finish_turn.avanzar_turno", side_effect=StaleDataError("game 10 changed")), \
+         patch("app.routes.finish_turn.get_websocket_service") as mock_ws:
+        response = client.post("/game/1/finish-turn", json={"user_id": 1})
+
+    assert response.status_code == 409
+    assert response.json()["detail"] == "version_conflict"
+    assert response.headers["Retry-After"] == "0"
+    mock_ws.assert_not_called()
+
+    app.dependency_overrides.clear()
+
+
+def test_finish_turn_with_stale_context_does_not_advance(mock_db, mock_get_db):
+    """El contexto cacheado dice que es el turno de 1 pero la fila de Game ya pasó a 2"""
+    from app.services.game_context import GameContext
+
+    app.dependency_overrides[get_db] = mock_get_db
+    context = GameContext(room_id=1, game_id=10, has_game=True, player_ids=(1, 2),
+                          turn_player_id=1, current_turn_id=5)
+    mock_db.get.return_value = models.Game(id=10, player_turn_id=2)
+
+    with patch("app.routes.finish_turn.get_game_context", return_value=context), \
+         patch("app.services.game_context.invalidate_game_context") as mock_invalidate, \
+         patch("app.routes.finish_turn.avanzar_turno") as mock_advance:
+        response = client.post("/game/1/finish-turn", json={"user_id": 1})
+
+    assert response.status_code == 409
+    assert response.json()["detail"] == "version_conflict"
+    mock_advance.assert_not_called()
+    mock_invalidate.assert_called_once_with(room_id=1)
+
+    app.dependency_overrides.clear()
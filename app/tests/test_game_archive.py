@@ -0,0 +1,166 @@
+import gzip
+import json
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db import crud, models
+from app.db.database import Base
+from app.services import game_archive
+from app.services.game_archive import GameArchiver
+
+engine = create_engine(
+    "sqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def archiver(tmp_path):
+    return GameArchiver(TestingSessionLocal, str(tmp_path / "archive"), batch_size=2)
+
+
+def _game(db, status):
+    game = crud.create_game(db, {"player_turn_id": None})
+    room = crud.create_room(db, {
+        "name": f"Sala {game.id}", "status": status, "players_min": 2, "players_max": 4, "id_game": game.id
+    })
+    player = crud.create_player(db, {"name": f"Ana {game.id}", "avatar_src": "a.png",
+                                     "birthdate": date(1990, 1, 1), "id_room": room.id, "is_host": True, "order": 1})
+    card = db.query(models.Card).first()
+    if card is None:
+        card = models.Card(name="Poirot", description="d", type=models.CardType.DETECTIVE, img_src="p.png", qty=1)
+        db.add(card)
+        db.flush()
+    turn = models.Turn(number=1, id_game=game.id, player_id=player.id, status=models.TurnStatus.FINISHED,
+                       start_time=datetime(2025, 1, 1, 12, 0))
+    db.add(turn)
+    db.flush()
+    cards = [
+        models.CardsXGame(id_game=game.id, id_card=card.id, is_in=models.CardState.DISCARD, position=i,
+                          player_id=None, hidden=False)
+        for i in range(3)
+    ]
+    db.add_all(cards)
+    db.flush()
+    parent = models.ActionsPerTurn(id_game=game.id, turn_id=turn.id, player_id=player.id,
+                                   action_type=models.ActionType.DETECTIVE_SET,
+                                   result=models.ActionResult.SUCCESS, selected_card_id=cards[0].id)
+    db.add(parent)
+    db.flush()
+    db.add(models.ActionsPerTurn(id_game=game.id, turn_id=turn.id, player_id=player.id,
+                                 action_type=models.ActionType.DETECTIVE_SET,
+                                 result=models.ActionResult.SUCCESS, parent_action_id=parent.id))
+    db.commit()
+    return game
+
+
+def _hot_rows(db, game_id):
+    return {
+        model.__tablename__: db.query(model).filter(model.id_game == game_id).count()
+        for model in (models.Turn, models.CardsXGame, models.ActionsPerTurn)
+    }
+
+
+def test_only_finished_games_are_archived(db, archiver):
+    finished = _game(db, models.RoomStatus.FINISH)
+    live = _game(db, models.RoomStatus.INGAME)
+
+    report = archiver.archive_finished()
+
+    assert report == {"games": [finished.id], "rows": {"turn": 1, "cardsXgame": 3, "actions_per_turn": 2}}
+    assert _hot_rows(db, finished.id) == {"turn": 0, "cardsXgame": 0, "actions_per_turn": 0}
+    assert _hot_rows(db, live.id) == {"turn": 1, "cardsXgame": 3, "actions_per_turn": 2}
+    assert db.get(models.Game, finished.id) is not None  # game/room/player quedan
+    assert archiver.pending_games() == []
+
+    with gzip.open(archiver.path(finished.id), "rb") as f:
+        document = json.loads(f.read())
+    assert document["game_id"] == finished.id
+    assert document["tables"]["turn"][0]["status"] == "FINISHED"
+
+
+def test_restore_brings_back_rows_and_links(db, archiver):
+    game = _game(db, models.RoomStatus.FINISH)
+    before = db.query(models.ActionsPerTurn).filter(models.ActionsPerTurn.id_game == game.id) \
+        .order_by(models.ActionsPerTurn.id).all()
+    expected = [(a.id, a.parent_action_id, a.selected_card_id, a.action_type) for a in before]
+    turn_start = db.query(models.Turn).filter(models.Turn.id_game == game.id).one().start_time
+
+    archiver.archive_game(game.id)
+    rows = archiver.restore_game(game.id)
+
+    db.expire_all()
+    assert rows == {"turn": 1, "cardsXgame": 3, "actions_per_turn": 2}
+    after = db.query(models.ActionsPerTurn).filter(models.ActionsPerTurn.id_game == game.id) \
+        .order_by(models.ActionsPerTurn.id).all()
+    assert [(a.id, a.parent_action_id, a.selected_card_id, a.action_type) for a in after] == expected
+    assert db.query(models.Turn).filter(models.Turn.id_game == game.id).one().start_time == turn_start
+    assert not archiver.is_archived(game.id)
+
+
+def _interrupt_purge(monkeypatch, at_call):
+    """El DELETE número ``at_call`` de purge_game falla (conexión cortada a mitad del borrado)"""
+    real_delete = game_archive.delete
+    calls = {"count": 0}
+
+    def flaky_delete(model):
+        calls["count"] += 1
+        if calls["count"] == at_call:
+            raise RuntimeError("conexión perdida")
+        return real_delete(model)
+
+    monkeypatch.setattr(game_archive, "delete", flaky_delete)
+    return lambda: monkeypatch.setattr(game_archive, "delete", real_delete)
+
+
+def test_interrupted_purge_resumes_without_overwriting_archive(db, archiver, monkeypatch):
+    game_id = _game(db, models.RoomStatus.FINISH).id
+    restore_delete = _interrupt_purge(monkeypatch, at_call=2)  # acciones borradas, cartas no
+
+    with pytest.raises(RuntimeError):
+        archiver.archive_game(game_id)
+    complete = archiver.load(game_id)
+    assert _hot_rows(db, game_id) == {"turn": 1, "cardsXgame": 3, "actions_per_turn": 0}
+    assert archiver.pending_games() == [game_id]
+
+    restore_delete()
+    report = archiver.archive_finished()
+
+    assert report == {"games": [game_id], "rows": {"turn": 1, "cardsXgame": 3, "actions_per_turn": 2}}
+    assert archiver.load(game_id) == complete
+    assert _hot_rows(db, game_id) == {"turn": 0, "cardsXgame": 0, "actions_per_turn": 0}
+    with pytest.raises(FileExistsError):
+        archiver.export_game(game_id)
+
+
+def test_restore_after_interrupted_purge(db, archiver, monkeypatch):
+    game_id = _game(db, models.RoomStatus.FINISH).id
+    parent_links = [a.parent_action_id for a in db.query(models.ActionsPerTurn)
+                    .filter(models.ActionsPerTurn.id_game == game_id).order_by(models.ActionsPerTurn.id)]
+    restore_delete = _interrupt_purge(monkeypatch, at_call=2)
+    with pytest.raises(RuntimeError):
+        archiver.archive_game(game_id)
+    restore_delete()
+
+    archiver.restore_game(game_id)
+
+    db.expire_all()
+    assert _hot_rows(db, game_id) == {"turn": 1, "cardsXgame": 3, "actions_per_turn": 2}
+    assert [a.parent_action_id for a in db.query(models.ActionsPerTurn)
+            .filter(models.ActionsPerTurn.id_game == game_id).order_by(models.ActionsPerTurn.id)] == parent_links
+    assert not archiver.is_archived(game_id)
@@ -0,0 +1,178 @@
+import pytest
+from datetime import date, datetime
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.database import Base
+from app.db.models import Game, Player, Room, RoomStatus, Turn, TurnStatus
+from app.services.game_context import GameContextCache
+from app.services import game_context as game_context_module
+from app.services.game_service import avanzar_turno
+
+engine = create_engine(
+    "sqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+
+@pytest.fixture
+def test_db():
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = TestingSessionLocal(bind=connection)
+    yield session
+    session.close()
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture
+def select_count():
+    """Cuenta los SELECT que llegan a la DB"""
+    counter = {"n": 0}
+
+    def on_execute(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            counter["n"] += 1
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    yield counter
+    event.remove(engine, "before_cursor_execute", on_execute)
+
+
+@pytest.fixture
+def game_in_progress(test_db):
+    """Sala con partida de 2 jugadores; turno 1 en curso del primero"""
+    game = Game()
+    test_db.add(game)
+    test_db.flush()
+    room = Room(name="Sala", status=RoomStatus.INGAME, id_game=game.id)
+    test_db.add(room)
+    test_db.flush()
+    players = [
+        Player(name=f"P{i}", avatar_src="a.png", birthdate=date(2000, 1, 1),
+               id_room=room.id, is_host=i == 1, order=i)
+        for i in (1, 2)
+    ]
+    test_db.add_all(players)
+    test_db.flush()
+    game.player_turn_id = players[0].id
+    turn = Turn(number=1, id_game=game.id, player_id=players[0].id,
+                status=TurnStatus.IN_PROGRESS, start_time=datetime.now())
+    test_db.add(turn)
+    test_db.commit()
+    return room, game, players, turn
+
+
+class TestGameContextCache:
+
+    def test_resolve_builds_context(self, test_db, game_in_progress):
+        room, game, players, turn = game_in_progress
+        context = GameContextCache(ttl=30).resolve(test_db, room.id)
+
+        assert context.game_id == game.id
+        assert context.has_game is True
+        assert context.player_ids == (players[0].id, players[1].id)
+        assert context.is_turn_of(players[0].id)
+        assert not context.is_turn_of(players[1].id)
+        assert context.current_turn_id == turn.id
+
+    def test_resolve_missing_room(self, test_db):
+        assert GameContextCache(ttl=30).resolve(test_db, 999999) is None
+
+    def test_cache_hit_skips_queries(self, test_db, game_in_progress, select_count):
+        room, game, _, _ = game_in_progress
+        cache = GameContextCache(ttl=30)
+        cache.resolve(test_db, room.id)
+        loaded = select_count["n"]
+
+        assert cache.resolve(test_db, room.id) is not None
+        assert cache.resolve_by_game(test_db, game.id).room_id == room.id
+        assert select_count["n"] == loaded
+        assert cache.hits == 2
+
+    def test_ttl_zero_disables_cache(self, test_db, game_in_progress, select_count):
+        room, _, _, _ = game_in_progress
+        cache = GameContextCache(ttl=0)
+        cache.resolve(test_db, room.id)
+        loaded = select_count["n"]
+
+        cache.resolve(test_db, room.id)
+        assert select_count["n"] > loaded
+        assert cache.hits == 0
+
+    def test_invalidate_by_game(self, test_db, game_in_progress):
+        room, game, _, _ = game_in_progress
+        cache = GameContextCache(ttl=30)
+        cache.resolve(test_db, room.id)
+
+        cache.invalidate(game_id=game.id)
+        cache.resolve(test_db, room.id)
+        assert cache.hits == 0
+        assert cache.misses == 2
+
+    def test_lru_evicts_oldest_room(self, test_db, game_in_progress):
+        room, game, _, _ = game_in_progress
+        cache = GameContextCache(ttl=30, max_rooms=1)
+        cache.resolve(test_db, room.id)
+        cache._put(game_context_module.GameContext(
+            room_id=room.id + 1000, game_id=None, has_game=False,
+            player_ids=(), turn_player_id=None, current_turn_id=None,
+        ))
+
+        assert room.id not in cache._rooms
+        assert game.id not in cache._room_by_game
+
+
+def test_avanzar_turno_invalidates_context(test_db, game_in_progress):
+    room, game, players, _ = game_in_progress
+    before = game_context_module.get_game_context(test_db, room.id)
+    assert before.is_turn_of(players[0].id)
+
+    avanzar_turno(test_db, room, game, players[0].id)
+
+    after = game_context_module.get_game_context(test_db, room.id)
+    assert after.is_turn_of(players[1].id)
+    assert after.current_turn_id != before.current_turn_id
+
+
+@pytest.mark.asyncio
+async def test_invalidations_reach_other_workers(test_db, game_in_progress):
+    import asyncio
+    from app.sockets.message_bus import InMemoryBroker
+
+    room, game, _, _ = game_in_progress
+    broker = InMemoryBroker()
+    cache_a, cache_b = GameContextCache(ttl=30), GameContextCache(ttl=30)
+    worker_a = game_context_module.ContextInvalidations(cache_a, broker, node_id="a")
+    worker_b = game_context_module.ContextInvalidations(cache_b, broker, node_id="b")
+    await worker_a.start()
+    await worker_b.start()
+    cache_a.resolve(test_db, room.id)
+    cache_b.resolve(test_db, room.id)
+
+    # El worker A cambia el turno desde un thread del executor
+    cache_a.invalidate(game_id=game.id)
+    await asyncio.to_thread(worker_a.publish, None, game.id)
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+    assert room.id not in cache_a._rooms
+    assert room.id not in cache_b._rooms
+    await worker_a.stop()
+    await worker_b.stop()
+
+
+def test_invalidate_game_context_publishes_with_bus(monkeypatch):
+    from unittest.mock import MagicMock
+
+    invalidations = MagicMock()
+    monkeypatch.setattr(game_context_module, "_invalidations", invalidations)
+
+    game_context_module.invalidate_game_context(room_id=3)
+
+    invalidations.publish.assert_called_once_with(3, None)
@@ -0,0 +1,194 @@
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from unittest.mock import patch
+
+from app.db import crud, models
+from app.db.database import Base
+from app.main import app
+from app.routes.game_history import get_db
+from app.services.game_archive import GameArchiver
+from app.services.game_context import GameContext
+from app.services.game_history_service import get_game_history
+from app.sharding import ShardRouter
+
+engine = create_engine(
+    "sqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def game(db):
+    """Partida con dos turnos: 1 (Ana) descarta 2 cartas y roba; 2 (Beto) juega un evento con hija y nieta"""
+    game = crud.create_game(db, {"player_turn_id": None})
+    room = crud.create_room(db, {"name": "Sala", "status": models.RoomStatus.INGAME, "id_game": game.id})
+    ana = crud.create_player(db, {"name": "Ana", "avatar_src": "a.png", "birthdate": date(1990, 1, 1),
+                                  "id_room": room.id, "is_host": True, "order": 1})
+    beto = crud.create_player(db, {"name": "Beto", "avatar_src": "b.png", "birthdate": date(1991, 1, 1),
+                                   "id_room": room.id, "is_host": False, "order": 2})
+    turn_1 = models.Turn(number=1, id_game=game.id, player_id=ana.id, status=models.TurnStatus.FINISHED)
+    turn_2 = models.Turn(number=2, id_game=game.id, player_id=beto.id)
+    db.add_all([turn_1, turn_2])
+    db.commit()
+
+    def action(turn, player, action_type, **extra):
+        row = crud.create_action(db, {"id_game": game.id, "turn_id": turn.id, "player_id": player.id,
+                                      "action_type": action_type, "result": models.ActionResult.SUCCESS, **extra})
+        db.commit()
+        return row.id
+
+    ids = {}
+    ids["discard"] = action(turn_1, ana, models.ActionType.DISCARD)
+    ids["discard_1"] = action(turn_1, ana, models.ActionType.DISCARD, parent_action_id=ids["discard"])
+    ids["discard_2"] = action(turn_1, ana, models.ActionType.DISCARD, parent_action_id=ids["discard"])
+    ids["draw"] = action(turn_1, ana, models.ActionType.DRAW)
+    ids["event"] = action(turn_2, beto, models.ActionType.EVENT_CARD, action_name="Another Victim")
+    ids["steal"] = action(turn_2, beto, models.ActionType.STEAL_SET, parent_action_id=ids["event"])
+    ids["move"] = action(turn_2, beto, models.ActionType.MOVE_CARD, parent_action_id=ids["steal"])
+    return {"room_id": room.id, "game_id": game.id, "turns": (turn_1.id, turn_2.id),
+            "players": (ana.id, beto.id), "ids": ids}
+
+
+def _ids(items):
+    return [item["id"] for item in items]
+
+
+def test_pages_roots_by_id_with_keyset_cursor(db, game):
+    ids = game["ids"]
+
+    first = get_game_history(db, game["game_id"], limit=2)
+    second = get_game_history(db, game["game_id"], after=first["next_cursor"], limit=2)
+
+    assert _ids(first["items"]) == [ids["discard"], ids["draw"]]
+    assert first["next_cursor"] == ids["draw"]
+    assert _ids(second["items"]) == [ids["event"]]
+    assert second["next_cursor"] is None
+
+
+def test_children_are_nested_with_one_query_per_level(db, game):
+    ids = game["ids"]
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        page = get_game_history(db, game["game_id"])
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    discard, draw, played = page["items"]
+    assert _ids(discard["children"]) == [ids["discard_1"], ids["discard_2"]]
+    assert draw["children"] == []
+    assert _ids(played["children"]) == [ids["steal"]]
+    assert _ids(played["children"][0]["children"]) == [ids["move"]]
+    # ids de raíces + hijas + nietas + (vacío) bisnietas y las filas completas por PK, sin importar
+    # cuántas acciones tenga la página
+    assert len(statements) == 5
+
+
+def test_page_ids_come_from_covering_indexes(db, game):
+    plans = []
+    listener = lambda conn, cursor, statement, *args: plans.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        get_game_history(db, game["game_id"], turn_id=game["turns"][1], action_type=models.ActionType.EVENT_CARD)
+        get_game_history(db, game["game_id"], player_id=game["players"][0])
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    # Todo menos la lectura final de filas completas (por PK) sale solo del índice
+    id_queries = [statement for statement in plans if "action_time" not in statement]
+    assert id_queries
+    with engine.connect() as conn:
+        for statement in id_queries:
+            plan = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, (None,) * statement.count("?"))
+            detail = " ".join(row[-1] for row in plan)
+            assert "COVERING INDEX ix_actions_game_" in detail, detail
+
+
+def test_filters_apply_to_roots(db, game):
+    ids = game["ids"]
+    turn_1, turn_2 = game["turns"]
+    ana, beto = game["players"]
+
+    assert _ids(get_game_history(db, game["game_id"], turn_id=turn_2)["items"]) == [ids["event"]]
+    assert _ids(get_game_history(db, game["game_id"], player_id=ana)["items"]) == [ids["discard"], ids["draw"]]
+    by_type = get_game_history(db, game["game_id"], action_type=models.ActionType.STEAL_SET)
+    assert by_type["items"] == []  # STEAL_SET solo aparece como hija
+
+
+@pytest.fixture
+def history_env(db, game, tmp_path):
+    def _get_test_db():
+        session = TestingSessionLocal()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    context = GameContext(room_id=game["room_id"], game_id=game["game_id"], has_game=True,
+                          player_ids=game["players"], turn_player_id=None, current_turn_id=None)
+    archiver = GameArchiver(TestingSessionLocal, str(tmp_path))
+    app.dependency_overrides[get_db] = _get_test_db
+    with patch("app.routes.game_history.get_game_context", return_value=context), \
+         patch("app.routes.game_history.get_game_archiver", return_value=archiver):
+        yield archiver
+    app.dependency_overrides.clear()
+
+
+def test_history_route_without_user_header(history_env, game):
+    ids = game["ids"]
+    url = f"/api/game/{game['room_id']}/history"
+
+    response = client.get(url, params={"limit": 1, "after": ids["discard"]})
+    body = response.json()
+
+    assert response.status_code == 200
+    assert body["archived"] is False
+    assert _ids(body["items"]) == [ids["draw"]]
+    assert body["next_cursor"] == ids["draw"]
+    assert client.get(url, params={"action_type": "NOPE"}).status_code == 422
+    assert client.get(url, params={"limit": 0}).status_code == 422
+
+
+def test_history_route_reads_archived_games(history_env, game):
+    ids = game["ids"]
+    live = client.get(f"/api/game/{game['room_id']}/history").json()
+    history_env.archive_game(game["game_id"])
+
+    archived = client.get(f"/api/game/{game['room_id']}/history").json()
+    filtered = client.get(f"/api/game/{game['room_id']}/history", params={"action_type": "EVENT_CARD"}).json()
+
+    assert archived["archived"] is True
+    assert archived["items"] == live["items"]
+    assert _ids(filtered["items"]) == [ids["event"]]
+    assert _ids(filtered["items"][0]["children"][0]["children"]) == [ids["move"]]
+
+
+def test_history_route_game_not_found(history_env):
+    with patch("app.routes.game_history.get_game_context", return_value=None):
+        response = client.get("/api/game/999/history")
+    assert response.status_code == 404
+
+
+def test_history_is_served_by_any_worker():
+    router = ShardRouter("w1", ["w1", "w2"])
+    assert router.room_id_for_path("/api/game/5/history") is None
+    assert router.room_id_for_path("/api/game/5/discard") == 5
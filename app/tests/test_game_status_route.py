@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import MagicMock, patch
+
+from app.main import app
+from app.routes.game_status import get_db
+from app.schemas.game_status_schema import DeckView, DiscardView, GameStateView, GameView, TurnInfo
+from app.sockets.event_buffer import EventLog
+
+client = TestClient(app)
+
+
+def _state():
+    return GameStateView(
+        game=GameView(id=10, name="Mesa", players_min=2, players_max=6, status="in_game", host_id=1),
+        players=[],
+        deck=DeckView(remaining=30),
+        discard=DiscardView(count=0),
+        turn=TurnInfo(current_player_id=1, order=[1, 2], can_act=True),
+    )
+
+
+@pytest.fixture
+def status_env(game_context):
+    """Contexto de partida, servicio de estado, Game.version y event log del ws manager mockeados"""
+    def _mock_get_db():
+        yield MagicMock()
+
+    app.dependency_overrides[get_db] = _mock_get_db
+    game = {"version": 7}
+    ws_manager = MagicMock(event_log=EventLog(maxlen=10))
+    with patch("app.routes.game_status.get_game_context", return_value=game_context()) as mock_context, \
+         patch("app.routes.game_status.get_game_status_service", return_value=_state()) as mock_service, \
+         patch("app.routes.game_status._game_version", side_effect=lambda db, game_id: game["version"]), \
+         patch("app.routes.game_status.get_ws_manager", return_value=ws_manager):
+        yield mock_context, mock_service, game
+    app.dependency_overrides.clear()
+
+
+def test_status_returns_etag(status_env):
+    _, mock_service, _ = status_env
+
+    response = client.get("/game_state/1", headers={"HTTP_USER_ID": "1"})
+
+    assert response.status_code == 200
+    assert response.json()["game"]["id"] == 10
+    assert response.headers["ETag"] == 'W/"10-7-1"'
+    mock_service.assert_called_once()
+
+
+def test_status_not_modified_skips_service(status_env):
+    _, mock_service, _ = status_env
+    etag = client.get("/game_state/1", headers={"HTTP_USER_ID": "1"}).headers["ETag"]
+    mock_service.reset_mock()
+
+    response = client.get("/game_state/1", headers={"HTTP_USER_ID": "1", "If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    mock_service.assert_not_called()
+
+
+def test_status_changes_with_game_version_and_per_player(status_env):
+    _, _, game = status_env
+    etag = client.get("/game_state/1", headers={"HTTP_USER_ID": "1"}).headers["ETag"]
+
+    other_player = client.get("/game_state/1", headers={"HTTP_USER_ID": "2", "If-None-Match": etag})
+    game["version"] += 1  # otra acción commiteada (en este u otro worker)
+    after_event = client.get("/game_state/1", headers={"HTTP_USER_ID": "1", "If-None-Match": etag})
+
+    assert other_player.status_code == 200
+    assert after_event.status_code == 200
+    assert after_event.headers["ETag"] != etag
+
+
+def test_status_rejects_non_member(status_env):
+    response = client.get("/game_state/1", headers={"HTTP_USER_ID": "99"})
+    assert response.status_code == 403
+
+
+def test_status_game_not_found(status_env):
+    mock_context, _, _ = status_env
+    mock_context.return_value = None
+
+    response = client.get("/game_state/1", headers={"HTTP_USER_ID": "1"})
+    assert response.status_code == 404
+
+
+def test_poll_returns_not_modified_on_timeout(status_env):
+    _, mock_service, _ = status_env
+    etag = client.get("/game_state/1", headers={"HTTP_USER_ID": "1"}).headers["ETag"]
+    mock_service.reset_mock()
+
+    response = client.get("/game_state/1/poll?timeout=0.05", headers={"HTTP_USER_ID": "1", "If-None-Match": etag})
+
+    assert response.status_code == 304
+    mock_service.assert_not_called()
+
+
+def test_poll_without_etag_returns_immediately(status_env):
+    response = client.get("/game_state/1/poll?timeout=5", headers={"HTTP_USER_ID": "1"})
+
+    assert response.status_code == 200
+    assert "ETag" in response.headers
+
+
+def test_poll_wakes_and_rereads_game_version(status_env):
+    _, mock_service, _ = status_env
+    etag = client.get("/game_state/1", headers={"HTTP_USER_ID": "1"}).headers["ETag"]
+    mock_service.reset_mock()
+    versions = iter([7, 8])  # otro worker commitea mientras el long-poll espera
+    woken = asyncio.Event()
+    woken.set()              # y el aviso llega por el bus
+
+    with patch("app.routes.game_status._game_version", side_effect=lambda db, game_id: next(versions)), \
+         patch.object(EventLog, "watch", return_value=woken) as mock_watch:
+        response = client.get("/game_state/1/poll?timeout=5", headers={"HTTP_USER_ID": "1", "If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] == 'W/"10-8-1"'
+    assert mock_watch.call_count == 2
+    mock_service.assert_called_once()
@@ -0,0 +1,102 @@
+import pytest
+from datetime import date
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm.exc import StaleDataError
+from sqlalchemy.pool import StaticPool
+
+from app.db import crud, models
+from app.db.database import Base
+from app.services.game_service import avanzar_turno
+
+engine = create_engine(
+    "sqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+def _game(db):
+    game = crud.create_game(db, {"player_turn_id": None})
+    room = crud.create_room(db, {
+        "name": "Sala", "status": models.RoomStatus.INGAME, "players_min": 2, "players_max": 4, "id_game": game.id
+    })
+    p1 = crud.create_player(db, {"name": "Ana", "avatar_src": "a.png", "birthdate": date(1990, 1, 1),
+                                 "id_room": room.id, "is_host": True, "order": 1})
+    p2 = crud.create_player(db, {"name": "Beto", "avatar_src": "b.png", "birthdate": date(1991, 1, 1),
+                                 "id_room": room.id, "is_host": False, "order": 2})
+    game.player_turn_id = p1.id
+    db.add(models.Turn(number=1, id_game=game.id, player_id=p1.id, status=models.TurnStatus.IN_PROGRESS))
+    db.commit()
+    return game, room, p1, p2
+
+
+def test_turn_change_bumps_version(db):
+    game, room, p1, p2 = _game(db)
+    version = game.version
+
+    avanzar_turno(db, room, game, p1.id)
+
+    assert game.version == version + 1
+    assert game.player_turn_id == p2.id
+
+
+def test_card_change_bumps_game_version(db):
+    game, room, p1, _ = _game(db)
+    version = game.version
+    card = models.Card(name="Poirot", description="d", type=models.CardType.DETECTIVE, img_src="p.png", qty=1)
+    db.add(card)
+    db.commit()
+
+    db.add(models.CardsXGame(id_game=game.id, id_card=card.id, is_in=models.CardState.HAND,
+                             position=1, player_id=p1.id))
+    db.commit()
+
+    assert db.get(models.Game, game.id).version == version + 1
+
+
+def test_concurrent_turn_change_conflicts(db):
+    game, room, p1, p2 = _game(db)
+    other = TestingSessionLocal()
+    try:
+        stale_game = other.get(models.Game, game.id)
+        stale_room = other.get(models.Room, room.id)
+
+        avanzar_turno(db, room, game, p1.id)
+
+        # El segundo finish-turn leyó la versión anterior: no pisa el cambio
+        with pytest.raises(StaleDataError):
+            avanzar_turno(other, stale_room, stale_game, p1.id)
+        other.rollback()
+    finally:
+        other.close()
+
+    db.expire_all()
+    game = db.get(models.Game, game.id)
+    assert game.player_turn_id == p2.id
+    turns = db.query(models.Turn).filter(models.Turn.id_game == game.id).all()
+    assert len(turns) == 2
+
+
+def test_second_commit_rereads_expired_game_version(db):
+    game, room, p1, p2 = _game(db)
+    avanzar_turno(db, room, game, p1.id)  # commitea: game queda expirada
+    version = db.get(models.Game, game.id).version
+
+    db.expire(game)
+    turn = db.query(models.Turn).filter(models.Turn.id_game == game.id).order_by(models.Turn.id.desc()).first()
+    turn.status = models.TurnStatus.FINISHED
+    db.commit()
+
+    assert game.version == version + 1
+    assert game.player_turn_id == p2.id
@@ -0,0 +1,167 @@
+import asyncio
+import time
+
+import httpx
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.database import Base
+from app.db.models import IdempotencyRecord
+from app.services import idempotency as idempotency_module
+from app.services.idempotency import IdempotencyStore, idempotent_actions, is_idempotent_path
+
+engine = create_engine(
+    "sqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = IdempotencyStore(ttl=60, max_keys=10)
+    monkeypatch.setattr(idempotency_module, "_store", store)
+    return store
+
+
+@pytest.fixture
+def calls():
+    return {"discard": 0}
+
+
+@pytest.fixture
+def client(store, calls):
+    app = FastAPI()
+    app.middleware("http")(idempotent_actions)
+
+    @app.post("/game/{room_id}/discard")
+    async def discard(room_id: int, body: dict):
+        calls["discard"] += 1
+        if body.get("fail") == "conflict":
+            raise HTTPException(status_code=409, detail="version_conflict")
+        if body.get("fail") == "forbidden":
+            raise HTTPException(status_code=403, detail="forbidden")
+        await asyncio.sleep(0)
+        return {"applied": calls["discard"], "cards": body.get("cards")}
+
+    return TestClient(app)
+
+
+def _post(client, key, body, user="7", path="/game/1/discard"):
+    headers = {"HTTP_USER_ID": user}
+    if key:
+        headers["Idempotency-Key"] = key
+    return client.post(path, json=body, headers=headers)
+
+
+def test_idempotent_paths():
+    assert is_idempotent_path("/game/3/discard")
+    assert is_idempotent_path("/game/3/take-deck")
+    assert is_idempotent_path("/game/9/draft/pick")
+    assert is_idempotent_path("/api/game/3/detective-action")
+    assert not is_idempotent_path("/game/3/finish-turn")
+    assert not is_idempotent_path("/api/game/3/play-detective-set")
+
+
+def test_retry_replays_original_response_without_running_again(client, calls, store):
+    first = _post(client, "k-1", {"cards": [1, 2]})
+    retry = _post(client, "k-1", {"cards": [1, 2]})
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json() == {"applied": 1, "cards": [1, 2]}
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert calls["discard"] == 1
+    assert store.stats()["hits"] == 1
+
+
+def test_without_key_every_request_runs(client, calls):
+    _post(client, None, {"cards": [1]})
+    _post(client, None, {"cards": [1]})
+    assert calls["discard"] == 2
+
+
+def test_key_is_scoped_by_user_and_room(client, calls):
+    _post(client, "k-1", {"cards": [1]}, user="7")
+    _post(client, "k-1", {"cards": [1]}, user="8")
+    _post(client, "k-1", {"cards": [1]}, path="/game/2/discard")
+    assert calls["discard"] == 3
+
+
+def test_same_key_with_other_body_is_rejected(client, calls, store):
+    _post(client, "k-1", {"cards": [1]})
+    response = _post(client, "k-1", {"cards": [2]})
+
+    assert response.status_code == 422
+    assert response.json()["detail"] == "idempotency_key_reused"
+    assert calls["discard"] == 1
+    assert store.conflicts == 1
+
+
+def test_final_errors_are_replayed_retryable_are_not(client, calls):
+    assert _post(client, "k-403", {"fail": "forbidden"}).status_code == 403
+    assert _post(client, "k-403", {"fail": "forbidden"}).status_code == 403
+    assert calls["discard"] == 1
+
+    assert _post(client, "k-409", {"fail": "conflict"}).status_code == 409
+    assert _post(client, "k-409", {"fail": "conflict"}).status_code == 409
+    assert calls["discard"] == 3
+
+
+def test_cache_is_bounded_and_expires(monkeypatch):
+    store = IdempotencyStore(ttl=60, max_keys=2)
+    for key in ("a", "b", "c"):
+        store.put(key, store.response(200, b"{}", "application/json", "f"))
+    assert store.get("a") is None
+    assert store.get("c") is not None
+
+    monkeypatch.setattr(idempotency_module.time, "time", lambda: time.monotonic() + 10 ** 10)
+    assert store.get("c") is None
+
+
+@pytest.mark.asyncio
+async def test_persisted_responses_survive_a_new_store():
+    store = IdempotencyStore(ttl=60, db_factory=TestingSessionLocal)
+    await store.store("k", store.response(200, b'{"ok": true}', "application/json", "f"))
+
+    fresh = IdempotencyStore(ttl=60, db_factory=TestingSessionLocal)
+    stored = await fresh.lookup("k")
+
+    assert stored.body == b'{"ok": true}'
+    assert stored.status_code == 200
+    assert fresh.get("k") is not None  # queda en memoria para el próximo reintento
+
+    db = TestingSessionLocal()
+    try:
+        assert db.get(IdempotencyRecord, "k") is not None
+    finally:
+        db.close()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_retries_with_slow_db_lookup_run_once(monkeypatch, store, calls, client):
+    def slow_load(key):
+        time.sleep(0.05)  # lookup en la DB (IDEMPOTENCY_PERSIST)
+        return None
+
+    store.db_factory = TestingSessionLocal
+    monkeypatch.setattr(store, "load", slow_load)
+    monkeypatch.setattr(store, "persist", lambda key, stored: None)
+    transport = httpx.ASGITransport(app=client.app)
+    headers = {"HTTP_USER_ID": "7", "Idempotency-Key": "k-race"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+        first, retry = await asyncio.gather(
+            http.post("/game/1/discard", json={"cards": [1]}, headers=headers),
+            http.post("/game/1/discard", json={"cards": [1]}, headers=headers),
+        )
+
+    assert calls["discard"] == 1
+    assert first.json() == retry.json() == {"applied": 1, "cards": [1]}
+    assert store.stats()["in_flight"] == 0
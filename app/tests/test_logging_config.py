@@ -0,0 +1,84 @@
+import json
+import logging
+import pytest
+from logging.handlers import QueueHandler
+
+from app import logging_config
+from app.config import _parse_module_levels
+from app.logging_config import JsonFormatter, setup_logging, shutdown_logging
+
+
+@pytest.fixture
+def clean_logging():
+    """Arranca cada test sin listener y restaura el estado del root logger"""
+    root = logging.getLogger()
+    previous_level = root.level
+    had_listener = logging_config._listener is not None
+    shutdown_logging()
+    yield
+    shutdown_logging()
+    logging.getLogger("app.test_module").setLevel(logging.NOTSET)
+    root.setLevel(previous_level)
+    if had_listener:
+        setup_logging(level=logging.getLevelName(previous_level))
+
+
+def test_parse_module_levels():
+    levels = _parse_module_levels("app.sockets=warning, app.routes.discard=DEBUG,invalido,=INFO")
+    assert levels == {"app.sockets": "WARNING", "app.routes.discard": "DEBUG"}
+    assert _parse_module_levels("") == {}
+
+
+def test_setup_logging_installs_queue_handler(clean_logging):
+    listener = setup_logging(level="WARNING", module_levels={"app.test_module": "DEBUG"})
+
+    root = logging.getLogger()
+    assert any(isinstance(h, QueueHandler) for h in root.handlers)
+    assert root.level == logging.WARNING
+    assert logging.getLogger("app.test_module").level == logging.DEBUG
+
+    # Idempotente: una segunda llamada reutiliza el listener
+    assert setup_logging(level="WARNING") is listener
+
+
+def test_shutdown_logging_removes_queue_handler(clean_logging):
+    setup_logging(level="INFO")
+    shutdown_logging()
+
+    assert logging_config._listener is None
+    assert not any(isinstance(h, QueueHandler) for h in logging.getLogger().handlers)
+
+
+def test_records_are_written_by_listener_thread(clean_logging, capsys):
+    setup_logging(level="INFO", module_levels={"app.test_module": "WARNING"})
+    logger = logging.getLogger("app.test_module")
+
+    logger.info("no deberia aparecer %s", "info")
+    logger.warning("carta %s descartada", 10)
+    shutdown_logging()  # vacía la cola
+
+    err = capsys.readouterr().err
+    assert "carta 10 descartada" in err
+    assert "no deberia aparecer" not in err
+
+
+def test_filtered_records_are_not_formatted(clean_logging):
+    setup_logging(level="WARNING")
+
+    class Explosive:
+        def __str__(self):
+            raise AssertionError("no se debe formatear")
+
+    logging.getLogger("app.test_module").debug("estado: %s", Explosive())
+
+
+def test_json_formatter_includes_extra_fields():
+    record = logging.LogRecord("app.x", logging.INFO, __file__, 1, "turno %s", (3,), None)
+    record.game_id = 7
+
+    payload = json.loads(JsonFormatter().format(record))
+
+    assert payload["msg"] == "turno 3"
+    assert payload["level"] == "INFO"
+    assert payload["logger"] == "app.x"
+    assert payload["game_id"] == 7
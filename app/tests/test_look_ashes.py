@@ -1,4 +1,5 @@
 import pytest
+from datetime import datetime
 from unittest.mock import Mock, patch, AsyncMock, MagicMock
 from fastapi.testclient import TestClient
 from app.db import models
@@ -6,72 +7,57 @@ from app.main import app
 
 client = TestClient(app)
 
+
+@pytest.fixture(autouse=True)
+def game_started_at():
+    """Inicio de la partida con que se acota la búsqueda de la acción padre"""
+    with patch('app.routes.look_ashes.crud.get_game_started_at', return_value=datetime(2026, 1, 1)):
+        yield
+
+
 def test_play_room_not_found():
     """Test que retorna 404 cuando la sala no existe"""
-    with patch('app.routes.look_ashes.crud.get_room_by_id', return_value=None):
+    with patch('app.routes.look_ashes.get_game_context', return_value=None):
         payload = {"card_id": 1}
         resp = client.post(f"/api/game/99999/look-into-ashes/play", json=payload, headers={"http-user-id": "1"})
         assert resp.status_code == 404
         assert resp.json()['detail'] == 'Room not found'
 
 
-def test_play_room_has_no_active_game():
+def test_play_room_has_no_active_game(game_context):
     """Test que retorna 400 cuando la sala no tiene juego activo"""
-    mock_room = Mock()
-    mock_room.id_game = None
-    
-    with patch('app.routes.look_ashes.crud.get_room_by_id', return_value=mock_room):
+    with patch('app.routes.look_ashes.get_game_context', return_value=game_context(game_id=None, has_game=False, turn_player_id=None, current_turn_id=None)):
         payload = {"card_id": 1}
         resp = client.post(f"/api/game/1/look-into-ashes/play", json=payload, headers={"http-user-id": "1"})
         assert resp.status_code == 400
         assert resp.json()['detail'] == 'Room has no active game'
 
 
-def test_play_game_not_found():
+def test_play_game_not_found(game_context):
     """Test que retorna 404 cuando el juego no existe"""
-    mock_room = Mock()
-    mock_room.id_game = 10
-    
-    with patch('app.routes.look_ashes.crud.get_room_by_id', return_value=mock_room), \
-         patch('app.routes.look_ashes.crud.get_game_by_id', return_value=None):
+    with patch('app.routes.look_ashes.get_game_context', return_value=game_context(has_game=False, turn_player_id=None, current_turn_id=None)):
         payload = {"card_id": 1}
         resp = client.post(f"/api/game/1/look-into-ashes/play", json=payload, headers={"http-user-id": "1"})
         assert resp.status_code == 404
         assert resp.json()['detail'] == 'Game not found'
 
 
-def test_play_not_your_turn():
+def test_play_not_your_turn(game_context):
     """Test que retorna 403 cuando no es el turno del jugador"""
-    mock_room = Mock()
-    mock_room.id_game = 10
-    
-    mock_game = Mock()
-    mock_game.player_turn_id = 2  # Different player
-    
-    with patch('app.routes.look_ashes.crud.get_room_by_id', return_value=mock_room), \
-         patch('app.routes.look_ashes.crud.get_game_by_id', return_value=mock_game):
+    with patch('app.routes.look_ashes.get_game_context', return_value=game_context(turn_player_id=2)):
         payload = {"card_id": 1}
         resp = client.post(f"/api/game/1/look-into-ashes/play", json=payload, headers={"http-user-id": "1"})
         assert resp.status_code == 403
         assert resp.json()['detail'] == 'Not your turn'
 
 
-def test_play_event_card_not_in_hand():
+def test_play_event_card_not_in_hand(game_context):
     """Test que retorna 404 cuando la carta de evento no está en la mano"""
-    mock_room = Mock()
-    mock_room.id = 1
-    mock_room.id_game = 10
-    
-    mock_game = Mock()
-    mock_game.id = 10
-    mock_game.player_turn_id = 1
-    
     # Mock query to return None (card not found)
     mock_query = MagicMock()
     mock_query.first.return_value = None
     
-    with patch('app.routes.look_ashes.crud.get_room_by_id', return_value=mock_room), \
-         patch('app.routes.look_ashes.crud.get_game_by_id', return_value=mock_game), \
+    with patch('app.routes.look_ashes.get_game_context', return_value=game_context()), \
          patch('app.routes.look_ashes.SessionLocal') as mock_db_class:
         
         mock_db = MagicMock()
@@ -84,16 +70,8 @@ def test_play_event_card_not_in_hand():
         assert resp.json()['detail'] == 'Event card not found in your hand'
 
 
-def test_play_card_not_event_type():
+def test_play_card_not_event_type(game_context):
     """Test que retorna 400 cuando la carta no es de tipo evento"""
-    mock_room = Mock()
-    mock_room.id = 1
-    mock_room.id_game = 10
-    
-    mock_game = Mock()
-    mock_game.id = 10
-    mock_game.player_turn_id = 1
-    
     # Mock card entry que no es de tipo EVENT
     mock_card_obj = Mock()
     mock_card_obj.type = models.CardType.INSTANT
@@ -104,8 +82,7 @@ def test_play_card_not_event_type():
     mock_query = MagicMock()
     mock_query.first.return_value = mock_card_entry
     
-    with patch('app.routes.look_ashes.crud.get_room_by_id', return_value=mock_room), \
-         patch('app.routes.look_ashes.crud.get_game_by_id', return_value=mock_game), \
+    with patch('app.routes.look_ashes.get_game_context', return_value=game_context()), \
          patch('app.routes.look_ashes.SessionLocal') as mock_db_class:
         
         mock_db = MagicMock()
@@ -118,16 +95,8 @@ def test_play_card_not_event_type():
         assert resp.json()['detail'] == 'Card is not an event card'
 
 
-def test_play_no_current_turn():
+def test_play_no_current_turn(game_context):
     """Test que retorna 400 cuando no hay turno activo"""
-    mock_room = Mock()
-    mock_room.id = 1
-    mock_room.id_game = 10
-    
-    mock_game = Mock()
-    mock_game.id = 10
-    mock_game.player_turn_id = 1
-    
     # Mock event card entry
     mock_card_obj = Mock()
     mock_card_obj.type = models.CardType.EVENT
@@ -144,9 +113,7 @@ def test_play_no_current_turn():
     mock_query2 = MagicMock()
     mock_query2.limit.return_value.all.return_value = [mock_discard_card]
     
-    with patch('app.routes.look_ashes.crud.get_room_by_id', return_value=mock_room), \
-         patch('app.routes.look_ashes.crud.get_game_by_id', return_value=mock_game), \
-         patch('app.routes.look_ashes.crud.get_current_turn', return_value=None), \
+    with patch('app.routes.look_ashes.get_game_context', return_value=game_context(current_turn_id=None)), \
          patch('app.routes.look_ashes.SessionLocal') as mock_db_class:
         
         mock_db = MagicMock()
@@ -162,69 +129,48 @@ def test_play_no_current_turn():
 
 def test_select_room_not_found():
     """Test que retorna 404 cuando la sala no existe en select"""
-    with patch('app.routes.look_ashes.crud.get_room_by_id', return_value=None):
+    with patch('app.routes.look_ashes.get_game_context', return_value=None):
         payload = {"action_id": 1, "selected_card_id": 1}
         resp = client.post(f"/api/game/999999/look-into-ashes/select", json=payload, headers={"http-user-id": "1"})
         assert resp.status_code == 404
 
 
-def test_select_game_not_found():
+def test_select_game_not_found(game_context):
     """Test que retorna 404 cuando el juego no existe en select"""
-    mock_room = Mock()
-    mock_room.id_game = 10
-    
-    with patch('app.routes.look_ashes.crud.get_room_by_id', return_value=mock_room), \
-         patch('app.routes.look_ashes.crud.get_game_by_id', return_value=None):
+    with patch('app.routes.look_ashes.get_game_context', return_value=game_context(has_game=False, turn_player_id=None, current_turn_id=None)):
         payload = {"action_id": 1, "selected_card_id": 1}
         resp = client.post(f"/api/game/1/look-into-ashes/select", json=payload, headers={"http-user-id": "1"})
         assert resp.status_code == 404
 
 
-def test_select_parent_action_not_found():
+def test_select_parent_action_not_found(game_context):
     """Test que retorna 404 cuando la acción padre no existe"""
-    mock_room = Mock()
-    mock_room.id_game = 10
-    
-    mock_game = Mock()
-    
-    with patch('app.routes.look_ashes.crud.get_room_by_id', return_value=mock_room), \
-         patch('app.routes.look_ashes.crud.get_game_by_id', return_value=mock_game), \
+    with patch('app.routes.look_ashes.get_game_context', return_value=game_context()), \
          patch('app.routes.look_ashes.crud.get_action_by_id', return_value=None):
         payload = {"action_id": 999, "selected_card_id": 1}
         resp = client.post(f"/api/game/1/look-into-ashes/select", json=payload, headers={"http-user-id": "1"})
         assert resp.status_code == 404
 
 
-def test_select_parent_action_invalid():
+def test_select_parent_action_invalid(game_context):
     """Test que retorna 400 cuando la acción padre es inválida"""
-    mock_room = Mock()
-    mock_room.id_game = 10
-    
-    mock_game = Mock()
-    
     mock_action = Mock()
     mock_action.id_game = 11  # Different game
     mock_action.player_id = 1
     mock_action.action_name = models.ActionName.LOOK_INTO_THE_ASHES.value
     mock_action.result = models.ActionResult.SUCCESS
     
-    with patch('app.routes.look_ashes.crud.get_room_by_id', return_value=mock_room), \
-         patch('app.routes.look_ashes.crud.get_game_by_id', return_value=mock_game), \
+    with patch('app.routes.look_ashes.get_game_context', return_value=game_context()), \
          patch('app.routes.look_ashes.crud.get_action_by_id', return_value=mock_action):
         payload = {"action_id": 1, "selected_card_id": 1}
         resp = client.post(f"/api/game/1/look-into-ashes/select", json=payload, headers={"http-user-id": "1"})
         assert resp.status_code == 400
 
 
-def test_select_action_expired():
+def test_select_action_expired(game_context):
     """Test que retorna 400 cuando la acción está expirada"""
     from datetime import datetime, timedelta
     
-    mock_room = Mock()
-    mock_room.id_game = 10
-    
-    mock_game = Mock()
-    
     mock_action = Mock()
     mock_action.id_game = 10
     mock_action.player_id = 1
@@ -232,8 +178,7 @@ def test_select_action_expired():
     mock_action.result = models.ActionResult.SUCCESS
     mock_action.action_time = datetime.now() - timedelta(minutes=11)  # Expired
     
-    with patch('app.routes.look_ashes.crud.get_room_by_id', return_value=mock_room), \
-         patch('app.routes.look_ashes.crud.get_game_by_id', return_value=mock_game), \
+    with patch('app.routes.look_ashes.get_game_context', return_value=game_context()), \
          patch('app.routes.look_ashes.crud.get_action_by_id', return_value=mock_action):
         payload = {"action_id": 1, "selected_card_id": 1}
         resp = client.post(f"/api/game/1/look-into-ashes/select", json=payload, headers={"http-user-id": "1"})
@@ -241,15 +186,10 @@ def test_select_action_expired():
         assert resp.json()['detail'] == 'Action expired'
 
 
-def test_select_card_not_found():
+def test_select_card_not_found(game_context):
     """Test que retorna 400 cuando la carta seleccionada no está en discard"""
     from datetime import datetime
     
-    mock_room = Mock()
-    mock_room.id_game = 10
-    
-    mock_game = Mock()
-    
     mock_action = Mock()
     mock_action.id_game = 10
     mock_action.player_id = 1
@@ -261,8 +201,7 @@ def test_select_card_not_found():
     mock_query = MagicMock()
     mock_query.first.return_value = None
     
-    with patch('app.routes.look_ashes.crud.get_room_by_id', return_value=mock_room), \
-         patch('app.routes.look_ashes.crud.get_game_by_id', return_value=mock_game), \
+    with patch('app.routes.look_ashes.get_game_context', return_value=game_context()), \
          patch('app.routes.look_ashes.crud.get_action_by_id', return_value=mock_action), \
          patch('app.routes.look_ashes.SessionLocal') as mock_db_class:
         
@@ -0,0 +1,85 @@
+import asyncio
+import time
+import traceback
+
+import pytest
+
+from app.loop_monitor import LoopMonitor, attribute
+from app.readiness import measure_loop_lag
+
+
+def test_stats_track_lag_and_stalls():
+    monitor = LoopMonitor(threshold=0.1)
+    for lag in (0.01, 0.02, 0.3, -0.001):
+        monitor.record(lag)
+
+    stats = monitor.stats()
+    assert stats["samples"] == 4
+    assert stats["stalls"] == 1
+    assert stats["max_lag_ms"] == 300.0
+    assert monitor.lag_ms(last=1) == 0.0
+
+
+def test_attribute_picks_innermost_handler():
+    frames = [
+        traceback.FrameSummary("/srv/venv/starlette/routing.py", 10, "app"),
+        traceback.FrameSummary("/srv/project/app/routes/discard.py", 80, "discard_cards"),
+        traceback.FrameSummary("/srv/project/app/services/discard.py", 30, "descartar_cartas"),
+        traceback.FrameSummary("/srv/venv/sqlalchemy/orm/query.py", 200, "all"),
+    ]
+    assert attribute(frames) == "app/routes/discard.py:discard_cards"
+    assert attribute(frames[:1]) is None
+
+
+@pytest.mark.asyncio
+async def test_sampler_measures_blocked_loop():
+    monitor = LoopMonitor(interval=0.01, threshold=0.05)
+    monitor.start()
+    try:
+        await asyncio.sleep(0.03)
+        time.sleep(0.12)  # bloquea el loop
+        await asyncio.sleep(0.03)
+    finally:
+        await monitor.stop()
+
+    assert monitor.stats()["max_lag_ms"] >= 100
+    assert monitor.stalls >= 1
+
+
+def _blocking_call():
+    time.sleep(0.25)
+
+
+@pytest.mark.asyncio
+async def test_debug_watchdog_reports_blocking_stack():
+    monitor = LoopMonitor(interval=0.01, threshold=0.05, debug=True)
+    monitor.start()
+    try:
+        await asyncio.sleep(0.03)
+        _blocking_call()
+        await asyncio.sleep(0.1)
+    finally:
+        await monitor.stop()
+
+    reports = monitor.blocking_reports()
+    assert len(reports) == 1
+    assert "_blocking_call" in "".join(reports[0]["stack"])
+    assert reports[0]["blocked_ms"] >= 200
+
+
+@pytest.mark.asyncio
+async def test_readiness_uses_monitor_lag():
+    monitor = LoopMonitor()
+    monitor.record(0.5)
+
+    check = await measure_loop_lag(monitor)
+    assert check["lag_ms"] == 500.0
+    assert check["ok"] is False
+
+
+def test_debug_route_only_mounted_in_debug_mode():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    # Los tests corren sin LOOP_BLOCK_DEBUG
+    assert TestClient(app).get("/debug/loop").status_code == 404
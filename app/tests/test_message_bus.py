@@ -0,0 +1,195 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+import socketio
+
+from app.sockets.message_bus import BusClientManager, InMemoryBroker, create_message_bus
+from app.sockets.session_registry import SessionRegistry
+from app.sockets.socket_manager import WebSocketManager
+
+
+async def _settle():
+    # Deja correr a los listeners del broker en memoria
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+# ----------------------
+# | Broker / factory   |
+# ----------------------
+
+def test_create_message_bus_backends():
+    assert create_message_bus("") is None
+    assert isinstance(create_message_bus("memory://"), InMemoryBroker)
+    with pytest.raises(ValueError):
+        create_message_bus("kafka://localhost")
+
+
+@pytest.mark.asyncio
+async def test_in_memory_broker_delivers_copies_to_every_subscriber():
+    broker = InMemoryBroker()
+    sub_a = await broker.subscribe("canal")
+    sub_b = await broker.subscribe("canal")
+    message = {"event": "x", "data": [1, 2]}
+
+    await broker.publish("canal", message)
+    received_a = await sub_a.__anext__()
+    received_b = await sub_b.__anext__()
+
+    assert received_a == received_b == message
+    assert received_a is not message
+
+    await sub_a.aclose()
+    assert broker.subscriber_count("canal") == 1
+
+
+# ----------------------
+# | SessionRegistry    |
+# ----------------------
+
+@pytest.mark.asyncio
+async def test_registry_without_bus_behaves_like_dict():
+    registry = SessionRegistry()
+    await registry.start()
+    registry["sid1"] = {"room_id": 1, "user_id": 5}
+
+    assert dict(registry) == {"sid1": {"room_id": 1, "user_id": 5}}
+    del registry["sid1"]
+    assert len(registry) == 0
+
+
+@pytest.mark.asyncio
+async def test_registry_replicates_between_workers():
+    broker = InMemoryBroker()
+    worker_a = SessionRegistry(broker, node_id="a")
+    worker_b = SessionRegistry(broker, node_id="b")
+    await worker_a.start()
+    await worker_b.start()
+
+    worker_a["sid-a"] = {"room_id": 3, "user_id": 10}
+    worker_b["sid-b"] = {"room_id": 3, "user_id": 11}
+    await worker_a.flush()
+    await worker_b.flush()
+    await _settle()
+
+    assert set(worker_a) == set(worker_b) == {"sid-a", "sid-b"}
+    assert worker_b.local_sids() == ["sid-b"]
+
+    del worker_a["sid-a"]
+    await worker_a.flush()
+    await _settle()
+    assert "sid-a" not in worker_b
+
+    await worker_a.stop()
+    await worker_b.stop()
+
+
+@pytest.mark.asyncio
+async def test_registry_late_worker_syncs_and_node_down_drops_sessions():
+    broker = InMemoryBroker()
+    worker_a = SessionRegistry(broker, node_id="a")
+    await worker_a.start()
+    worker_a["sid-a"] = {"room_id": 1, "user_id": 1}
+    await worker_a.flush()
+
+    # Arranca después: recibe el estado por sync_request
+    worker_b = SessionRegistry(broker, node_id="b")
+    await worker_b.start()
+    await worker_b.flush()
+    await _settle()
+    await worker_a.flush()
+    await _settle()
+    assert worker_b["sid-a"] == {"room_id": 1, "user_id": 1}
+
+    await worker_a.stop()
+    await _settle()
+    assert "sid-a" not in worker_b
+    await worker_b.stop()
+
+
+@pytest.mark.asyncio
+async def test_registry_expires_sessions_of_a_node_that_stops_beating():
+    broker = InMemoryBroker()
+    worker_a = SessionRegistry(broker, node_id="a", heartbeat_interval=0.01, node_ttl=0.05)
+    worker_b = SessionRegistry(broker, node_id="b", heartbeat_interval=0.01, node_ttl=0.05)
+    await worker_a.start()
+    await worker_b.start()
+    worker_a["sid-a"] = {"room_id": 1, "user_id": 1}
+    await worker_a.flush()
+
+    # Mientras late, sus sesiones siguen aunque pase más de un TTL
+    await asyncio.sleep(0.1)
+    assert "sid-a" in worker_b
+
+    # Muere sin node_down: deja de latir y vence
+    for task in worker_a._tasks:
+        task.cancel()
+    await asyncio.gather(*worker_a._tasks, return_exceptions=True)
+    await asyncio.sleep(0.1)
+    assert "sid-a" not in worker_b
+    await worker_b.stop()
+
+
+# ---------------------------------------------
+# | Dos AsyncServer compartiendo el broker    |
+# ---------------------------------------------
+
+async def _server_with_socket(broker, node_id, room):
+    sio = socketio.AsyncServer(async_mode="asgi", client_manager=BusClientManager(broker))
+    sio._send_eio_packet = AsyncMock()
+    sio.manager.initialize()
+    sio.manager_initialized = True
+    sid = await sio.manager.connect(f"eio-{node_id}", "/")
+    await sio.manager.enter_room(sid, "/", room)
+    manager = WebSocketManager(sio, MagicMock(), SessionRegistry(broker, node_id=node_id))
+    await manager.start()
+    return sio, manager, sid
+
+
+@pytest.mark.asyncio
+async def test_room_broadcast_and_sids_span_workers():
+    broker = InMemoryBroker()
+    sio_a, manager_a, sid_a = await _server_with_socket(broker, "a", "game_7")
+    sio_b, manager_b, sid_b = await _server_with_socket(broker, "b", "game_7")
+
+    manager_a.user_sessions[sid_a] = {"room_id": 7, "user_id": 1}
+    manager_b.user_sessions[sid_b] = {"room_id": 7, "user_id": 2}
+    await manager_a.user_sessions.flush()
+    await manager_b.user_sessions.flush()
+    await _settle()
+
+    assert sorted(manager_a.get_sids_in_game(7)) == sorted([sid_a, sid_b])
+
+    # Un emit desde el worker A llega al socket conectado al worker B
+    await manager_a.emit_to_room(7, "game_state_public", {"turno": 1})
+    await _settle()
+
+    sio_a._send_eio_packet.assert_awaited_once()
+    sio_b._send_eio_packet.assert_awaited_once()
+    assert sio_b._send_eio_packet.await_args.args[0] == "eio-b"
+
+    for sio, manager in ((sio_a, manager_a), (sio_b, manager_b)):
+        await manager.stop()
+        sio.manager.thread.cancel()
+
+
+@pytest.mark.asyncio
+async def test_room_change_wakes_long_polls_on_other_workers():
+    broker = InMemoryBroker()
+    sio_a, manager_a, _ = await _server_with_socket(broker, "a", "game_7")
+    sio_b, manager_b, _ = await _server_with_socket(broker, "b", "game_7")
+    waiting_b = manager_b.event_log.watch(7)
+    other_room = manager_b.event_log.watch(8)
+
+    async with manager_a.outbox():
+        await manager_a.emit_to_room(7, "game_state_public", {"turno": 2})
+    await _settle()
+
+    assert waiting_b.is_set()
+    assert not other_room.is_set()
+    assert manager_b.event_log.current_seq(7) is None  # solo el aviso: el evento no se bufferea en B
+
+    for sio, manager in ((sio_a, manager_a), (sio_b, manager_b)):
+        await manager.stop()
+        sio.manager.thread.cancel()
@@ -0,0 +1,81 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import socketio
+
+from app.sockets.outbound import OutboundManager
+
+
+async def _server(**limits):
+    manager = OutboundManager(poll_interval=0.001, **limits)
+    sio = socketio.AsyncServer(async_mode="asgi", client_manager=manager)
+    sio._send_eio_packet = AsyncMock()
+    sio.manager_initialized = True
+    sockets = {}
+    for name in ("fast", "slow"):
+        sid = await manager.connect(f"eio-{name}", "/")
+        await manager.enter_room(sid, "/", "game_1")
+        sio.eio.sockets[f"eio-{name}"] = SimpleNamespace(queue=asyncio.Queue())
+        sockets[name] = sid
+    return sio, manager, sockets
+
+
+def _delivered_to(sio, eio_sid):
+    return [c.args[1].data for c in sio._send_eio_packet.await_args_list if c.args[0] == eio_sid]
+
+
+@pytest.mark.asyncio
+async def test_healthy_connections_are_delivered_directly():
+    sio, manager, _ = await _server(backlog=2, queue_max=5, slow_after=60)
+
+    await sio.emit("turn_finished", {"n": 1}, room="game_1")
+
+    assert sio._send_eio_packet.await_count == 2
+    assert manager.stats()["queued"] == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_connection_gets_latest_snapshot_only_and_in_order():
+    sio, manager, sids = await _server(backlog=2, queue_max=5, slow_after=60)
+    backlog = sio.eio.sockets["eio-slow"].queue
+    backlog.put_nowait("p1")
+    backlog.put_nowait("p2")
+
+    await sio.emit("game_state_public", {"v": 1}, room="game_1")
+    await sio.emit("card_drawn_simple", {"n": 1}, room="game_1")
+    await sio.emit("game_state_public", {"v": 2}, room="game_1")
+
+    # El rápido recibe todo; el lento, nada mientras su transporte esté lleno
+    assert len(_delivered_to(sio, "eio-fast")) == 3
+    assert _delivered_to(sio, "eio-slow") == []
+    assert manager.queue_depths() == {sids["slow"]: 2}
+    assert manager.stats()["merged"] == 1
+
+    backlog.get_nowait()
+    backlog.get_nowait()
+    for _ in range(20):
+        await asyncio.sleep(0.002)
+
+    delivered = _delivered_to(sio, "eio-slow")
+    assert [d.split(",")[0] for d in delivered] == ['2["card_drawn_simple"', '2["game_state_public"']
+    assert '"v":2' in delivered[1]
+    assert manager.queue_depths() == {}
+
+
+@pytest.mark.asyncio
+async def test_overflow_drops_oldest_and_flags_slow_consumer():
+    sio, manager, sids = await _server(backlog=1, queue_max=2, slow_after=60)
+    sio.eio.sockets["eio-slow"].queue.put_nowait("p1")
+
+    for n in range(4):
+        await sio.emit("card_drawn_simple", {"n": n}, to=sids["slow"])
+
+    stats = manager.stats()
+    assert stats["dropped"] == 2
+    assert stats["slow_consumers"] == [sids["slow"]]
+    assert manager.queue_depths()[sids["slow"]] == 2
+
+    await manager.disconnect(sids["slow"], "/")
+    assert manager.stats()["slow_consumers"] == []
@@ -0,0 +1,100 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db import crud, models, partitioning
+from app.db.database import Base
+
+engine = create_engine(
+    "sqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+def _action(db, game_id, player_id, when, **extra):
+    action = crud.create_action(db, {"id_game": game_id, "player_id": player_id, "action_time": when,
+                                     "action_type": models.ActionType.DISCARD,
+                                     "result": models.ActionResult.SUCCESS, **extra})
+    db.commit()
+    return action
+
+
+@pytest.fixture
+def game(db):
+    game = crud.create_game(db, {"player_turn_id": None})
+    room = crud.create_room(db, {"name": "Sala", "status": models.RoomStatus.INGAME, "id_game": game.id})
+    player = crud.create_player(db, {"name": "Ana", "avatar_src": "a.png", "birthdate": date(1990, 1, 1),
+                                     "id_room": room.id, "is_host": True, "order": 1})
+    return game.id, player.id
+
+
+def test_migration_creates_monthly_partitions_without_foreign_keys():
+    statements = partitioning.migration_statements(
+        ["fk_game", "fk_parent"], date(2025, 11, 20), date(2026, 1, 5), months_ahead=2
+    )
+
+    assert statements[:2] == [
+        "ALTER TABLE actions_per_turn DROP FOREIGN KEY fk_game",
+        "ALTER TABLE actions_per_turn DROP FOREIGN KEY fk_parent",
+    ]
+    assert statements[2] == "ALTER TABLE actions_per_turn DROP PRIMARY KEY, ADD PRIMARY KEY (id, action_time)"
+    ddl = statements[3]
+    assert ddl.startswith("ALTER TABLE actions_per_turn PARTITION BY RANGE COLUMNS(action_time)")
+    for name, bound in [("p202511", "2025-12-01"), ("p202512", "2026-01-01"), ("p202601", "2026-02-01"),
+                        ("p202603", "2026-04-01")]:
+        assert f"PARTITION {name} VALUES LESS THAN ('{bound}')" in ddl
+    assert "p202604" not in ddl
+    assert ddl.rstrip(")\n ").endswith("PARTITION p_future VALUES LESS THAN (MAXVALUE")
+
+
+def test_only_partitions_entirely_before_cutoff_expire():
+    names = ["p202510", "p202511", "p202512", "p_future"]
+    assert partitioning.expired_partitions(names, datetime(2025, 12, 1)) == ["p202510", "p202511"]
+    assert partitioning.expired_partitions(names, datetime(2025, 11, 30, 23, 59)) == ["p202510"]
+
+
+def test_maintain_without_partitions_deletes_old_actions_in_batches(db, game):
+    game_id, player_id = game
+    now = datetime(2026, 3, 1, 12, 0)
+    old_parent = _action(db, game_id, player_id, now - timedelta(days=40))
+    old_child = _action(db, game_id, player_id, now - timedelta(days=40), parent_action_id=old_parent.id)
+    recent = _action(db, game_id, player_id, now - timedelta(days=5), triggered_by_action_id=old_parent.id)
+    old_ids, recent_id = {old_parent.id, old_child.id}, recent.id
+
+    report = partitioning.maintain(engine, retention_days=30, batch_size=1, now=now)
+
+    assert report == {"partitioned": False, "created": [], "dropped": [], "deleted_rows": 2}
+    db.expire_all()
+    remaining = {action.id: action for action in db.query(models.ActionsPerTurn).all()}
+    assert set(remaining) == {recent_id}
+    assert not old_ids & set(remaining)
+    assert remaining[recent_id].triggered_by_action_id is None
+
+
+def test_maintain_with_retention_disabled_keeps_everything(db, game):
+    _action(db, *game, datetime(2020, 1, 1))
+    assert partitioning.maintain(engine, retention_days=0)["deleted_rows"] == 0
+    assert db.query(models.ActionsPerTurn).count() == 1
+
+
+def test_get_action_by_id_only_reads_from_since(db, game):
+    old = _action(db, *game, datetime.now() - timedelta(days=30))
+
+    # Sin búsqueda de respaldo sobre todas las particiones
+    assert crud.get_action_by_id(db, old.id, since=datetime.now()) is None
+    assert crud.get_action_by_id(db, old.id, since=datetime.now() - timedelta(days=31)).id == old.id
+    assert crud.get_action_by_id(db, 9999, since=datetime.now() - timedelta(days=31)) is None
@@ -432,3 +432,28 @@ class TestPlayDetectiveSetRoute:
         # Should return 500 when service raises non-HTTPException
         assert resp.status_code == 500
         assert "Internal server error" in resp.json()["detail"]
+
+    def test_service_version_conflict_returns_409(self, client, setup_game_data, monkeypatch):
+        """StaleDataError del servicio llega al handler global: 409 reintentable, no 500"""
+        from sqlalchemy.orm.exc import StaleDataError
+        from app.routes import play_detective_set as route_mod
+
+        def conflict(*args, **kwargs):
+            raise StaleDataError("game changed")
+
+        monkeypatch.setattr(route_mod.DetectiveSetService, "play_detective_set", conflict)
+
+        data = setup_game_data
+        resp = client.post(
+            f"/api/game/{data['room_id']}/play-detective-set",
+            json={
+                "owner": data['player1_id'],
+                "setType": "marple",
+                "cards": data['card_ids'],
+                "hasWildcard": True,
+            },
+        )
+
+        assert resp.status_code == 409
+        assert resp.json()["detail"] == "version_conflict"
+        assert resp.headers["Retry-After"] == "0"
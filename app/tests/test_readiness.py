@@ -0,0 +1,94 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from app import readiness
+from app.readiness import check_readiness, measure_pool, measure_queues
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'ready.db'}", poolclass=QueuePool, pool_size=2, max_overflow=2)
+    yield engine
+    engine.dispose()
+
+
+def _sio(connections=0):
+    sio = MagicMock()
+    sio.eio.sockets = {f"eio{i}": object() for i in range(connections)}
+    return sio
+
+
+def _ws_manager(outbound=None, pending=0):
+    manager = MagicMock()
+    manager.outbound_stats.return_value = outbound or {}
+    manager.user_sessions.pending.return_value = pending
+    return manager
+
+
+@pytest.mark.asyncio
+async def test_ready_when_all_checks_pass(engine):
+    ready, report = await check_readiness(engine, _sio(3), _ws_manager(), MagicMock(ready=True))
+
+    assert ready is True
+    assert report["failing"] == []
+    assert report["checks"]["sockets"]["connections"] == 3
+    assert report["checks"]["db"]["latency_ms"] >= 0
+
+
+@pytest.mark.asyncio
+async def test_not_ready_while_warming_up(engine):
+    ready, report = await check_readiness(engine, _sio(), _ws_manager(), MagicMock(ready=False))
+
+    assert ready is False
+    assert report["failing"] == ["warmup"]
+
+
+def test_pool_saturation_over_threshold(engine):
+    connections = [engine.connect() for _ in range(4)]
+    try:
+        with patch.object(readiness.settings, "READY_POOL_SATURATION", 0.75):
+            check = measure_pool(engine)
+    finally:
+        for conn in connections:
+            conn.close()
+
+    assert check["capacity"] == 4
+    assert check["saturation"] == 1.0
+    assert check["ok"] is False
+
+
+def test_pool_without_limit_is_always_ok():
+    engine = create_engine("sqlite:///:memory:", poolclass=StaticPool)
+    assert measure_pool(engine)["ok"] is True
+
+
+def test_queue_depths_over_threshold():
+    manager = _ws_manager({"pending": 8, "max_queue_depth": 5, "slow_consumers": ["sid1"]}, pending=3)
+
+    with patch.object(readiness.settings, "READY_MAX_QUEUE_DEPTH", 10):
+        check = measure_queues(manager)
+
+    assert check["depths"]["outbound"] == 8
+    assert check["depths"]["session_replication"] == 3
+    assert check["slow_consumers"] == 1
+    assert check["ok"] is False
+
+
+@pytest.mark.asyncio
+async def test_db_error_is_not_ready(engine):
+    with patch.object(readiness, "_ping", side_effect=RuntimeError("db caída")):
+        ready, report = await check_readiness(engine, _sio(), _ws_manager())
+
+    assert ready is False
+    assert report["checks"]["db"]["error"] == "db caída"
+
+
+@pytest.mark.asyncio
+async def test_connection_limit(engine):
+    with patch.object(readiness.settings, "READY_MAX_CONNECTIONS", 2):
+        ready, report = await check_readiness(engine, _sio(3), _ws_manager())
+
+    assert ready is False
+    assert report["failing"] == ["sockets"]
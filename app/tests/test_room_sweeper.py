@@ -0,0 +1,131 @@
+import pytest
+from datetime import date, datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sqlalchemy import create_engine, event, update
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db import crud, models
+from app.db.database import Base
+from app.services.room_sweeper import RoomSweeper
+
+engine = create_engine(
+    "sqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def ws():
+    ws = MagicMock()
+    ws.notificar_game_cancelled = AsyncMock()
+    with patch("app.sockets.socket_service.get_websocket_service", return_value=ws):
+        yield ws
+
+
+def _room(db, name, age_minutes, status=models.RoomStatus.WAITING, players=2):
+    game = crud.create_game(db, {"player_turn_id": None})
+    room = crud.create_room(db, {
+        "name": name, "status": status, "players_min": 2, "players_max": 4, "id_game": game.id,
+        "created_at": datetime.now() - timedelta(minutes=age_minutes),
+    })
+    for order in range(1, players + 1):
+        crud.create_player(db, {"name": f"{name}-{order}", "avatar_src": "a.png", "birthdate": date(1990, 1, 1),
+                                "id_room": room.id, "is_host": order == 1, "order": order})
+    return room.id
+
+
+def _sweeper(connected=None, batch_size=100):
+    return RoomSweeper(TestingSessionLocal, idle_seconds=30 * 60, max_age_seconds=24 * 3600,
+                       batch_size=batch_size, connected=connected or (lambda room_id: 0))
+
+
+@pytest.mark.asyncio
+async def test_sweeps_old_waiting_rooms_and_reports(db, ws):
+    stale = [_room(db, f"vieja{i}", age_minutes=60) for i in range(3)]
+    fresh = _room(db, "nueva", age_minutes=5)
+    playing = _room(db, "jugando", age_minutes=600, status=models.RoomStatus.INGAME)
+
+    report = await _sweeper(batch_size=2).sweep()
+
+    assert report == {"rooms": 3, "players": 6, "games": 3, "orphan_players": 0, "notified": 0}
+    db.expire_all()
+    remaining = {room_id for (room_id,) in db.query(models.Room.id).all()}
+    assert remaining == {fresh, playing}
+    assert not set(stale) & remaining
+    assert db.query(models.Player).count() == 4
+    ws.notificar_game_cancelled.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_connected_rooms_survive_until_max_age_then_are_cancelled(db, ws):
+    waiting = _room(db, "esperando", age_minutes=60)
+    ancient = _room(db, "antigua", age_minutes=25 * 60)
+    connected = {waiting: 2, ancient: 1}
+
+    report = await _sweeper(connected=lambda room_id: connected.get(room_id, 0)).sweep()
+
+    assert report["rooms"] == 1
+    assert report["notified"] == 1
+    db.expire_all()
+    assert db.get(models.Room, waiting) is not None
+    assert db.get(models.Room, ancient) is None
+    ws.notificar_game_cancelled.assert_awaited_once()
+    assert ws.notificar_game_cancelled.await_args.kwargs["room_id"] == ancient
+
+
+@pytest.mark.asyncio
+async def test_room_started_during_sweep_keeps_its_players(db, ws):
+    room_id = _room(db, "arranca", age_minutes=60)
+    started = []
+
+    def start_room(conn, cursor, statement, parameters, context, executemany):
+        # La sala arranca justo después del SELECT del barrido y antes de su DELETE
+        if statement.startswith("DELETE FROM player") and not started:
+            started.append(room_id)
+            conn.execute(update(models.Room).where(models.Room.id == room_id)
+                         .values(status=models.RoomStatus.INGAME))
+
+    event.listen(engine, "after_cursor_execute", start_room)
+    try:
+        report = await _sweeper().sweep()
+    finally:
+        event.remove(engine, "after_cursor_execute", start_room)
+
+    assert report["rooms"] == 0 and report["players"] == 0
+    db.expire_all()
+    assert db.get(models.Room, room_id) is not None
+    assert db.query(models.Player).filter(models.Player.id_room == room_id).count() == 2
+
+
+@pytest.mark.asyncio
+async def test_orphan_players_without_references_are_removed(db, ws):
+    room_id = _room(db, "jugando", age_minutes=5, status=models.RoomStatus.INGAME, players=1)
+    orphan = crud.create_player(db, {"name": "huérfano", "avatar_src": "a.png", "birthdate": date(1990, 1, 1),
+                                     "id_room": None, "is_host": False, "order": None})
+    # Sin sala pero con un turno que lo referencia: se conserva
+    kept = crud.create_player(db, {"name": "con turno", "avatar_src": "a.png", "birthdate": date(1990, 1, 1),
+                                   "id_room": None, "is_host": False, "order": None})
+    orphan_id, kept_id = orphan.id, kept.id
+    game_id = db.get(models.Room, room_id).id_game
+    db.add(models.Turn(number=1, id_game=game_id, player_id=kept_id, status=models.TurnStatus.FINISHED))
+    db.commit()
+
+    report = await _sweeper().sweep()
+
+    assert report["orphan_players"] == 1
+    db.expire_all()
+    assert db.get(models.Player, orphan_id) is None
+    assert db.get(models.Player, kept_id) is not None
@@ -0,0 +1,42 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.db import models
+from app.db.database import Base
+from app.db.seed import seed_card_catalog, _extract_card_insert
+
+engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture(scope="function")
+def db():
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    yield db
+    db.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+def test_extract_card_insert_skips_comments():
+    sql = "USE x;\nINSERT INTO card (name) VALUES\n-- comentario\n('A'),\n('B');\nINSERT INTO game VALUES (1);"
+    statement = _extract_card_insert(sql)
+    assert statement.startswith("INSERT INTO card")
+    assert "comentario" not in statement
+    assert "game" not in statement
+
+
+def test_seed_card_catalog_loads_cards_in_order(db):
+    total = seed_card_catalog(db)
+
+    assert total == 25
+    # Los servicios dependen de estos ids
+    assert db.query(models.Card).get(4).name == "Harley Quin Wildcard"
+    assert db.query(models.Card).get(6).name == "Miss Marple"
+    assert db.query(models.Card).filter(models.Card.name == "You are the Murderer!!").count() == 1
+
+
+def test_seed_card_catalog_is_idempotent(db):
+    seed_card_catalog(db)
+    assert seed_card_catalog(db) == 25
+    assert db.query(models.Card).count() == 25
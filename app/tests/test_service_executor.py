@@ -0,0 +1,108 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services.executor import ServiceExecutor, game_key
+
+
+@pytest.mark.asyncio
+async def test_runs_off_the_event_loop():
+    executor = ServiceExecutor(workers=2)
+    loop_thread = threading.get_ident()
+
+    thread = await executor.run(game_key(1), threading.get_ident)
+
+    assert thread != loop_thread
+    assert executor.stats()["completed"] == 1
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_same_game_runs_in_order_other_games_in_parallel():
+    executor = ServiceExecutor(workers=4)
+    order = []
+
+    def work(name, seconds):
+        time.sleep(seconds)
+        order.append(name)
+
+    started = time.monotonic()
+    await asyncio.gather(
+        executor.run(game_key(1), work, "g1-slow", 0.1),
+        executor.run(game_key(1), work, "g1-fast", 0.0),
+        executor.run(game_key(2), work, "g2", 0.1),
+    )
+    elapsed = time.monotonic() - started
+
+    assert order.index("g1-slow") < order.index("g1-fast")
+    assert elapsed < 0.19  # g2 no esperó a la partida 1
+    assert executor.stats()["ordered_keys"] == 0
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_queue_depth_metrics_when_saturated():
+    executor = ServiceExecutor(workers=1, queue_max=1)
+    release = threading.Event()
+
+    calls = [asyncio.ensure_future(executor.run(None, release.wait, 1)) for _ in range(3)]
+    await asyncio.sleep(0.05)
+    stats = executor.stats()
+    release.set()
+    await asyncio.gather(*calls)
+
+    assert stats["running"] == 1
+    assert stats["queued"] == 1   # admitida en la cola del pool
+    assert stats["waiting"] == 1  # fuera del límite: espera en el loop
+    assert executor.depth() == 0
+    assert executor.stats()["max_queued"] >= 1
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_exceptions_propagate_and_release_the_game():
+    executor = ServiceExecutor(workers=1)
+
+    def boom():
+        raise ValueError("falló")
+
+    with pytest.raises(ValueError):
+        await executor.run(game_key(1), boom)
+    assert await executor.run(game_key(1), lambda: "ok") == "ok"
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_ordered_holds_the_game_across_calls():
+    executor = ServiceExecutor(workers=4)
+    order = []
+
+    async def action(name):
+        async with executor.ordered(game_key(1)):
+            await executor.run(game_key(1), order.append, f"{name}-servicio")
+            await asyncio.sleep(0.02)  # p. ej. notificaciones por WebSocket
+            await executor.run(game_key(1), order.append, f"{name}-estado")
+
+    await asyncio.gather(action("a"), action("b"), executor.run(game_key(1), order.append, "suelta"))
+
+    assert order == ["a-servicio", "a-estado", "b-servicio", "b-estado", "suelta"]
+    assert executor.stats()["ordered_keys"] == 0
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_tasks_spawned_inside_ordered_wait_their_turn():
+    executor = ServiceExecutor(workers=2)
+    order = []
+
+    async with executor.ordered(game_key(1)):
+        # Hereda el contexto del bloque pero no la partida
+        spawned = asyncio.ensure_future(executor.run(game_key(1), order.append, "lanzada"))
+        await asyncio.sleep(0.02)
+        order.append("bloque")
+    await spawned
+
+    assert order == ["bloque", "lanzada"]
+    executor.shutdown()
@@ -0,0 +1,188 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app import sharding
+from app.config import _parse_nodes
+from app.sharding import FORWARD_HEADER, HashRing, ShardRouter, forward_to_owner
+from app.sockets.message_bus import InMemoryBroker
+from app.sockets.socket_manager import WebSocketManager
+
+NODES = {"w1": "http://w1", "w2": "http://w2", "w3": "http://w3"}
+
+
+def _room_owned_by(router, node_id, start=1):
+    return next(room_id for room_id in range(start, 10_000) if router.owner_of(room_id) == node_id)
+
+
+# ---------------
+# | HashRing    |
+# ---------------
+
+def test_parse_nodes():
+    assert _parse_nodes("w1=http://a:8001/, w2=http://b:8002,basura") == {"w1": "http://a:8001", "w2": "http://b:8002"}
+
+
+def test_hash_ring_spreads_and_moves_few_keys_on_new_node():
+    ring = HashRing(["w1", "w2", "w3"])
+    owners = {room_id: ring.owner(room_id) for room_id in range(3000)}
+    counts = {node: list(owners.values()).count(node) for node in ("w1", "w2", "w3")}
+    assert all(600 < c < 1400 for c in counts.values())
+
+    # Un nodo nuevo solo se lleva claves: ninguna cambia entre los nodos viejos
+    bigger = HashRing(["w1", "w2", "w3", "w4"])
+    moved = [k for k, owner in owners.items() if bigger.owner(k) != owner]
+    assert all(bigger.owner(k) == "w4" for k in moved)
+    assert len(moved) < 1200
+
+
+def test_single_node_router_is_always_local():
+    router = ShardRouter()
+    assert router.sharded is False
+    assert router.is_local(123)
+
+
+def test_room_id_for_path():
+    db = MagicMock()
+    db.query.return_value.filter.return_value.first.return_value = MagicMock(id=42)
+    router = ShardRouter("w1", NODES, db_factory=lambda: db)
+
+    assert router.room_id_for_path("/api/game/5/discard") == 5
+    assert router.room_id_for_path("/game/6/start") == 6
+    assert router.room_id_for_path("/game_join/7/leave") == 7
+    assert router.room_id_for_path("/game/9/draft/pick") == 42
+    assert router.room_id_for_path("/game/9/draft/pick") == 42
+    assert router.room_id_for_path("/game_list") is None
+    # game_id -> room_id se consulta una sola vez
+    assert db.query.call_count == 1
+
+
+# ------------------------
+# | Middleware HTTP      |
+# ------------------------
+
+@pytest.fixture
+def sharded_app():
+    previous = sharding._router
+    router = sharding.init_shard_router("w1", NODES)
+    forwarded = []
+
+    def upstream(request: httpx.Request):
+        forwarded.append(request)
+        return httpx.Response(202, json={"handled_by": "owner"})
+
+    router._http = httpx.AsyncClient(transport=httpx.MockTransport(upstream))
+
+    app = FastAPI()
+    app.middleware("http")(forward_to_owner)
+
+    @app.post("/api/game/{room_id}/discard")
+    async def discard(room_id: int, request: Request):
+        return {"handled_by": "local", "body": (await request.json())}
+
+    yield app, router, forwarded
+    sharding._router = previous
+
+
+def test_middleware_handles_owned_rooms_locally(sharded_app):
+    app, router, forwarded = sharded_app
+    room_id = _room_owned_by(router, "w1")
+
+    response = TestClient(app).post(f"/api/game/{room_id}/discard", json={"card_ids": [1]})
+
+    assert response.json() == {"handled_by": "local", "body": {"card_ids": [1]}}
+    assert forwarded == []
+
+
+def test_middleware_forwards_to_owner(sharded_app):
+    app, router, forwarded = sharded_app
+    room_id = _room_owned_by(router, "w2")
+
+    response = TestClient(app).post(
+        f"/api/game/{room_id}/discard?x=1", json={"card_ids": [1]}, headers={"http-user-id": "3"}
+    )
+
+    assert response.status_code == 202
+    assert response.json() == {"handled_by": "owner"}
+    request = forwarded[0]
+    assert str(request.url) == f"http://w2/api/game/{room_id}/discard?x=1"
+    assert request.headers[FORWARD_HEADER] == "w1"
+    assert request.headers["http-user-id"] == "3"
+    assert request.content == b'{"card_ids":[1]}'
+
+
+def test_middleware_does_not_forward_twice(sharded_app):
+    app, router, forwarded = sharded_app
+    room_id = _room_owned_by(router, "w2")
+
+    response = TestClient(app).post(f"/api/game/{room_id}/discard", json={}, headers={FORWARD_HEADER: "w3"})
+
+    assert response.json()["handled_by"] == "local"
+    assert forwarded == []
+
+
+def test_middleware_rejects_when_owner_is_down(sharded_app):
+    app, router, forwarded = sharded_app
+    room_id = _room_owned_by(router, "w2")
+
+    def down(request: httpx.Request):
+        raise httpx.ConnectError("connection refused", request=request)
+
+    router._http = httpx.AsyncClient(transport=httpx.MockTransport(down))
+    response = TestClient(app).post(f"/api/game/{room_id}/discard", json={"card_ids": [1]})
+
+    # No se atiende localmente: el dueño es el único que muta la partida
+    assert response.status_code == 503
+    assert response.json() == {"detail": "shard_owner_unavailable"}
+    assert response.headers["Retry-After"] == "1"
+
+
+@pytest.mark.asyncio
+async def test_game_paths_resolve_room_off_the_loop():
+    db = MagicMock()
+    db.query.return_value.filter.return_value.first.return_value = MagicMock(id=42)
+    router = ShardRouter("w1", NODES, db_factory=lambda: db)
+
+    assert await router.resolve_room_id("/game/9/draft/pick") == 42
+    assert await router.resolve_room_id("/game/9/draft/pick") == 42
+    assert await router.resolve_room_id("/api/game/5/discard") == 5
+    assert db.query.call_count == 1
+
+
+# ------------------------------
+# | Eventos de room por bus    |
+# ------------------------------
+
+@pytest.mark.asyncio
+async def test_room_presence_runs_on_owner_worker():
+    broker = InMemoryBroker()
+    router_w1 = ShardRouter("w1", {"w1": "http://w1", "w2": "http://w2"}, broker)
+    router_w2 = ShardRouter("w2", {"w1": "http://w1", "w2": "http://w2"}, broker)
+    await router_w2.start()
+
+    owner_presence = AsyncMock()
+    router_w2.register_handler("room_presence", owner_presence)
+    room_id = _room_owned_by(router_w1, "w2")
+
+    sio = MagicMock()
+    sio.enter_room = AsyncMock()
+    sio.emit = AsyncMock()
+    manager = WebSocketManager(sio, MagicMock())
+    manager.broadcast_room_presence = AsyncMock()
+
+    previous = sharding._router
+    sharding._router = router_w1
+    try:
+        assert await manager.join_game_room("sid1", room_id, 10) is True
+    finally:
+        sharding._router = previous
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+    manager.broadcast_room_presence.assert_not_awaited()
+    owner_presence.assert_awaited_once_with(room_id=room_id)
+    await router_w2.stop()
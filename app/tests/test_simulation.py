@@ -0,0 +1,84 @@
+import logging
+import pytest
+
+from app.db import models
+from app.db.database import SessionLocal
+from app.simulation import runner
+from app.simulation.runner import run_simulations, summarize
+from app.simulation.simulator import GameSimulator, SimulationConfig
+from app.sockets import socket_manager
+
+
+@pytest.fixture
+def simulation_worker():
+    """Inicializa el worker en proceso y restaura el ws_manager global y el nivel de log"""
+    previous_manager = socket_manager._ws_manager
+    previous_level = logging.getLogger("app").level
+    runner.init_worker()
+    yield
+    socket_manager._ws_manager = previous_manager
+    logging.getLogger("app").setLevel(previous_level)
+
+
+def test_simulated_game_runs_until_draft_is_empty(simulation_worker):
+    config = SimulationConfig(num_players=2, keep_games=True)
+    db = SessionLocal()
+    try:
+        simulator = GameSimulator(db, config, seed=2)
+        result = runner._loop.run_until_complete(simulator.run())
+
+        assert result.status == "finished"
+        assert result.turns > 0
+        assert result.murderer_id is not None
+        assert result.actions_logged > 0
+
+        room = db.get(models.Room, simulator.room_id)
+        assert room.status == models.RoomStatus.FINISH
+        draft_left = db.query(models.CardsXGame).filter(
+            models.CardsXGame.id_game == simulator.game_id,
+            models.CardsXGame.is_in == models.CardState.DRAFT
+        ).count()
+        assert draft_left == 0
+    finally:
+        db.close()
+
+
+def test_same_seed_reproduces_game(simulation_worker):
+    config = SimulationConfig(num_players=3)
+    first, second = run_simulations(2, config, seed=7), run_simulations(2, config, seed=7)
+
+    # Los ids de la base cambian entre corridas; el desarrollo de la partida no
+    fields = ("status", "turns", "sets_played", "events_played", "cards_discarded", "cards_drawn_deck",
+              "cards_drawn_draft", "actions_logged", "murderer_revealed")
+    strip = lambda results: [{k: r[k] for k in fields} for r in results]
+    assert strip(first) == strip(second)
+
+
+def test_purged_games_leave_no_rows(simulation_worker):
+    db = SessionLocal()
+    try:
+        games_before = db.query(models.Game).count()
+        run_simulations(1, SimulationConfig(num_players=2, keep_games=False), seed=3)
+        assert db.query(models.Game).count() == games_before
+    finally:
+        db.close()
+
+
+def test_summarize_aggregates_results():
+    results = [
+        {"seed": 1, "status": "finished", "turns": 10, "elapsed_s": 0.5, "murderer_revealed": True,
+         "sets_played": {"poirot": 1}, "events_played": {}, "actions_logged": 50, "violations": [], "error": None},
+        {"seed": 2, "status": "error", "turns": 3, "elapsed_s": 0.1, "murderer_revealed": False,
+         "sets_played": {"poirot": 2}, "events_played": {"look_ashes": 1}, "actions_logged": 10,
+         "violations": ["x"], "error": "InvariantViolation: boom"},
+    ]
+
+    summary = summarize(results, elapsed_s=1.0)
+
+    assert summary["games"] == 2
+    assert summary["games_per_min"] == 120.0
+    assert summary["status"] == {"finished": 1, "error": 1}
+    assert summary["turns"]["mean"] == 10
+    assert summary["sets_played"] == {"poirot": 3}
+    assert summary["rule_violations"] == 1
+    assert summary["failing_seeds"] == [2]
@@ -17,25 +17,21 @@ def mock_ws_manager():
     manager = MagicMock()
     manager.join_game_room = AsyncMock(return_value=True)
     manager.leave_game_room = AsyncMock()
+    manager.validate_connection = AsyncMock(return_value=None)
     return manager
 
 
 @pytest.mark.asyncio
 async def test_connect_success(mock_sio, mock_ws_manager):
-    with patch("app.sockets.socket_events.get_ws_manager", return_value=mock_ws_manager), \
-         patch("app.sockets.socket_events.SessionLocal") as mock_db:
-        db_instance = MagicMock()
-        mock_db.return_value = db_instance
-        mock_room = MagicMock()
-        db_instance.query.return_value.filter.return_value.first.return_value = mock_room
-
+    with patch("app.sockets.socket_events.get_ws_manager", return_value=mock_ws_manager):
         socket_events.register_events(mock_sio)
         connect = mock_sio.event.call_args_list[0][0][0]
         environ = {"QUERY_STRING": "user_id=1&room_id=10"}
 
         result = await connect("sid123", environ)
         assert result is True
-        mock_ws_manager.join_game_room.assert_awaited_once_with("sid123", 10, 1)
+        mock_ws_manager.validate_connection.assert_awaited_once_with(10, 1)
+        mock_ws_manager.join_game_room.assert_awaited_once_with("sid123", 10, 1, wire_format="json", deflate=False, batch=False)
 
         args, kwargs = mock_sio.emit.await_args_list[-1]
         assert args[0] == "connected"
@@ -50,8 +46,7 @@ async def test_connect_success(mock_sio, mock_ws_manager):
     ("user_id=1&room_id=xyz", "invalid room_id format")
 ])
 async def test_connect_invalid_queries(mock_sio, query, expected):
-    with patch("app.sockets.socket_events.get_ws_manager") as ws_manager, \
-         patch("app.sockets.socket_events.SessionLocal") as mock_db:
+    with patch("app.sockets.socket_events.get_ws_manager") as ws_manager:
         ws_manager.return_value = MagicMock()
         socket_events.register_events(mock_sio)
         connect = mock_sio.event.call_args_list[0][0][0]
@@ -63,19 +58,17 @@ async def test_connect_invalid_queries(mock_sio, query, expected):
 
 
 @pytest.mark.asyncio
-async def test_connect_room_not_found(mock_sio, mock_ws_manager):
-    with patch("app.sockets.socket_events.get_ws_manager", return_value=mock_ws_manager), \
-         patch("app.sockets.socket_events.SessionLocal") as mock_db:
-        db_instance = MagicMock()
-        mock_db.return_value = db_instance
-        db_instance.query.return_value.filter.return_value.first.return_value = None
-
+@pytest.mark.parametrize("error", ["room not found", "user not in room"])
+async def test_connect_rejected(mock_sio, mock_ws_manager, error):
+    mock_ws_manager.validate_connection = AsyncMock(return_value=error)
+    with patch("app.sockets.socket_events.get_ws_manager", return_value=mock_ws_manager):
         socket_events.register_events(mock_sio)
         connect = mock_sio.event.call_args_list[0][0][0]
         environ = {"QUERY_STRING": "user_id=1&room_id=10"}
         result = await connect("sid1", environ)
         assert result is False
-        mock_sio.emit.assert_any_await("connect_error", {"message": "room not found"}, room="sid1")
+        mock_sio.emit.assert_any_await("connect_error", {"message": error}, room="sid1")
+        mock_ws_manager.join_game_room.assert_not_awaited()
 
 # ----------------
 # Disconnect Tests
@@ -113,3 +106,17 @@ async def test_disconnect_exception(mock_sio):
         disconnect = mock_sio.event.call_args_list[1][0][0]
         await disconnect("sid-error")
         ws_manager.return_value.leave_game_room.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_connect_with_last_seq_resumes_session(mock_sio, mock_ws_manager):
+    ws_service = MagicMock()
+    ws_service.reanudar_sesion = AsyncMock()
+    with patch("app.sockets.socket_events.get_ws_manager", return_value=mock_ws_manager), \
+         patch("app.sockets.socket_events.get_websocket_service", return_value=ws_service):
+        socket_events.register_events(mock_sio)
+        connect = mock_sio.event.call_args_list[0][0][0]
+
+        assert await connect("sid123", {"QUERY_STRING": "user_id=1&room_id=10&last_seq=42"}) is True
+
+    ws_service.reanudar_sesion.assert_awaited_once_with(sid="sid123", room_id=10, user_id=1, last_seq=42)
@@ -1,7 +1,9 @@
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from datetime import datetime
+import asyncio
 import logging
+import threading
 
 from app.sockets.socket_manager import (
     WebSocketManager,
@@ -139,6 +141,74 @@ async def test_get_room_participants_empty(mock_sio, mock_db_factory):
     result = await mgr.get_room_participants(5)
     assert result == []
 
+@pytest.mark.asyncio
+async def test_get_room_participants_queries_db_once_per_room(mock_sio):
+    mock_db = MagicMock()
+    players = [
+        MagicMock(id=1, name="Ana", avatar_src="a.png", is_host=True, order=2),
+        MagicMock(id=2, name="Beto", avatar_src="b.png", is_host=False, order=1),
+    ]
+    mock_db.query.return_value.filter.return_value.all.return_value = players
+    loop_thread = threading.get_ident()
+    threads = []
+    mgr = WebSocketManager(mock_sio, lambda: threads.append(threading.get_ident()) or mock_db)
+
+    # Tormenta de reconexiones: muchos joins a la misma sala, una sola consulta
+    for n in range(20):
+        await mgr.join_game_room(f"sid{n}", 5, 1 + n % 2)
+        result = await mgr.get_room_participants(5)
+
+    assert [p["id"] for p in result] == [2, 1]
+    assert result[1]["connected_at"] == mgr.user_sessions["sid0"]["connected_at"]
+    assert mgr.presence.loads == 1
+    assert loop_thread not in threads  # la DB se consulta fuera del event loop
+
+    # Un jugador que no estaba en el cache fuerza una recarga de la sala
+    players.append(MagicMock(id=3, name="Caro", avatar_src="c.png", is_host=False, order=3))
+    await mgr.join_game_room("sid_new", 5, 3)
+    assert [p["id"] for p in await mgr.get_room_participants(5)] == [2, 1, 3]
+    assert mgr.presence.loads == 2
+
+    # player_left reemplaza los perfiles sin ir a la DB
+    mgr.presence.set_players(5, [{"id": 1, "name": "Ana", "avatar": "a.png", "is_host": True, "order": 2}])
+    assert 2 not in mgr.presence.get(5)
+
+
+@pytest.mark.asyncio
+async def test_validate_connection_from_membership_cache(mock_sio):
+    mock_db = MagicMock()
+    mock_db.query.return_value.filter.return_value.first.return_value = MagicMock(id=5)
+    mock_db.query.return_value.filter.return_value.all.return_value = [
+        MagicMock(id=1, name="Ana", avatar_src="a.png", is_host=True, order=1),
+    ]
+    mgr = WebSocketManager(mock_sio, lambda: mock_db)
+
+    # Muchos connects a la vez: una sola carga de la sala
+    results = await asyncio.gather(*(mgr.validate_connection(5, 1) for _ in range(10)))
+    assert results == [None] * 10
+    assert mgr.presence.loads == 1
+
+    assert await mgr.validate_connection(5, 1) is None
+    assert mgr.presence.loads == 1
+
+    assert await mgr.validate_connection(5, 99) == "user not in room"
+
+    mock_db.query.return_value.filter.return_value.first.return_value = None
+    assert await mgr.validate_connection(6, 1) == "room not found"
+    assert mgr.presence.get(6) is None
+
+
+def test_sessions_indexed_by_room(mock_sio, mock_db_factory):
+    mgr = WebSocketManager(mock_sio, mock_db_factory)
+    mgr.user_sessions["a"] = {"room_id": 1, "user_id": 1}
+    mgr.user_sessions["b"] = {"room_id": 1, "user_id": 2}
+    mgr.user_sessions["a"] = {"room_id": 2, "user_id": 1}
+    del mgr.user_sessions["b"]
+
+    assert mgr.get_sids_in_game(1) == []
+    assert mgr.get_sids_in_game(2) == ["a"]
+    assert mgr.user_sessions.in_room(1) == {}
+
 # ---------------------------------------------------------------------
 # emit_to_room / emit_to_sid
 # ---------------------------------------------------------------------
@@ -148,7 +218,8 @@ async def test_emit_to_room_with_players(mock_sio, mock_db_factory):
     mgr = WebSocketManager(mock_sio, mock_db_factory)
     mgr.user_sessions = {"s1": {"room_id": 5}}
     await mgr.emit_to_room(5, "eventX", {"x": 1})
-    mock_sio.emit.assert_awaited_once_with("eventX", {"x": 1}, room="game_5")
+    seq = mgr.event_log.current_seq(5)
+    mock_sio.emit.assert_awaited_once_with("eventX", {"x": 1, "seq": seq}, room="game_5")
 
 
 @pytest.mark.asyncio
@@ -140,3 +140,47 @@ async def test_draw_and_turn_methods(service, mock_ws_manager):
         _, event, payload = call.args
         assert "player_id" in payload
         assert "timestamp" in payload
+
+
+# ---------------
+# Resume handshake
+# ---------------
+
+@pytest.mark.asyncio
+async def test_reanudar_sesion_replays_missed_events(service, mock_ws_manager):
+    from app.sockets.event_buffer import EventLog
+
+    log = EventLog()
+    last_seen = log.record(10, "turn_finished", {"player_id": 1})
+    log.record(10, "game_state_private", {"mano": [1]}, user_id=2)
+    missed = log.record(10, "player_must_draw", {"player_id": 2})
+    mock_ws_manager.event_log = log
+
+    await service.reanudar_sesion("sid1", 10, 1, last_seen)
+
+    calls = mock_ws_manager.emit_to_sid.await_args_list
+    assert [c.args[1] for c in calls] == ["player_must_draw", "resumed"]
+    assert calls[0].args[2] == {"player_id": 2, "seq": missed}
+    assert calls[1].args[2]["mode"] == "replay"
+    assert calls[1].args[2]["replayed"] == 1
+    assert all(c.kwargs["record"] is False for c in calls)
+
+
+@pytest.mark.asyncio
+async def test_reanudar_sesion_sends_snapshot_on_gap(service, mock_ws_manager):
+    from app.sockets.event_buffer import EventLog
+
+    mock_ws_manager.event_log = EventLog()
+    db = MagicMock()
+    db.query.return_value.filter.return_value.first.return_value = MagicMock(id_game=7)
+    mock_ws_manager.db_factory = lambda: db
+    game_state = {"game_id": 7, "status": "INGAME", "estados_privados": {1: {"mano": [{"id": 3}]}}}
+
+    with patch("app.services.game_status_service.build_complete_game_state", return_value=game_state):
+        await service.reanudar_sesion("sid1", 10, 1, 5)
+
+    calls = mock_ws_manager.emit_to_sid.await_args_list
+    assert [c.args[1] for c in calls] == ["game_state_public", "game_state_private", "resumed"]
+    assert calls[1].args[2]["mano"] == [{"id": 3}]
+    assert calls[2].args[2]["mode"] == "snapshot"
+    db.close.assert_called_once()
@@ -5,6 +5,7 @@ from fastapi import HTTPException
 from app.schemas.take_deck import TakeDeckRequest, TakeDeckResponse, CardSummary
 from app.db.models import Room, Game, CardsXGame, CardState, CardType, Player
 
+
 def test_take_deck_request_schema():
     """Test que verifica el schema de TakeDeckRequest"""
     from app.schemas.take_deck import TakeDeckRequest
@@ -188,11 +189,11 @@ async def test_take_from_deck_room_not_found():
     from app.schemas.take_deck import TakeDeckRequest
     
     mock_db = Mock()
-    mock_db.query.return_value.filter.return_value.first.return_value = None
     
     request = TakeDeckRequest(cantidad=2)
     
-    with pytest.raises(HTTPException) as exc_info:
+    with patch('app.routes.take_deck.get_game_context', return_value=None), \
+         pytest.raises(HTTPException) as exc_info:
         await take_from_deck(room_id=999, request=request, user_id=1, db=mock_db)
     
     assert exc_info.value.status_code == 404
@@ -200,22 +201,19 @@ async def test_take_from_deck_room_not_found():
 
 
 @pytest.mark.asyncio
-async def test_take_from_deck_game_not_found():
+async def test_take_from_deck_game_not_found(game_context):
     """Test cuando el juego no existe"""
     from app.routes.take_deck import take_from_deck
     from app.schemas.take_deck import TakeDeckRequest
     from app.db.models import Room
     
     mock_db = Mock()
-    mock_room = Mock(spec=Room)
-    mock_room.id_game = 10
-    
-    # Primera query retorna room, segunda retorna None (game)
-    mock_db.query.return_value.filter.return_value.first.side_effect = [mock_room, None]
     
     request = TakeDeckRequest(cantidad=2)
     
-    with pytest.raises(HTTPException) as exc_info:
+    # La sala existe pero no la fila de Game
+    with patch('app.routes.take_deck.get_game_context', return_value=game_context(has_game=False)), \
+         pytest.raises(HTTPException) as exc_info:
         await take_from_deck(room_id=1, request=request, user_id=1, db=mock_db)
     
     assert exc_info.value.status_code == 404
@@ -223,25 +221,19 @@ async def test_take_from_deck_game_not_found():
 
 
 @pytest.mark.asyncio
-async def test_take_from_deck_not_your_turn():
+async def test_take_from_deck_not_your_turn(game_context):
     """Test cuando no es el turno del jugador"""
     from app.routes.take_deck import take_from_deck
     from app.schemas.take_deck import TakeDeckRequest
     from app.db.models import Room, Game
     
     mock_db = Mock()
-    mock_room = Mock(spec=Room)
-    mock_room.id_game = 10
-    
-    mock_game = Mock(spec=Game)
-    mock_game.id = 10
-    mock_game.player_turn_id = 2  # Turno del jugador 2
-    
-    mock_db.query.return_value.filter.return_value.first.side_effect = [mock_room, mock_game]
     
     request = TakeDeckRequest(cantidad=2)
     
-    with pytest.raises(HTTPException) as exc_info:
+    # Turno del jugador 2
+    with patch('app.routes.take_deck.get_game_context', return_value=game_context(turn_player_id=2)), \
+         pytest.raises(HTTPException) as exc_info:
         await take_from_deck(room_id=1, request=request, user_id=1, db=mock_db)  # Usuario 1 intenta
     
     assert exc_info.value.status_code == 403
@@ -251,28 +243,22 @@ async def test_take_from_deck_not_your_turn():
 @pytest.mark.asyncio
 @patch('app.routes.take_deck.get_websocket_service')
 @patch('app.routes.take_deck.robar_cartas_del_mazo')
-async def test_take_from_deck_deck_empty(mock_robar, mock_ws):
+async def test_take_from_deck_deck_empty(mock_robar, mock_ws, game_context):
     """Test cuando el mazo está vacío"""
     from app.routes.take_deck import take_from_deck
     from app.schemas.take_deck import TakeDeckRequest
     from app.db.models import Room, Game
     
     mock_db = Mock()
-    mock_room = Mock(spec=Room)
-    mock_room.id_game = 10
-    
-    mock_game = Mock(spec=Game)
-    mock_game.id = 10
-    mock_game.player_turn_id = 1
-    
-    mock_db.query.return_value.filter.return_value.first.side_effect = [mock_room, mock_game]
+    mock_db.get.return_value = Mock(spec=Game, id=10, player_turn_id=1)
     
     # robar_cartas_del_mazo retorna lista vacía
     mock_robar.return_value = []
     
     request = TakeDeckRequest(cantidad=2)
     
-    with pytest.raises(HTTPException) as exc_info:
+    with patch('app.routes.take_deck.get_game_context', return_value=game_context()), \
+         pytest.raises(HTTPException) as exc_info:
         await take_from_deck(room_id=1, request=request, user_id=1, db=mock_db)
     
     assert exc_info.value.status_code == 400
@@ -283,18 +269,15 @@ async def test_take_from_deck_deck_empty(mock_robar, mock_ws):
 @patch('app.routes.take_deck.build_complete_game_state')
 @patch('app.routes.take_deck.get_websocket_service')
 @patch('app.routes.take_deck.robar_cartas_del_mazo')
-async def test_take_from_deck_success(mock_robar, mock_ws, mock_build_game_state):
+async def test_take_from_deck_success(mock_robar, mock_ws, mock_build_game_state, game_context):
     """Test exitoso de robar cartas"""
     from app.routes.take_deck import take_from_deck
 
     mock_db = Mock()
-    mock_room = Mock(spec=Room)
-    mock_room.id = 1
-    mock_room.id_game = 10
-
     mock_game = Mock(spec=Game)
     mock_game.id = 10
     mock_game.player_turn_id = 1
+    mock_db.get.return_value = mock_game
 
     # Mock cartas robadas
     mock_card1 = Mock(spec=CardsXGame)
@@ -341,11 +324,6 @@ async def test_take_from_deck_success(mock_robar, mock_ws, mock_build_game_state
     }
     mock_build_game_state.return_value = game_state_mock
 
-    # Mock mock_player para Players query
-    mock_player = Mock(spec=Player)
-    mock_player.id = 1
-    mock_player.order = 1
-
     # Setup query mocks
     query_count = [0]
 
@@ -354,16 +332,11 @@ async def test_take_from_deck_success(mock_robar, mock_ws, mock_build_game_state
         query_count[0] += 1
         mock_query = Mock()
 
-        if query_count[0] == 1:  # Room query
-            mock_query.filter.return_value.first.return_value = mock_room
-        elif query_count[0] == 2:  # Game query
-            mock_query.filter.return_value.first.return_value = mock_game
-        elif query_count[0] == 3:  # Hand query
+        # Sala, partida y turno salen del contexto de partida
+        if query_count[0] == 1:  # Hand query
             mock_query.filter.return_value.all.return_value = hand_cards
-        elif query_count[0] == 4:  # Deck remaining count
+        elif query_count[0] == 2:  # Deck remaining count
             mock_query.filter.return_value.count.return_value = 15
-        elif query_count[0] == 5:  # Players query
-            mock_query.filter.return_value.order_by.return_value.all.return_value = [mock_player]
         else:
             mock_query.filter.return_value.all.return_value = []
             mock_query.filter.return_value.count.return_value = 0
@@ -375,7 +348,8 @@ async def test_take_from_deck_success(mock_robar, mock_ws, mock_build_game_state
     request = TakeDeckRequest(cantidad=2)
 
     # Execute
-    result = await take_from_deck(room_id=1, request=request, user_id=1, db=mock_db)
+    with patch('app.routes.take_deck.get_game_context', return_value=game_context()):
+        result = await take_from_deck(room_id=1, request=request, user_id=1, db=mock_db)
 
     # Verify response structure
     assert isinstance(result, TakeDeckResponse)
@@ -397,7 +371,7 @@ async def test_take_from_deck_success(mock_robar, mock_ws, mock_build_game_state
     assert result.deck_remaining == 15
 
     # Verify service calls
-    mock_robar.assert_called_once_with(mock_db, mock_game, 1, 2)
+    mock_robar.assert_called_once_with(mock_db, mock_game, 1, 2, turn_id=100)
     mock_build_game_state.assert_called_once_with(mock_db, 10)
     mock_ws_service.notificar_estado_partida.assert_called_once()
     mock_ws_service.notificar_card_drawn_simple.assert_called_once_with(
@@ -0,0 +1,229 @@
+import asyncio
+import pytest
+from datetime import date, datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db import crud, models
+from app.db.database import Base
+from app.services import turn_timer
+from app.services.turn_timer import TimerWheel
+
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _recorder(fired, name):
+    async def callback():
+        fired.append(name)
+    return callback
+
+
+# --------------
+# | TimerWheel |
+# --------------
+
+@pytest.mark.asyncio
+async def test_wheel_fires_only_due_timers():
+    clock = FakeClock()
+    wheel = TimerWheel(tick=1.0, slots=8, clock=clock)
+    fired = []
+    wheel.schedule("a", 1002.5, _recorder(fired, "a"))
+    wheel.schedule("b", 1005.0, _recorder(fired, "b"))
+
+    assert wheel.advance(1002.0) == []
+    assert wheel.advance(1003.0) == ["a"]
+    await asyncio.sleep(0)
+
+    assert fired == ["a"]
+    assert "b" in wheel and len(wheel) == 1
+
+
+@pytest.mark.asyncio
+async def test_wheel_reschedule_and_cancel():
+    clock = FakeClock()
+    wheel = TimerWheel(tick=1.0, slots=8, clock=clock)
+    fired = []
+    wheel.schedule("turn", 1002.0, _recorder(fired, "old"))
+    wheel.schedule("turn", 1004.0, _recorder(fired, "new"))
+
+    assert wheel.advance(1003.0) == []
+    assert wheel.deadline("turn") == 1004.0
+    assert wheel.cancel("turn") is True
+    assert wheel.cancel("turn") is False
+    assert wheel.advance(1010.0) == []
+    assert fired == []
+
+
+@pytest.mark.asyncio
+async def test_wheel_keeps_deadlines_beyond_one_revolution():
+    clock = FakeClock()
+    wheel = TimerWheel(tick=1.0, slots=4, clock=clock)
+    fired = []
+    wheel.schedule("far", 1010.0, _recorder(fired, "far"))
+
+    # Pasa por el balde de "far" (1010 % 4 == 1006 % 4) antes de su vuelta
+    assert wheel.advance(1006.0) == []
+    assert wheel.advance(1010.0) == ["far"]
+
+
+@pytest.mark.asyncio
+async def test_wheel_overdue_deadline_fires_on_next_tick():
+    clock = FakeClock()
+    wheel = TimerWheel(tick=1.0, slots=8, clock=clock)
+    fired = []
+    wheel.schedule("late", 900.0, _recorder(fired, "late"))
+
+    assert wheel.advance(1001.0) == ["late"]
+
+
+# ------------------------
+# | Programar / vencer |
+# ------------------------
+
+@pytest.fixture
+def timer():
+    previous = turn_timer._timer
+    wheel = turn_timer.init_turn_timer(tick=1.0)
+    yield wheel
+    turn_timer._timer = previous
+
+
+def test_programar_turno_is_noop_without_timer():
+    previous = turn_timer._timer
+    turn_timer._timer = None
+    try:
+        turn_timer.programar_turno(1, 1, datetime.now())
+    finally:
+        turn_timer._timer = previous
+
+
+def test_programar_turno_uses_start_time(timer):
+    start = datetime(2025, 1, 1, 12, 0, 0)
+    with patch.object(turn_timer.settings, "TURN_TIMEOUT_SECONDS", 120):
+        turn_timer.programar_turno(7, 70, start)
+
+    assert timer.deadline(("turn", 7)) == (start + timedelta(seconds=120)).timestamp()
+
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+def _game_in_progress(db, turn_start):
+    game = crud.create_game(db, {"player_turn_id": None})
+    room = crud.create_room(db, {
+        "name": "Sala", "status": models.RoomStatus.INGAME, "players_min": 2, "players_max": 4, "id_game": game.id
+    })
+    p1 = crud.create_player(db, {"name": "Ana", "avatar_src": "a.png", "birthdate": date(1990, 1, 1),
+                                 "id_room": room.id, "is_host": True, "order": 1})
+    p2 = crud.create_player(db, {"name": "Beto", "avatar_src": "b.png", "birthdate": date(1991, 1, 1),
+                                 "id_room": room.id, "is_host": False, "order": 2})
+    game.player_turn_id = p1.id
+    turn = models.Turn(number=1, id_game=game.id, player_id=p1.id,
+                       status=models.TurnStatus.IN_PROGRESS, start_time=turn_start)
+    db.add(turn)
+    db.commit()
+    return game, room, p1, p2, turn
+
+
+def test_recargar_deadlines_schedules_active_turns(db, timer):
+    start = datetime.now() - timedelta(seconds=30)
+    game, *_ = _game_in_progress(db, start)
+
+    with patch.object(turn_timer.settings, "TURN_TIMEOUT_SECONDS", 60):
+        assert turn_timer.recargar_deadlines(db) == 1
+
+    assert timer.deadline(("turn", game.id)) == pytest.approx((start + timedelta(seconds=60)).timestamp())
+
+
+@pytest.mark.asyncio
+async def test_expirar_turno_advances_turn_and_notifies(db, timer):
+    game, room, p1, p2, turn = _game_in_progress(db, datetime.now() - timedelta(minutes=10))
+    pending = crud.create_action(db, {
+        "id_game": game.id, "turn_id": turn.id, "player_id": p1.id, "action_name": "play_Poirot_set",
+        "action_type": models.ActionType.DETECTIVE_SET, "result": models.ActionResult.PENDING
+    })
+    db.commit()
+
+    ws = MagicMock()
+    ws.notificar_turn_expired = AsyncMock()
+    ws.notificar_estado_partida = AsyncMock()
+    ws.notificar_turn_finished = AsyncMock()
+
+    with patch("app.services.turn_timer.SessionLocal", TestingSessionLocal), \
+         patch("app.services.game_status_service.build_complete_game_state", return_value={"ok": True}), \
+         patch("app.sockets.socket_service.get_websocket_service", return_value=ws):
+        await turn_timer.expirar_turno(game.id, turn.id)
+
+    db.expire_all()
+    assert db.get(models.Game, game.id).player_turn_id == p2.id
+    assert db.get(models.Turn, turn.id).status == models.TurnStatus.FINISHED
+    assert db.get(models.ActionsPerTurn, pending.id).result == models.ActionResult.CANCELLED
+    # El turno nuevo queda programado
+    assert ("turn", game.id) in timer
+    ws.notificar_turn_expired.assert_awaited_once_with(
+        room_id=room.id, player_id=p1.id, next_player_id=p2.id, cancelled_actions=[pending.id]
+    )
+    ws.notificar_turn_finished.assert_awaited_once_with(room_id=room.id, player_id=p1.id)
+
+
+@pytest.mark.asyncio
+async def test_expirar_turno_ignores_finished_turn(db, timer):
+    game, room, p1, p2, turn = _game_in_progress(db, datetime.now())
+    turn.status = models.TurnStatus.FINISHED
+    db.commit()
+
+    with patch("app.services.turn_timer.SessionLocal", TestingSessionLocal), \
+         patch("app.sockets.socket_service.get_websocket_service") as mock_ws:
+        await turn_timer.expirar_turno(game.id, turn.id)
+
+    mock_ws.assert_not_called()
+    db.expire_all()
+    assert db.get(models.Game, game.id).player_turn_id == p1.id
+
+
+@pytest.mark.asyncio
+async def test_expirar_accion_waits_for_the_action_holding_the_game(db, timer):
+    from app.services.executor import game_key, ordered
+
+    game, room, p1, p2, turn = _game_in_progress(db, datetime.now())
+    action = crud.create_action(db, {
+        "id_game": game.id, "turn_id": turn.id, "player_id": p1.id, "action_name": "play_Poirot_set",
+        "action_type": models.ActionType.DETECTIVE_SET, "result": models.ActionResult.PENDING
+    })
+    db.commit()
+    action_id, action_time = action.id, action.action_time
+
+    ws = MagicMock()
+    ws.notificar_action_expired = AsyncMock()
+    with patch("app.services.turn_timer.SessionLocal", TestingSessionLocal), \
+         patch("app.sockets.socket_service.get_websocket_service", return_value=ws):
+        async with ordered(game_key(game.id)):
+            # El vencimiento dispara mientras la acción de detective tiene la partida
+            expiry = asyncio.ensure_future(turn_timer.expirar_accion(action_id, game.id, action_time))
+            await asyncio.sleep(0.05)
+            assert not expiry.done()
+            crud.update_action_result(db, action_id, models.ActionResult.SUCCESS, since=action_time)
+            db.commit()
+        await expiry
+
+    db.expire_all()
+    assert db.get(models.ActionsPerTurn, action_id).result == models.ActionResult.SUCCESS
+    ws.notificar_action_expired.assert_not_awaited()
@@ -0,0 +1,66 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+from unittest.mock import patch
+
+from app.db.database import Base
+from app.main import get_app
+from app.routes import cards
+from app.sockets import socket_manager
+from app.warmup import Warmup
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'warmup.db'}", poolclass=QueuePool, pool_size=3)
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_warmup_fills_pool_and_loads_catalog(engine):
+    warmup = Warmup(engine, sessionmaker(bind=engine), connections=5)
+
+    with patch.object(cards, "_catalog", None):
+        await warmup.start()
+        assert cards._catalog is not None
+
+    assert warmup.ready
+    assert engine.pool.checkedin() == 3  # acotado al tamaño del pool
+    assert set(warmup.status()["timings"]) == {"db_pool", "card_catalog", "total"}
+    assert warmup.status()["errors"] == {}
+
+
+@pytest.mark.asyncio
+async def test_warmup_failure_still_reports_ready(engine):
+    warmup = Warmup(engine, sessionmaker(bind=engine))
+
+    with patch.object(Warmup, "_load_catalog", side_effect=RuntimeError("sin DB")):
+        await warmup.run()
+
+    assert warmup.ready
+    assert warmup.errors == {"card_catalog": "sin DB"}
+
+
+@pytest.mark.asyncio
+async def test_health_is_starting_until_warmup_finishes(engine, monkeypatch):
+    app = get_app()
+    # El middleware del outbox necesita un ws manager (otros tests lo resetean)
+    monkeypatch.setattr(socket_manager, "_ws_manager", socket_manager.WebSocketManager(app.state.sio, lambda: None))
+    client = TestClient(app)
+    previous = app.state.warmup
+    app.state.warmup = Warmup(engine, sessionmaker(bind=engine))
+    try:
+        starting = client.get("/health")
+        await app.state.warmup.run()
+        healthy = client.get("/health")
+    finally:
+        app.state.warmup = previous
+
+    assert starting.status_code == 503
+    assert starting.json()["status"] == "starting"
+    assert healthy.status_code == 200
+    assert healthy.json()["status"] == "healthy"
@@ -0,0 +1,84 @@
+import json
+import zlib
+from datetime import datetime
+
+import msgpack
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.db.models import RoomStatus, TurnStatus
+from app.sockets import wire_format as wire
+from app.sockets.socket_manager import WebSocketManager
+
+STATE = {
+    "room_id": 1,
+    "mano": [{"id": 31, "cardId": 7, "name": "Parker Pyne", "description": "...", "type": "DETECTIVE", "img_src": "pyne.png"}],
+    "jugadores": [{"player_id": 1, "name": "Ana"}],
+}
+
+
+def test_negotiate_falls_back_to_known_formats():
+    assert wire.negotiate("COMPACT") == ("compact", False)
+    assert wire.negotiate("xml", deflate=True) == ("json", True)
+    with patch.object(wire, "msgpack", None):
+        assert wire.negotiate("msgpack") == ("compact", False)
+
+
+def test_compact_drops_catalog_fields_only_from_cards():
+    compact = wire.compact_payload(STATE)
+
+    assert compact["mano"] == [{"id": 31, "cardId": 7}]
+    # Un jugador no es una carta: conserva su nombre
+    assert compact["jugadores"] == [{"player_id": 1, "name": "Ana"}]
+    assert STATE["mano"][0]["name"] == "Parker Pyne"
+
+
+def test_encode_json_is_untouched_and_deflate_round_trips():
+    assert wire.encode(STATE) is STATE
+
+    deflated = wire.encode(STATE, wire.COMPACT, deflate=True)
+    assert json.loads(zlib.decompress(deflated)) == wire.compact_payload(STATE)
+    assert wire.encoded_size(STATE, wire.COMPACT, True) < wire.encoded_size(STATE)
+
+
+def test_msgpack_encodes_datetimes_and_enums_like_json():
+    sent_at = datetime(2026, 10, 19, 12, 30)
+    data = {"timestamp": sent_at, "status": RoomStatus.INGAME, "turn": TurnStatus.IN_PROGRESS}
+
+    packed = wire.encode(data, wire.MSGPACK)
+    deflated = wire.encode(data, wire.COMPACT, deflate=True)
+
+    assert msgpack.unpackb(packed, raw=False) == json.loads(zlib.decompress(deflated))
+    assert msgpack.unpackb(packed, raw=False)["timestamp"] == str(sent_at)
+
+
+@pytest.mark.asyncio
+async def test_emit_to_room_encodes_per_negotiated_format():
+    sio = MagicMock()
+    sio.emit = AsyncMock()
+    mgr = WebSocketManager(sio, MagicMock())
+    mgr.user_sessions = {
+        "plain": {"room_id": 1, "user_id": 1},
+        "small": {"room_id": 1, "user_id": 2, "format": "compact", "deflate": False},
+    }
+
+    await mgr.emit_to_room(1, "game_state_public", STATE)
+
+    plain_call, compact_call = sio.emit.await_args_list
+    assert plain_call.kwargs == {"room": "game_1", "skip_sid": ["small"]}
+    assert plain_call.args[1]["mano"][0]["name"] == "Parker Pyne"
+    assert compact_call.kwargs == {"to": ["small"]}
+    assert compact_call.args[1]["mano"] == [{"id": 31, "cardId": 7}]
+
+
+@pytest.mark.asyncio
+async def test_emit_to_sid_uses_session_format():
+    sio = MagicMock()
+    sio.emit = AsyncMock()
+    mgr = WebSocketManager(sio, MagicMock())
+    mgr.user_sessions = {"s1": {"room_id": 1, "user_id": 2, "format": "json", "deflate": True}}
+
+    await mgr.emit_to_sid("s1", "game_state_private", {"mano": []})
+
+    payload = sio.emit.await_args.args[1]
+    assert json.loads(zlib.decompress(payload))["mano"] == []
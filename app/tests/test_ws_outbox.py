@@ -0,0 +1,77 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.sockets import socket_manager
+from app.sockets.socket_manager import WebSocketManager, collect_ws_events
+
+
+@pytest.fixture
+def mgr():
+    sio = MagicMock()
+    sio.emit = AsyncMock()
+    manager = WebSocketManager(sio, MagicMock())
+    manager.user_sessions = {
+        "old": {"room_id": 1, "user_id": 1},
+        "new": {"room_id": 1, "user_id": 2, "batch": True},
+    }
+    return manager
+
+
+@pytest.mark.asyncio
+async def test_outbox_sends_one_batch_per_batching_connection(mgr):
+    async with mgr.outbox():
+        await mgr.emit_to_room(1, "game_state_public", {"turno": 2})
+        await mgr.emit_to_sid("old", "game_state_private", {"mano": [1]})
+        await mgr.emit_to_sid("new", "game_state_private", {"mano": [2]})
+        await mgr.emit_to_room(1, "card_drawn_simple", {"n": 1})
+        # Nada sale antes del flush
+        mgr.sio.emit.assert_not_awaited()
+
+    calls = mgr.sio.emit.await_args_list
+    batch = calls[0]
+    assert batch.args[0] == "batch" and batch.kwargs == {"to": "new"}
+    assert [e["event"] for e in batch.args[1]["events"]] == ["game_state_public", "game_state_private", "card_drawn_simple"]
+    assert batch.args[1]["events"][1]["data"]["mano"] == [2]
+
+    # La conexión sin batch recibe los mismos eventos sueltos y en orden
+    assert [(c.args[0], c.kwargs) for c in calls[1:]] == [
+        ("game_state_public", {"room": "game_1", "skip_sid": ["new"]}),
+        ("game_state_private", {"to": "old"}),
+        ("card_drawn_simple", {"room": "game_1", "skip_sid": ["new"]}),
+    ]
+    seqs = [e["data"]["seq"] for e in batch.args[1]["events"]]
+    assert seqs == sorted(seqs)
+
+
+@pytest.mark.asyncio
+async def test_nested_outbox_flushes_once_at_outermost(mgr):
+    async with mgr.outbox():
+        async with mgr.outbox():
+            await mgr.emit_to_room(1, "turn_finished", {})
+        mgr.sio.emit.assert_not_awaited()
+    assert mgr.sio.emit.await_count == 2
+
+
+def test_middleware_flushes_after_the_request(mgr):
+    previous = socket_manager._ws_manager
+    socket_manager._ws_manager = mgr
+    app = FastAPI()
+    app.middleware("http")(collect_ws_events)
+
+    @app.post("/accion")
+    async def accion():
+        await mgr.emit_to_room(1, "turn_finished", {"player_id": 1})
+        await mgr.emit_to_room(1, "player_must_draw", {"player_id": 2})
+        assert mgr.sio.emit.await_count == 0
+        return {"ok": True}
+
+    try:
+        assert TestClient(app).post("/accion").json() == {"ok": True}
+    finally:
+        socket_manager._ws_manager = previous
+
+    events = [c.args[0] for c in mgr.sio.emit.await_args_list]
+    assert events == ["batch", "turn_finished", "player_must_draw"]
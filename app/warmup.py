@@ -0,0 +1,96 @@
+# app/warmup.py
+"""
+Warmup del worker antes de reportarse sano.
+
+En un reinicio escalonado el balanceador manda tráfico apenas ``/health``
+responde 200; sin warmup las primeras requests de cada worker pagaban abrir las
+conexiones de la DB y cargar el catálogo de cartas. Al arrancar se corre en un
+thread (sin bloquear el event loop):
+
+- abre hasta ``connections`` conexiones del pool a la vez (``SELECT 1`` en cada
+  una) y las devuelve, así quedan listas para reusar;
+- carga el catálogo de cartas del proceso (routes/cards.py).
+
+Mientras tanto ``/health`` responde 503 ``starting``. Si un paso falla se
+registra el error y el worker igual queda sano: es una optimización, no un
+requisito para atender.
+"""
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+
+class Warmup:
+
+    def __init__(self, engine, db_factory: Callable, connections: int = 5):
+        self.engine = engine
+        self.db_factory = db_factory
+        self.connections = connections
+        self.done = asyncio.Event()
+        self.timings: Dict[str, float] = {}  # paso -> segundos
+        self.errors: Dict[str, str] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.done.is_set()
+
+    def start(self) -> asyncio.Task:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def run(self):
+        started = time.monotonic()
+        try:
+            await asyncio.to_thread(self._step, "db_pool", self._fill_pool)
+            await asyncio.to_thread(self._step, "card_catalog", self._load_catalog)
+        finally:
+            self.timings["total"] = time.monotonic() - started
+            self.done.set()
+            logger.info("Warmup terminado en %.3fs: %s", self.timings["total"], self.timings)
+
+    def _step(self, name: str, step: Callable[[], None]):
+        started = time.monotonic()
+        try:
+            step()
+        except Exception as e:
+            self.errors[name] = str(e)
+            logger.warning("Warmup %s falló: %s", name, e)
+        finally:
+            self.timings[name] = time.monotonic() - started
+
+    def _fill_pool(self):
+        size = getattr(self.engine.pool, "size", None)
+        wanted = min(self.connections, size()) if callable(size) else 1
+        opened = []
+        try:
+            for _ in range(max(wanted, 1)):
+                conn = self.engine.connect()
+                opened.append(conn)
+                conn.execute(text("SELECT 1"))
+        finally:
+            for conn in opened:
+                conn.close()
+
+    def _load_catalog(self):
+        from app.routes.cards import load_catalog  # Import aquí para evitar circular imports
+
+        db = self.db_factory()
+        try:
+            catalog = load_catalog(db)
+            logger.debug("Warmup: catálogo con %s cartas", len(catalog.items))
+        finally:
+            db.close()
+
+    def status(self) -> dict:
+        return {
+            "ready": self.ready,
+            "timings": {name: round(seconds, 4) for name, seconds in self.timings.items()},
+            "errors": dict(self.errors),
+        }
@@ -0,0 +1,106 @@
+# benchmarks/conftest.py
+import os
+
+# Antes de importar app.db.database (create_engine necesita una URL)
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+import asyncio
+import pytest
+from dataclasses import dataclass
+from datetime import date
+from typing import List
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db import crud, models
+from app.db.database import Base
+from app.db.seed import seed_card_catalog
+from app.routes.start import start_game
+from app.schemas.start import StartRequest
+
+PLAYER_COUNTS = [2, 4, 6]
+
+
+@dataclass
+class SeededGame:
+    db: Session
+    room_id: int
+    game_id: int
+    player_ids: List[int]
+    current_player_id: int
+
+
+@pytest.fixture(scope="session")
+def event_loop_runner():
+    """Un único event loop para correr corutinas dentro del benchmark sin el costo de asyncio.run"""
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
+
+
+def fake_websocket_service():
+    ws = MagicMock()
+    ws.notificar_estado_partida = AsyncMock()
+    return ws
+
+
+def new_database() -> Session:
+    """SQLite en memoria, nueva por partida, con el catálogo de cartas cargado"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    seed_card_catalog(db)
+    return db
+
+
+def create_waiting_room(db: Session, num_players: int):
+    """Crea una sala WAITING con num_players jugadores. Devuelve (room, players)"""
+    room = crud.create_room(db, {
+        "name": f"bench-{num_players}",
+        "status": models.RoomStatus.WAITING,
+        "players_min": 2,
+        "players_max": 6
+    })
+    players = [
+        crud.create_player(db, {
+            "name": f"Bench {i}",
+            "avatar_src": f"/avatars/bench{i}.png",
+            "birthdate": date(1990, (i % 12) + 1, 10),
+            "id_room": room.id,
+            "is_host": i == 0,
+            "order": i + 1
+        })
+        for i in range(num_players)
+    ]
+    return room, players
+
+
+def seed_game(num_players: int, run) -> SeededGame:
+    """Partida INGAME repartida por el mismo start_game que usa la API"""
+    db = new_database()
+    room, players = create_waiting_room(db, num_players)
+
+    with patch("app.routes.start.get_websocket_service", return_value=fake_websocket_service()):
+        run(start_game(room.id, StartRequest(user_id=players[0].id), db))
+
+    db.refresh(room)
+    game = crud.get_game_by_id(db, room.id_game)
+    return SeededGame(
+        db=db,
+        room_id=room.id,
+        game_id=game.id,
+        player_ids=[p.id for p in players],
+        current_player_id=game.player_turn_id
+    )
+
+
+@pytest.fixture(params=PLAYER_COUNTS, ids=lambda n: f"{n}p")
+def num_players(request):
+    return request.param
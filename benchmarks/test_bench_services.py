@@ -0,0 +1,123 @@
+# benchmarks/test_bench_services.py
+from unittest.mock import patch
+
+from app.db import models
+from app.routes.start import start_game
+from app.schemas.detective_set_schema import PlayDetectiveSetRequest, SetType
+from app.schemas.start import StartRequest
+from app.services.detective_set_service import DetectiveSetService
+from app.services.discard import descartar_cartas
+from app.services.draft_service import pick_card_from_draft
+from app.services.game_status_service import build_complete_game_state
+from app.services.take_deck import robar_cartas_del_mazo
+
+from .conftest import create_waiting_room, fake_websocket_service, new_database, seed_game
+
+ROUNDS = 15
+
+
+def _hand(db, game_id, player_id):
+    return db.query(models.CardsXGame).filter(
+        models.CardsXGame.id_game == game_id,
+        models.CardsXGame.player_id == player_id,
+        models.CardsXGame.is_in == models.CardState.HAND
+    ).order_by(models.CardsXGame.position).all()
+
+
+def test_build_complete_game_state(benchmark, num_players, event_loop_runner):
+    seeded = seed_game(num_players, event_loop_runner)
+
+    state = benchmark(build_complete_game_state, seeded.db, seeded.game_id)
+
+    assert len(state["jugadores"]) == num_players
+
+
+def test_start_game_dealing(benchmark, num_players, event_loop_runner):
+    def setup():
+        db = new_database()
+        room, players = create_waiting_room(db, num_players)
+        return (room.id, StartRequest(user_id=players[0].id), db), {}
+
+    def deal(room_id, request, db):
+        return event_loop_runner(start_game(room_id, request, db))
+
+    with patch("app.routes.start.get_websocket_service", return_value=fake_websocket_service()):
+        payload = benchmark.pedantic(deal, setup=setup, rounds=ROUNDS)
+
+    assert len(payload["turn"]["order"]) == num_players
+
+
+def test_descartar_cartas(benchmark, num_players, event_loop_runner):
+    def setup():
+        seeded = seed_game(num_players, event_loop_runner)
+        game = seeded.db.get(models.Game, seeded.game_id)
+        cards = _hand(seeded.db, seeded.game_id, seeded.current_player_id)[:3]
+        return (seeded.db, game, seeded.current_player_id, cards), {}
+
+    def discard(db, game, user_id, cards):
+        return event_loop_runner(descartar_cartas(db, game, user_id, cards))
+
+    discarded = benchmark.pedantic(discard, setup=setup, rounds=ROUNDS)
+
+    assert len(discarded) == 3
+
+
+def test_robar_cartas_del_mazo(benchmark, num_players, event_loop_runner):
+    def setup():
+        seeded = seed_game(num_players, event_loop_runner)
+        game = seeded.db.get(models.Game, seeded.game_id)
+        return (seeded.db, game, seeded.current_player_id, 3), {}
+
+    def draw(db, game, user_id, cantidad):
+        return event_loop_runner(robar_cartas_del_mazo(db, game, user_id, cantidad))
+
+    drawn = benchmark.pedantic(draw, setup=setup, rounds=ROUNDS)
+
+    assert len(drawn) == 3
+
+
+def test_pick_card_from_draft(benchmark, num_players, event_loop_runner):
+    def setup():
+        seeded = seed_game(num_players, event_loop_runner)
+        draft_card = seeded.db.query(models.CardsXGame).filter(
+            models.CardsXGame.id_game == seeded.game_id,
+            models.CardsXGame.is_in == models.CardState.DRAFT
+        ).first()
+        return (seeded.db, draft_card.id, seeded.current_player_id), {}
+
+    picked = benchmark.pedantic(pick_card_from_draft, setup=setup, rounds=ROUNDS)
+
+    assert picked is not None
+
+
+def test_play_detective_set(benchmark, num_players, event_loop_runner):
+    poirot_id = DetectiveSetService.SET_CARD_IDS[SetType.POIROT]
+
+    def setup():
+        seeded = seed_game(num_players, event_loop_runner)
+        db = seeded.db
+        # Forzar un set de Poirot en la mano del jugador activo
+        poirots = db.query(models.CardsXGame).filter(
+            models.CardsXGame.id_game == seeded.game_id,
+            models.CardsXGame.id_card == poirot_id
+        ).limit(3).all()
+        for card in poirots:
+            card.is_in = models.CardState.HAND
+            card.player_id = seeded.current_player_id
+        db.commit()
+
+        request = PlayDetectiveSetRequest(
+            owner=seeded.current_player_id,
+            setType=SetType.POIROT,
+            cards=[c.id for c in poirots],
+            hasWildcard=False
+        )
+        return (DetectiveSetService(db), seeded.game_id, request), {}
+
+    def play(service, game_id, request):
+        return service.play_detective_set(game_id, request)
+
+    action_id, next_action = benchmark.pedantic(play, setup=setup, rounds=ROUNDS)
+
+    assert action_id is not None
+    assert len(next_action.allowedPlayers) == num_players - 1
@@ -0,0 +1,117 @@
+# benchmarks/test_bench_sockets.py
+import asyncio
+import itertools
+
+import pytest
+
+from app.services.game_status_service import build_complete_game_state
+from app.sockets import socket_events, socket_manager
+from app.sockets.socket_manager import init_ws_manager
+from app.sockets.socket_service import WebSocketService
+
+from .conftest import seed_game
+
+# Sockets que conectan a la vez en cada ronda del benchmark de connect
+CONNECT_BURST = 100
+
+# Salas conectadas además de la medida: get_sids_in_game y emit_to_room no deberían depender de ellas
+OTHER_ROOMS = 200
+
+
+class CountingSio:
+    """AsyncServer falso: solo cuenta emits, sin red ni serialización"""
+
+    def __init__(self):
+        self.emits = 0
+        self.handlers = {}
+
+    async def emit(self, event, data=None, room=None, to=None, skip_sid=None):
+        self.emits += 1
+
+    # Lo mínimo de AsyncServer para registrar y correr los handlers de socket_events
+
+    def event(self, handler):
+        self.handlers[handler.__name__] = handler
+        return handler
+
+    async def save_session(self, sid, session):
+        pass
+
+    async def enter_room(self, sid, room):
+        pass
+
+
+@pytest.fixture
+def fan_out(num_players, event_loop_runner):
+    seeded = seed_game(num_players, event_loop_runner)
+    game_state = build_complete_game_state(seeded.db, seeded.game_id)
+
+    sio = CountingSio()
+    previous = socket_manager._ws_manager
+    manager = init_ws_manager(sio, lambda: seeded.db)
+
+    for other in range(OTHER_ROOMS):
+        for seat in range(num_players):
+            manager.user_sessions[f"other-{other}-{seat}"] = {
+                "user_id": 10_000 + other * 10 + seat,
+                "room_id": 10_000 + other,
+                "connected_at": "2025-01-01T00:00:00"
+            }
+    for player_id in seeded.player_ids:
+        manager.user_sessions[f"sid-{player_id}"] = {
+            "user_id": player_id,
+            "room_id": seeded.room_id,
+            "connected_at": "2025-01-01T00:00:00"
+        }
+
+    yield seeded, game_state, sio
+    socket_manager._ws_manager = previous
+
+
+def test_notificar_estado_partida_fan_out(benchmark, fan_out, event_loop_runner, num_players):
+    seeded, game_state, sio = fan_out
+    service = WebSocketService()
+
+    def notify():
+        event_loop_runner(service.notificar_estado_partida(room_id=seeded.room_id, game_state=game_state))
+
+    benchmark(notify)
+
+    # Un game_state_public a la sala + un game_state_private por jugador
+    assert sio.emits % (num_players + 1) == 0
+
+
+def test_get_room_participants(benchmark, fan_out, event_loop_runner, num_players):
+    seeded, _, _ = fan_out
+    manager = socket_manager.get_ws_manager()
+
+    participants = benchmark(lambda: event_loop_runner(manager.get_room_participants(seeded.room_id)))
+
+    assert len(participants) == num_players
+
+
+def test_connect_rate(benchmark, fan_out, event_loop_runner, num_players):
+    """Connects por segundo que acepta un proceso (validación + join + presencia), en ráfagas"""
+    seeded, _, sio = fan_out
+    manager = socket_manager.get_ws_manager()
+    socket_events.register_events(sio)
+    connect = sio.handlers["connect"]
+    sids = itertools.count()
+
+    async def burst():
+        batch = [(f"bench-{next(sids)}", seeded.player_ids[n % num_players]) for n in range(CONNECT_BURST)]
+        results = await asyncio.gather(*(
+            connect(sid, {"QUERY_STRING": f"user_id={user_id}&room_id={seeded.room_id}"})
+            for sid, user_id in batch
+        ))
+        assert all(results)
+        # Desconecta la ráfaga para que cada ronda mida lo mismo
+        for sid, _ in batch:
+            del manager.user_sessions[sid]
+
+    benchmark(lambda: event_loop_runner(burst()))
+
+    if benchmark.stats:
+        benchmark.extra_info["connects_per_second"] = round(CONNECT_BURST / benchmark.stats.stats.mean)
+    # La sala se cargó de la DB una sola vez para todas las ráfagas
+    assert manager.presence.loads == 1
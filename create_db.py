@@ -1,5 +1,15 @@
-from app.db.database import engine, Base
+import sys
+from app.db.database import engine, Base, SessionLocal
 import app.db.models 
 
 Base.metadata.create_all(bind=engine)
-print("Tablas creadas automáticamente en la base de datos.")
\ No newline at end of file
+print("Tablas creadas automáticamente en la base de datos.")
+
+# python create_db.py --seed-cards  -> carga el catálogo de cartas (útil con SQLite)
+if "--seed-cards" in sys.argv:
+    from app.db.seed import seed_card_catalog
+    db = SessionLocal()
+    try:
+        print(f"Catálogo de cartas cargado: {seed_card_catalog(db)} cartas.")
+    finally:
+        db.close()
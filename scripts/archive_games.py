@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+"""
+scripts/archive_games.py
+
+Archiva las partidas terminadas (app/services/game_archive.py): exporta sus
+cartas, turnos y acciones a ``ARCHIVE_DIR/game_{id}.json.gz`` y las borra de las
+tablas calientes en lotes. ``--restore`` vuelve a cargar una partida archivada.
+
+Uso:
+    python scripts/archive_games.py                  # archiva todas las pendientes
+    python scripts/archive_games.py --limit 100 --batch-size 1000
+    python scripts/archive_games.py --list           # solo lista las pendientes
+    python scripts/archive_games.py --restore 42
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archivo de partidas terminadas")
+    parser.add_argument("--limit", type=int, default=0, help="máximo de partidas a archivar (0 = todas)")
+    parser.add_argument("--batch-size", type=int, help="filas por lote al borrar/restaurar (default ARCHIVE_BATCH_SIZE)")
+    parser.add_argument("--dir", dest="directory", help="directorio de los archivos (default ARCHIVE_DIR)")
+    parser.add_argument("--list", action="store_true", help="listar las partidas pendientes sin archivar")
+    parser.add_argument("--restore", type=int, metavar="GAME_ID", help="restaurar una partida archivada")
+    args = parser.parse_args()
+
+    from app.services.game_archive import get_game_archiver
+
+    archiver = get_game_archiver()
+    if args.batch_size:
+        archiver.batch_size = args.batch_size
+    if args.directory:
+        archiver.directory = args.directory
+
+    if args.restore is not None:
+        if not archiver.is_archived(args.restore):
+            print(f"La partida {args.restore} no está archivada en {archiver.directory}")
+            sys.exit(1)
+        print(json.dumps({"restored": args.restore, "rows": archiver.restore_game(args.restore)}))
+    elif args.list:
+        print(json.dumps({"pending": archiver.pending_games(args.limit or None)}))
+    else:
+        print(json.dumps(archiver.archive_finished(args.limit or None)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+"""
+scripts/import_profile.py
+
+Perfil de importación del arranque (estilo ``python -X importtime``).
+
+Corre en un proceso nuevo ``import app.main`` y ``create_app()`` (que es donde
+se importan FastAPI, SQLAlchemy, Socket.IO y las rutas) con ``-X importtime``,
+y resume el reporte: tiempo total, los paquetes de terceros y los módulos de
+``app`` con mayor tiempo acumulado, y lo que tarda ``create_app()``.
+
+Uso:
+    python scripts/import_profile.py
+    python scripts/import_profile.py --top 30 --json imports.json
+    python scripts/import_profile.py --budget-ms 1500      # falla si el total lo supera
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+_TARGET = """
+import time
+started = time.perf_counter()
+import {module} as target
+imported = time.perf_counter()
+{call}
+print("create_app_ms=%.1f import_ms=%.1f" % ((time.perf_counter() - imported) * 1000, (imported - started) * 1000))
+"""
+
+
+def run_importtime(module: str, factory: str):
+    call = f"target.{factory}()" if factory else ""
+    env = {**os.environ, "PYTHONPATH": ROOT}
+    env.setdefault("DATABASE_URL", "sqlite:///:memory:")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _TARGET.format(module=module, call=call)],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr)
+        raise SystemExit(proc.returncode)
+    return proc.stdout, proc.stderr
+
+
+def parse(report: str):
+    """Entradas (módulo, self_us, cumulative_us, profundidad) en el orden del reporte"""
+    entries = []
+    for line in report.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return entries
+
+
+def summarize(entries, top: int):
+    # Total = suma de los imports de primer nivel (cada uno ya incluye a sus hijos)
+    total_us = sum(cumulative for _, _, cumulative, depth in entries if depth == 0)
+    first_party = sorted(
+        (e for e in entries if e[0] == "app" or e[0].startswith("app.")),
+        key=lambda e: e[2], reverse=True,
+    )
+    # Paquetes de terceros: el import de la raíz del paquete más costoso
+    packages = {}
+    for name, _, cumulative, _ in entries:
+        root = name.split(".")[0]
+        if root != "app":
+            packages[root] = max(packages.get(root, 0), cumulative)
+    third_party = sorted(packages.items(), key=lambda item: item[1], reverse=True)
+    return {
+        "total_ms": round(total_us / 1000, 1),
+        "modules": len(entries),
+        "third_party": [{"package": name, "cumulative_ms": round(us / 1000, 1)} for name, us in third_party[:top]],
+        "app": [
+            {"module": name, "self_ms": round(self_us / 1000, 1), "cumulative_ms": round(cumulative / 1000, 1)}
+            for name, self_us, cumulative, _ in first_party[:top]
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Perfil de importación del arranque de la aplicación")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--factory", default="create_app", help="función del módulo a llamar ('' = solo importar)")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=0, help="falla (exit 1) si el total supera este tiempo")
+    parser.add_argument("--json", dest="json_path", help="guardar el resumen en este archivo")
+    args = parser.parse_args()
+
+    stdout, report = run_importtime(args.module, args.factory)
+    summary = summarize(parse(report), args.top)
+    timings = dict(item.split("=") for item in stdout.split() if "=" in item)
+    summary.update({key: float(value) for key, value in timings.items()})
+
+    print(f"{summary['modules']} módulos, {summary['total_ms']} ms importando "
+          f"(import {args.module}: {summary.get('import_ms', 0)} ms, {args.factory or '-'}: {summary.get('create_app_ms', 0)} ms)")
+    print(f"\n{'paquete':<32}{'acumulado ms':>14}")
+    for item in summary["third_party"]:
+        print(f"{item['package']:<32}{item['cumulative_ms']:>14}")
+    print(f"\n{'módulo app':<40}{'propio ms':>10}{'acumulado ms':>14}")
+    for item in summary["app"]:
+        print(f"{item['module']:<40}{item['self_ms']:>10}{item['cumulative_ms']:>14}")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(summary, f, indent=2)
+
+    if args.budget_ms and summary["total_ms"] > args.budget_ms:
+        print(f"\nEl import supera el presupuesto: {summary['total_ms']} ms > {args.budget_ms} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
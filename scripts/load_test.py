@@ -0,0 +1,494 @@
+#!/usr/bin/env python
+"""
+scripts/load_test.py
+
+Generador de carga con jugadores simulados (bots).
+
+Cada partida simulada:
+  1. Crea la sala con POST /game (host) y une bots con POST /game/{room_id}/join
+  2. Conecta un cliente Socket.IO por jugador (?user_id=..&room_id=..)
+  3. Inicia la partida con POST /game/{room_id}/start
+  4. Juega turnos legales: set de detective (si hay), discard, draft pick o take-deck, finish-turn
+
+Al terminar reporta throughput, latencias p50/p95/p99 por endpoint y el lag de entrega
+de los eventos WebSocket (timestamp del payload vs. hora de recepción; válido solo si
+el servidor corre en la misma máquina).
+
+Uso:
+    # Servidor con SQLite
+    DATABASE_URL=sqlite:///./loadtest.db python create_db.py --seed-cards
+    DATABASE_URL=sqlite:///./loadtest.db uvicorn app.main:socket_app --port 8000
+
+    python scripts/load_test.py --games 20 --players 4 --think-time 0.1 --duration 120
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import random
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import httpx
+import socketio
+
+logger = logging.getLogger("load_test")
+
+HAND_SIZE = 6
+
+# setType -> (nombre de carta, cartas necesarias). Solo sets sin comodín.
+DETECTIVE_SETS = {
+    "poirot": ("Hercule Poirot", 3),
+    "marple": ("Miss Marple", 3),
+    "pyne": ("Parker Pyne", 2),
+    "satterthwaite": ("Mr Satterthwaite", 2),
+    "eileenbrent": ('Lady Eileen "Bundle" Brent', 2),
+}
+TWO_STEP_SETS = {"satterthwaite", "eileenbrent", "beresford"}
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Percentil por rango más cercano (values no vacío)"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class Metrics:
+    """Acumula latencias HTTP por endpoint y lag de eventos WebSocket"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.ws_lag: Dict[str, List[float]] = defaultdict(list)
+        self.games_started = 0
+        self.games_finished = 0
+        self.turns = 0
+
+    def record_request(self, endpoint: str, seconds: float, status: str):
+        self.latencies[endpoint].append(seconds)
+        self.statuses[endpoint][status] += 1
+
+    def record_event(self, event: str, data):
+        if not isinstance(data, dict) or "timestamp" not in data:
+            return
+        try:
+            sent = datetime.fromisoformat(data["timestamp"])
+        except (TypeError, ValueError):
+            return
+        self.ws_lag[event].append((datetime.now() - sent).total_seconds())
+
+    @staticmethod
+    def _summary(values: List[float]) -> dict:
+        if not values:
+            return {"count": 0}
+        return {
+            "count": len(values),
+            "p50_ms": round(percentile(values, 50) * 1000, 2),
+            "p95_ms": round(percentile(values, 95) * 1000, 2),
+            "p99_ms": round(percentile(values, 99) * 1000, 2),
+            "max_ms": round(max(values) * 1000, 2),
+        }
+
+    def report(self) -> dict:
+        elapsed = time.perf_counter() - self.started
+        total_requests = sum(len(v) for v in self.latencies.values())
+        return {
+            "elapsed_s": round(elapsed, 2),
+            "games_started": self.games_started,
+            "games_finished": self.games_finished,
+            "turns": self.turns,
+            "requests": total_requests,
+            "throughput_rps": round(total_requests / elapsed, 2) if elapsed else 0,
+            "turns_per_s": round(self.turns / elapsed, 2) if elapsed else 0,
+            "endpoints": {
+                endpoint: {**self._summary(values), "status": dict(self.statuses[endpoint])}
+                for endpoint, values in sorted(self.latencies.items())
+            },
+            "ws_events": {
+                event: self._summary(values)
+                for event, values in sorted(self.ws_lag.items())
+            },
+        }
+
+
+def format_report(report: dict) -> str:
+    lines = [
+        f"Duración: {report['elapsed_s']}s  partidas: {report['games_started']} iniciadas / "
+        f"{report['games_finished']} terminadas  turnos: {report['turns']}",
+        f"Requests: {report['requests']}  throughput: {report['throughput_rps']} req/s  "
+        f"turnos/s: {report['turns_per_s']}",
+        "",
+        f"{'endpoint':<32}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}  status",
+    ]
+    for endpoint, s in report["endpoints"].items():
+        lines.append(
+            f"{endpoint:<32}{s['count']:>8}{s.get('p50_ms', '-'):>10}{s.get('p95_ms', '-'):>10}"
+            f"{s.get('p99_ms', '-'):>10}  {s['status']}"
+        )
+    lines += ["", f"{'evento ws (lag)':<32}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"]
+    for event, s in report["ws_events"].items():
+        lines.append(
+            f"{event:<32}{s['count']:>8}{s.get('p50_ms', '-'):>10}{s.get('p95_ms', '-'):>10}{s.get('p99_ms', '-'):>10}"
+        )
+    return "\n".join(lines)
+
+
+def find_detective_set(hand: List[dict]) -> Optional[tuple]:
+    """Busca en la mano un set jugable sin comodín. Devuelve (setType, [ids]) o None"""
+    by_name = defaultdict(list)
+    for card in hand:
+        by_name[card["name"]].append(card["id"])
+
+    for set_type, (name, needed) in DETECTIVE_SETS.items():
+        if len(by_name[name]) >= needed:
+            return set_type, by_name[name][:needed]
+
+    tommy, tuppence = by_name["Tommy Beresford"], by_name["Tuppence Beresford"]
+    if tommy and tuppence:
+        return "beresford", [tommy[0], tuppence[0]]
+    return None
+
+
+class LoadTest:
+    """Estado compartido: cliente HTTP, métricas y configuración"""
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.metrics = Metrics()
+        self.client: Optional[httpx.AsyncClient] = None
+        self.deadline = time.monotonic() + args.duration
+
+    async def request(self, endpoint: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        t0 = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            self.metrics.record_request(endpoint, time.perf_counter() - t0, type(e).__name__)
+            logger.debug("%s %s failed: %s", method, url, e)
+            return None
+        self.metrics.record_request(endpoint, time.perf_counter() - t0, str(response.status_code))
+        if response.status_code >= 400:
+            logger.debug("%s %s -> %s %s", method, url, response.status_code, response.text[:200])
+        return response
+
+    async def think(self):
+        if self.args.think_time > 0:
+            await asyncio.sleep(random.expovariate(1 / self.args.think_time))
+
+
+class BotPlayer:
+    """Jugador simulado: un cliente Socket.IO + decisiones de juego"""
+
+    def __init__(self, lt: LoadTest, game: "SimulatedGame", player_id: int):
+        self.lt = lt
+        self.game = game
+        self.player_id = player_id
+        self.hand: List[dict] = []
+        self.secrets: List[dict] = []
+        self.private_updated = asyncio.Event()
+        self.sio = socketio.AsyncClient(reconnection=False)
+        self._register_handlers()
+
+    def _register_handlers(self):
+        metrics = self.lt.metrics
+
+        @self.sio.on("*")
+        async def any_event(event, data=None):
+            metrics.record_event(event, data)
+
+        @self.sio.on("game_state_public")
+        async def on_public(data):
+            metrics.record_event("game_state_public", data)
+            self.game.public_state = data
+
+        @self.sio.on("game_state_private")
+        async def on_private(data):
+            metrics.record_event("game_state_private", data)
+            self.hand = data.get("mano", [])
+            self.secrets = data.get("secretos", [])
+            self.private_updated.set()
+
+        @self.sio.on("select_own_secret")
+        async def on_select_own_secret(data):
+            metrics.record_event("select_own_secret", data)
+            asyncio.create_task(self.answer_detective_action(int(data["action_id"])))
+
+        @self.sio.on("detective_action_complete")
+        async def on_action_complete(data):
+            metrics.record_event("detective_action_complete", data)
+            self.game.detective_done.set()
+
+        @self.sio.on("game_ended")
+        async def on_game_ended(data):
+            metrics.record_event("game_ended", data)
+            self.game.finished = True
+
+    async def connect(self):
+        url = f"{self.lt.args.base_url}?user_id={self.player_id}&room_id={self.game.room_id}"
+        t0 = time.perf_counter()
+        try:
+            await self.sio.connect(url, transports=["websocket"])
+            self.lt.metrics.record_request("WS connect", time.perf_counter() - t0, "ok")
+        except socketio.exceptions.ConnectionError as e:
+            self.lt.metrics.record_request("WS connect", time.perf_counter() - t0, "error")
+            logger.warning("Player %s could not connect: %s", self.player_id, e)
+
+    async def disconnect(self):
+        if self.sio.connected:
+            await self.sio.disconnect()
+
+    async def act(self, endpoint: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        """Ejecuta una acción y espera el estado privado que emite el servidor"""
+        self.private_updated.clear()
+        response = await self.lt.request(endpoint, method, url, **kwargs)
+        if response is not None and response.status_code < 400:
+            try:
+                await asyncio.wait_for(self.private_updated.wait(), self.lt.args.ws_timeout)
+            except asyncio.TimeoutError:
+                logger.debug("No private state after %s for player %s", endpoint, self.player_id)
+        await self.lt.think()
+        return response
+
+    async def play_turn(self) -> Optional[int]:
+        """Juega un turno completo y devuelve el id del siguiente jugador"""
+        room_id, game_id = self.game.room_id, self.game.game_id
+        headers = {"HTTP_USER_ID": str(self.player_id)}
+
+        if random.random() < self.lt.args.set_probability:
+            await self.try_detective_set()
+
+        if self.hand:
+            card = random.choice(self.hand)
+            await self.act(
+                "POST discard", "POST", f"/game/{room_id}/discard",
+                json={"card_ids": [{"order": 1, "card_id": card["id"]}]},
+                headers=headers,
+            )
+
+        missing = HAND_SIZE - len(self.hand)
+        mazos = (self.game.public_state or {}).get("mazos", {})
+        draft = mazos.get("deck", {}).get("draft", [])
+        if missing > 0 and draft and random.random() < self.lt.args.draft_probability:
+            await self.act(
+                "POST draft/pick", "POST", f"/game/{game_id}/draft/pick",
+                json={"card_id": random.choice(draft)["id"], "user_id": self.player_id},
+            )
+            missing = HAND_SIZE - len(self.hand)
+
+        if missing > 0 and mazos.get("deck", {}).get("count", 1) > 0:
+            await self.act(
+                "POST take-deck", "POST", f"/game/{room_id}/take-deck",
+                json={"cantidad": min(missing, 10)},
+                headers=headers,
+            )
+
+        response = await self.lt.request(
+            "POST finish-turn", "POST", f"/game/{room_id}/finish-turn",
+            json={"user_id": self.player_id},
+        )
+        if response is None or response.status_code != 200:
+            return None
+        return response.json()["next_turn"]
+
+    async def try_detective_set(self):
+        found = find_detective_set(self.hand)
+        if not found:
+            return
+        set_type, card_ids = found
+
+        response = await self.act(
+            "POST play-detective-set", "POST", f"/api/game/{self.game.room_id}/play-detective-set",
+            json={"owner": self.player_id, "setType": set_type, "cards": card_ids, "hasWildcard": False},
+        )
+        if response is None or response.status_code != 200:
+            return
+
+        body = response.json()
+        allowed = body["nextAction"]["allowedPlayers"]
+        if not allowed:
+            return
+        target = random.choice(allowed)
+        payload = {"actionId": body["actionId"], "executorId": self.player_id, "targetPlayerId": target}
+
+        if set_type in TWO_STEP_SETS:
+            # El target elige su propio secreto al recibir select_own_secret
+            self.game.detective_done.clear()
+            await self.act("POST detective-action", "POST", f"/api/game/{self.game.room_id}/detective-action", json=payload)
+            try:
+                await asyncio.wait_for(self.game.detective_done.wait(), self.lt.args.ws_timeout * 4)
+            except asyncio.TimeoutError:
+                logger.debug("Detective action %s not completed by target", body["actionId"])
+            return
+
+        want_hidden = set_type != "pyne"
+        secrets = [
+            s for s in (self.game.public_state or {}).get("secretsFromAllPlayers", [])
+            if s["player_id"] == target and s["hidden"] == want_hidden
+        ]
+        if not secrets:
+            return
+        payload["secretId"] = random.choice(secrets)["id"]
+        await self.act("POST detective-action", "POST", f"/api/game/{self.game.room_id}/detective-action", json=payload)
+
+    async def answer_detective_action(self, action_id: int):
+        hidden = [s for s in self.secrets if not s.get("revealed")]
+        if not hidden:
+            return
+        await self.lt.request(
+            "POST detective-action", "POST", f"/api/game/{self.game.room_id}/detective-action",
+            json={"actionId": action_id, "executorId": self.player_id, "secretId": random.choice(hidden)["id"]},
+        )
+
+
+class SimulatedGame:
+    """Una partida: sala, bots y bucle de turnos"""
+
+    def __init__(self, lt: LoadTest, index: int):
+        self.lt = lt
+        self.index = index
+        self.room_id: Optional[int] = None
+        self.game_id: Optional[int] = None
+        self.host_id: Optional[int] = None
+        self.bots: Dict[int, BotPlayer] = {}
+        self.public_state: Optional[dict] = None
+        self.detective_done = asyncio.Event()
+        self.finished = False
+
+    @staticmethod
+    def _player_payload(tag: str) -> dict:
+        day = random.randint(1, 28)
+        month = random.randint(1, 12)
+        return {
+            "name": f"bot-{tag}",
+            "avatar": f"/avatars/bot-{uuid.uuid4().hex[:12]}.png",
+            "birthdate": f"{random.randint(1950, 2005)}-{month:02d}-{day:02d}",
+        }
+
+    async def setup(self) -> bool:
+        lt = self.lt
+        host = self._player_payload(f"{self.index}-host")
+        response = await lt.request("POST /game", "POST", "/game", json={
+            "room": {
+                "nombre_partida": f"load-{uuid.uuid4().hex[:16]}",
+                "jugadoresMin": 2,
+                "jugadoresMax": lt.args.players,
+            },
+            "player": {"nombre": host["name"], "avatar": host["avatar"], "fechaNacimiento": host["birthdate"]},
+        })
+        if response is None or response.status_code != 201:
+            return False
+
+        body = response.json()
+        self.room_id = body["room"]["id"]
+        self.host_id = body["room"]["host_id"]
+        player_ids = [self.host_id]
+
+        for n in range(1, lt.args.players):
+            payload = self._player_payload(f"{self.index}-{n}")
+            response = await lt.request("POST join", "POST", f"/game/{self.room_id}/join", json=payload)
+            if response is None or response.status_code != 200:
+                return False
+            me = next(p for p in response.json()["players"] if p["avatar"] == payload["avatar"])
+            player_ids.append(me["id"])
+
+        self.bots = {pid: BotPlayer(lt, self, pid) for pid in player_ids}
+        await asyncio.gather(*(bot.connect() for bot in self.bots.values()))
+        return True
+
+    async def run(self):
+        lt = self.lt
+        try:
+            if not await self.setup():
+                return
+
+            response = await lt.request("POST start", "POST", f"/game/{self.room_id}/start", json={"user_id": self.host_id})
+            if response is None or response.status_code != 201:
+                return
+            body = response.json()
+            self.game_id = body["game"]["id"]
+            current = body["turn"]["current_player_id"]
+            lt.metrics.games_started += 1
+
+            # Esperar el primer estado privado de todos los bots
+            await asyncio.gather(*(
+                asyncio.wait_for(bot.private_updated.wait(), lt.args.ws_timeout)
+                for bot in self.bots.values()
+            ), return_exceptions=True)
+
+            turns = 0
+            while not self.finished and turns < lt.args.max_turns and time.monotonic() < lt.deadline:
+                bot = self.bots.get(current)
+                if bot is None:
+                    break
+                current = await bot.play_turn()
+                if current is None:
+                    break
+                turns += 1
+                lt.metrics.turns += 1
+
+            if self.finished:
+                lt.metrics.games_finished += 1
+        finally:
+            await asyncio.gather(*(bot.disconnect() for bot in self.bots.values()), return_exceptions=True)
+
+
+async def run_load_test(args: argparse.Namespace) -> dict:
+    lt = LoadTest(args)
+    limits = httpx.Limits(max_connections=args.max_connections, max_keepalive_connections=args.max_connections)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.http_timeout, limits=limits) as client:
+        lt.client = client
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def one_game(index: int):
+            # Ramp-up: distribuir los arranques en el intervalo configurado
+            await asyncio.sleep(args.ramp_up * index / max(1, args.games))
+            async with semaphore:
+                await SimulatedGame(lt, index).run()
+
+        await asyncio.gather(*(one_game(i) for i in range(args.games)))
+    return lt.metrics.report()
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load test con jugadores simulados")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--games", type=int, default=10, help="Partidas a simular")
+    parser.add_argument("--concurrency", type=int, default=10, help="Partidas simultáneas")
+    parser.add_argument("--players", type=int, default=4, choices=range(2, 7), help="Jugadores por partida")
+    parser.add_argument("--think-time", type=float, default=0.2, help="Pausa media entre acciones de un bot (s)")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="Segundos para arrancar todas las partidas")
+    parser.add_argument("--duration", type=float, default=300.0, help="Duración máxima (s)")
+    parser.add_argument("--max-turns", type=int, default=200, help="Turnos máximos por partida")
+    parser.add_argument("--draft-probability", type=float, default=0.5, help="Probabilidad de robar del draft")
+    parser.add_argument("--set-probability", type=float, default=0.8, help="Probabilidad de bajar un set si hay")
+    parser.add_argument("--ws-timeout", type=float, default=2.0, help="Espera máxima de eventos WebSocket (s)")
+    parser.add_argument("--http-timeout", type=float, default=30.0)
+    parser.add_argument("--max-connections", type=int, default=100)
+    parser.add_argument("--json", dest="json_output", help="Guardar el reporte en este archivo JSON")
+    parser.add_argument("--seed", type=int, help="Semilla para decisiones reproducibles")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO, format="%(levelname)s %(message)s")
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    report = asyncio.run(run_load_test(args))
+    print(format_report(report))
+    if args.json_output:
+        with open(args.json_output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
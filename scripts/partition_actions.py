@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+"""
+scripts/partition_actions.py
+
+Particionado y retención del log de acciones (app/db/partitioning.py).
+
+``--migrate`` particiona ``actions_per_turn`` por mes (solo MySQL; una vez). Sin
+argumentos corre la pasada de mantenimiento: crea las particiones de los próximos
+``ACTION_PARTITION_MONTHS_AHEAD`` meses y aplica ``ACTION_RETENTION_DAYS``
+(``DROP PARTITION``, o ``DELETE`` por lotes si la tabla no está particionada).
+Pensado para correr una vez por día (cron).
+
+Uso:
+    python scripts/partition_actions.py --migrate --dry-run    # muestra el DDL
+    python scripts/partition_actions.py --migrate
+    python scripts/partition_actions.py                        # mantenimiento
+    python scripts/partition_actions.py --retention-days 180
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def main():
+    from app.config import settings
+
+    parser = argparse.ArgumentParser(description="Particionado y retención de actions_per_turn")
+    parser.add_argument("--migrate", action="store_true", help="particionar la tabla (MySQL)")
+    parser.add_argument("--dry-run", action="store_true", help="con --migrate: solo mostrar el DDL")
+    parser.add_argument("--retention-days", type=int, default=settings.ACTION_RETENTION_DAYS,
+                        help="días de acciones a conservar (0 = todas)")
+    parser.add_argument("--months-ahead", type=int, default=settings.ACTION_PARTITION_MONTHS_AHEAD)
+    parser.add_argument("--batch-size", type=int, default=1000, help="filas por lote sin particiones")
+    args = parser.parse_args()
+
+    from app.db import partitioning
+    from app.db.database import engine
+
+    if args.migrate:
+        try:
+            statements = partitioning.migrate(engine, months_ahead=args.months_ahead, dry_run=args.dry_run)
+        except RuntimeError as e:
+            print(e)
+            sys.exit(1)
+        print(";\n".join(statements) + (";" if statements else "-- La tabla ya está particionada"))
+    else:
+        report = partitioning.maintain(engine, args.retention_days, args.months_ahead, args.batch_size)
+        print(json.dumps(report))
+
+
+if __name__ == "__main__":
+    main()
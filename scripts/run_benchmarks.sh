@@ -0,0 +1,22 @@
+#!/usr/bin/env bash
+# Microbenchmarks de los servicios calientes (ver benchmarks/).
+#   scripts/run_benchmarks.sh          -> compara contra el último baseline guardado
+#   scripts/run_benchmarks.sh --save   -> guarda una nueva corrida como baseline
+# Falla si la mediana de algún benchmark empeora más que BENCH_THRESHOLD (default 25%).
+set -euo pipefail
+
+cd "$(dirname "$0")/.."
+
+STORAGE="file://./benchmarks/.baselines"
+THRESHOLD="${BENCH_THRESHOLD:-25%}"
+export DATABASE_URL="${DATABASE_URL:-sqlite:///:memory:}"
+export LOG_LEVEL="${LOG_LEVEL:-WARNING}"
+
+if [[ "${1:-}" == "--save" ]]; then
+  shift
+  python -m pytest benchmarks -q --benchmark-storage="$STORAGE" --benchmark-autosave "$@"
+else
+  python -m pytest benchmarks -q --benchmark-storage="$STORAGE" \
+    --benchmark-compare --benchmark-compare-fail="median:${THRESHOLD}" \
+    --benchmark-columns=min,mean,median,max,rounds "$@"
+fi
@@ -1,4 +1,4 @@
 #!/bin/bash
 # scripts/start_dev.sh
 # source venv/bin/activate
-uvicorn app.main:socket_app --host 0.0.0.0 --port 8000 --reload
+uvicorn --factory app.main:create_socket_app --host 0.0.0.0 --port 8000 --reload
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+"""
+scripts/wire_size.py
+
+Mide los bytes por turno de las actualizaciones de estado WebSocket en cada
+formato de cable (app/sockets/wire_format.py).
+
+Juega partidas con el simulador headless y, después de cada turno, arma el estado
+con build_complete_game_state y los mensajes que emite notificar_estado_partida:
+game_state_public para cada jugador conectado y game_state_private para cada uno.
+Suma el tamaño de esos payloads codificados en cada formato.
+
+Uso:
+    python scripts/wire_size.py --games 5 --players 4
+    python scripts/wire_size.py --games 20 --players 6 --json wire.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from statistics import mean
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def _variants():
+    from app.sockets import wire_format as wire
+
+    variants = [
+        ("json", wire.JSON, False),
+        ("json+deflate", wire.JSON, True),
+        ("compact", wire.COMPACT, False),
+        ("compact+deflate", wire.COMPACT, True),
+    ]
+    if wire.msgpack is not None:
+        variants += [("msgpack", wire.MSGPACK, False), ("msgpack+deflate", wire.MSGPACK, True)]
+    return variants
+
+
+async def measure_game(db, seed: int, num_players: int):
+    from app.services.game_status_service import build_complete_game_state
+    from app.simulation.simulator import GameSimulator, SimulationConfig
+    from app.sockets.socket_service import WebSocketService
+    from app.sockets.wire_format import encoded_size
+
+    variants = _variants()
+    per_turn = {name: [] for name, _, _ in variants}
+
+    class MeasuringSimulator(GameSimulator):
+        async def _play_turn(self):
+            await super()._play_turn()
+            if self.result.status != "running":
+                return
+            state = build_complete_game_state(self.db, self.game_id)
+            public = WebSocketService._mensaje_publico(self.room_id, state)
+            privates = [
+                WebSocketService._mensaje_privado(player_id, private)
+                for player_id, private in state.get("estados_privados", {}).items()
+            ]
+            for name, wire_format, deflate in variants:
+                size = encoded_size(public, wire_format, deflate) * len(privates)
+                size += sum(encoded_size(p, wire_format, deflate) for p in privates)
+                per_turn[name].append(size)
+
+    config = SimulationConfig(num_players=num_players, check_invariants=False, keep_games=False)
+    result = await MeasuringSimulator(db, config, seed).run()
+    return result, per_turn
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bytes por turno de las actualizaciones de estado por formato")
+    parser.add_argument("--games", type=int, default=5)
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", help="guardar el resumen en este archivo")
+    args = parser.parse_args()
+
+    from app.simulation.runner import init_worker
+    init_worker("sqlite:///:memory:")
+    from app.db.database import SessionLocal
+
+    loop = asyncio.new_event_loop()
+    totals = {}
+    turns = 0
+    for game in range(args.games):
+        db = SessionLocal()
+        try:
+            result, per_turn = loop.run_until_complete(measure_game(db, args.seed + game, args.players))
+        finally:
+            db.close()
+        turns += result.turns
+        for name, sizes in per_turn.items():
+            totals.setdefault(name, []).extend(sizes)
+
+    baseline = mean(totals["json"]) if totals.get("json") else 0
+    summary = {
+        "games": args.games,
+        "players": args.players,
+        "turns": turns,
+        "bytes_per_turn": {name: round(mean(sizes)) for name, sizes in totals.items() if sizes},
+    }
+    print(f"{args.games} partidas, {args.players} jugadores, {turns} turnos medidos")
+    print(f"{'formato':<18}{'bytes/turno':>12}{'vs json':>10}")
+    for name, value in summary["bytes_per_turn"].items():
+        ratio = value / baseline if baseline else 0
+        print(f"{name:<18}{value:>12}{ratio:>9.0%}")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()